@@ -0,0 +1,141 @@
+import asyncio
+import hashlib
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from fastapi import FastAPI, Header, Query, Response
+from fastapi.responses import JSONResponse
+from vidrank.lib.utilities.typing_utilities import JsonObject
+
+from benchmarks.synthetic_data import SyntheticData
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class NetworkConditions:
+    """Latency and failures of the fake API's responses."""
+
+    latency_seconds: float = 0.0
+    error_rate: float = 0.0
+
+
+class FakeYouTubeApi:
+    """Local stand-in for the parts of the YouTube Data API that vidrank calls.
+
+    Serves synthetic videos, channels, a playlist and its pages of items in the JSON format of the real API, including
+    ETags and 304 responses for unchanged playlist pages. Every response is delayed by a fixed latency, a fraction of
+    requests fails with a server error, and a fraction of the playlist videos is missing from the videos endpoint, the
+    way deleted and private videos are. Calls are counted per endpoint.
+    """
+
+    API_PATH = "/youtube/v3"
+    MISSING_RATE = 0.02
+
+    def __init__(
+        self,
+        synthetic_data: SyntheticData,
+        playlist_id: str,
+        n_videos: int,
+        network_conditions: Optional[NetworkConditions] = None,
+    ):
+        """Initialize the fake API.
+
+        Args:
+            synthetic_data (SyntheticData): The generator of the served data.
+            playlist_id (str): The ID of the only playlist.
+            n_videos (int): The number of videos in the playlist.
+            network_conditions (Optional[NetworkConditions]): The latency and error rate of the responses, or None for
+                instant responses that never fail.
+        """
+        self.playlist_id = playlist_id
+        self.network_conditions = network_conditions if network_conditions is not None else NetworkConditions()
+        self.call_counts: Counter[str] = Counter()
+        self.error_counts: Counter[str] = Counter()
+
+        rng = np.random.default_rng(synthetic_data.seed)
+        video_dicts = synthetic_data.get_video_dicts(n_videos)
+        found = rng.random(n_videos) >= self.MISSING_RATE
+        self._video_dicts = {
+            video_dict["id"]: video_dict for video_dict, is_found in zip(video_dicts, found, strict=True) if is_found
+        }
+        self._playlist_dict = synthetic_data.get_playlist_dict(playlist_id)
+        self._item_dicts = synthetic_data.get_playlist_item_dicts(n_videos)
+        self._synthetic_data = synthetic_data
+        self._error_rng = np.random.default_rng(synthetic_data.seed + 1)
+
+    def create_app(self) -> FastAPI:
+        """Create the ASGI app serving the fake API.
+
+        Returns:
+            FastAPI: The app, with routes under the same path as the real API.
+        """
+        app = FastAPI()
+
+        @app.get(f"{self.API_PATH}/videos")
+        async def get_videos(video_ids: str = Query(alias="id")) -> Response:
+            if (error := await self._start_call("videos")) is not None:
+                return error
+            items = [self._video_dicts[video_id] for video_id in video_ids.split(",") if video_id in self._video_dicts]
+            return self._list_response(items)
+
+        @app.get(f"{self.API_PATH}/channels")
+        async def get_channels(channel_id: str = Query(alias="id")) -> Response:
+            if (error := await self._start_call("channels")) is not None:
+                return error
+            return self._list_response([self._synthetic_data.get_channel_dict(channel_id)])
+
+        @app.get(f"{self.API_PATH}/playlists")
+        async def get_playlists(playlist_id: str = Query(alias="id")) -> Response:
+            if (error := await self._start_call("playlists")) is not None:
+                return error
+            items = [self._playlist_dict] if playlist_id == self.playlist_id else []
+            return self._list_response(items)
+
+        @app.get(f"{self.API_PATH}/playlistItems")
+        async def get_playlist_items(
+            playlist_id: str = Query(alias="playlistId"),
+            max_results: int = Query(default=5, alias="maxResults"),
+            page_token: Optional[str] = Query(default=None, alias="pageToken"),
+            if_none_match: Optional[str] = Header(default=None),
+        ) -> Response:
+            if (error := await self._start_call("playlistItems")) is not None:
+                return error
+            if playlist_id != self.playlist_id:
+                return self._error_response("playlistItems", 404, f"Playlist {playlist_id} not found")
+
+            start = 0 if page_token is None else int(page_token)
+            end = start + max_results
+            etag = hashlib.sha256(f"{self.playlist_id}:{len(self._item_dicts)}:{start}".encode()).hexdigest()[:16]
+            if if_none_match == etag:
+                return Response(status_code=304)
+
+            response_json: JsonObject = {
+                "etag": etag,
+                "items": self._item_dicts[start:end],
+                "pageInfo": {"totalResults": len(self._item_dicts), "resultsPerPage": max_results},
+            }
+            if end < len(self._item_dicts):
+                response_json["nextPageToken"] = str(end)
+            return JSONResponse(response_json)
+
+        return app
+
+    async def _start_call(self, endpoint: str) -> Optional[Response]:
+        self.call_counts[endpoint] += 1
+        if self.network_conditions.latency_seconds > 0:
+            await asyncio.sleep(self.network_conditions.latency_seconds)
+        if self._error_rng.random() < self.network_conditions.error_rate:
+            return self._error_response(endpoint, 500, "Backend Error")
+        return None
+
+    def _error_response(self, endpoint: str, code: int, message: str) -> Response:
+        self.error_counts[endpoint] += 1
+        return JSONResponse({"error": {"code": code, "message": message}}, status_code=code)
+
+    @classmethod
+    def _list_response(cls, items: list[JsonObject]) -> Response:
+        return JSONResponse({"items": items, "pageInfo": {"totalResults": len(items), "resultsPerPage": len(items)}})
@@ -0,0 +1,383 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+import click
+import httpx
+import numpy as np
+import uvicorn
+from starlette.types import ASGIApp, Receive, Scope, Send
+from vidrank.app.app import app
+from vidrank.app.app_state import AppState
+from vidrank.lib.utilities.typing_utilities import JsonObject
+
+from benchmarks.fake_youtube_api import FakeYouTubeApi, NetworkConditions
+from benchmarks.run_benchmarks import MATCHING_SETTINGS, SEED, get_commit
+from benchmarks.synthetic_data import SyntheticData
+
+logger = logging.getLogger(__name__)
+
+HOST = "127.0.0.1"
+# NOTE: Idle connections are kept open for the whole run, so closed keep-alive connections are not counted as errors
+KEEP_ALIVE_SECONDS = 600
+PLAYLIST_ID = "synthetic"
+RANKINGS_PAGE_SIZE = 20
+MAX_RANKINGS_PAGES = 3
+MIN_SESSION_STEPS = 5
+MAX_SESSION_STEPS = 20
+REMOVE_PROBABILITY = 0.05
+SEARCH_N_RESULTS = 20
+# Relative frequency of each user action after a choice set is shown
+SESSION_MIX = {
+    "submit": 0.6,
+    "skip": 0.2,
+    "undo": 0.05,
+    "rankings": 0.1,
+    "search": 0.05,
+}
+
+# The vidrank route that caused an upstream request, or "background" for the playlist syncer and choice set queue
+_current_route: ContextVar[str] = ContextVar("current_route", default="background")
+
+
+class RouteTaggingMiddleware:
+    """ASGI middleware that records the path of the request being served, so upstream calls can be attributed."""
+
+    def __init__(self, app: ASGIApp):
+        """Initialize the middleware.
+
+        Args:
+            app (ASGIApp): The app to wrap.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Serve a request with its path recorded.
+
+        Args:
+            scope (Scope): The ASGI connection scope.
+            receive (Receive): The ASGI receive channel.
+            send (Send): The ASGI send channel.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = _current_route.set(scope["path"])
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_route.reset(token)
+
+
+@dataclass
+class LoadTestStats:
+    """Latencies and status codes of the requests sent to vidrank, and the upstream calls they caused."""
+
+    latencies: defaultdict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    status_counts: defaultdict[str, Counter[str]] = field(default_factory=lambda: defaultdict(Counter))
+    upstream_counts: defaultdict[str, Counter[str]] = field(default_factory=lambda: defaultdict(Counter))
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def count_upstream(self, request: httpx.Request) -> None:
+        """Count a request to the YouTube API against the route that caused it.
+
+        Args:
+            request (httpx.Request): The request to the YouTube API.
+        """
+        endpoint = request.url.path.rsplit("/", 1)[-1]
+        with self.lock:
+            self.upstream_counts[_current_route.get()][endpoint] += 1
+
+    async def count_upstream_async(self, request: httpx.Request) -> None:
+        """Count a request to the YouTube API made by the async client.
+
+        Args:
+            request (httpx.Request): The request to the YouTube API.
+        """
+        self.count_upstream(request)
+
+    def get_report(self, duration_seconds: float) -> JsonObject:
+        """Summarize the stats per route.
+
+        Args:
+            duration_seconds (float): The duration of the load test.
+
+        Returns:
+            JsonObject: The latency percentiles, throughput, status codes and upstream calls of every route.
+        """
+        routes: JsonObject = {}
+        for route, latencies in sorted(self.latencies.items()):
+            latencies_ms = np.array(latencies) * 1e3
+            p50, p90, p99 = np.percentile(latencies_ms, [50, 90, 99]).tolist()
+            routes[route] = {
+                "n_requests": len(latencies),
+                "throughput_rps": len(latencies) / duration_seconds,
+                "p50_ms": p50,
+                "p90_ms": p90,
+                "p99_ms": p99,
+                "max_ms": float(latencies_ms.max()),
+                "status_counts": dict(self.status_counts[route]),
+                "upstream_calls": dict(self.upstream_counts[route]),
+            }
+        background_calls = dict(self.upstream_counts["background"])
+        return {"routes": routes, "background_upstream_calls": background_calls}
+
+
+class ServerThread:
+    """Uvicorn server running an ASGI app in a background thread."""
+
+    def __init__(self, app: ASGIApp, port: int):
+        """Initialize the server thread.
+
+        Args:
+            app (ASGIApp): The app to serve.
+            port (int): The local port to listen on.
+        """
+        self.server = uvicorn.Server(
+            uvicorn.Config(app, host=HOST, port=port, log_level="warning", timeout_keep_alive=KEEP_ALIVE_SECONDS)
+        )
+        self._thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def start(self) -> None:
+        """Start serving and wait until the server accepts connections."""
+        self._thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+
+    def stop(self) -> None:
+        """Shut the server down, running the shutdown of its lifespan."""
+        self.server.should_exit = True
+        self._thread.join()
+
+
+class Session:
+    """A simulated user rating choice sets, undoing some choices, paging through the rankings and searching."""
+
+    def __init__(self, client: httpx.AsyncClient, stats: LoadTestStats, rng: np.random.Generator):
+        """Initialize the session.
+
+        Args:
+            client (httpx.AsyncClient): The client for the vidrank API.
+            stats (LoadTestStats): The stats to record requests in.
+            rng (np.random.Generator): The source of the session's random choices.
+        """
+        self.client = client
+        self.stats = stats
+        self.rng = rng
+        strategy = list(MATCHING_SETTINGS)[int(rng.integers(len(MATCHING_SETTINGS)))]
+        self.settings = {"matching_settings": MATCHING_SETTINGS[strategy].model_dump(mode="json")}
+        self.video_ids: list[str] = []
+        self.video_titles: list[str] = []
+        self.record_ids: list[str] = []
+
+    async def run(self, deadline: float) -> None:
+        """Show a choice set and then take a random number of actions.
+
+        Args:
+            deadline (float): The time after which no more actions are taken.
+        """
+        response_json = await self._post("/videos", {"settings": self.settings})
+        self._set_videos(response_json)
+
+        actions = list(SESSION_MIX)
+        n_steps = int(self.rng.integers(MIN_SESSION_STEPS, MAX_SESSION_STEPS + 1))
+        for action in self.rng.choice(actions, size=n_steps, p=list(SESSION_MIX.values())):
+            if time.perf_counter() >= deadline:
+                return
+            if action == "submit":
+                await self._choose("/submit", self._get_choices(select=True))
+            elif action == "skip":
+                await self._choose("/skip", self._get_choices(select=False))
+            elif action == "undo":
+                await self._undo()
+            elif action == "search":
+                await self._search()
+            else:
+                await self._page_rankings()
+
+    async def _choose(self, path: str, choices: list[JsonObject]) -> None:
+        request_json = {"choice_set": {"choices": choices}, "settings": self.settings}
+        response_json = await self._post(path, request_json)
+        if response_json is not None:
+            self.record_ids.append(response_json["record_id"])
+        self._set_videos(response_json)
+
+    async def _undo(self) -> None:
+        if len(self.record_ids) == 0:
+            return
+        response_json = await self._post("/undo", {"record_id": self.record_ids.pop()})
+        self._set_videos(response_json)
+
+    async def _page_rankings(self) -> None:
+        n_pages = int(self.rng.integers(1, MAX_RANKINGS_PAGES + 1))
+        cursor = None
+        for _ in range(n_pages):
+            response_json = await self._post("/rankings", {"page_size": RANKINGS_PAGE_SIZE, "cursor": cursor})
+            if response_json is None or response_json["next_cursor"] is None:
+                return
+            cursor = response_json["next_cursor"]
+
+    async def _search(self) -> None:
+        if len(self.video_titles) == 0:
+            return
+        # NOTE: Searching for the first word of a shown title one letter at a time, like a user typing a query
+        words = self.video_titles[int(self.rng.integers(len(self.video_titles)))].split()
+        query = words[0] if len(words) > 0 else ""
+        for query_i in range(1, len(query) + 1):
+            await self._post("/search", {"query": query[:query_i], "n_results": SEARCH_N_RESULTS})
+
+    def _get_choices(self, select: bool) -> list[JsonObject]:
+        actions = ["nothing"] * len(self.video_ids)
+        if select and len(actions) > 0:
+            actions[int(self.rng.integers(len(actions)))] = "select"
+        if len(actions) > 1 and self.rng.random() < REMOVE_PROBABILITY:
+            actions[-1] = "remove"
+        return [
+            {"video_id": video_id, "action": action} for video_id, action in zip(self.video_ids, actions, strict=True)
+        ]
+
+    def _set_videos(self, response_json: Optional[JsonObject]) -> None:
+        if response_json is not None:
+            self.video_ids = [video["id"] for video in response_json["videos"]]
+            self.video_titles = [video["title"] for video in response_json["videos"]]
+
+    async def _post(self, path: str, request_json: JsonObject) -> Optional[JsonObject]:
+        start = time.perf_counter()
+        response: Optional[httpx.Response] = None
+        try:
+            response = await self.client.post(path, json=request_json)
+            status = str(response.status_code)
+        except httpx.HTTPError as exc:
+            status = type(exc).__name__
+        latency = time.perf_counter() - start
+
+        with self.stats.lock:
+            self.stats.latencies[path].append(latency)
+            self.stats.status_counts[path][status] += 1
+
+        if response is None or not response.is_success:
+            return None
+        return response.json()
+
+
+async def drive(base_url: str, concurrency: int, duration_seconds: float, stats: LoadTestStats) -> float:
+    """Run sessions from concurrent simulated users until the duration has passed.
+
+    Args:
+        base_url (str): The base URL of the vidrank API.
+        concurrency (int): The number of simulated users.
+        duration_seconds (float): The time after which no more requests are sent.
+        stats (LoadTestStats): The stats to record requests in.
+
+    Returns:
+        float: The time it took for all sessions to stop.
+    """
+    start = time.perf_counter()
+    deadline = start + duration_seconds
+
+    async def run_user(user_i: int) -> None:
+        rng = np.random.default_rng([SEED, user_i])
+        while time.perf_counter() < deadline:
+            await Session(client, stats, rng).run(deadline)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        await asyncio.gather(*[run_user(user_i) for user_i in range(concurrency)])
+    return time.perf_counter() - start
+
+
+def get_free_port() -> int:
+    """Find a free local port.
+
+    Returns:
+        int: The port.
+    """
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+@click.command()
+@click.option("--n-videos", type=int, default=1000, help="Number of videos in the fake playlist.")
+@click.option("--concurrency", type=int, default=8, help="Number of simulated users.")
+@click.option("--duration", type=float, default=30.0, help="Seconds to send requests for.")
+@click.option("--latency-ms", type=float, default=50.0, help="Latency of every fake YouTube API response.")
+@click.option("--error-rate", type=float, default=0.0, help="Fraction of fake YouTube API requests that fail.")
+def main(n_videos: int, concurrency: int, duration: float, latency_ms: float, error_rate: float) -> None:
+    """Load test the vidrank API against a local fake of the YouTube API and emit JSON results.
+
+    Args:
+        n_videos (int): Number of videos in the fake playlist.
+        concurrency (int): Number of simulated users.
+        duration (float): Seconds to send requests for.
+        latency_ms (float): Latency of every fake YouTube API response.
+        error_rate (float): Fraction of fake YouTube API requests that fail.
+    """
+    logging.getLogger("vidrank").setLevel(logging.WARNING)
+    fake_api = FakeYouTubeApi(
+        SyntheticData(SEED),
+        PLAYLIST_ID,
+        n_videos,
+        NetworkConditions(latency_seconds=latency_ms / 1e3, error_rate=error_rate),
+    )
+    fake_port = get_free_port()
+    fake_server = ServerThread(fake_api.create_app(), fake_port)
+    fake_server.start()
+
+    with tempfile.TemporaryDirectory(prefix="vidrank-load-test-") as cache_dirname:
+        # NOTE: The quota is lifted so that long runs measure the server instead of running out of quota
+        os.environ["YOUTUBE_API_KEY"] = "load-test"
+        os.environ["VIDRANK_CACHE_DIR"] = cache_dirname
+        os.environ["VIDRANK_PLAYLIST_ID"] = PLAYLIST_ID
+        os.environ["VIDRANK_YOUTUBE_BASE_URL"] = f"http://{HOST}:{fake_port}{FakeYouTubeApi.API_PATH}"
+        os.environ["VIDRANK_DAILY_QUOTA"] = str(10**9)
+
+        stats = LoadTestStats()
+        youtube_facade = AppState.get().youtube_facade
+        youtube_facade.youtube_client.http_client.event_hooks = {"request": [stats.count_upstream]}
+        youtube_facade.async_youtube_client.http_client.event_hooks = {"request": [stats.count_upstream_async]}
+
+        port = get_free_port()
+        server = ServerThread(RouteTaggingMiddleware(app), port)
+        server.start()
+        try:
+            click.echo(f"Load testing with {concurrency} users for {duration} seconds", err=True)
+            elapsed = asyncio.run(drive(f"http://{HOST}:{port}", concurrency, duration, stats))
+        finally:
+            server.stop()
+            fake_server.stop()
+
+    report = {
+        "commit": get_commit(),
+        "config": {
+            "n_videos": n_videos,
+            "concurrency": concurrency,
+            "duration_seconds": duration,
+            "latency_ms": latency_ms,
+            "error_rate": error_rate,
+        },
+        "elapsed_seconds": elapsed,
+        **stats.get_report(elapsed),
+        "fake_api": {"call_counts": dict(fake_api.call_counts), "error_counts": dict(fake_api.error_counts)},
+    }
+    for route, route_stats in report["routes"].items():
+        click.echo(
+            f"{route:<12} {route_stats['n_requests']:>7} requests {route_stats['throughput_rps']:>8.1f} rps"
+            f" p50 {route_stats['p50_ms']:>8.1f} ms p99 {route_stats['p99_ms']:>8.1f} ms",
+            err=True,
+        )
+    click.echo(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
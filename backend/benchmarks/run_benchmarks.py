@@ -0,0 +1,507 @@
+import contextlib
+import io
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from functools import partial
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+import click
+import numpy as np
+from vidrank.app.app_state import AppState
+from vidrank.lib.analytics.analytics import Analytics, print_analysis
+from vidrank.lib.analytics.record_columns import RecordColumns
+from vidrank.lib.caching.memory_cache import MemoryCache
+from vidrank.lib.caching.pickle_cache import PickleCache
+from vidrank.lib.caching.record_tracker import RecordTracker
+from vidrank.lib.matching.choice_set_queue import ChoiceSetQueue
+from vidrank.lib.matching.matcher import Matcher
+from vidrank.lib.matching.playlist_date_index import PlaylistDateIndex
+from vidrank.lib.matching.removed_video_index import RemovedVideoIndex
+from vidrank.lib.models.choice_set import ChoiceSet
+from vidrank.lib.models.matching_settings import (
+    ActiveStrategySettings,
+    ByDateStrategySettings,
+    ByRatingStrategySettings,
+    FinetuneStrategySettings,
+    MatchingSettings,
+    RandomStrategySettings,
+)
+from vidrank.lib.models.record import Record
+from vidrank.lib.profiling.request_profiler import RequestProfiler
+from vidrank.lib.ranking.leaderboard import Leaderboard
+from vidrank.lib.ranking.ranker import Ranker
+from vidrank.lib.ranking.ranking_engine import RankingEngine
+from vidrank.lib.search.search_index import SearchIndex
+from vidrank.lib.utilities.datetime_utilities import get_timestamp
+from vidrank.lib.utilities.typing_utilities import JsonObject
+from vidrank.lib.youtube.async_youtube_client import AsyncYouTubeClient
+from vidrank.lib.youtube.channel import Channel
+from vidrank.lib.youtube.playlist import Playlist
+from vidrank.lib.youtube.playlist_syncer import PlaylistSyncer
+from vidrank.lib.youtube.quota_scheduler import QuotaScheduler
+from vidrank.lib.youtube.video import Video
+from vidrank.lib.youtube.video_summary import VideoSummary
+from vidrank.lib.youtube.youtube_caches import YouTubeCaches
+from vidrank.lib.youtube.youtube_client import YouTubeClient
+from vidrank.lib.youtube.youtube_facade import YouTubeFacade
+from vidrank.lib.youtube.youtube_marshaller import YouTubeMarshaller
+
+from benchmarks.synthetic_data import SyntheticData
+
+logger = logging.getLogger(__name__)
+
+PLAYLIST_ID = "synthetic"
+N_VIDEOS_PER_MATCH = 6
+N_OPS_PER_REPEAT = 100
+SEED = 0
+MIN_SECONDS = 1.0
+MAX_REPEATS = 20
+MATCHING_SETTINGS = {
+    "random": MatchingSettings(
+        by_date_strategy=None,
+        by_rating_strategy=None,
+        finetune_strategy=None,
+        random_strategy=RandomStrategySettings(),
+    ),
+    "by_rating": MatchingSettings(
+        by_date_strategy=None,
+        by_rating_strategy=ByRatingStrategySettings(),
+        finetune_strategy=None,
+        random_strategy=None,
+    ),
+    "finetune": MatchingSettings(
+        by_date_strategy=None,
+        by_rating_strategy=None,
+        finetune_strategy=FinetuneStrategySettings(fraction=0.5),
+        random_strategy=None,
+    ),
+    "by_date": MatchingSettings(
+        by_date_strategy=ByDateStrategySettings(days=90),
+        by_rating_strategy=None,
+        finetune_strategy=None,
+        random_strategy=None,
+    ),
+    "active": MatchingSettings(
+        by_date_strategy=None,
+        by_rating_strategy=None,
+        finetune_strategy=None,
+        random_strategy=None,
+        active_strategy=ActiveStrategySettings(),
+    ),
+}
+
+
+@dataclass
+class BenchmarkResult:
+    """Timings of one benchmark at one data size."""
+
+    name: str
+    size: int
+    n_repeats: int
+    n_ops: int
+    min_seconds: float
+    median_seconds: float
+    mean_seconds: float
+
+    @property
+    def median_seconds_per_op(self) -> float:
+        """Get the median time of a single operation.
+
+        Returns:
+            float: The median seconds per operation.
+        """
+        return self.median_seconds / self.n_ops
+
+
+@dataclass
+class Benchmark:
+    """A function to time, with an optional untimed setup run before every repeat."""
+
+    name: str
+    fn: Callable[[], object]
+    n_ops: int = 1
+    setup: Optional[Callable[[], None]] = None
+
+
+@dataclass
+class BenchmarkData:
+    """Synthetic data and application state for one data size."""
+
+    size: int
+    dirpath: Path
+    video_dicts: list[JsonObject]
+    videos: list[Video]
+    playlist: Playlist
+    records: list[Record]
+    app_state: AppState
+
+
+def create_data(synthetic_data: SyntheticData, size: int, dirpath: Path) -> BenchmarkData:
+    """Generate the synthetic data for one size and write it to a cache directory.
+
+    Args:
+        synthetic_data (SyntheticData): The synthetic data generator.
+        size (int): The number of videos and records.
+        dirpath (Path): The cache directory to write to.
+
+    Returns:
+        BenchmarkData: The synthetic data and an application state reading from it.
+    """
+    video_dicts = synthetic_data.get_video_dicts(size)
+    videos = [YouTubeMarshaller.parse_video(video_dict) for video_dict in video_dicts]
+    playlist = synthetic_data.get_playlist(PLAYLIST_ID, size)
+    records = synthetic_data.get_records(size, size)
+
+    # NOTE: Records are written in the legacy format so that the record tracker migrates them in a single write
+    records_dirpath = dirpath / "records"
+    records_dirpath.mkdir(parents=True)
+    with (records_dirpath / "records.json").open("w") as fp:
+        json.dump([record.model_dump(mode="json") for record in records], fp)
+
+    video_store: PickleCache[Video] = PickleCache(dirpath / "videos")
+    video_store.add_many({video.id: video for video in videos})
+    video_summary_store: PickleCache[VideoSummary] = PickleCache(dirpath / "video_summaries")
+    video_summary_store.add_many({video.id: VideoSummary.from_video(video) for video in videos})
+    playlist_store: PickleCache[Playlist] = PickleCache(dirpath / "playlists")
+    playlist_store.add(playlist.id, playlist)
+
+    return BenchmarkData(
+        size=size,
+        dirpath=dirpath,
+        video_dicts=video_dicts,
+        videos=videos,
+        playlist=playlist,
+        records=records,
+        app_state=create_app_state(dirpath, synthetic_data.seed),
+    )
+
+
+def create_app_state(dirpath: Path, seed: int) -> AppState:
+    """Create an application state over a cache directory, without reading environment variables.
+
+    Args:
+        dirpath (Path): The cache directory.
+        seed (int): The seed for random operations.
+
+    Returns:
+        AppState: The application state.
+    """
+    quota_scheduler = QuotaScheduler()
+    video_cache = MemoryCache(PickleCache[Video](dirpath / "videos"), max_bytes=256 * 1024 * 1024)
+    video_summary_cache = MemoryCache(
+        PickleCache[VideoSummary](dirpath / "video_summaries"), max_bytes=64 * 1024 * 1024
+    )
+    channel_cache = MemoryCache(PickleCache[Channel](dirpath / "channels"), max_items=1024)
+    playlist_cache = MemoryCache(PickleCache[Playlist](dirpath / "playlists"), max_items=1)
+    youtube_facade = YouTubeFacade(
+        youtube_client=YouTubeClient("benchmark", scheduler=quota_scheduler),
+        async_youtube_client=AsyncYouTubeClient("benchmark", scheduler=quota_scheduler),
+        caches=YouTubeCaches(
+            videos=video_cache,
+            video_summaries=video_summary_cache,
+            channels=channel_cache,
+            playlists=playlist_cache,
+        ),
+    )
+    record_tracker = RecordTracker(dirpath)
+    ranking_engine = RankingEngine(record_tracker, dirpath)
+    return AppState(
+        youtube_facade=youtube_facade,
+        record_tracker=record_tracker,
+        ranking_engine=ranking_engine,
+        removed_video_index=RemovedVideoIndex(record_tracker, dirpath),
+        playlist_date_index=PlaylistDateIndex(),
+        search_index=SearchIndex(youtube_facade, PLAYLIST_ID, dirpath),
+        leaderboard=Leaderboard(ranking_engine, youtube_facade, PLAYLIST_ID),
+        playlist_syncer=PlaylistSyncer(youtube_facade, PLAYLIST_ID),
+        quota_scheduler=quota_scheduler,
+        choice_set_queue=ChoiceSetQueue(),
+        request_profiler=RequestProfiler(dirpath / "profiles"),
+        playlist_id=PLAYLIST_ID,
+        cache_dirpath=dirpath,
+        match_overfetch=AppState.DEFAULT_MATCH_OVERFETCH,
+        rng=np.random.default_rng(seed),
+    )
+
+
+def iter_benchmarks(data: BenchmarkData) -> Iterator[Benchmark]:
+    """Iterate over the benchmarks for one data size.
+
+    Args:
+        data (BenchmarkData): The synthetic data and application state.
+
+    Yields:
+        Iterator[Benchmark]: The benchmarks.
+    """
+    app_state = data.app_state
+    rng = np.random.default_rng(data.size)
+
+    yield Benchmark("ranker.iter_rankings", lambda: list(Ranker.iter_rankings(data.records)))
+
+    # NOTE: Matching is measured against warm indexes, the way it runs between requests
+    list(Matcher.match(app_state, N_VIDEOS_PER_MATCH, MATCHING_SETTINGS["by_rating"]))
+    for strategy, settings in MATCHING_SETTINGS.items():
+        yield Benchmark(f"matcher.{strategy}", partial(match, app_state, settings))
+
+    record_tracker = app_state.record_tracker
+    counter = iter(range(sys.maxsize))
+
+    def new_record() -> Record:
+        record_i = next(counter)
+        choice_set = ChoiceSet(choices=data.records[record_i % data.size].choice_set.choices)
+        return Record(id=f"benchmark{record_i:07d}", created_at=get_timestamp(), choice_set=choice_set)
+
+    added_ids: list[str] = []
+
+    def add_records() -> None:
+        for _ in range(N_OPS_PER_REPEAT):
+            record = new_record()
+            record_tracker.add(record)
+            added_ids.append(record.id)
+
+    def pop_records() -> None:
+        while len(added_ids) > 0:
+            record_tracker.pop(added_ids.pop())
+
+    yield Benchmark("record_tracker.load", lambda: RecordTracker(data.dirpath).load())
+    yield Benchmark("record_tracker.add", add_records, n_ops=N_OPS_PER_REPEAT, setup=pop_records)
+    yield Benchmark("record_tracker.pop", pop_records, n_ops=N_OPS_PER_REPEAT, setup=add_records)
+    pop_records()
+
+    yield from iter_ranking_benchmarks(data)
+
+    pickle_cache: PickleCache[Video] = PickleCache(data.dirpath / "videos")
+    video_ids = [video.id for video in data.videos]
+    yield Benchmark(
+        "pickle_cache.get",
+        lambda: [pickle_cache.get(video_ids[i]) for i in rng.integers(0, data.size, size=N_OPS_PER_REPEAT)],
+        n_ops=N_OPS_PER_REPEAT,
+    )
+
+    summary_cache: PickleCache[VideoSummary] = PickleCache(data.dirpath / "video_summaries")
+    yield Benchmark(
+        "pickle_cache.get_summary",
+        lambda: [summary_cache.get(video_ids[i]) for i in rng.integers(0, data.size, size=N_OPS_PER_REPEAT)],
+        n_ops=N_OPS_PER_REPEAT,
+    )
+
+    def add_videos() -> None:
+        for video in data.videos[:N_OPS_PER_REPEAT]:
+            pickle_cache.add(video.id, video)
+
+    yield Benchmark("pickle_cache.add", add_videos, n_ops=N_OPS_PER_REPEAT)
+    yield Benchmark("pickle_cache.len", lambda: len(pickle_cache))
+
+    yield Benchmark(
+        "youtube_marshaller.parse_video",
+        lambda: [YouTubeMarshaller.parse_video(video_dict) for video_dict in data.video_dicts],
+        n_ops=data.size,
+    )
+
+    def analyze() -> None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            print_analysis(data.records, data.playlist, app_state.youtube_facade)
+
+    yield Benchmark("analytics.print_analysis", analyze)
+
+    columns = RecordColumns.from_records(data.records)
+    video_map = app_state.youtube_facade.get_video_summaries(columns.video_ids)
+    yield Benchmark("analytics.record_columns", lambda: RecordColumns.from_records(data.records))
+    yield Benchmark("analytics.get_report", lambda: Analytics.get_report(columns, data.size, video_map))
+
+
+def iter_ranking_benchmarks(data: BenchmarkData) -> Iterator[Benchmark]:
+    """Iterate over the benchmarks of keeping the rankings up to date as records are added.
+
+    Args:
+        data (BenchmarkData): The synthetic data and application state.
+
+    Yields:
+        Iterator[Benchmark]: The benchmarks.
+    """
+    record_tracker = data.app_state.record_tracker
+    ranking_engine = data.app_state.ranking_engine
+    counter = iter(range(sys.maxsize))
+    added_ids: list[str] = []
+
+    # NOTE: Every record is followed by a lookup, the way matching reads the rating index after each submit
+    def add_records() -> None:
+        for _ in range(N_OPS_PER_REPEAT):
+            record_i = next(counter)
+            choice_set = ChoiceSet(choices=data.records[record_i % data.size].choice_set.choices)
+            record = Record(id=f"ranked{record_i:07d}", created_at=get_timestamp(), choice_set=choice_set)
+            record_tracker.add(record)
+            added_ids.append(record.id)
+            ranking_engine.get_rating_index()
+
+    def pop_records() -> None:
+        while len(added_ids) > 0:
+            record_tracker.pop(added_ids.pop())
+        ranking_engine.get_rating_index()
+
+    yield Benchmark("ranking_engine.add_record", add_records, n_ops=N_OPS_PER_REPEAT, setup=pop_records)
+    pop_records()
+
+
+def match(app_state: AppState, settings: MatchingSettings) -> list[VideoSummary]:
+    """Match one choice set.
+
+    Args:
+        app_state (AppState): The application state.
+        settings (MatchingSettings): The matching settings.
+
+    Returns:
+        list[VideoSummary]: The matched videos.
+    """
+    return list(Matcher.match(app_state, N_VIDEOS_PER_MATCH, settings))
+
+
+def measure(benchmark: Benchmark, size: int, min_seconds: float, max_repeats: int) -> BenchmarkResult:
+    """Time a benchmark, repeating it until enough time has passed or the repeat limit is reached.
+
+    Args:
+        benchmark (Benchmark): The benchmark to time.
+        size (int): The data size the benchmark runs at.
+        min_seconds (float): The total time after which no more repeats are started.
+        max_repeats (int): The maximum number of repeats.
+
+    Returns:
+        BenchmarkResult: The timings of the benchmark.
+    """
+    timings: list[float] = []
+    while len(timings) < max_repeats and (len(timings) == 0 or sum(timings) < min_seconds):
+        if benchmark.setup is not None:
+            benchmark.setup()
+        start = time.perf_counter()
+        benchmark.fn()
+        timings.append(time.perf_counter() - start)
+
+    return BenchmarkResult(
+        name=benchmark.name,
+        size=size,
+        n_repeats=len(timings),
+        n_ops=benchmark.n_ops,
+        min_seconds=min(timings),
+        median_seconds=statistics.median(timings),
+        mean_seconds=statistics.fmean(timings),
+    )
+
+
+def compare(results: list[BenchmarkResult], baseline: JsonObject, threshold: float) -> list[str]:
+    """Compare results against the results of an earlier run.
+
+    Args:
+        results (list[BenchmarkResult]): The results of this run.
+        baseline (JsonObject): The output of an earlier run.
+        threshold (float): The ratio of median times above which a benchmark counts as a regression.
+
+    Returns:
+        list[str]: A description of every regression.
+    """
+    baseline_medians = {(r["name"], r["size"]): r["median_seconds"] / r["n_ops"] for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        baseline_median = baseline_medians.get((result.name, result.size))
+        if baseline_median is None or baseline_median == 0:
+            continue
+        ratio = result.median_seconds_per_op / baseline_median
+        click.echo(f"{result.name} @ {result.size}: {ratio:.2f}x baseline", err=True)
+        if ratio > threshold:
+            regressions.append(f"{result.name} @ {result.size} is {ratio:.2f}x slower than {baseline['commit']}")
+    return regressions
+
+
+def get_commit() -> Optional[str]:
+    """Get the commit of the working tree being benchmarked.
+
+    Returns:
+        Optional[str]: The commit hash, or None if it cannot be determined.
+    """
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip()
+
+
+@click.command()
+@click.option("--sizes", type=str, default="1000,10000,100000", help="Comma separated data sizes.")
+@click.option("--only", type=str, default=None, help="Only run benchmarks whose name contains this string.")
+@click.option("--output", type=click.Path(path_type=Path), default=None, help="File to write JSON results to.")
+@click.option("--baseline", type=click.Path(exists=True, path_type=Path), default=None)
+@click.option("--threshold", type=float, default=1.25, help="Slowdown ratio that fails a comparison.")
+def main(
+    sizes: str,
+    only: Optional[str],
+    output: Optional[Path],
+    baseline: Optional[Path],
+    threshold: float,
+) -> None:
+    """Run the benchmarks and emit JSON results.
+
+    Args:
+        sizes (str): Comma separated data sizes.
+        only (Optional[str]): Only run benchmarks whose name contains this string.
+        output (Optional[Path]): File to write JSON results to, or None to write them to stdout.
+        baseline (Optional[Path]): The output of an earlier run to compare against.
+        threshold (float): Slowdown ratio that fails a comparison.
+
+    Raises:
+        SystemExit: If any benchmark regressed compared to the baseline.
+    """
+    logging.basicConfig(level=logging.WARNING)
+    synthetic_data = SyntheticData(SEED)
+
+    results: list[BenchmarkResult] = []
+    for size in [int(s) for s in sizes.split(",")]:
+        with tempfile.TemporaryDirectory(prefix="vidrank-benchmark-") as tmp_dirname:
+            click.echo(f"Generating synthetic data of size {size}", err=True)
+            data = create_data(synthetic_data, size, Path(tmp_dirname))
+            for benchmark in iter_benchmarks(data):
+                if only is not None and only not in benchmark.name:
+                    continue
+                result = measure(benchmark, size, MIN_SECONDS, MAX_REPEATS)
+                click.echo(
+                    f"{result.name:<32} {size:>8} {result.median_seconds_per_op * 1e3:>12.4f} ms/op"
+                    f" ({result.n_repeats} repeats)",
+                    err=True,
+                )
+                results.append(result)
+
+    report = {
+        "commit": get_commit(),
+        "created_at": get_timestamp(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": SEED,
+        "results": [asdict(result) for result in results],
+    }
+    report_json = json.dumps(report, indent=2)
+    if output is None:
+        click.echo(report_json)
+    else:
+        output.write_text(f"{report_json}\n")
+
+    if baseline is not None:
+        regressions = compare(results, json.loads(baseline.read_text()), threshold)
+        for regression in regressions:
+            click.echo(regression, err=True)
+        if len(regressions) > 0:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+import json
+import logging
+from dataclasses import dataclass
+from itertools import islice
+from typing import Callable, Optional
+
+import click
+import numpy as np
+from trueskill import global_env
+from vidrank.lib.matching.information_gain import InformationGain
+from vidrank.lib.ranking.batch_ranker import BatchRanker
+from vidrank.lib.ranking.rating_arrays import RatingArrays
+
+from benchmarks.run_benchmarks import SEED, get_commit
+
+logger = logging.getLogger(__name__)
+
+N_VIDEOS_PER_CHOICE_SET = 6
+MAX_SELECTED = 2
+FINETUNE_FRACTION = 0.5
+
+# A strategy picks the indices of a choice set from the current rating means and deviations
+Strategy = Callable[[np.ndarray, np.ndarray, np.random.Generator], np.ndarray]
+
+
+def match_random(mu: np.ndarray, _sigma: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Pick videos uniformly at random, like the random strategy.
+
+    Args:
+        mu (np.ndarray): The rating means.
+        _sigma (np.ndarray): The rating deviations.
+        rng (np.random.Generator): The random number generator.
+
+    Returns:
+        np.ndarray: The indices of the choice set.
+    """
+    return rng.choice(len(mu), N_VIDEOS_PER_CHOICE_SET, replace=False)
+
+
+def match_by_rating(mu: np.ndarray, _sigma: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Pick a random video and the videos with the nearest rating means, like the by rating strategy.
+
+    Args:
+        mu (np.ndarray): The rating means.
+        _sigma (np.ndarray): The rating deviations.
+        rng (np.random.Generator): The random number generator.
+
+    Returns:
+        np.ndarray: The indices of the choice set.
+    """
+    selected = rng.integers(len(mu))
+    return np.argsort(np.abs(mu - mu[selected]), kind="stable")[:N_VIDEOS_PER_CHOICE_SET]
+
+
+def match_finetune(mu: np.ndarray, _sigma: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Pick videos at random from the top of the rankings, like the finetune strategy.
+
+    Args:
+        mu (np.ndarray): The rating means.
+        _sigma (np.ndarray): The rating deviations.
+        rng (np.random.Generator): The random number generator.
+
+    Returns:
+        np.ndarray: The indices of the choice set.
+    """
+    top = np.argsort(-mu, kind="stable")[: max(int(len(mu) * FINETUNE_FRACTION), N_VIDEOS_PER_CHOICE_SET)]
+    return rng.choice(top, N_VIDEOS_PER_CHOICE_SET, replace=False)
+
+
+def match_active(mu: np.ndarray, sigma: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Pick videos by expected information gain, like the active strategy.
+
+    Args:
+        mu (np.ndarray): The rating means.
+        sigma (np.ndarray): The rating deviations.
+        rng (np.random.Generator): The random number generator.
+
+    Returns:
+        np.ndarray: The indices of the choice set.
+    """
+    return np.array(list(islice(InformationGain.iter_choice_set(mu, sigma, rng), N_VIDEOS_PER_CHOICE_SET)))
+
+
+STRATEGIES: dict[str, Strategy] = {
+    "random": match_random,
+    "by_rating": match_by_rating,
+    "finetune": match_finetune,
+    "active": match_active,
+}
+
+
+@dataclass
+class SimulationResult:
+    """Outcome of simulating one strategy against one ground truth."""
+
+    n_choice_sets: Optional[int]
+    n_comparisons: Optional[int]
+    final_correlation: float
+
+
+def get_rank_correlation(a: np.ndarray, b: np.ndarray) -> float:
+    """Compute the Spearman rank correlation of two arrays without ties.
+
+    Args:
+        a (np.ndarray): The first array.
+        b (np.ndarray): The second array.
+
+    Returns:
+        float: The rank correlation.
+    """
+    a_ranks = np.argsort(np.argsort(a))
+    b_ranks = np.argsort(np.argsort(b))
+    return float(np.corrcoef(a_ranks, b_ranks)[0, 1])
+
+
+def simulate(
+    strategy: Strategy, skills: np.ndarray, max_choice_sets: int, target: float, seed: int
+) -> SimulationResult:
+    """Simulate a user making choices with a strategy until the ratings recover the ground truth.
+
+    The simulated user draws a noisy performance for every video of a choice set from its true skill with the
+    TrueSkill performance deviation, and selects the best one or two. Ratings are updated after every choice set the
+    same way the ranking engine applies a record.
+
+    Args:
+        strategy (Strategy): The strategy that picks choice sets.
+        skills (np.ndarray): The true skills of the videos.
+        max_choice_sets (int): The number of choice sets to give up after.
+        target (float): The rank correlation with the true skills that counts as converged.
+        seed (int): The seed of the strategy and the simulated user.
+
+    Returns:
+        SimulationResult: The number of choice sets and comparisons it took to converge and the final correlation.
+    """
+    env = global_env()
+    rng = np.random.default_rng(seed)
+    n_videos = len(skills)
+    ratings = RatingArrays.from_prior(n_videos)
+    mu, sigma = ratings.mu, ratings.sigma
+
+    n_comparisons = 0
+    for choice_set_i in range(1, max_choice_sets + 1):
+        choice_set = strategy(mu, sigma, rng)
+        performances = skills[choice_set] + rng.normal(0.0, env.beta, len(choice_set))
+        n_selected = int(rng.integers(1, MAX_SELECTED + 1))
+        order = np.argsort(-performances, kind="stable")
+        selected, unselected = choice_set[order[:n_selected]], choice_set[order[n_selected:]]
+
+        # NOTE: Every selected video wins against every video left alone, like Comparisons.from_records
+        winners = np.repeat(selected, len(unselected))
+        losers = np.tile(unselected, len(selected))
+        ratings = BatchRanker.rate_trueskill(winners, losers, n_videos, ratings)
+        mu, sigma = ratings.mu, ratings.sigma
+        n_comparisons += len(winners)
+
+        if get_rank_correlation(mu, skills) >= target:
+            return SimulationResult(choice_set_i, n_comparisons, get_rank_correlation(mu, skills))
+
+    return SimulationResult(None, None, get_rank_correlation(mu, skills))
+
+
+def get_summary(results: list[SimulationResult]) -> dict[str, Optional[float]]:
+    """Summarize the simulations of one strategy.
+
+    Args:
+        results (list[SimulationResult]): The results of the simulations.
+
+    Returns:
+        dict[str, Optional[float]]: The number of runs that converged, the medians of the choice sets and comparisons
+            it took, counting runs that did not converge as never converging, and the mean final correlation.
+    """
+    n_choice_sets = [np.inf if r.n_choice_sets is None else r.n_choice_sets for r in results]
+    n_comparisons = [np.inf if r.n_comparisons is None else r.n_comparisons for r in results]
+    median_choice_sets = float(np.median(n_choice_sets))
+    median_comparisons = float(np.median(n_comparisons))
+    return {
+        "n_converged": sum(r.n_choice_sets is not None for r in results),
+        "median_choice_sets": median_choice_sets if np.isfinite(median_choice_sets) else None,
+        "median_comparisons": median_comparisons if np.isfinite(median_comparisons) else None,
+        "mean_final_correlation": float(np.mean([r.final_correlation for r in results])),
+    }
+
+
+@click.command()
+@click.option("--n-videos", type=int, default=100, help="Number of videos with a synthetic true skill.")
+@click.option("--n-runs", type=int, default=5, help="Number of ground truths to simulate each strategy against.")
+@click.option("--max-choice-sets", type=int, default=2000, help="Number of choice sets to give up after.")
+@click.option(
+    "--target", type=float, default=0.9, help="Rank correlation with the true skills that counts as converged."
+)
+def main(n_videos: int, n_runs: int, max_choice_sets: int, target: float) -> None:
+    """Simulate matching strategies on synthetic ground truth and emit the comparisons to convergence as JSON.
+
+    Args:
+        n_videos (int): Number of videos with a synthetic true skill.
+        n_runs (int): Number of ground truths to simulate each strategy against.
+        max_choice_sets (int): Number of choice sets to give up after.
+        target (float): Rank correlation with the true skills that counts as converged.
+    """
+    env = global_env()
+    results: dict[str, list[SimulationResult]] = {name: [] for name in STRATEGIES}
+    for run_i in range(n_runs):
+        skills = np.random.default_rng(SEED + run_i).normal(env.mu, env.sigma, n_videos)
+        for name, strategy in STRATEGIES.items():
+            results[name].append(simulate(strategy, skills, max_choice_sets, target, SEED + run_i))
+
+    summaries = {name: get_summary(strategy_results) for name, strategy_results in results.items()}
+    report = {
+        "commit": get_commit(),
+        "config": {"n_videos": n_videos, "n_runs": n_runs, "max_choice_sets": max_choice_sets, "target": target},
+        "strategies": summaries,
+    }
+    for name, summary in summaries.items():
+        click.echo(
+            f"{name:<10} converged {summary['n_converged']}/{n_runs}"
+            f" median choice sets {summary['median_choice_sets']} median comparisons {summary['median_comparisons']}"
+            f" final correlation {summary['mean_final_correlation']:.3f}",
+            err=True,
+        )
+    click.echo(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
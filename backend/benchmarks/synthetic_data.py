@@ -0,0 +1,274 @@
+import zlib
+from typing import TYPE_CHECKING, Optional, cast
+
+import numpy as np
+import pendulum
+from vidrank.lib.models.action import Action
+from vidrank.lib.models.choice import Choice
+from vidrank.lib.models.choice_set import ChoiceSet
+from vidrank.lib.models.record import Record
+from vidrank.lib.utilities.typing_utilities import JsonObject
+from vidrank.lib.youtube.playlist import Playlist
+from vidrank.lib.youtube.playlist_item import PlaylistItem
+from vidrank.lib.youtube.thumbnail_set import ThumbnailSet
+from vidrank.lib.youtube.video import Video
+from vidrank.lib.youtube.youtube_marshaller import YouTubeMarshaller
+
+if TYPE_CHECKING:
+    from pydantic_extra_types.pendulum_dt import DateTime
+
+WORDS = [
+    "ambient", "build", "cooking", "deep", "dive", "explained", "first", "guide", "history", "inside",
+    "journey", "kitchen", "live", "music", "night", "ocean", "physics", "quiet", "review", "science",
+    "theory", "under", "video", "walk", "world", "year", "zero", "space", "math", "city",
+]  # fmt: skip
+
+
+class SyntheticData:
+    """Deterministic generator of synthetic playlists, videos, and record histories.
+
+    Every generated object only depends on the seed and the requested sizes, so that benchmark runs on different
+    commits measure the same inputs.
+    """
+
+    START_DATE = pendulum.datetime(2020, 1, 1)
+    PLAYLIST_DAYS = 4 * 365
+    CHOICE_SET_SIZE = 6
+    REMOVE_PROBABILITY = 0.02
+    NOTHING_PROBABILITY = 0.1
+
+    def __init__(self, seed: int = 0):
+        """Initialize the generator.
+
+        Args:
+            seed (int): The seed for all random choices.
+        """
+        self.seed = seed
+
+    def get_video_ids(self, n_videos: int) -> list[str]:
+        """Get the IDs of the synthetic videos.
+
+        Args:
+            n_videos (int): The number of videos.
+
+        Returns:
+            list[str]: The video IDs.
+        """
+        return [f"video{i:07d}" for i in range(n_videos)]
+
+    def get_video_dicts(self, n_videos: int) -> list[JsonObject]:
+        """Generate videos in the JSON format of the YouTube API.
+
+        Args:
+            n_videos (int): The number of videos.
+
+        Returns:
+            list[JsonObject]: The JSON objects representing the videos.
+        """
+        rng = self._get_rng("videos")
+        video_ids = self.get_video_ids(n_videos)
+        title_words = rng.integers(0, len(WORDS), size=(n_videos, 5))
+        durations = rng.integers(30, 3 * 60 * 60, size=n_videos)
+        published_days = rng.integers(0, self.PLAYLIST_DAYS, size=n_videos)
+        n_views = rng.zipf(1.5, size=n_videos).clip(max=10**9) * 100
+        n_channels = max(1, n_videos // 20)
+        channels = rng.integers(0, n_channels, size=n_videos)
+
+        video_dicts = []
+        for i, video_id in enumerate(video_ids):
+            title = " ".join(WORDS[w] for w in title_words[i]).capitalize()
+            duration = int(durations[i])
+            published_at = self.START_DATE.add(days=int(published_days[i]))
+            views = int(n_views[i])
+            video_dicts.append(
+                {
+                    "id": video_id,
+                    "snippet": {
+                        "publishedAt": published_at.to_iso8601_string(),
+                        "channelId": f"channel{int(channels[i]):06d}",
+                        "title": title,
+                        "description": f"{title}. " * 8,
+                        "thumbnails": self._get_thumbnail_set_dict(video_id),
+                        "channelTitle": f"Channel {int(channels[i])}",
+                    },
+                    "contentDetails": {
+                        "duration": f"PT{duration // 3600}H{duration // 60 % 60}M{duration % 60}S",
+                    },
+                    "statistics": {
+                        "viewCount": str(views),
+                        "likeCount": str(views // 40),
+                        "dislikeCount": "0",
+                        "favoriteCount": "0",
+                        "commentCount": str(views // 500),
+                    },
+                }
+            )
+        return video_dicts
+
+    def get_videos(self, n_videos: int) -> list[Video]:
+        """Generate parsed videos.
+
+        Args:
+            n_videos (int): The number of videos.
+
+        Returns:
+            list[Video]: The videos.
+        """
+        return [YouTubeMarshaller.parse_video(video_dict) for video_dict in self.get_video_dicts(n_videos)]
+
+    def get_playlist(self, playlist_id: str, n_videos: int, now: Optional[pendulum.DateTime] = None) -> Playlist:
+        """Generate a playlist of the synthetic videos, with items added over the last few years.
+
+        Args:
+            playlist_id (str): The ID of the playlist.
+            n_videos (int): The number of videos in the playlist.
+            now (Optional[pendulum.DateTime]): The time the newest item was added, defaults to the current time.
+
+        Returns:
+            Playlist: The playlist.
+        """
+        thumbnails = ThumbnailSet(default=None, standard=None, medium=None, high=None, maxres=None)
+        items = [
+            PlaylistItem(
+                video_id=video_id,
+                added_at=cast("DateTime", added_at),
+                position=position,
+                title=video_id,
+                description="",
+                thumbnails=thumbnails,
+            )
+            for position, (video_id, added_at) in enumerate(
+                zip(self.get_video_ids(n_videos), self._get_added_ats(n_videos, now), strict=True)
+            )
+        ]
+        return Playlist(
+            id=playlist_id,
+            title="Synthetic playlist",
+            created_at=cast("DateTime", self.START_DATE),
+            thumbnails=thumbnails,
+            description="",
+            items=items,
+        )
+
+    def get_playlist_dict(self, playlist_id: str) -> JsonObject:
+        """Generate a playlist in the JSON format of the YouTube API, without its items.
+
+        Args:
+            playlist_id (str): The ID of the playlist.
+
+        Returns:
+            JsonObject: The JSON object representing the playlist.
+        """
+        return {
+            "id": playlist_id,
+            "snippet": {
+                "publishedAt": self.START_DATE.to_iso8601_string(),
+                "title": "Synthetic playlist",
+                "description": "",
+                "thumbnails": self._get_thumbnail_set_dict(playlist_id),
+            },
+        }
+
+    def get_playlist_item_dicts(self, n_videos: int, now: Optional[pendulum.DateTime] = None) -> list[JsonObject]:
+        """Generate the items of a playlist in the JSON format of the YouTube API.
+
+        The items are the same as the items of the playlist returned by `get_playlist`.
+
+        Args:
+            n_videos (int): The number of videos in the playlist.
+            now (Optional[pendulum.DateTime]): The time the newest item was added, defaults to the current time.
+
+        Returns:
+            list[JsonObject]: The JSON objects representing the playlist items, in position order.
+        """
+        return [
+            {
+                "snippet": {
+                    "publishedAt": added_at.to_iso8601_string(),
+                    "position": position,
+                    "title": video_id,
+                    "description": "",
+                    "thumbnails": {},
+                },
+                "contentDetails": {"videoId": video_id},
+            }
+            for position, (video_id, added_at) in enumerate(
+                zip(self.get_video_ids(n_videos), self._get_added_ats(n_videos, now), strict=True)
+            )
+        ]
+
+    def get_channel_dict(self, channel_id: str) -> JsonObject:
+        """Generate a channel in the JSON format of the YouTube API.
+
+        Args:
+            channel_id (str): The ID of the channel.
+
+        Returns:
+            JsonObject: The JSON object representing the channel.
+        """
+        return {
+            "id": channel_id,
+            "snippet": {
+                "title": f"Channel {channel_id}",
+                "thumbnails": self._get_thumbnail_set_dict(channel_id),
+            },
+            "statistics": {"subscriberCount": "1000", "videoCount": "20", "viewCount": "100000"},
+        }
+
+    def get_records(self, n_records: int, n_videos: int) -> list[Record]:
+        """Generate a history of user choices over the synthetic videos.
+
+        Videos are drawn with a skewed popularity, so that some of them are compared much more often than others, and
+        each choice set has one selected video, a few videos with no action, and occasionally a removed video.
+
+        Args:
+            n_records (int): The number of records.
+            n_videos (int): The number of videos the records choose from.
+
+        Returns:
+            list[Record]: The records, in the order they were created.
+        """
+        rng = self._get_rng("records")
+        video_ids = self.get_video_ids(n_videos)
+        choice_set_size = min(self.CHOICE_SET_SIZE, n_videos)
+        weights = 1.0 / np.arange(1, n_videos + 1) ** 0.5
+        weights /= weights.sum()
+        created_at = int(self.START_DATE.timestamp())
+
+        # NOTE: Sampling without replacement is linear in the number of videos, so candidates are drawn in bulk with
+        # replacement and deduplicated per record instead
+        candidates = rng.choice(n_videos, size=(n_records, 4 * choice_set_size), p=weights)
+
+        records = []
+        for record_i in range(n_records):
+            indices = list(dict.fromkeys(candidates[record_i].tolist()))[:choice_set_size]
+            if len(indices) < choice_set_size:
+                indices = rng.choice(n_videos, size=choice_set_size, replace=False).tolist()
+            actions = [Action.NOTHING] * choice_set_size
+            if rng.random() >= self.NOTHING_PROBABILITY:
+                actions[int(rng.integers(choice_set_size))] = Action.SELECT
+            if rng.random() < self.REMOVE_PROBABILITY:
+                actions[-1] = Action.REMOVE
+            choices = [Choice(video_id=video_ids[i], action=action) for i, action in zip(indices, actions, strict=True)]
+            created_at += int(rng.integers(1, 60))
+            records.append(
+                Record(id=f"record{record_i:07d}", created_at=created_at, choice_set=ChoiceSet(choices=choices))
+            )
+        return records
+
+    def _get_added_ats(self, n_videos: int, now: Optional[pendulum.DateTime]) -> list[pendulum.DateTime]:
+        rng = self._get_rng("playlist")
+        now = pendulum.now() if now is None else now
+        added_minutes = np.sort(rng.integers(0, self.PLAYLIST_DAYS * 24 * 60, size=n_videos))
+        return [now.subtract(minutes=int(minutes)) for minutes in added_minutes]
+
+    def _get_rng(self, name: str) -> np.random.Generator:
+        # NOTE: Each kind of data has its own stream, so generating one kind does not shift the others
+        return np.random.default_rng([self.seed, zlib.crc32(name.encode())])
+
+    @classmethod
+    def _get_thumbnail_set_dict(cls, video_id: str) -> JsonObject:
+        return {
+            size: {"url": f"https://i.ytimg.com/vi/{video_id}/{size}.jpg", "width": width, "height": height}
+            for size, width, height in [("default", 120, 90), ("medium", 320, 180), ("high", 480, 360)]
+        }
@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+from typing import cast
+
+from vidrank.lib.analytics.analytics import Analytics
+from vidrank.lib.analytics.record_columns import RecordColumns
+from vidrank.lib.models.action import Action
+from vidrank.lib.models.choice import Choice
+from vidrank.lib.models.choice_set import ChoiceSet
+from vidrank.lib.models.record import Record
+from vidrank.lib.ranking.comparisons import Comparisons
+from vidrank.lib.youtube.video_summary import VideoSummary
+
+MS_PER_DAY = 24 * 60 * 60 * 1000
+CHANNELS = {"a": "c1", "b": "c2", "c": "c1", "d": "c2", "e": "c3"}
+
+
+def make_record(record_id: str, created_at: int, actions: dict[str, Action]) -> Record:
+    choices = [Choice(video_id=video_id, action=action) for video_id, action in actions.items()]
+    return Record(id=record_id, created_at=created_at, choice_set=ChoiceSet(choices=choices))
+
+
+def make_video_map(video_ids: list[str]) -> dict[str, VideoSummary]:
+    return {
+        video_id: cast(
+            VideoSummary,
+            SimpleNamespace(
+                title=f"Video {video_id}", channel_id=CHANNELS[video_id], channel=CHANNELS[video_id].upper()
+            ),
+        )
+        for video_id in video_ids
+    }
+
+
+RECORDS = [
+    make_record("r1", 0, {"a": Action.SELECT, "b": Action.NOTHING, "c": Action.NOTHING, "d": Action.REMOVE}),
+    make_record("r2", 1000, {"a": Action.SELECT, "c": Action.SELECT, "b": Action.NOTHING}),
+    make_record("r3", MS_PER_DAY + 5, {"e": Action.NOTHING, "d": Action.NOTHING}),
+    make_record("r4", 3 * MS_PER_DAY, {"a": Action.SELECT, "e": Action.SELECT, "d": Action.NOTHING}),
+]
+
+
+class TestAnalytics:
+    def test_report_counts_match_records(self) -> None:
+        columns = RecordColumns.from_records(RECORDS)
+
+        report = Analytics.get_report(columns, 10, make_video_map(["a", "b", "c", "d"]), min_selections=2)
+
+        assert report.n_playlist_videos == 10
+        assert report.n_records == len(RECORDS)
+        assert report.n_rated_videos == len({"a", "b", "c", "d", "e"})
+        assert report.n_comparisons == len(Comparisons.from_records(RECORDS))
+        assert [(s.video_id, s.title, s.n_selections) for s in report.top_selections] == [("a", "Video a", 3)]
+
+    def test_report_groups_days_and_channels(self) -> None:
+        columns = RecordColumns.from_records(RECORDS)
+
+        report = Analytics.get_report(columns, 10, make_video_map(["a", "b", "c", "d"]))
+
+        assert [(d.date, d.n_records, d.n_comparisons) for d in report.daily_activity] == [
+            ("1970-01-01", 2, 4),
+            ("1970-01-02", 1, 0),
+            ("1970-01-04", 1, 2),
+        ]
+        assert [
+            (c.channel_id, c.channel, c.n_videos, c.n_selections, c.n_unselected, c.n_removals) for c in report.channels
+        ] == [("c1", "C1", 2, 4, 1, 0), ("c2", "C2", 2, 0, 4, 1)]
+
+    def test_top_selection_ids(self) -> None:
+        columns = RecordColumns.from_records(RECORDS)
+
+        assert Analytics.get_top_selection_ids(columns, min_selections=1) == ["a", "c", "e"]
+        assert Analytics.get_top_selection_ids(columns, min_selections=2) == ["a"]
+        assert Analytics.get_top_selection_ids(columns) == []
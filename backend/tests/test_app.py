@@ -0,0 +1,60 @@
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Iterable
+
+import pytest
+from fastapi.testclient import TestClient
+from vidrank.app.app import app
+from vidrank.app.app_state import AppState
+from vidrank.app.routes import MAX_SEARCH_RESULTS
+from vidrank.lib.caching.pickle_cache import PickleCache
+from vidrank.lib.profiling.request_profiler import RequestProfiler
+from vidrank.lib.search.search_index import SearchHit
+from vidrank.lib.youtube.async_youtube_client import AsyncYouTubeClient
+from vidrank.lib.youtube.quota_scheduler import QuotaScheduler
+from vidrank.lib.youtube.video_summary import VideoSummary
+from vidrank.lib.youtube.youtube_caches import YouTubeCaches
+from vidrank.lib.youtube.youtube_client import YouTubeClient
+from vidrank.lib.youtube.youtube_facade import YouTubeFacade
+
+
+async def get_no_video_summaries(_video_ids: Iterable[str]) -> dict[str, VideoSummary]:
+    return {}
+
+
+class TestApp:
+    def test_quota_exceeded_is_retryable(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        quota_scheduler = QuotaScheduler(daily_limit=0)
+        youtube_facade = YouTubeFacade(
+            youtube_client=YouTubeClient("key", scheduler=quota_scheduler),
+            async_youtube_client=AsyncYouTubeClient("key", scheduler=quota_scheduler),
+            caches=YouTubeCaches(
+                videos=PickleCache(tmp_path / "videos"),
+                video_summaries=PickleCache(tmp_path / "video_summaries"),
+                channels=PickleCache(tmp_path / "channels"),
+                playlists=PickleCache(tmp_path / "playlists"),
+            ),
+        )
+        app_state = SimpleNamespace(
+            request_profiler=RequestProfiler(tmp_path / "profiles"),
+            search_index=SimpleNamespace(search=lambda _query, _n_results: [SearchHit(video_id="v0", score=1.0)]),
+            youtube_facade=youtube_facade,
+        )
+        monkeypatch.setattr(AppState, "_INSTANCE", app_state)
+
+        response = TestClient(app).post("/search", json={"query": "video"})
+        assert response.status_code == 503
+        assert int(response.headers["Retry-After"]) > 0
+
+    def test_search_results_are_bounded(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        app_state = SimpleNamespace(
+            request_profiler=RequestProfiler(tmp_path / "profiles"),
+            search_index=SimpleNamespace(search=lambda _query, _n_results: []),
+            youtube_facade=SimpleNamespace(get_video_summaries_async=get_no_video_summaries),
+        )
+        monkeypatch.setattr(AppState, "_INSTANCE", app_state)
+
+        client = TestClient(app)
+        assert client.post("/search", json={"query": "video", "n_results": MAX_SEARCH_RESULTS}).status_code == 200
+        assert client.post("/search", json={"query": "video", "n_results": MAX_SEARCH_RESULTS + 1}).status_code == 400
+        assert client.post("/search", json={"query": "video", "n_results": 0}).status_code == 400
@@ -0,0 +1,124 @@
+import asyncio
+
+import httpx
+import pytest
+from vidrank.lib.utilities.typing_utilities import JsonObject
+from vidrank.lib.youtube.async_youtube_client import AsyncYouTubeClient
+from vidrank.lib.youtube.fetch_limits import FetchLimits
+
+
+def make_video_json(video_id: str) -> JsonObject:
+    return {
+        "id": video_id,
+        "contentDetails": {"duration": "PT4M13S"},
+        "snippet": {
+            "title": f"Video {video_id}",
+            "description": "",
+            "channelId": "c0",
+            "channelTitle": "Channel",
+            "publishedAt": "2024-01-01T00:00:00Z",
+            "thumbnails": {},
+        },
+        "statistics": {"viewCount": "10"},
+    }
+
+
+def make_playlist_item_json(video_id: str, position: int) -> JsonObject:
+    return {
+        "contentDetails": {"videoId": video_id},
+        "snippet": {
+            "publishedAt": "2024-01-01T00:00:00Z",
+            "position": position,
+            "title": f"Video {video_id}",
+            "description": "",
+            "thumbnails": {},
+        },
+    }
+
+
+class FakeYouTubeApi:
+    def __init__(self, available_ids: set[str], n_playlist_items: int = 0, page_size: int = 2):
+        self.available_ids = available_ids
+        self.n_playlist_items = n_playlist_items
+        self.page_size = page_size
+        self.n_in_flight = 0
+        self.max_in_flight = 0
+        self.n_requests = 0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.n_requests += 1
+        self.n_in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.n_in_flight)
+        await asyncio.sleep(0.01)
+        self.n_in_flight -= 1
+
+        resource = request.url.path.rsplit("/", 1)[-1]
+        if resource == "videos":
+            video_ids = request.url.params["id"].split(",")
+            items = [make_video_json(video_id) for video_id in video_ids if video_id in self.available_ids]
+            return httpx.Response(200, json={"items": items})
+        if resource == "playlists":
+            playlist_json = {
+                "id": request.url.params["id"],
+                "snippet": {
+                    "title": "Playlist",
+                    "description": "",
+                    "publishedAt": "2024-01-01T00:00:00Z",
+                    "thumbnails": {},
+                },
+            }
+            return httpx.Response(200, json={"pageInfo": {"totalResults": 1}, "items": [playlist_json]})
+        if resource == "playlistItems":
+            start = int(request.url.params.get("pageToken", "0"))
+            end = min(start + self.page_size, self.n_playlist_items)
+            response_json: JsonObject = {
+                "items": [make_playlist_item_json(f"v{i}", i) for i in range(start, end)],
+            }
+            if end < self.n_playlist_items:
+                response_json["nextPageToken"] = str(end)
+            return httpx.Response(200, json=response_json)
+        return httpx.Response(404, json={"error": {"code": 404, "message": "Not found"}})
+
+
+class TestAsyncYouTubeClient:
+    def test_get_videos_fetches_chunks_concurrently(self) -> None:
+        video_ids = [f"v{i}" for i in range(100)]
+        api = FakeYouTubeApi(set(video_ids[::2]))
+
+        async def run() -> list[str]:
+            client = AsyncYouTubeClient("key", fetch_limits=FetchLimits(batch_size=10, max_concurrency=4))
+            client.http_client = httpx.AsyncClient(transport=httpx.MockTransport(api.handle))
+            videos = await client.get_videos(video_ids)
+            await client.aclose()
+            return [video.id for video in videos]
+
+        assert asyncio.run(run()) == video_ids[::2]
+        assert api.n_requests == 10
+        assert 1 < api.max_in_flight <= 4
+
+    def test_get_playlist_follows_pages(self) -> None:
+        api = FakeYouTubeApi(set(), n_playlist_items=5)
+
+        async def run() -> list[str]:
+            client = AsyncYouTubeClient("key")
+            client.http_client = httpx.AsyncClient(transport=httpx.MockTransport(api.handle))
+            playlist = await client.get_playlist("p0")
+            await client.aclose()
+            return [item.video_id for item in playlist.items]
+
+        assert asyncio.run(run()) == ["v0", "v1", "v2", "v3", "v4"]
+
+    def test_error_response_raises(self) -> None:
+        async def handle(_request: httpx.Request) -> httpx.Response:
+            return httpx.Response(403, json={"error": {"code": 403, "message": "Quota exceeded"}})
+
+        async def run() -> None:
+            client = AsyncYouTubeClient("key")
+            client.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+            try:
+                await client.get_videos(["v0"])
+            finally:
+                await client.aclose()
+
+        with pytest.raises(ValueError, match="Quota exceeded"):
+            asyncio.run(run())
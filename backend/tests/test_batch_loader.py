@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+
+import pytest
+from vidrank.lib.caching.async_single_flight import AsyncSingleFlight
+from vidrank.lib.caching.batch_loader import BatchLoader
+from vidrank.lib.caching.single_flight import SingleFlight
+
+priority_var: ContextVar[int] = ContextVar("priority", default=0)
+
+
+class TestBatchLoader:
+    def test_concurrent_loads_are_coalesced(self) -> None:
+        calls: list[list[str]] = []
+        lock = threading.Lock()
+
+        def load(keys: list[str]) -> dict[str, str]:
+            with lock:
+                calls.append(keys)
+            time.sleep(0.01)
+            return {key: key.upper() for key in keys if key != "missing"}
+
+        loader = BatchLoader(load, window_seconds=0.05)
+        requests = [["a", "b"], ["b", "c"], ["a", "missing"], ["d"]] * 4
+        with ThreadPoolExecutor(max_workers=len(requests)) as executor:
+            results = list(executor.map(loader.load_many, requests))
+
+        for keys, result in zip(requests, results, strict=True):
+            assert result == {key: key.upper() for key in keys if key != "missing"}
+        loaded_keys = [key for keys in calls for key in keys]
+        assert sorted(loaded_keys) == ["a", "b", "c", "d", "missing"]
+        assert len(calls) < len(requests)
+
+    def test_full_batch_does_not_wait_for_window(self) -> None:
+        loader = BatchLoader(lambda keys: dict.fromkeys(keys, 1), window_seconds=10.0, max_batch_size=3)
+        start = time.monotonic()
+        assert loader.load_many(["a", "b", "c"]) == {"a": 1, "b": 1, "c": 1}
+        assert time.monotonic() - start < 1.0
+
+    def test_lone_load_does_not_wait_for_window(self) -> None:
+        loader = BatchLoader(lambda keys: dict.fromkeys(keys, 1), window_seconds=10.0)
+        start = time.monotonic()
+        assert loader.load_many(["a"]) == {"a": 1}
+        assert time.monotonic() - start < 1.0
+
+    def test_batches_are_capped(self) -> None:
+        calls: list[list[str]] = []
+
+        def load(keys: list[str]) -> dict[str, int]:
+            calls.append(keys)
+            return dict.fromkeys(keys, 1)
+
+        loader = BatchLoader(load, max_batch_size=3)
+        keys = [f"k{i}" for i in range(7)]
+        assert loader.load_many(keys) == dict.fromkeys(keys, 1)
+        assert calls == [keys[0:3], keys[3:6], keys[6:7]]
+
+    def test_batches_load_at_highest_priority(self) -> None:
+        load_priorities: list[int] = []
+        first_started = threading.Event()
+        release = threading.Event()
+
+        def load(keys: list[str]) -> dict[str, int]:
+            if keys == ["first"]:
+                first_started.set()
+                release.wait()
+            load_priorities.append(priority_var.get())
+            return dict.fromkeys(keys, 1)
+
+        def load_many(keys: list[str], priority: int) -> dict[str, int]:
+            priority_var.set(priority)
+            return loader.load_many(keys)
+
+        loader = BatchLoader(load, window_seconds=0.5, priority_fn=priority_var.get)
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            # The first load keeps the next background batch waiting for its window
+            first = executor.submit(load_many, ["first"], 0)
+            first_started.wait()
+            background = executor.submit(load_many, ["a"], 0)
+            time.sleep(0.1)
+            interactive = executor.submit(load_many, ["b"], 1)
+            release.set()
+            assert background.result() == {"a": 1}
+            assert interactive.result() == {"b": 1}
+            assert first.result() == {"first": 1}
+
+        assert load_priorities == [0, 1]
+
+    def test_errors_are_shared(self) -> None:
+        def load(_keys: list[str]) -> dict[str, int]:
+            msg = "API error"
+            raise ValueError(msg)
+
+        loader = BatchLoader(load, window_seconds=0.0)
+        with pytest.raises(ValueError, match="API error"):
+            loader.load_many(["a"])
+        assert loader.load_many([]) == {}
+
+
+class TestSingleFlight:
+    def test_concurrent_calls_share_one_run(self) -> None:
+        n_runs = 0
+        started = threading.Event()
+
+        def fetch() -> str:
+            nonlocal n_runs
+            n_runs += 1
+            started.set()
+            time.sleep(0.05)
+            return "playlist"
+
+        single_flight: SingleFlight[str] = SingleFlight()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            first = executor.submit(single_flight.do, "p0", fetch)
+            started.wait()
+            others = [executor.submit(single_flight.do, "p0", fetch) for _ in range(3)]
+            results = [first.result()] + [future.result() for future in others]
+
+        assert results == ["playlist"] * 4
+        assert n_runs == 1
+
+
+class TestAsyncSingleFlight:
+    def test_concurrent_calls_share_one_run(self) -> None:
+        calls: list[list[str]] = []
+
+        async def fetch(keys: list[str]) -> dict[str, str]:
+            calls.append(keys)
+            await asyncio.sleep(0.01)
+            return {key: key.upper() for key in keys if key != "missing"}
+
+        async def run() -> list[dict[str, str]]:
+            single_flight: AsyncSingleFlight[str] = AsyncSingleFlight()
+            requests = [["a", "b"], ["b", "c"], ["a", "missing"]]
+            return await asyncio.gather(*(single_flight.do_many(keys, fetch) for keys in requests))
+
+        results = asyncio.run(run())
+
+        assert results == [{"a": "A", "b": "B"}, {"b": "B", "c": "C"}, {"a": "A"}]
+        assert calls == [["a", "b"], ["c"], ["missing"]]
@@ -0,0 +1,62 @@
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+from vidrank.lib.models.action import Action
+from vidrank.lib.models.choice import Choice
+from vidrank.lib.models.choice_set import ChoiceSet
+from vidrank.lib.models.record import Record
+from vidrank.lib.ranking.batch_ranker import BatchRanker
+from vidrank.lib.ranking.ranker import Ranker
+from vidrank.lib.ranking.ranking_method import RankingMethod
+
+if TYPE_CHECKING:
+    from trueskill import Rating
+
+
+def make_history(n_records: int, n_videos: int, seed: int = 0) -> tuple[list[Record], np.ndarray]:
+    """Simulate choices where the video with the highest noisy true score in each set is selected."""
+    rng = np.random.default_rng(seed)
+    true_scores = rng.normal(size=n_videos)
+    records = []
+    for i in range(n_records):
+        video_indices = rng.choice(n_videos, 6, replace=False)
+        noisy_scores = true_scores[video_indices] + rng.normal(scale=0.5, size=6)
+        best = int(np.argmax(noisy_scores))
+        choices = [
+            Choice(video_id=f"v{v}", action=Action.SELECT if j == best else Action.NOTHING)
+            for j, v in enumerate(video_indices)
+        ]
+        records.append(Record(id=f"r{i}", created_at=i, choice_set=ChoiceSet(choices=choices)))
+    return records, true_scores
+
+
+class TestBatchRanker:
+    @pytest.mark.parametrize(("n_records", "n_videos"), [(1, 6), (50, 10), (500, 200)])
+    def test_batch_trueskill_matches_ranker(self, n_records: int, n_videos: int) -> None:
+        records, _ = make_history(n_records, n_videos)
+        expected = list(Ranker.iter_rankings(records))
+        actual = list(Ranker.iter_rankings(records, RankingMethod.BATCH_TRUESKILL))
+        assert [r.video_id for r in actual] == [r.video_id for r in expected]
+        assert [r.rating for r in actual] == pytest.approx([r.rating for r in expected], abs=1e-9)
+
+    def test_update_rating_map_matches_ranker(self) -> None:
+        records, _ = make_history(300, 50)
+        expected: dict[str, Rating] = {}
+        Ranker.update_rating_map(expected, records)
+
+        actual: dict[str, Rating] = {}
+        BatchRanker.update_rating_map(actual, records[:100])
+        BatchRanker.update_rating_map(actual, records[100:])
+        assert list(actual) == list(expected)
+        for video_id, rating in expected.items():
+            assert actual[video_id].mu == pytest.approx(rating.mu, abs=1e-9)
+            assert actual[video_id].sigma == pytest.approx(rating.sigma, abs=1e-9)
+
+    def test_bradley_terry_recovers_true_order(self) -> None:
+        records, true_scores = make_history(2000, 100)
+        rankings = list(Ranker.iter_rankings(records, RankingMethod.BRADLEY_TERRY))
+        true_ranks = np.argsort(np.argsort(-true_scores))
+        fitted_ranks = [true_ranks[int(r.video_id[1:])] for r in rankings]
+        correlation = np.corrcoef(fitted_ranks, np.arange(len(rankings)))[0, 1]
+        assert correlation > 0.9
@@ -0,0 +1,143 @@
+import itertools
+import threading
+import time
+from types import SimpleNamespace
+from typing import Callable, cast
+
+from vidrank.lib.matching.choice_set_queue import ChoiceSetQueue
+from vidrank.lib.models.action import Action
+from vidrank.lib.models.choice import Choice
+from vidrank.lib.models.choice_set import ChoiceSet
+from vidrank.lib.models.matching_settings import (
+    ByRatingStrategySettings,
+    MatchingSettings,
+    RandomStrategySettings,
+)
+from vidrank.lib.models.record import Record
+from vidrank.lib.youtube.video_summary import VideoSummary
+
+RANDOM_SETTINGS = MatchingSettings(
+    by_date_strategy=None,
+    by_rating_strategy=None,
+    finetune_strategy=None,
+    random_strategy=RandomStrategySettings(),
+)
+BY_RATING_SETTINGS = MatchingSettings(
+    by_date_strategy=None,
+    by_rating_strategy=ByRatingStrategySettings(),
+    finetune_strategy=None,
+    random_strategy=None,
+)
+
+
+def make_record(video_id: str, action: Action) -> Record:
+    return Record(id="r0", created_at=0, choice_set=ChoiceSet(choices=[Choice(video_id=video_id, action=action)]))
+
+
+def make_videos(i: int) -> list[VideoSummary]:
+    return [
+        cast("VideoSummary", SimpleNamespace(id=f"v{i}")),
+        cast("VideoSummary", SimpleNamespace(id="shared")),
+    ]
+
+
+def wait_for(predicate: Callable[[], bool]) -> None:
+    deadline = time.monotonic() + 5.0
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def wait_for_pop(queue: ChoiceSetQueue, settings: MatchingSettings) -> list[VideoSummary]:
+    popped: list[list[VideoSummary]] = []
+
+    def pop() -> bool:
+        videos = queue.pop(settings)
+        if videos is not None:
+            popped.append(videos)
+        return videos is not None
+
+    wait_for(pop)
+    return popped[0]
+
+
+def get_index(videos: list[VideoSummary]) -> int:
+    return int(videos[0].id.removeprefix("v"))
+
+
+class TestChoiceSetQueue:
+    def test_pop_and_invalidate(self) -> None:
+        counter = itertools.count()
+        n_calls = 0
+
+        def match(_settings: MatchingSettings) -> list[VideoSummary]:
+            nonlocal n_calls
+            n_calls += 1
+            return make_videos(next(counter))
+
+        queue = ChoiceSetQueue(depth=2)
+        assert queue.pop(RANDOM_SETTINGS) is None
+        queue.start(match)
+        try:
+            assert queue.pop(RANDOM_SETTINGS) is None
+            assert queue.pop(BY_RATING_SETTINGS) is None
+            assert wait_for_pop(queue, RANDOM_SETTINGS)[1].id == "shared"
+
+            # Rating changes only make choice sets of rating based strategies stale
+            wait_for(lambda: n_calls >= 5)
+            n_started = n_calls
+            queue.invalidate(make_record("shared", Action.SELECT))
+            assert get_index(wait_for_pop(queue, RANDOM_SETTINGS)) < n_started
+            assert get_index(wait_for_pop(queue, BY_RATING_SETTINGS)) >= n_started
+
+            # Removals make every choice set with the removed video stale
+            n_started = n_calls
+            queue.invalidate(make_record("shared", Action.REMOVE))
+            assert get_index(wait_for_pop(queue, RANDOM_SETTINGS)) >= n_started
+            assert get_index(wait_for_pop(queue, BY_RATING_SETTINGS)) >= n_started
+        finally:
+            queue.stop()
+
+    def test_invalidate_while_matching(self) -> None:
+        counter = itertools.count()
+        is_matching = threading.Event()
+        can_finish = threading.Event()
+
+        def match(_settings: MatchingSettings) -> list[VideoSummary]:
+            i = next(counter)
+            if i == 0:
+                is_matching.set()
+                can_finish.wait()
+            return make_videos(i)
+
+        queue = ChoiceSetQueue(depth=1)
+        queue.start(match)
+        try:
+            # Choice sets finished after a rating change are still served by strategies that ignore ratings
+            assert queue.pop(RANDOM_SETTINGS) is None
+            is_matching.wait()
+            queue.invalidate(make_record("shared", Action.SELECT))
+            can_finish.set()
+            assert get_index(wait_for_pop(queue, RANDOM_SETTINGS)) == 0
+        finally:
+            queue.stop()
+
+    def test_failures_are_retried_after_delay(self) -> None:
+        n_calls = 0
+
+        def match(_settings: MatchingSettings) -> list[VideoSummary]:
+            nonlocal n_calls
+            n_calls += 1
+            msg = "No videos"
+            raise ValueError(msg)
+
+        queue = ChoiceSetQueue()
+        queue.start(match)
+        try:
+            for _ in range(20):
+                assert queue.pop(RANDOM_SETTINGS) is None
+                queue.invalidate(make_record("v0", Action.SELECT))
+                time.sleep(0.005)
+            assert n_calls == 1
+        finally:
+            queue.stop()
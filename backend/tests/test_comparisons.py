@@ -0,0 +1,45 @@
+from vidrank.lib.models.action import Action
+from vidrank.lib.models.choice import Choice
+from vidrank.lib.models.choice_set import ChoiceSet
+from vidrank.lib.models.record import Record
+from vidrank.lib.ranking.comparisons import Comparisons
+
+
+def make_record(record_id: str, actions: dict[str, Action]) -> Record:
+    choices = [Choice(video_id=video_id, action=action) for video_id, action in actions.items()]
+    return Record(id=record_id, created_at=0, choice_set=ChoiceSet(choices=choices))
+
+
+class TestComparisons:
+    def test_matches_all_pairs(self) -> None:
+        records = [
+            make_record("r1", {"a": Action.NOTHING, "b": Action.SELECT, "c": Action.NOTHING, "d": Action.REMOVE}),
+            make_record("r2", {"e": Action.NOTHING, "f": Action.NOTHING}),
+            make_record("r3", {"c": Action.SELECT, "g": Action.SELECT, "a": Action.NOTHING, "h": Action.NOTHING}),
+        ]
+        expected = []
+        for record in records:
+            for choice_a in record.choice_set.choices:
+                for choice_b in record.choice_set.choices:
+                    if (choice_a.action, choice_b.action) == (Action.SELECT, Action.NOTHING):
+                        expected.append((choice_a.video_id, choice_b.video_id))
+
+        comparisons = Comparisons.from_records(records)
+        video_ids = comparisons.video_ids
+        actual = [
+            (video_ids[winner], video_ids[loser])
+            for winner, loser in zip(comparisons.winners, comparisons.losers, strict=True)
+        ]
+        assert actual == expected
+        assert comparisons.video_ids == ["b", "a", "c", "h", "g"]
+        assert comparisons.record_indices.tolist() == [0, 0, 2, 2, 2, 2]
+
+    def test_known_video_ids_keep_their_indices(self) -> None:
+        records = [make_record("r1", {"a": Action.SELECT, "b": Action.NOTHING})]
+        comparisons = Comparisons.from_records(records, known_video_ids=["z", "b"])
+        assert comparisons.video_ids == ["z", "b", "a"]
+        assert comparisons.winners.tolist() == [2]
+        assert comparisons.losers.tolist() == [1]
+
+    def test_empty(self) -> None:
+        assert len(Comparisons.from_records([])) == 0
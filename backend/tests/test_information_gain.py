@@ -0,0 +1,25 @@
+from itertools import islice
+
+import numpy as np
+from vidrank.lib.matching.information_gain import InformationGain
+
+
+class TestInformationGain:
+    def test_pair_gains_prefer_close_and_uncertain_ratings(self) -> None:
+        mu_b = np.array([25.0, 25.0, 35.0, 45.0])
+        sigma_b = np.array([8.0, 2.0, 8.0, 8.0])
+        gains = InformationGain.get_pair_gains(25.0, 8.0, mu_b, sigma_b)
+
+        assert gains[0] > gains[1]
+        assert gains[0] > gains[2] > gains[3] > 0
+
+    def test_choice_set_has_distinct_candidates(self) -> None:
+        rng = np.random.default_rng(0)
+        mu = rng.normal(25.0, 5.0, 50)
+        sigma = np.full(50, 1.0)
+        sigma[7] = 8.0
+
+        choice_set = list(islice(InformationGain.iter_choice_set(mu, sigma, rng), 6))
+        assert len(set(choice_set)) == 6
+        assert sorted(InformationGain.iter_choice_set(mu, sigma, rng)) == list(range(50))
+        assert list(InformationGain.iter_choice_set(np.array([]), np.array([]), rng)) == []
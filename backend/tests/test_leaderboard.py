@@ -0,0 +1,83 @@
+import asyncio
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Iterable, cast
+
+from vidrank.lib.models.leaderboard_cursor import LeaderboardCursor
+from vidrank.lib.models.record_log_watermark import RecordLogWatermark
+from vidrank.lib.ranking.leaderboard import Leaderboard, LeaderboardEntry, LeaderboardSnapshot
+from vidrank.lib.ranking.ranking import Ranking
+from vidrank.lib.youtube.playlist import Playlist
+from vidrank.lib.youtube.playlist_item import PlaylistItem
+
+if TYPE_CHECKING:
+    from vidrank.lib.ranking.ranking_engine import RankingEngine
+    from vidrank.lib.youtube.video_summary import VideoSummary
+    from vidrank.lib.youtube.youtube_facade import YouTubeFacade
+
+
+class FakeRankingEngine:
+    def __init__(self, ratings: dict[str, float]):
+        self.set_ratings(ratings)
+
+    def set_ratings(self, ratings: dict[str, float]) -> None:
+        sorted_ratings = sorted(ratings.items(), key=lambda x: x[1], reverse=True)
+        self.rankings = [Ranking(video_id=v, rank=i + 1, rating=r) for i, (v, r) in enumerate(sorted_ratings)]
+        self.offset = getattr(self, "offset", 0) + 1
+
+    def get_versioned_rankings(self) -> tuple[list[Ranking], RecordLogWatermark]:
+        return self.rankings, RecordLogWatermark(log_id="log", offset=self.offset)
+
+
+class FakeYouTubeFacade:
+    def __init__(self, missing_ids: set[str]):
+        self.missing_ids = missing_ids
+        self.playlist = Playlist.model_construct(id="p0", items=[PlaylistItem.model_construct(video_id="a")])
+        self.n_resolves = 0
+
+    async def get_playlist_async(self, _playlist_id: str) -> Playlist:
+        return self.playlist
+
+    async def get_video_summaries_async(self, video_ids: Iterable[str]) -> dict[str, "VideoSummary"]:
+        self.n_resolves += 1
+        return {v: cast("VideoSummary", SimpleNamespace(id=v)) for v in video_ids if v not in self.missing_ids}
+
+
+def make_snapshot(ratings: list[tuple[str, float]]) -> LeaderboardSnapshot:
+    entries = [
+        LeaderboardEntry(video=cast("VideoSummary", SimpleNamespace(id=video_id)), rank=i + 1, rating=rating)
+        for i, (video_id, rating) in enumerate(ratings)
+    ]
+    return LeaderboardSnapshot(version="v", entries=entries)
+
+
+class TestLeaderboard:
+    def test_rebuilds_only_on_change(self) -> None:
+        engine = FakeRankingEngine({"a": 30.0, "b": 20.0, "c": 10.0})
+        facade = FakeYouTubeFacade(missing_ids={"b"})
+        leaderboard = Leaderboard(cast("RankingEngine", engine), cast("YouTubeFacade", facade), "p0")
+
+        snapshot = asyncio.run(leaderboard.get_snapshot())
+        assert [(e.video.id, e.rank) for e in snapshot.entries] == [("a", 1), ("c", 3)]
+        assert asyncio.run(leaderboard.get_snapshot()) is snapshot
+        assert facade.n_resolves == 1
+
+        engine.set_ratings({"a": 10.0, "b": 20.0, "c": 30.0})
+        new_snapshot = asyncio.run(leaderboard.get_snapshot())
+        assert new_snapshot.version != snapshot.version
+        assert [e.video.id for e in new_snapshot.entries] == ["c", "a"]
+
+        facade.playlist = Playlist.model_construct(id="p0", items=[PlaylistItem.model_construct(video_id="d")])
+        assert asyncio.run(leaderboard.get_snapshot()).version != new_snapshot.version
+        assert facade.n_resolves == 3
+
+    def test_cursor_start(self) -> None:
+        snapshot = make_snapshot([("a", 40.0), ("b", 30.0), ("c", 30.0), ("d", 20.0)])
+        assert snapshot.get_cursor_start(snapshot.get_cursor(0)) == 1
+        assert snapshot.get_cursor_start(snapshot.get_cursor(1)) == 2
+        assert snapshot.get_cursor_start(LeaderboardCursor(rating=30.0, video_id="x")) == 3
+        assert snapshot.get_cursor_start(LeaderboardCursor(rating=35.0, video_id="x")) == 1
+        assert snapshot.get_cursor_start(LeaderboardCursor(rating=10.0, video_id="x")) == 4
+
+    def test_cursor_round_trip(self) -> None:
+        cursor = LeaderboardCursor(rating=25.5, video_id="abc")
+        assert LeaderboardCursor.decode(cursor.encode()) == cursor
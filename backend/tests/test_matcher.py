@@ -0,0 +1,117 @@
+from types import SimpleNamespace
+from typing import Iterable, cast
+
+import numpy as np
+from vidrank.app.app_state import AppState
+from vidrank.lib.matching.matcher import Matcher
+from vidrank.lib.models.matching_settings import ByDateStrategySettings, FinetuneStrategySettings
+from vidrank.lib.ranking.ranking import Ranking
+from vidrank.lib.ranking.rating_index import RatingIndex
+from vidrank.lib.youtube.video_summary import VideoSummary
+
+
+class FakeYouTubeFacade:
+    def __init__(self, available_ids: set[str], playlist_ids: Iterable[str] = ()):
+        self.available_ids = available_ids
+        self.playlist_ids = list(playlist_ids)
+        self.requests: list[list[str]] = []
+
+    def get_playlist(self, playlist_id: str) -> SimpleNamespace:
+        return SimpleNamespace(
+            id=playlist_id, items=[SimpleNamespace(video_id=video_id) for video_id in self.playlist_ids]
+        )
+
+    def get_video_summaries(self, video_ids: Iterable[str]) -> dict[str, VideoSummary]:
+        video_ids = list(video_ids)
+        self.requests.append(video_ids)
+        found_ids = [video_id for video_id in video_ids if video_id in self.available_ids]
+        return {video_id: cast("VideoSummary", SimpleNamespace(id=video_id, title="")) for video_id in found_ids}
+
+
+def make_app_state(facade: FakeYouTubeFacade, match_overfetch: int) -> AppState:
+    return cast("AppState", SimpleNamespace(youtube_facade=facade, match_overfetch=match_overfetch))
+
+
+def make_matching_app_state(n_ranked: int, eligible_ids: set[str], seed: int = 0) -> AppState:
+    rating_index = RatingIndex([Ranking(video_id=f"v{i}", rank=i + 1, rating=100.0 - i) for i in range(n_ranked)])
+    return cast(
+        "AppState",
+        SimpleNamespace(
+            youtube_facade=FakeYouTubeFacade(eligible_ids, sorted({f"v{i}" for i in range(n_ranked)} | eligible_ids)),
+            ranking_engine=SimpleNamespace(get_rating_index=lambda: rating_index),
+            removed_video_index=SimpleNamespace(get_eligible_video_ids=lambda _playlist: frozenset(eligible_ids)),
+            playlist_date_index=SimpleNamespace(
+                get_recent_video_ids=lambda _playlist, _days: ([f"v{i}" for i in range(n_ranked)], 8)
+            ),
+            playlist_id="p0",
+            match_overfetch=2,
+            rng=np.random.default_rng(seed),
+        ),
+    )
+
+
+class TestMatcher:
+    def test_iter_found_videos_skips_missing_in_order(self) -> None:
+        video_ids = [f"v{i}" for i in range(20)]
+        facade = FakeYouTubeFacade({"v1", "v2", "v5", "v6", "v7", "v8"})
+        found = list(Matcher.iter_found_videos(make_app_state(facade, 2), video_ids, 4))
+
+        assert [(i, video.id) for i, video in found] == [(1, "v1"), (2, "v2"), (5, "v5"), (6, "v6")]
+        assert facade.requests == [video_ids[0:6], video_ids[6:9]]
+
+    def test_iter_found_videos_runs_out_of_candidates(self) -> None:
+        video_ids = [f"v{i}" for i in range(5)]
+        facade = FakeYouTubeFacade({"v3"})
+        found = list(Matcher.iter_found_videos(make_app_state(facade, 10), video_ids, 3))
+
+        assert [video.id for _, video in found] == ["v3"]
+        assert facade.requests == [video_ids]
+
+    def test_match_by_rating_samples_eligible_anchor(self) -> None:
+        eligible_ids = {f"v{i}" for i in range(0, 100, 2)}
+        for seed in range(20):
+            app_state = make_matching_app_state(100, eligible_ids, seed)
+            videos = list(Matcher.match_by_rating(app_state, 6))
+
+            assert len(videos) == 6
+            assert {video.id for video in videos} <= eligible_ids
+
+    def test_match_by_rating_tops_up_with_random(self) -> None:
+        # Only two ranked videos are eligible, the rest of the choice set comes from unranked videos
+        eligible_ids = {"v3", "v7", *(f"u{i}" for i in range(10))}
+        app_state = make_matching_app_state(20, eligible_ids)
+        videos = list(Matcher.match_by_rating(app_state, 6))
+
+        assert len(videos) == 6
+        assert len({video.id for video in videos}) == 6
+        assert {"v3", "v7"} <= {video.id for video in videos}
+
+    def test_lazy_strategies_top_up_with_random(self) -> None:
+        # Eight candidates pass the up front check, but three of them are removed
+        eligible_ids = {f"v{i}" for i in range(3, 20)}
+        for seed in range(10):
+            app_state = make_matching_app_state(20, eligible_ids, seed)
+            finetune_videos = list(Matcher.match_finetune(app_state, 6, FinetuneStrategySettings(fraction=0.4)))
+            by_date_videos = list(Matcher.match_by_date(app_state, 6, ByDateStrategySettings(days=7)))
+
+            for videos in [finetune_videos, by_date_videos]:
+                assert len(videos) == 6
+                assert len({video.id for video in videos}) == 6
+                assert {video.id for video in videos} <= eligible_ids
+
+    def test_match_random_skips_removed_excluded_and_repeated_videos(self) -> None:
+        eligible_ids = {f"v{i}" for i in range(0, 20, 2)}
+        for seed in range(10):
+            app_state = make_matching_app_state(20, eligible_ids, seed)
+            facade = cast("FakeYouTubeFacade", app_state.youtube_facade)
+            facade.playlist_ids += facade.playlist_ids
+            videos = list(Matcher.match_random(app_state, 20, excluded_ids=frozenset({"v0", "v2"})))
+
+            assert sorted(video.id for video in videos) == sorted(eligible_ids - {"v0", "v2"})
+
+    def test_non_removed_video_ids_follow_playlist_order(self) -> None:
+        app_state = make_matching_app_state(0, {"v3", "v1", "v7"})
+        facade = cast("FakeYouTubeFacade", app_state.youtube_facade)
+        facade.playlist_ids = ["v7", "v2", "v1", "v7", "v3"]
+
+        assert Matcher.get_non_removed_video_ids(app_state) == ["v7", "v1", "v3"]
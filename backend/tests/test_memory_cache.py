@@ -0,0 +1,62 @@
+from pathlib import Path
+from typing import Iterable
+
+import pytest
+from vidrank.lib.caching import memory_cache
+from vidrank.lib.caching.memory_cache import MemoryCache
+from vidrank.lib.caching.pickle_cache import PickleCache
+
+
+class TestMemoryCache:
+    def test_evicts_least_recently_used(self, tmp_path: Path) -> None:
+        cache: MemoryCache[str] = MemoryCache(PickleCache(tmp_path), max_items=2)
+        cache.add("a", "A")
+        cache.add("b", "B")
+        assert cache.get("a") == "A"
+        cache.add("c", "C")
+
+        assert cache.stats.evictions == 1
+        assert cache.get("a") == "A"
+        assert cache.get("c") == "C"
+        assert cache.stats.hits == 3
+        assert cache.get("b") == "B"
+        assert cache.stats.misses == 1
+        assert len(cache) == 3
+
+    def test_byte_budget_and_invalidation(self, tmp_path: Path) -> None:
+        cache: MemoryCache[str] = MemoryCache(PickleCache(tmp_path), max_bytes=10, size_fn=len)
+        cache.add("a", "12345")
+        cache.add("b", "123456")
+        assert cache.n_bytes == 6
+        assert cache.stats.evictions == 1
+
+        cache.add("b", "xyz")
+        assert cache.get("b") == "xyz"
+        assert cache.n_bytes == 3
+        assert cache.get("missing") is None
+
+    def test_misses_are_sized_by_stored_bytes(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        store: PickleCache[str] = PickleCache(tmp_path)
+        store.add("a", "A" * 100)
+        cache: MemoryCache[str] = MemoryCache(store, max_bytes=1000)
+        monkeypatch.setattr(memory_cache, "get_pickled_size", lambda _item: pytest.fail("Item was pickled again"))
+
+        assert cache.get_many(["a"]) == {"a": "A" * 100}
+        assert cache.n_bytes == (tmp_path / "a.pkl").stat().st_size
+
+    def test_add_during_read_is_not_overwritten(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        store: PickleCache[str] = PickleCache(tmp_path)
+        store.add("a", "old")
+        cache: MemoryCache[str] = MemoryCache(store, max_items=10)
+        get_many_sized = store.get_many_sized
+
+        def get_many_sized_then_add(item_ids: Iterable[str]) -> dict[str, tuple[str, int]]:
+            items = get_many_sized(item_ids)
+            cache.add("a", "new")
+            return items
+
+        monkeypatch.setattr(store, "get_many_sized", get_many_sized_then_add)
+        assert cache.get("a") == "new"
+        monkeypatch.undo()
+        assert cache.get("a") == "new"
+        assert cache.stats.hits == 1
@@ -0,0 +1,49 @@
+import pytest
+from vidrank.lib.metrics.metrics_registry import MetricsRegistry
+
+
+class TestMetricsRegistry:
+    def test_render_counter_and_gauge(self) -> None:
+        registry = MetricsRegistry()
+        counter = registry.counter("requests_total", "Requests.", ("endpoint",))
+        gauge = registry.gauge("records", "Records.")
+        counter.labels("videos").inc()
+        counter.labels("videos").inc(2)
+        gauge.labels().set(1.5)
+
+        assert registry.render() == (
+            "# HELP requests_total Requests.\n"
+            "# TYPE requests_total counter\n"
+            'requests_total{endpoint="videos"} 3\n'
+            "# HELP records Records.\n"
+            "# TYPE records gauge\n"
+            "records 1.5\n"
+        )
+
+    def test_render_histogram_cumulative_buckets(self) -> None:
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+        for value in [0.05, 0.5, 0.5, 2.0]:
+            histogram.labels("/rankings").observe(value)
+
+        lines = registry.render().splitlines()
+        assert lines[2:] == [
+            'latency_seconds_bucket{route="/rankings",le="0.1"} 1',
+            'latency_seconds_bucket{route="/rankings",le="1"} 3',
+            'latency_seconds_bucket{route="/rankings",le="+Inf"} 4',
+            'latency_seconds_sum{route="/rankings"} 3.05',
+            'latency_seconds_count{route="/rankings"} 4',
+        ]
+
+    def test_render_counter_function(self) -> None:
+        registry = MetricsRegistry()
+        registry.counter_function("hits_total", "Hits.", ("cache", "layer"), lambda: {("videos", "memory"): 7})
+
+        assert registry.render().splitlines()[-1] == 'hits_total{cache="videos",layer="memory"} 7'
+
+    def test_labels_with_wrong_arity_raises(self) -> None:
+        registry = MetricsRegistry()
+        counter = registry.counter("requests_total", "Requests.", ("endpoint",))
+
+        with pytest.raises(ValueError, match="expects labels"):
+            counter.labels("videos", "extra")
@@ -0,0 +1,23 @@
+import os
+import time
+from pathlib import Path
+
+from vidrank.lib.caching.pickle_cache import PickleCache
+
+
+class TestPickleCache:
+    def test_add_removes_stale_tmp_files(self, tmp_path: Path) -> None:
+        stale_filepath = tmp_path / "a.stale.tmp"
+        recent_filepath = tmp_path / "b.recent.tmp"
+        stale_filepath.write_bytes(b"partial")
+        recent_filepath.write_bytes(b"partial")
+        stale_time = time.time() - 2 * PickleCache.STALE_TMP_SECONDS
+        os.utime(stale_filepath, (stale_time, stale_time))
+
+        pickle_cache: PickleCache[int] = PickleCache(tmp_path)
+        pickle_cache.add("c", 1)
+
+        assert not stale_filepath.exists()
+        assert recent_filepath.exists()
+        assert pickle_cache.get("c") == 1
+        assert [filepath.name for filepath in tmp_path.glob("c.*")] == ["c.pkl"]
@@ -0,0 +1,27 @@
+import pendulum
+from vidrank.lib.matching.playlist_date_index import PlaylistDateIndex
+from vidrank.lib.youtube.playlist import Playlist
+from vidrank.lib.youtube.playlist_item import PlaylistItem
+
+
+def make_playlist(days_ago: dict[str, float]) -> Playlist:
+    now = pendulum.now()
+    items = [
+        PlaylistItem.model_construct(video_id=video_id, added_at=now.subtract(seconds=int(days * 24 * 60 * 60)))
+        for video_id, days in days_ago.items()
+    ]
+    return Playlist.model_construct(id="p0", items=items)
+
+
+class TestPlaylistDateIndex:
+    def test_recent_video_ids_match_whole_days(self) -> None:
+        days_ago = {"a": 9.0, "b": 0.5, "c": 3.9, "d": 2.5, "e": 4.1, "f": 30.0}
+        playlist = make_playlist(days_ago)
+        playlist_date_index = PlaylistDateIndex()
+
+        for days in [0, 2, 3, 4, 40]:
+            video_ids, n_recent = playlist_date_index.get_recent_video_ids(playlist, days)
+            expected_ids = {item.video_id for item in playlist.items if (pendulum.now() - item.added_at).days <= days}
+
+            assert video_ids == ["b", "d", "c", "e", "a", "f"]
+            assert set(video_ids[:n_recent]) == expected_ids
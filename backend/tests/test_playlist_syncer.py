@@ -0,0 +1,152 @@
+import hashlib
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest
+from vidrank.lib.caching.pickle_cache import PickleCache
+from vidrank.lib.youtube.async_youtube_client import AsyncYouTubeClient
+from vidrank.lib.youtube.playlist_syncer import PlaylistSyncer
+from vidrank.lib.youtube.youtube_caches import YouTubeCaches
+from vidrank.lib.youtube.youtube_client import YouTubeClient
+from vidrank.lib.youtube.youtube_facade import YouTubeFacade
+
+if TYPE_CHECKING:
+    from vidrank.lib.utilities.typing_utilities import JsonObject
+
+
+class FakePlaylistApi:
+    def __init__(self, video_ids: list[str], page_size: int = 2):
+        self.video_ids = video_ids
+        self.page_size = page_size
+        self.titles: dict[str, str] = {}
+        self.n_item_requests = 0
+        self.n_not_modified = 0
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        resource = request.url.path.rsplit("/", 1)[-1]
+        if resource == "playlists":
+            playlist_json = {
+                "id": request.url.params["id"],
+                "snippet": {"title": "", "description": "", "publishedAt": "2024-01-01T00:00:00Z", "thumbnails": {}},
+            }
+            return httpx.Response(200, json={"pageInfo": {"totalResults": 1}, "items": [playlist_json]})
+
+        self.n_item_requests += 1
+        start = int(request.url.params.get("pageToken", "0"))
+        end = min(start + self.page_size, len(self.video_ids))
+        page_titles = [self.titles.get(video_id, "") for video_id in self.video_ids[start:end]]
+        page_key = f"{start}:{len(self.video_ids)}:{','.join(self.video_ids[start:end])}:{','.join(page_titles)}"
+        etag = hashlib.sha256(page_key.encode()).hexdigest()
+        if request.headers.get("If-None-Match") == etag:
+            self.n_not_modified += 1
+            return httpx.Response(304)
+
+        items = [
+            {
+                "contentDetails": {"videoId": video_id},
+                "snippet": {
+                    "publishedAt": "2024-01-01T00:00:00Z",
+                    "position": i,
+                    "title": self.titles.get(video_id, ""),
+                    "description": "",
+                    "thumbnails": {},
+                    "videoOwnerChannelTitle": "Channel",
+                },
+            }
+            for i, video_id in enumerate(self.video_ids[start:end], start=start)
+        ]
+        response_json: JsonObject = {"etag": etag, "pageInfo": {"totalResults": len(self.video_ids)}, "items": items}
+        if end < len(self.video_ids):
+            response_json["nextPageToken"] = str(end)
+        return httpx.Response(200, json=response_json)
+
+
+def make_syncer(api: FakePlaylistApi, cache_dirpath: Path) -> PlaylistSyncer:
+    youtube_client = YouTubeClient("key")
+    youtube_client.http_client = httpx.Client(transport=httpx.MockTransport(api.handle))
+    youtube_facade = YouTubeFacade(
+        youtube_client=youtube_client,
+        async_youtube_client=AsyncYouTubeClient("key"),
+        caches=YouTubeCaches(
+            videos=PickleCache(cache_dirpath / "videos"),
+            video_summaries=PickleCache(cache_dirpath / "video_summaries"),
+            channels=PickleCache(cache_dirpath / "channels"),
+            playlists=PickleCache(cache_dirpath / "playlists"),
+        ),
+    )
+    return PlaylistSyncer(youtube_facade, "p0")
+
+
+class TestPlaylistSyncer:
+    def test_sync_deltas(self, tmp_path: Path) -> None:
+        api = FakePlaylistApi([f"v{i}" for i in range(10)])
+        syncer = make_syncer(api, tmp_path)
+        deltas = []
+        syncer.add_listener(lambda _previous, _playlist, delta: deltas.append(delta))
+
+        delta = syncer.sync()
+        assert len(delta.added) == 10
+        assert syncer.sync().is_empty()
+
+        # Unchanged playlists cost a single conditional request
+        api.n_item_requests = 0
+        api.n_not_modified = 0
+        assert syncer.sync().is_empty()
+        assert api.n_item_requests == 1
+        assert api.n_not_modified == 1
+
+        # Items added to the front are found without paging past the known items
+        api.n_item_requests = 0
+        api.video_ids = ["n0", "n1", "n2", *api.video_ids]
+        delta = syncer.sync()
+        assert [item.video_id for item in delta.added] == ["n0", "n1", "n2"]
+        assert delta.removed == []
+        assert api.n_item_requests == 2
+
+        playlist = syncer.youtube_facade.get_playlist("p0")
+        assert [item.video_id for item in playlist.items] == api.video_ids
+        assert [item.position for item in playlist.items] == list(range(13))
+
+        # Removed items
+        api.video_ids = [video_id for video_id in api.video_ids if video_id not in {"v3", "v7"}]
+        delta = syncer.sync()
+        assert delta.added == []
+        assert delta.removed == ["v3", "v7"]
+        assert [item.video_id for item in syncer.youtube_facade.get_playlist("p0").items] == api.video_ids
+        assert len(deltas) == 3
+
+    def test_sync_remove_and_append(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        api = FakePlaylistApi([f"v{i}" for i in range(10)])
+        syncer = make_syncer(api, tmp_path)
+        syncer.sync()
+        syncer.sync()
+
+        # Removing one item and appending another keeps the total unchanged, so it is found by the full sync
+        api.video_ids = [video_id for video_id in api.video_ids if video_id != "v5"] + ["new"]
+        api.video_ids.insert(0, "front")
+        delta = syncer.sync()
+        assert [item.video_id for item in delta.added] == ["front"]
+        assert delta.removed == []
+
+        monkeypatch.setattr(PlaylistSyncer, "FULL_SYNC_SECONDS", 0)
+        delta = syncer.sync()
+        assert [item.video_id for item in delta.added] == ["new"]
+        assert delta.removed == ["v5"]
+
+        playlist = syncer.youtube_facade.get_playlist("p0")
+        assert [item.video_id for item in playlist.items] == api.video_ids
+        assert [item.position for item in playlist.items] == list(range(11))
+
+    def test_sync_updated_items(self, tmp_path: Path) -> None:
+        api = FakePlaylistApi([f"v{i}" for i in range(10)])
+        syncer = make_syncer(api, tmp_path)
+        syncer.sync()
+
+        # Edited titles are reported as updates, without the items that only moved
+        api.titles["v6"] = "Edited"
+        api.video_ids = api.video_ids[1:]
+        delta = syncer.sync()
+        assert delta.removed == ["v0"]
+        assert [(item.video_id, item.title, item.channel) for item in delta.updated] == [("v6", "Edited", "Channel")]
+        assert syncer.youtube_facade.get_playlist("p0").items[5].title == "Edited"
@@ -0,0 +1,80 @@
+from pathlib import Path
+
+import httpx
+import pytest
+from vidrank.lib.youtube import quota_scheduler as quota_scheduler_module
+from vidrank.lib.youtube.quota_exceeded_error import QuotaExceededError
+from vidrank.lib.youtube.quota_scheduler import QuotaScheduler
+from vidrank.lib.youtube.request_priority import RequestPriority
+from vidrank.lib.youtube.youtube_client import YouTubeClient
+
+
+def handle(_request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json={"items": []})
+
+
+def make_client(scheduler: QuotaScheduler) -> YouTubeClient:
+    youtube_client = YouTubeClient("key", scheduler=scheduler)
+    youtube_client.http_client = httpx.Client(transport=httpx.MockTransport(handle))
+    return youtube_client
+
+
+class TestQuotaScheduler:
+    def test_usage_is_counted_and_persisted(self, tmp_path: Path) -> None:
+        filepath = tmp_path / "quota_usage.json"
+        scheduler = QuotaScheduler(filepath)
+        youtube_client = make_client(scheduler)
+        list(youtube_client.iter_videos([f"v{i}" for i in range(120)]))
+        youtube_client.get_playlist_items_page("p0")
+        scheduler.flush()
+
+        usage = QuotaScheduler(filepath).get_usage()
+        assert usage.units_used == 4
+        assert usage.units_by_endpoint == {"videos": 3, "playlistItems": 1}
+
+    def test_background_requests_leave_reserve(self) -> None:
+        youtube_client = make_client(QuotaScheduler(daily_limit=10))
+        with QuotaScheduler.priority(RequestPriority.BACKGROUND):
+            for _ in range(8):
+                youtube_client.get_playlist_items_page("p0")
+            with pytest.raises(QuotaExceededError):
+                youtube_client.get_playlist_items_page("p0")
+
+        youtube_client.get_playlist_items_page("p0")
+        youtube_client.get_playlist_items_page("p0")
+        with pytest.raises(QuotaExceededError):
+            youtube_client.get_playlist_items_page("p0")
+
+    def test_usage_resets_daily(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(QuotaScheduler, "_get_day", classmethod(lambda _cls: "2024-01-01"))
+        scheduler = QuotaScheduler(tmp_path / "quota_usage.json", daily_limit=1)
+        scheduler.acquire("videos")
+        with pytest.raises(QuotaExceededError):
+            scheduler.acquire("videos")
+
+        monkeypatch.setattr(QuotaScheduler, "_get_day", classmethod(lambda _cls: "2024-01-02"))
+        scheduler.acquire("videos")
+        assert scheduler.get_usage().day == "2024-01-02"
+        assert scheduler.get_usage().units_used == 1
+
+    def test_token_bucket_delays_bursts(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        sleeps: list[float] = []
+        monkeypatch.setattr(quota_scheduler_module.time, "sleep", sleeps.append)
+        scheduler = QuotaScheduler(requests_per_second=1.0, burst=2)
+        for _ in range(4):
+            scheduler.acquire("videos")
+        scheduler.acquire("channels")
+
+        assert len(sleeps) == 2
+        assert sleeps[0] == pytest.approx(1.0, abs=0.05)
+        assert sleeps[1] == pytest.approx(2.0, abs=0.05)
+
+    def test_usage_saves_are_batched(self, tmp_path: Path) -> None:
+        filepath = tmp_path / "quota_usage.json"
+        scheduler = QuotaScheduler(filepath)
+        for _ in range(3):
+            scheduler.acquire("videos")
+        assert QuotaScheduler(filepath).get_usage().units_used == 1
+
+        scheduler.flush()
+        assert QuotaScheduler(filepath).get_usage().units_used == 3
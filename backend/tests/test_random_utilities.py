@@ -0,0 +1,13 @@
+from itertools import islice
+
+import numpy as np
+from vidrank.lib.utilities.random_utilities import iter_sample_indices
+
+
+class TestRandomUtilities:
+    def test_sample_indices_without_replacement(self) -> None:
+        rng = np.random.default_rng(0)
+
+        assert sorted(iter_sample_indices(rng, 100)) == list(range(100))
+        assert len(set(islice(iter_sample_indices(rng, 10**9), 50))) == 50
+        assert list(iter_sample_indices(rng, 0)) == []
@@ -0,0 +1,112 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from vidrank.lib.caching.record_tracker import RecordTracker
+from vidrank.lib.models.action import Action
+from vidrank.lib.models.choice import Choice
+from vidrank.lib.models.choice_set import ChoiceSet
+from vidrank.lib.models.record import Record
+from vidrank.lib.ranking.ranker import Ranker
+from vidrank.lib.ranking.ranking_engine import RankingEngine
+
+
+def make_records(n_records: int, n_videos: int, seed: int = 0) -> list[Record]:
+    rng = np.random.default_rng(seed)
+    records = []
+    for i in range(n_records):
+        video_indices = rng.choice(n_videos, 6, replace=False)
+        actions = rng.choice([Action.SELECT, Action.NOTHING, Action.REMOVE], 6, p=[0.3, 0.6, 0.1])
+        choices = [Choice(video_id=f"v{v}", action=a) for v, a in zip(video_indices, actions, strict=True)]
+        records.append(Record(id=f"r{i}", created_at=i, choice_set=ChoiceSet(choices=choices)))
+    return records
+
+
+def make_record(record_id: str, choices: list[tuple[str, Action]]) -> Record:
+    choice_set = ChoiceSet(choices=[Choice(video_id=video_id, action=action) for video_id, action in choices])
+    return Record(id=record_id, created_at=0, choice_set=choice_set)
+
+
+def assert_matches_ranker(engine: RankingEngine, tracker: RecordTracker) -> None:
+    expected = list(Ranker.iter_rankings(tracker.load()))
+    actual = engine.get_rankings()
+    assert [r.video_id for r in actual] == [r.video_id for r in expected]
+    assert [r.rating for r in actual] == pytest.approx([r.rating for r in expected])
+    assert [r.rank for r in actual] == [r.rank for r in expected]
+
+
+class TestRankingEngine:
+    def test_incremental_matches_full_replay(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(RankingEngine, "CHECKPOINT_INTERVAL", 4)
+        tracker = RecordTracker(tmp_path)
+        engine = RankingEngine(tracker, tmp_path)
+        records = make_records(30, 20)
+
+        for record in records[:15]:
+            tracker.add(record)
+        assert_matches_ranker(engine, tracker)
+
+        for record in records[15:]:
+            tracker.add(record)
+            assert_matches_ranker(engine, tracker)
+
+        # Undo the latest record, then a record from the middle of the history
+        tracker.pop("r29")
+        assert_matches_ranker(engine, tracker)
+        tracker.pop("r17")
+        assert_matches_ranker(engine, tracker)
+        tracker.pop("r2")
+        assert_matches_ranker(engine, tracker)
+
+    def test_resumes_from_persisted_state(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(RankingEngine, "CHECKPOINT_INTERVAL", 4)
+        tracker = RecordTracker(tmp_path)
+        records = make_records(20, 15)
+        for record in records[:10]:
+            tracker.add(record)
+        RankingEngine(tracker, tmp_path).get_rankings()
+
+        for record in records[10:]:
+            tracker.add(record)
+        assert_matches_ranker(RankingEngine(RecordTracker(tmp_path), tmp_path), tracker)
+
+    def test_persists_state_past_max_checkpoints(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(RankingEngine, "CHECKPOINT_INTERVAL", 4)
+        monkeypatch.setattr(RankingEngine, "MAX_CHECKPOINTS", 2)
+        tracker = RecordTracker(tmp_path)
+        engine = RankingEngine(tracker, tmp_path)
+        for record in make_records(40, 20):
+            tracker.add(record)
+            engine.get_rankings()
+
+        state = RankingEngine(tracker, tmp_path).state_file.load()
+
+        assert state is not None
+        assert len(state.record_ids) == 40
+        assert state.record_id_set == set(state.record_ids)
+        assert [checkpoint.n_records for checkpoint in state.checkpoints] == [36, 40]
+
+    def test_undoes_records_without_comparisons_after_restart(self, tmp_path: Path) -> None:
+        tracker = RecordTracker(tmp_path)
+        tracker.add(make_record("r0", [("a", Action.SELECT), ("b", Action.NOTHING)]))
+        tracker.add(make_record("r1", [("a", Action.NOTHING), ("c", Action.NOTHING)]))
+        tracker.add(make_record("r2", [("b", Action.SELECT), ("z", Action.REMOVE)]))
+        RankingEngine(tracker, tmp_path).get_rankings()
+
+        tracker.pop("r2")
+        tracker.pop("r1")
+        assert_matches_ranker(RankingEngine(RecordTracker(tmp_path), tmp_path), tracker)
+        assert_matches_ranker(RankingEngine(RecordTracker(tmp_path), tmp_path), tracker)
+
+    def test_undoes_latest_records_without_replay(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(RankingEngine, "CHECKPOINT_INTERVAL", 4)
+        tracker = RecordTracker(tmp_path)
+        engine = RankingEngine(tracker, tmp_path)
+        for record in make_records(10, 8):
+            tracker.add(record)
+        engine.get_rankings()
+
+        monkeypatch.setattr(RankingEngine, "_replay", lambda *_: pytest.fail("Undo should not replay"))
+        for record_id in ["r9", "r8", "r7"]:
+            tracker.pop(record_id)
+            assert_matches_ranker(engine, tracker)
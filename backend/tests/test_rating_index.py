@@ -0,0 +1,91 @@
+import random
+from typing import Optional
+
+import numpy as np
+from vidrank.lib.ranking.ranking import Ranking
+from vidrank.lib.ranking.rating_index import RatingIndex
+
+
+def make_rating_index(ratings: list[float]) -> RatingIndex:
+    sorted_ratings = sorted(ratings, reverse=True)
+    return RatingIndex([Ranking(video_id=f"v{i}", rank=i + 1, rating=r) for i, r in enumerate(sorted_ratings)])
+
+
+class TestRatingIndex:
+    def test_nearest_matches_sort_by_distance(self) -> None:
+        rng = random.Random(0)
+        rating_index = make_rating_index([round(rng.uniform(0, 50), 1) for _ in range(200)])
+        for rating in [-5.0, 0.0, 12.3, 25.0, rating_index.rankings[40].rating, 60.0]:
+            nearest = rating_index.get_nearest(rating, 20)
+            expected = sorted(rating_index.rankings, key=lambda r: abs(rating - r.rating))[:20]
+
+            assert [abs(rating - r.rating) for r in nearest] == [abs(rating - r.rating) for r in expected]
+        assert len(list(rating_index.iter_nearest(25.0))) == len(rating_index)
+
+    def test_rank_top_and_range(self) -> None:
+        rating_index = make_rating_index([40.0, 30.0, 30.0, 20.0, 10.0])
+
+        assert rating_index.get_ranking("v3") == Ranking(video_id="v3", rank=4, rating=20.0)
+        assert rating_index.get_ranking("x") is None
+        assert [r.video_id for r in rating_index.get_top(2)] == ["v0", "v1"]
+        assert [r.video_id for r in rating_index.get_range(15.0, 30.0)] == ["v1", "v2", "v3"]
+        assert rating_index.get_range_bounds(30.0, 30.0) == (1, 3)
+        assert rating_index.get_range(31.0, 39.0) == []
+
+    def test_update_matches_rebuild(self) -> None:
+        rng = random.Random(0)
+        ratings = {f"v{i}": rng.uniform(0, 50) for i in range(200)}
+        rating_index = make_rating_index(list(ratings.values()))
+        ratings = {ranking.video_id: ranking.rating for ranking in rating_index.rankings}
+
+        for _ in range(50):
+            changes: dict[str, Optional[float]] = {
+                video_id: rng.uniform(0, 50) for video_id in rng.sample(sorted(ratings), rng.randint(1, 6))
+            }
+            if rng.random() < 0.3:
+                changes[rng.choice(sorted(ratings))] = None
+            if rng.random() < 0.3:
+                changes[f"new{len(ratings)}"] = rng.uniform(0, 50)
+
+            rating_index.update(changes)
+            for video_id, rating in changes.items():
+                if rating is None:
+                    del ratings[video_id]
+                else:
+                    ratings[video_id] = rating
+
+            sorted_ratings = sorted(ratings.items(), key=lambda x: (-x[1], x[0]))
+            expected = [Ranking(video_id=v, rank=i + 1, rating=r) for i, (v, r) in enumerate(sorted_ratings)]
+            assert rating_index.rankings == expected
+            assert all(rating_index.get_position(r.video_id) == r.rank - 1 for r in expected)
+            assert rating_index.get_range(10.0, 20.0) == [r for r in expected if 10.0 <= r.rating <= 20.0]
+
+    def test_ties_are_ordered_by_video_id(self) -> None:
+        rating_index = RatingIndex([])
+        rating_index.update({"c": 10.0, "a": 10.0, "d": 20.0})
+        rating_index.update({"b": 10.0, "d": 10.0})
+
+        assert [r.video_id for r in rating_index.rankings] == ["a", "b", "c", "d"]
+        assert [r.rank for r in rating_index.rankings] == [1, 2, 3, 4]
+        assert rating_index.get_position("c") == 2
+        rating_index.update({"a": None})
+        assert rating_index.get_ranking("d") == Ranking(video_id="d", rank=3, rating=10.0)
+
+    def test_nearest_skips_videos_moved_during_iteration(self) -> None:
+        rating_index = make_rating_index([50.0, 40.0, 30.0, 20.0, 10.0])
+        nearest = rating_index.iter_nearest(30.0)
+        video_ids = [next(nearest).video_id, next(nearest).video_id]
+        rating_index.update({"v1": 15.0})
+        video_ids += [r.video_id for r in nearest]
+
+        assert video_ids == ["v2", "v1", "v0", "v4"]
+
+    def test_sample(self) -> None:
+        rng = np.random.default_rng(0)
+        assert RatingIndex([]).sample(rng) is None
+
+        rating_index = make_rating_index([30.0, 20.0, 10.0])
+        rating_index.update({"v0": None})
+        samples = [rating_index.sample(rng) for _ in range(50)]
+        assert {r.video_id for r in samples if r is not None} == {"v1", "v2"}
+        assert all(r in rating_index.rankings for r in samples)
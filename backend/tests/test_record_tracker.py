@@ -0,0 +1,84 @@
+import json
+from pathlib import Path
+
+from vidrank.lib.caching.record_tracker import RecordTracker
+from vidrank.lib.models.action import Action
+from vidrank.lib.models.choice import Choice
+from vidrank.lib.models.choice_set import ChoiceSet
+from vidrank.lib.models.record import Record
+
+
+def make_record(record_id: str) -> Record:
+    choices = [
+        Choice(video_id=f"{record_id}-a", action=Action.SELECT),
+        Choice(video_id=f"{record_id}-b", action=Action.NOTHING),
+    ]
+    return Record(id=record_id, created_at=0, choice_set=ChoiceSet(choices=choices))
+
+
+class TestRecordTracker:
+    def test_add_pop_load(self, tmp_path: Path) -> None:
+        tracker = RecordTracker(tmp_path)
+        for record_id in ["r1", "r2", "r3"]:
+            tracker.add(make_record(record_id))
+
+        popped = tracker.pop("r2")
+        assert popped is not None
+        assert popped.id == "r2"
+        assert tracker.pop("r2") is None
+        assert [r.id for r in tracker.load()] == ["r1", "r3"]
+
+        reopened = RecordTracker(tmp_path)
+        assert [r.id for r in reopened.load()] == ["r1", "r3"]
+
+    def test_sees_appends_from_other_instances(self, tmp_path: Path) -> None:
+        reader = RecordTracker(tmp_path)
+        writer = RecordTracker(tmp_path)
+        writer.add(make_record("r1"))
+        assert [r.id for r in reader.load()] == ["r1"]
+
+    def test_migrates_legacy_records(self, tmp_path: Path) -> None:
+        records_dirpath = tmp_path / "records"
+        records_dirpath.mkdir()
+        legacy_records = [make_record("r1").model_dump(), make_record("r2").model_dump()]
+        with (records_dirpath / "records.json").open("w") as fp:
+            json.dump(legacy_records, fp)
+
+        tracker = RecordTracker(tmp_path)
+        assert [r.id for r in tracker.load()] == ["r1", "r2"]
+        assert not (records_dirpath / "records.json").exists()
+        assert (records_dirpath / "records.json.bak").exists()
+
+    def test_recovers_from_torn_last_line(self, tmp_path: Path) -> None:
+        tracker = RecordTracker(tmp_path)
+        tracker.add(make_record("r1"))
+        with tracker.filepath.open("ab") as fp:
+            fp.write(b'{"operation":"add","record_id":"r2","rec')
+
+        recovered = RecordTracker(tmp_path)
+        assert [r.id for r in recovered.load()] == ["r1"]
+        recovered.add(make_record("r3"))
+        assert [r.id for r in RecordTracker(tmp_path).load()] == ["r1", "r3"]
+
+    def test_recovers_from_invalid_header(self, tmp_path: Path) -> None:
+        tracker = RecordTracker(tmp_path)
+        tracker.add(make_record("r1"))
+        lines = tracker.filepath.read_bytes().splitlines(keepends=True)
+        tracker.filepath.write_bytes(b'{"log_id": \n' + b"".join(lines[1:]))
+
+        recovered = RecordTracker(tmp_path)
+        assert [r.id for r in recovered.load()] == ["r1"]
+        assert recovered.log_id != tracker.log_id
+        assert RecordTracker(tmp_path).log_id == recovered.log_id
+
+    def test_recovers_from_empty_log(self, tmp_path: Path) -> None:
+        records_dirpath = tmp_path / "records"
+        records_dirpath.mkdir()
+        (records_dirpath / "records.jsonl").touch()
+
+        tracker = RecordTracker(tmp_path)
+        records, watermark = tracker.snapshot()
+        assert records == []
+        assert watermark.log_id == tracker.log_id
+        tracker.add(make_record("r1"))
+        assert [r.id for r in RecordTracker(tmp_path).load()] == ["r1"]
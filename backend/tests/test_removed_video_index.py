@@ -0,0 +1,77 @@
+from pathlib import Path
+from typing import TYPE_CHECKING, cast
+
+import pendulum
+import pytest
+from vidrank.lib.caching.record_tracker import RecordTracker
+from vidrank.lib.matching.removed_video_index import RemovedVideoIndex
+from vidrank.lib.models.action import Action
+from vidrank.lib.models.choice import Choice
+from vidrank.lib.models.choice_set import ChoiceSet
+from vidrank.lib.models.record import Record
+from vidrank.lib.youtube.playlist import Playlist
+from vidrank.lib.youtube.playlist_item import PlaylistItem
+from vidrank.lib.youtube.thumbnail_set import ThumbnailSet
+
+if TYPE_CHECKING:
+    from pydantic_extra_types.pendulum_dt import DateTime
+
+
+def make_record(record_id: str, removed_ids: list[str], selected_ids: list[str]) -> Record:
+    choices = [Choice(video_id=video_id, action=Action.REMOVE) for video_id in removed_ids]
+    choices += [Choice(video_id=video_id, action=Action.SELECT) for video_id in selected_ids]
+    return Record(id=record_id, created_at=0, choice_set=ChoiceSet(choices=choices))
+
+
+def make_playlist(video_ids: list[str]) -> Playlist:
+    thumbnails = ThumbnailSet(default=None, standard=None, medium=None, high=None, maxres=None)
+    now = cast("DateTime", pendulum.now())
+    items = [
+        PlaylistItem(video_id=video_id, added_at=now, position=i, title="", description="", thumbnails=thumbnails)
+        for i, video_id in enumerate(video_ids)
+    ]
+    return Playlist(id="p0", title="", created_at=now, thumbnails=thumbnails, description="", items=items)
+
+
+class TestRemovedVideoIndex:
+    def test_add_and_undo_removals(self, tmp_path: Path) -> None:
+        tracker = RecordTracker(tmp_path)
+        index = RemovedVideoIndex(tracker, tmp_path)
+        playlist = make_playlist(["a", "b", "c", "d"])
+
+        tracker.add(make_record("r0", ["a"], ["b"]))
+        tracker.add(make_record("r1", ["a", "c"], []))
+        assert index.get_eligible_video_ids(playlist) == {"b", "d"}
+
+        tracker.pop("r1")
+        assert index.get_eligible_video_ids(playlist) == {"b", "c", "d"}
+        assert index.is_removed("a")
+
+        tracker.pop("r0")
+        assert index.get_eligible_video_ids(playlist) == {"a", "b", "c", "d"}
+        assert index.get_removed_video_ids() == []
+
+    def test_state_is_persisted(self, tmp_path: Path) -> None:
+        tracker = RecordTracker(tmp_path)
+        index = RemovedVideoIndex(tracker, tmp_path)
+        tracker.add(make_record("r0", ["a", "b"], []))
+        assert index.get_removed_video_ids() == ["a", "b"]
+
+        tracker.add(make_record("r1", ["c"], []))
+        reloaded_index = RemovedVideoIndex(RecordTracker(tmp_path), tmp_path)
+        assert reloaded_index.get_removed_video_ids() == ["a", "b", "c"]
+
+    def test_watermark_is_persisted_without_removals(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(RemovedVideoIndex, "SAVE_INTERVAL", 3)
+        tracker = RecordTracker(tmp_path)
+        index = RemovedVideoIndex(tracker, tmp_path)
+        tracker.add(make_record("r0", ["a"], []))
+        assert index.is_removed("a")
+
+        for i in range(1, 4):
+            tracker.add(make_record(f"r{i}", [], ["b"]))
+            index.is_removed("a")
+
+        state = index.state_file.load()
+        assert state is not None
+        assert state.watermark == tracker.snapshot()[1]
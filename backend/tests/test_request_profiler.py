@@ -0,0 +1,45 @@
+from pathlib import Path
+
+from vidrank.lib.profiling.profile_trigger import ProfileTrigger
+from vidrank.lib.profiling.request_profiler import RequestProfiler
+
+
+class TestRequestProfiler:
+    def test_get_trigger(self, tmp_path: Path) -> None:
+        disabled_profiler = RequestProfiler(tmp_path)
+        assert disabled_profiler.get_trigger([(b"x-vidrank-profile", b"1")]) is None
+
+        header_profiler = RequestProfiler(tmp_path, on_header=True)
+        assert header_profiler.get_trigger([(b"x-vidrank-profile", b"1")]) == ProfileTrigger.HEADER
+        assert header_profiler.get_trigger([(b"x-vidrank-profile", b"0")]) is None
+        assert header_profiler.get_trigger([]) is None
+
+        sample_profiler = RequestProfiler(tmp_path, sample_rate=1.0)
+        assert sample_profiler.get_trigger([]) == ProfileTrigger.SAMPLE
+
+    def test_sections_only_recorded_when_active(self, tmp_path: Path) -> None:
+        profiler = RequestProfiler(tmp_path, on_header=True)
+        with RequestProfiler.section("outside"):
+            pass
+
+        with profiler.activate(ProfileTrigger.HEADER) as active_profile:
+            for _ in range(2):
+                with RequestProfiler.section("records.load"):
+                    pass
+        with RequestProfiler.section("records.load"):
+            pass
+
+        assert active_profile.section_calls == {"records.load": 2}
+        assert RequestProfiler.get_active_profile() is None
+
+    def test_save_keeps_latest_profiles(self, tmp_path: Path) -> None:
+        profiler = RequestProfiler(tmp_path, on_header=True, max_profiles=2)
+        for status_code in [200, 201, 202]:
+            with profiler.activate(ProfileTrigger.HEADER) as active_profile, active_profile.run():
+                sum(range(100))
+            profiler.save(active_profile, active_profile.get_metadata("POST", "/rankings", status_code, 0.1))
+
+        profiles = profiler.list_profiles()
+        assert [profile.status_code for profile in profiles] == [202, 201]
+        assert all(profiler.get_stats_filepath(profile.profile_id).exists() for profile in profiles)
+        assert len(list(tmp_path.glob("*.prof"))) == 2
@@ -0,0 +1,102 @@
+import pickle
+from pathlib import Path
+from types import SimpleNamespace
+from typing import cast
+
+from vidrank.lib.search.search_index import SearchIndex
+from vidrank.lib.youtube.playlist import Playlist
+from vidrank.lib.youtube.playlist_delta import PlaylistDelta
+from vidrank.lib.youtube.playlist_item import PlaylistItem
+from vidrank.lib.youtube.youtube_facade import YouTubeFacade
+
+CHANNELS = {"a": "Cooking Corner", "b": "Garden Club", "c": "Cooking Corner"}
+
+
+def make_playlist(items: list[tuple[str, str, str]]) -> Playlist:
+    playlist_items = [
+        PlaylistItem.model_construct(
+            video_id=video_id, title=title, description=description, channel=CHANNELS.get(video_id, "")
+        )
+        for video_id, title, description in items
+    ]
+    return Playlist.model_construct(id="p0", items=playlist_items)
+
+
+def make_facade(playlists: list[Playlist]) -> YouTubeFacade:
+    return cast(YouTubeFacade, SimpleNamespace(get_playlist=lambda _playlist_id: playlists[-1]))
+
+
+PLAYLIST = make_playlist(
+    [
+        ("a", "Bread baking basics", "How to bake sourdough"),
+        ("b", "Tomato planting", "Growing tomatoes and bread wheat"),
+        ("c", "Soup recipes", "Winter soups"),
+    ]
+)
+
+
+class TestSearchIndex:
+    def test_search_ranks_titles_above_descriptions(self, tmp_path: Path) -> None:
+        search_index = SearchIndex(make_facade([PLAYLIST]), "p0", tmp_path)
+
+        hits = search_index.search("bread", 10, prefix=False)
+
+        assert [hit.video_id for hit in hits] == ["a", "b"]
+        assert hits[0].score > hits[1].score
+
+    def test_search_matches_every_term_and_last_prefix(self, tmp_path: Path) -> None:
+        search_index = SearchIndex(make_facade([PLAYLIST]), "p0", tmp_path)
+
+        assert [hit.video_id for hit in search_index.search("cooking so", 10)] == ["c", "a"]
+        assert [hit.video_id for hit in search_index.search("cooking soup", 10, prefix=False)] == ["c"]
+        assert search_index.search("cooking tomato", 10) == []
+        assert search_index.search("  ", 10) == []
+
+    def test_playlist_delta_updates_index(self, tmp_path: Path) -> None:
+        updated = make_playlist([("b", "Tomato planting", ""), ("d", "Bread rolls", "")])
+        playlists = [PLAYLIST]
+        search_index = SearchIndex(make_facade(playlists), "p0", tmp_path)
+        search_index.search("bread", 10)
+
+        playlists.append(updated)
+        delta = PlaylistDelta.model_construct(added=[updated.items[1]], removed=["a", "c"], updated=[])
+        search_index.apply_playlist_delta(PLAYLIST, updated, delta)
+
+        assert [hit.video_id for hit in search_index.search("bread", 10)] == ["d", "b"]
+        assert search_index.search("soup", 10) == []
+
+    def test_index_is_reloaded_and_reconciled(self, tmp_path: Path) -> None:
+        SearchIndex(make_facade([PLAYLIST]), "p0", tmp_path).search("bread", 10)
+        updated = make_playlist([(item.video_id, item.title, item.description) for item in PLAYLIST.items[1:]])
+
+        search_index = SearchIndex(make_facade([updated]), "p0", tmp_path)
+
+        assert (tmp_path / "search" / "search_state.pkl").exists()
+        assert [hit.video_id for hit in search_index.search("bread", 10)] == ["b"]
+
+    def test_edited_items_are_indexed_again(self, tmp_path: Path) -> None:
+        SearchIndex(make_facade([PLAYLIST]), "p0", tmp_path).search("bread", 10)
+        edited = make_playlist([("a", "Pasta basics", ""), ("b", "Tomato planting", ""), ("c", "Soup recipes", "")])
+        playlists = [edited]
+
+        # Edits since the index was saved are found when it is reloaded
+        search_index = SearchIndex(make_facade(playlists), "p0", tmp_path)
+        assert [hit.video_id for hit in search_index.search("pasta", 10)] == ["a"]
+        assert search_index.search("bread", 10) == []
+
+        # Edits found by a playlist sync are applied from the delta
+        renamed = make_playlist([("a", "Pasta basics", ""), ("b", "Tomato pasta", ""), ("c", "Soup recipes", "")])
+        playlists.append(renamed)
+        delta = PlaylistDelta.model_construct(added=[], removed=[], updated=[renamed.items[1]])
+        search_index.apply_playlist_delta(edited, renamed, delta)
+        assert {hit.video_id for hit in search_index.search("pasta", 10)} == {"a", "b"}
+        assert [hit.video_id for hit in search_index.search("garden", 10)] == ["b"]
+
+    def test_items_cached_without_channel_are_loaded(self) -> None:
+        item = PlaylistItem.model_construct(video_id="a", title="", description="", channel="Garden Club")
+        state = item.__getstate__()
+        del state["__dict__"]["channel"]
+
+        restored = PlaylistItem.__new__(PlaylistItem)
+        restored.__setstate__(pickle.loads(pickle.dumps(state)))
+        assert restored.channel == ""
@@ -0,0 +1,32 @@
+from pathlib import Path
+
+from vidrank.lib.caching.pickle_cache import PickleCache
+from vidrank.lib.caching.sqlite_cache import SqliteCache
+
+
+class TestSqliteCache:
+    def test_get_add_len(self, tmp_path: Path) -> None:
+        db_filepath = tmp_path / "cache.sqlite3"
+        videos: SqliteCache[dict] = SqliteCache(db_filepath, "videos")
+        channels: SqliteCache[dict] = SqliteCache(db_filepath, "channels")
+
+        videos.add("a", {"title": "A"})
+        videos.add_many({"b": {"title": "B"}, "a": {"title": "A2"}})
+        channels.add("a", {"name": "Channel"})
+
+        assert videos.get("a") == {"title": "A2"}
+        assert videos.get("missing") is None
+        assert videos.get_many(["a", "b", "c"]) == {"a": {"title": "A2"}, "b": {"title": "B"}}
+        assert videos.has("b")
+        assert len(videos) == 2
+        assert len(channels) == 1
+        assert len(SqliteCache(db_filepath, "videos")) == 2
+
+    def test_import_pickle_cache(self, tmp_path: Path) -> None:
+        pickle_cache: PickleCache[str] = PickleCache(tmp_path / "videos")
+        pickle_cache.add_many({f"v{i}": f"video {i}" for i in range(5)})
+
+        sqlite_cache: SqliteCache[str] = SqliteCache(tmp_path / "cache.sqlite3", "videos")
+        assert sqlite_cache.import_pickle_cache(pickle_cache, batch_size=2) == 5
+        assert len(sqlite_cache) == 5
+        assert sqlite_cache.get("v3") == "video 3"
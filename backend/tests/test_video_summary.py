@@ -0,0 +1,73 @@
+import pickle
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from vidrank.app.routes import PostRankingsResponse, ResponseRanking
+from vidrank.lib.utilities.json_utilities import dump_json_with_fragments
+from vidrank.lib.youtube.video import Video
+from vidrank.lib.youtube.video_summary import VideoSummary
+from vidrank.lib.youtube.youtube_marshaller import YouTubeMarshaller
+
+
+def make_video() -> Video:
+    return YouTubeMarshaller.parse_video(
+        {
+            "id": "v0",
+            "contentDetails": {"duration": "PT1H4M13S"},
+            "snippet": {
+                "title": "Vidéo v0 ✓",
+                "description": "A long description",
+                "channelId": "c0",
+                "channelTitle": "Channel",
+                "publishedAt": "2024-01-01T00:00:00Z",
+                "thumbnails": {
+                    "default": {"url": "https://i.ytimg.com/vi/v0/default.jpg", "width": 120, "height": 90},
+                    "high": {"url": "https://i.ytimg.com/vi/v0/high.jpg", "width": 480, "height": 360},
+                },
+            },
+            "statistics": {"viewCount": "10", "likeCount": "3"},
+        }
+    )
+
+
+class TestVideoSummary:
+    def test_listing_matches_video(self) -> None:
+        video = make_video()
+        listing_json = VideoSummary.from_video(video).to_listing().model_dump(mode="json")
+        video_json = video.model_dump(mode="json", exclude={"description", "thumbnails"})
+
+        assert {key: listing_json[key] for key in video_json} == video_json
+        assert listing_json["thumbnails"] == {
+            "default": None,
+            "standard": None,
+            "medium": None,
+            "high": {"url": "https://i.ytimg.com/vi/v0/high.jpg", "width": 480, "height": 360},
+            "maxres": None,
+        }
+
+    def test_pickle_round_trip_interns_channel(self) -> None:
+        summary = VideoSummary.from_video(make_video())
+        loaded = pickle.loads(pickle.dumps(summary))
+
+        assert loaded == summary
+        assert loaded.channel_id is summary.channel_id
+
+    def test_listing_json_matches_response(self) -> None:
+        summary = VideoSummary.from_video(make_video())
+        response = PostRankingsResponse(
+            page_number=1,
+            n_pages=1,
+            rankings_page=[ResponseRanking(video=summary.to_listing(), rank=1, rating=3.4e-05)],
+            version="v",
+        )
+        expected = JSONResponse(jsonable_encoder(response)).body
+
+        content = {
+            "page_number": 1,
+            "n_pages": 1,
+            "rankings_page": [{"video": summary.get_listing_json(), "rank": 1, "rating": 3.4e-05}],
+            "version": "v",
+            "next_cursor": None,
+        }
+        assert dump_json_with_fragments(content) == expected
+        assert pickle.loads(pickle.dumps(summary)).get_listing_json() == summary.get_listing_json()
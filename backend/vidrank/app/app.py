@@ -1,17 +1,40 @@
 import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
+from vidrank.app.app_state import AppState
 from vidrank.app.logging.logging_utilities import configure_logger
-from vidrank.app.routes import router
+from vidrank.app.metrics.metrics_middleware import MetricsMiddleware
+from vidrank.app.profiling.profiling_middleware import ProfilingMiddleware
+from vidrank.app.routes import N_VIDEOS_PER_RESPONSE, router
+from vidrank.lib.matching.matcher import Matcher
+from vidrank.lib.youtube.quota_exceeded_error import QuotaExceededError
 
 configure_logger()
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """Run the background playlist sync and choice set precomputation while the app is serving, then close clients."""
+    app_state = AppState.get()
+    app_state.playlist_syncer.start()
+    app_state.choice_set_queue.start(
+        lambda settings: list(Matcher.match(app_state, N_VIDEOS_PER_RESPONSE, settings)),
+    )
+    yield
+    app_state.choice_set_queue.stop()
+    app_state.playlist_syncer.stop()
+    await app_state.youtube_facade.async_youtube_client.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(router)
 app.add_middleware(
     CORSMiddleware,
@@ -20,6 +43,20 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ProfilingMiddleware, profiler_fn=lambda: AppState.get().request_profiler)
+
+
+@app.exception_handler(QuotaExceededError)
+async def handle_quota_exceeded(_request: Request, exc: QuotaExceededError) -> JSONResponse:
+    """Tell clients to come back once the YouTube API quota resets, instead of failing with an internal error."""
+    logger.warning("Refusing request: %s", exc)
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "YouTube API quota exceeded"},
+        headers={"Retry-After": str(exc.retry_after_seconds)},
+    )
+
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
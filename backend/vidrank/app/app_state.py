@@ -1,21 +1,41 @@
 import os
 from pathlib import Path
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Optional, TypeVar
 
 import numpy as np
 
+from vidrank.lib.caching.cache_backend import CacheBackend
+from vidrank.lib.caching.cache_limits import CacheLimits
+from vidrank.lib.caching.memory_cache import MemoryCache
 from vidrank.lib.caching.pickle_cache import PickleCache
 from vidrank.lib.caching.record_tracker import RecordTracker
+from vidrank.lib.caching.sqlite_cache import SqliteCache
+from vidrank.lib.matching.choice_set_queue import ChoiceSetQueue
+from vidrank.lib.matching.playlist_date_index import PlaylistDateIndex
+from vidrank.lib.matching.removed_video_index import RemovedVideoIndex
+from vidrank.lib.metrics.metrics import track_cache_stats
+from vidrank.lib.profiling.request_profiler import RequestProfiler
+from vidrank.lib.ranking.leaderboard import Leaderboard
+from vidrank.lib.ranking.ranking_engine import RankingEngine
+from vidrank.lib.search.search_index import SearchIndex
+from vidrank.lib.youtube.async_youtube_client import AsyncYouTubeClient
+from vidrank.lib.youtube.playlist_syncer import PlaylistSyncer
+from vidrank.lib.youtube.quota_scheduler import QuotaScheduler
+from vidrank.lib.youtube.youtube_caches import YouTubeCaches
 from vidrank.lib.youtube.youtube_client import YouTubeClient
 from vidrank.lib.youtube.youtube_facade import YouTubeFacade
 
 if TYPE_CHECKING:
+    from vidrank.lib.caching.cache import Cache
     from vidrank.lib.youtube.channel import Channel
     from vidrank.lib.youtube.playlist import Playlist
     from vidrank.lib.youtube.video import Video
+    from vidrank.lib.youtube.video_summary import VideoSummary
 
 from dataclasses import dataclass
 
+T = TypeVar("T")
+
 
 @dataclass
 class AppState:
@@ -23,9 +43,24 @@ class AppState:
 
     _INSTANCE = None
 
+    DEFAULT_MEMORY_CACHE_MB = 64
+    MAX_MEMORY_CACHE_PLAYLISTS = 4
+    DEFAULT_MATCH_OVERFETCH = 10
+
     youtube_facade: YouTubeFacade
     record_tracker: RecordTracker
+    ranking_engine: RankingEngine
+    removed_video_index: RemovedVideoIndex
+    playlist_date_index: PlaylistDateIndex
+    search_index: SearchIndex
+    leaderboard: Leaderboard
+    playlist_syncer: PlaylistSyncer
+    quota_scheduler: QuotaScheduler
+    choice_set_queue: ChoiceSetQueue
+    request_profiler: RequestProfiler
     playlist_id: str
+    cache_dirpath: Path
+    match_overfetch: int
     rng: np.random.Generator
 
     @classmethod
@@ -57,28 +92,130 @@ class AppState:
             msg = "VIDRANK_PLAYLIST_ID environment variable is not set."
             raise ValueError(msg)
 
+        memory_cache_mb = int(os.getenv("VIDRANK_MEMORY_CACHE_MB", str(cls.DEFAULT_MEMORY_CACHE_MB)))
+        memory_cache_bytes = memory_cache_mb * 1024 * 1024
+
+        match_overfetch = int(os.getenv("VIDRANK_MATCH_OVERFETCH", str(cls.DEFAULT_MATCH_OVERFETCH)))
+
+        playlist_sync_str = os.getenv("VIDRANK_PLAYLIST_SYNC_SECONDS")
+        playlist_sync_seconds = None if playlist_sync_str is None else float(playlist_sync_str)
+
+        daily_quota = int(os.getenv("VIDRANK_DAILY_QUOTA", str(QuotaScheduler.DEFAULT_DAILY_LIMIT)))
+
+        youtube_base_url = os.getenv("VIDRANK_YOUTUBE_BASE_URL", YouTubeClient.BASE_URL)
+
+        cache_backend = CacheBackend(os.getenv("VIDRANK_CACHE_BACKEND", CacheBackend.PICKLE))
+
         cache_dirpath = Path(cache_dir_str)
-        youtube_client = YouTubeClient(api_key)
-        video_cache: PickleCache[Video] = PickleCache(cache_dirpath / "videos")
-        channel_cache: PickleCache[Channel] = PickleCache(cache_dirpath / "channels")
-        playlist_cache: PickleCache[Playlist] = PickleCache(cache_dirpath / "playlists")
+        quota_scheduler = QuotaScheduler(cache_dirpath / "quota" / "quota_usage.json", daily_limit=daily_quota)
+        youtube_client = YouTubeClient(api_key, scheduler=quota_scheduler, base_url=youtube_base_url)
+        async_youtube_client = AsyncYouTubeClient(api_key, scheduler=quota_scheduler, base_url=youtube_base_url)
+        video_cache: MemoryCache[Video] = cls.create_cache(
+            cache_backend, cache_dirpath, "videos", CacheLimits(max_bytes=memory_cache_bytes)
+        )
+        video_summary_cache: MemoryCache[VideoSummary] = cls.create_cache(
+            cache_backend, cache_dirpath, "video_summaries", CacheLimits(max_bytes=memory_cache_bytes // 4)
+        )
+        channel_cache: MemoryCache[Channel] = cls.create_cache(
+            cache_backend, cache_dirpath, "channels", CacheLimits(max_bytes=memory_cache_bytes // 8)
+        )
+        playlist_cache: MemoryCache[Playlist] = cls.create_cache(
+            cache_backend, cache_dirpath, "playlists", CacheLimits(max_items=cls.MAX_MEMORY_CACHE_PLAYLISTS)
+        )
         youtube_facade = YouTubeFacade(
             youtube_client=youtube_client,
-            video_cache=video_cache,
-            channel_cache=channel_cache,
-            playlist_cache=playlist_cache,
+            async_youtube_client=async_youtube_client,
+            caches=YouTubeCaches(
+                videos=video_cache,
+                video_summaries=video_summary_cache,
+                channels=channel_cache,
+                playlists=playlist_cache,
+            ),
         )
         record_tracker = RecordTracker(cache_dirpath)
+        ranking_engine = RankingEngine(record_tracker, cache_dirpath)
+        removed_video_index = RemovedVideoIndex(record_tracker, cache_dirpath)
+        leaderboard = Leaderboard(ranking_engine, youtube_facade, playlist_id)
+        playlist_syncer = PlaylistSyncer(youtube_facade, playlist_id, interval_seconds=playlist_sync_seconds)
+        playlist_syncer.add_listener(removed_video_index.apply_playlist_delta)
+        search_index = SearchIndex(youtube_facade, playlist_id, cache_dirpath)
+        playlist_syncer.add_listener(search_index.apply_playlist_delta)
         rng = np.random.default_rng(random_seed)
 
         cls._INSTANCE = cls(
             youtube_facade=youtube_facade,
             record_tracker=record_tracker,
+            ranking_engine=ranking_engine,
+            removed_video_index=removed_video_index,
+            playlist_date_index=PlaylistDateIndex(),
+            search_index=search_index,
+            leaderboard=leaderboard,
+            playlist_syncer=playlist_syncer,
+            quota_scheduler=quota_scheduler,
+            choice_set_queue=ChoiceSetQueue(),
+            request_profiler=cls.create_request_profiler(cache_dirpath),
             playlist_id=playlist_id,
+            cache_dirpath=cache_dirpath,
+            match_overfetch=match_overfetch,
             rng=rng,
         )
         return cls._INSTANCE
 
+    @classmethod
+    def create_cache(
+        cls,
+        cache_backend: CacheBackend,
+        cache_dirpath: Path,
+        name: str,
+        limits: CacheLimits,
+    ) -> MemoryCache[T]:
+        """Create the in-memory cache and on-disk store for one kind of cached item, and report their stats.
+
+        Args:
+            cache_backend (CacheBackend): The storage backend to use.
+            cache_dirpath (Path): The path to the cache directory.
+            name (str): The name of the kind of item, used as the directory or namespace.
+            limits (CacheLimits): The limits on the items kept in memory.
+
+        Returns:
+            MemoryCache[T]: The in-memory cache, writing through to the on-disk store.
+        """
+        store: Cache[T] = cls.create_store(cache_backend, cache_dirpath, name)
+        cache = MemoryCache(store, max_items=limits.max_items, max_bytes=limits.max_bytes)
+        track_cache_stats(name, "memory", cache.stats)
+        track_cache_stats(name, "disk", store.stats)
+        return cache
+
+    @classmethod
+    def create_store(cls, cache_backend: CacheBackend, cache_dirpath: Path, name: str) -> "Cache[T]":
+        """Create the on-disk store for one kind of cached item.
+
+        Args:
+            cache_backend (CacheBackend): The storage backend to use.
+            cache_dirpath (Path): The path to the cache directory.
+            name (str): The name of the kind of item, used as the directory or namespace.
+
+        Returns:
+            Cache[T]: The on-disk store.
+        """
+        if cache_backend == CacheBackend.SQLITE:
+            return SqliteCache(cache_dirpath / "cache.sqlite3", name)
+        return PickleCache(cache_dirpath / name)
+
+    @classmethod
+    def create_request_profiler(cls, cache_dirpath: Path) -> RequestProfiler:
+        """Create the request profiler from environment variables.
+
+        Args:
+            cache_dirpath (Path): The path to the cache directory.
+
+        Returns:
+            RequestProfiler: The request profiler, disabled unless a sample rate or header profiling is set.
+        """
+        sample_rate = float(os.getenv("VIDRANK_PROFILE_SAMPLE_RATE", "0"))
+        on_header = os.getenv("VIDRANK_PROFILE_ON_HEADER", "false").lower() == "true"
+        return RequestProfiler(cache_dirpath / "profiles", sample_rate=sample_rate, on_header=on_header)
+
     @classmethod
     def get(cls) -> "AppState":
         """Get the instance of the AppState singleton.
@@ -0,0 +1,52 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from vidrank.lib.metrics.metrics import ROUTE_LATENCY
+
+
+class MetricsMiddleware:
+    """ASGI middleware that observes the latency of every request by route.
+
+    Requests are labelled with the path template of the matched route, like "/rankings", rather than the raw path, so
+    that the number of label combinations stays bounded.
+    """
+
+    UNMATCHED_ROUTE = "unmatched"
+
+    def __init__(self, app: ASGIApp):
+        """Initialize the middleware.
+
+        Args:
+            app (ASGIApp): The app to wrap.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle a request, observing its latency once the response has been sent.
+
+        Args:
+            scope (Scope): The connection scope.
+            receive (Receive): The function receiving messages from the client.
+            send (Send): The function sending messages to the client.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # NOTE: The router stores the matched route in the scope, which is shared with the wrapped app
+            route = scope.get("route")
+            route_path = getattr(route, "path", self.UNMATCHED_ROUTE)
+            ROUTE_LATENCY.labels(scope["method"], route_path, str(status_code)).observe(time.perf_counter() - start)
@@ -0,0 +1,63 @@
+import asyncio
+import time
+from typing import Callable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from vidrank.lib.profiling.request_profiler import RequestProfiler
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles the requests picked by the request profiler.
+
+    Requests that are not profiled are passed through after a single check, so the middleware can stay installed.
+    """
+
+    UNMATCHED_ROUTE = "unmatched"
+
+    def __init__(self, app: ASGIApp, profiler_fn: Callable[[], RequestProfiler]):
+        """Initialize the middleware.
+
+        Args:
+            app (ASGIApp): The app to wrap.
+            profiler_fn (Callable[[], RequestProfiler]): The function returning the request profiler.
+        """
+        self.app = app
+        self.profiler_fn = profiler_fn
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle a request, profiling it if it is picked by the request profiler.
+
+        Args:
+            scope (Scope): The connection scope.
+            receive (Receive): The function receiving messages from the client.
+            send (Send): The function sending messages to the client.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profiler = self.profiler_fn()
+        trigger = profiler.get_trigger(scope["headers"])
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        with profiler.activate(trigger) as active_profile:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = getattr(scope.get("route"), "path", self.UNMATCHED_ROUTE)
+                duration_seconds = time.perf_counter() - start
+                metadata = active_profile.get_metadata(scope["method"], route, status_code, duration_seconds)
+                # NOTE: Writing the stats and trimming old profiles touches the disk, so it is kept off the event loop
+                await asyncio.to_thread(profiler.save, active_profile, metadata)
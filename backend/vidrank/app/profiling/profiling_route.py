@@ -0,0 +1,51 @@
+import asyncio
+import functools
+from typing import Any, Callable
+
+from fastapi.routing import APIRoute
+
+from vidrank.lib.profiling.request_profiler import RequestProfiler
+
+
+class ProfilingRoute(APIRoute):
+    """Route that runs its endpoint under the deterministic profiler when the request is profiled.
+
+    The endpoint is wrapped rather than the whole route handler, so that synchronous endpoints are profiled on the
+    worker thread they run on. Asynchronous endpoints are profiled on the event loop thread, where calls made by other
+    requests while the endpoint is waiting also show up in the profile.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        """Initialize the route.
+
+        Args:
+            path (str): The path template of the route.
+            endpoint (Callable[..., Any]): The endpoint handling requests to the route.
+            kwargs (Any): The other arguments of the route.
+        """
+        super().__init__(path, self._wrap_endpoint(endpoint), **kwargs)
+
+    @classmethod
+    def _wrap_endpoint(cls, endpoint: Callable[..., Any]) -> Callable[..., Any]:
+        # NOTE: functools.wraps sets __wrapped__, which FastAPI follows to read the parameters and the return type
+        if asyncio.iscoroutinefunction(endpoint):
+
+            @functools.wraps(endpoint)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                active_profile = RequestProfiler.get_active_profile()
+                if active_profile is None:
+                    return await endpoint(*args, **kwargs)
+                with active_profile.run():
+                    return await endpoint(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(endpoint)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            active_profile = RequestProfiler.get_active_profile()
+            if active_profile is None:
+                return endpoint(*args, **kwargs)
+            with active_profile.run():
+                return endpoint(*args, **kwargs)
+
+        return wrapper
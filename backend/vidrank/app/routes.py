@@ -1,25 +1,38 @@
 import logging
 import math
-from typing import Annotated
+from typing import Annotated, Any, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from fastapi import HTTPException as HttpException
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
 from vidrank import __version__ as package_version
 from vidrank.app.app_state import AppState
+from vidrank.app.profiling.profiling_route import ProfilingRoute
+from vidrank.lib.analytics.analytics import Analytics
+from vidrank.lib.analytics.analytics_report import AnalyticsReport
+from vidrank.lib.analytics.record_columns import RecordColumns
 from vidrank.lib.matching.matcher import Matcher
+from vidrank.lib.metrics.metrics import REGISTRY
+from vidrank.lib.metrics.metrics_registry import MetricsRegistry
 from vidrank.lib.models.choice_set import ChoiceSet
+from vidrank.lib.models.leaderboard_cursor import LeaderboardCursor
+from vidrank.lib.models.matching_settings import MatchingSettings
 from vidrank.lib.models.record import Record
 from vidrank.lib.models.settings import Settings
-from vidrank.lib.ranking.ranker import Ranker
 from vidrank.lib.utilities.datetime_utilities import get_timestamp
 from vidrank.lib.utilities.identifier_utilities import get_identifier
-from vidrank.lib.youtube.video import Video
+from vidrank.lib.utilities.json_utilities import dump_json_with_fragments
+from vidrank.lib.youtube.quota_scheduler import QuotaScheduler
+from vidrank.lib.youtube.quota_usage import QuotaUsage
+from vidrank.lib.youtube.request_priority import RequestPriority
+from vidrank.lib.youtube.video_listing import VideoListing
+from vidrank.lib.youtube.video_summary import VideoSummary
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(route_class=ProfilingRoute)
 
 
 async def app_state_dep() -> AppState:
@@ -30,6 +43,7 @@ async def app_state_dep() -> AppState:
 AppStateDep = Annotated[AppState, Depends(app_state_dep)]
 
 N_VIDEOS_PER_RESPONSE = 6
+MAX_SEARCH_RESULTS = 100
 
 
 class GetStatusResponse(BaseModel):
@@ -56,6 +70,65 @@ def get_version() -> GetVersionResponse:
     return GetVersionResponse(version=package_version)
 
 
+@router.get(name="Metrics", path="/metrics", description="Get the API metrics in the Prometheus text format.")
+def get_metrics() -> Response:
+    """Route to get the API metrics."""
+    return Response(content=REGISTRY.render(), media_type=MetricsRegistry.CONTENT_TYPE)
+
+
+def create_json_response(content: dict[str, Any]) -> Response:
+    """Create a JSON response, splicing in videos that are already serialized.
+
+    Args:
+        content (dict[str, Any]): The response content, in the field order of the response model, where `bytes` values
+            hold serialized JSON.
+
+    Returns:
+        Response: The JSON response.
+    """
+    return Response(content=dump_json_with_fragments(content), media_type="application/json")
+
+
+def match_videos(app_state: AppState, matching_settings: MatchingSettings) -> list[VideoSummary]:
+    """Get the next choice set, from the precomputed queue if one is ready.
+
+    Args:
+        app_state (AppState): The application state.
+        matching_settings (MatchingSettings): The matching settings of the request.
+
+    Returns:
+        list[VideoSummary]: The videos of the choice set.
+    """
+    videos = app_state.choice_set_queue.pop(matching_settings)
+    if videos is None:
+        videos = list(Matcher.match(app_state, N_VIDEOS_PER_RESPONSE, matching_settings))
+    return videos
+
+
+@router.get(name="Quota", path="/quota", description="Get the YouTube API quota usage.")
+def get_quota(app_state: AppStateDep) -> QuotaUsage:
+    """Route to get the YouTube API quota units used today."""
+    return app_state.quota_scheduler.get_usage()
+
+
+@router.get(name="Analytics", path="/analytics", description="Get stats about the completed records.")
+async def get_analytics(app_state: AppStateDep) -> AnalyticsReport:
+    """Route to get stats about the completed records."""
+    records = await run_in_threadpool(app_state.record_tracker.load)
+    columns = await run_in_threadpool(RecordColumns.from_records, records)
+    playlist = await run_in_threadpool(app_state.youtube_facade.get_playlist, app_state.playlist_id)
+
+    # NOTE: Channels are counted from cached summaries and only the top selections are resolved, so deleted and
+    # private videos that are never cached do not use up the quota on every call
+    video_map = await run_in_threadpool(app_state.youtube_facade.video_summary_cache.get_many, columns.video_ids)
+    top_selection_ids = await run_in_threadpool(Analytics.get_top_selection_ids, columns)
+    uncached_ids = [video_id for video_id in top_selection_ids if video_id not in video_map]
+    # NOTE: Uncached top selections are resolved in one batch, and must not use up the quota for matching
+    with QuotaScheduler.priority(RequestPriority.BACKGROUND):
+        video_map.update(await app_state.youtube_facade.get_video_summaries_async(uncached_ids))
+    return await run_in_threadpool(Analytics.get_report, columns, len(playlist.items), video_map)
+
+
 class PostVideosRequest(BaseModel):
     """Model for the request of the videos route."""
 
@@ -65,11 +138,11 @@ class PostVideosRequest(BaseModel):
 class PostVideosResponse(BaseModel):
     """Model for the response of the videos route."""
 
-    videos: list[Video]
+    videos: list[VideoListing]
 
 
-@router.post(name="Videos", path="/videos", description="Post videos.")
-def post_videos(request: PostVideosRequest, app_state: AppStateDep) -> PostVideosResponse:
+@router.post(name="Videos", path="/videos", description="Post videos.", response_model=PostVideosResponse)
+def post_videos(request: PostVideosRequest, app_state: AppStateDep) -> Response:
     """Route for posting a request for videos.
 
     Args:
@@ -77,11 +150,11 @@ def post_videos(request: PostVideosRequest, app_state: AppStateDep) -> PostVideo
         app_state (AppStateDep): The application state.
 
     Returns:
-        PostVideosResponse: The response to the request for videos.
+        Response: The response to the request for videos, serialized like `PostVideosResponse`.
     """
-    videos = list(Matcher.match(app_state, N_VIDEOS_PER_RESPONSE, request.settings.matching_settings))
+    videos = match_videos(app_state, request.settings.matching_settings)
 
-    return PostVideosResponse(videos=videos)
+    return create_json_response({"videos": [video.get_listing_json() for video in videos]})
 
 
 class PostSubmitRequest(BaseModel):
@@ -95,11 +168,11 @@ class PostSubmitResponse(BaseModel):
     """Model for the response of the submit route."""
 
     record_id: str
-    videos: list[Video]
+    videos: list[VideoListing]
 
 
-@router.post(name="Submit", path="/submit", description="Post submit.")
-def post_submit(request: PostSubmitRequest, app_state: AppStateDep) -> PostSubmitResponse:
+@router.post(name="Submit", path="/submit", description="Post submit.", response_model=PostSubmitResponse)
+def post_submit(request: PostSubmitRequest, app_state: AppStateDep) -> Response:
     """Route for posting a submit request.
 
     Args:
@@ -107,10 +180,8 @@ def post_submit(request: PostSubmitRequest, app_state: AppStateDep) -> PostSubmi
         app_state (AppStateDep): The application state.
 
     Returns:
-        PostSubmitResponse: The response to the submit request.
+        Response: The response to the submit request, serialized like `PostSubmitResponse`.
     """
-    videos = list(Matcher.match(app_state, N_VIDEOS_PER_RESPONSE, request.settings.matching_settings))
-
     record_id = get_identifier()
     created_at = get_timestamp()
     record = Record(
@@ -119,7 +190,10 @@ def post_submit(request: PostSubmitRequest, app_state: AppStateDep) -> PostSubmi
         choice_set=request.choice_set,
     )
     app_state.record_tracker.add(record)
-    return PostSubmitResponse(record_id=record_id, videos=videos)
+    app_state.choice_set_queue.invalidate(record)
+
+    videos = match_videos(app_state, request.settings.matching_settings)
+    return create_json_response({"record_id": record_id, "videos": [video.get_listing_json() for video in videos]})
 
 
 class PostUndoRequest(BaseModel):
@@ -131,12 +205,12 @@ class PostUndoRequest(BaseModel):
 class PostUndoResponse(BaseModel):
     """Model for the response of the undo route."""
 
-    videos: list[Video]
+    videos: list[VideoListing]
     choice_set: ChoiceSet
 
 
-@router.post(name="Undo", path="/undo", description="Post undo.")
-def post_undo(request: PostUndoRequest, app_state: AppStateDep) -> PostUndoResponse:
+@router.post(name="Undo", path="/undo", description="Post undo.", response_model=PostUndoResponse)
+async def post_undo(request: PostUndoRequest, app_state: AppStateDep) -> Response:
     """Route for posting an undo request.
 
     Args:
@@ -144,19 +218,21 @@ def post_undo(request: PostUndoRequest, app_state: AppStateDep) -> PostUndoRespo
         app_state (AppStateDep): The application state.
 
     Returns:
-        PostUndoResponse: The response to the undo request.
+        Response: The response to the undo request, serialized like `PostUndoResponse`.
 
     Raises:
         HttpException: If the record ID is not found.
     """
-    record = app_state.record_tracker.pop(request.record_id)
+    record = await run_in_threadpool(app_state.record_tracker.pop, request.record_id)
     if record is None:
         raise HttpException(status_code=404, detail="Videos no longer available")
+    app_state.choice_set_queue.invalidate(record)
 
     video_ids = [choice.video_id for choice in record.choice_set.choices]
-    videos = list(app_state.youtube_facade.iter_videos(video_ids))
+    video_map = await app_state.youtube_facade.get_video_summaries_async(video_ids)
+    videos = [video_map[video_id].get_listing_json() for video_id in video_ids if video_id in video_map]
 
-    return PostUndoResponse(videos=videos, choice_set=record.choice_set)
+    return create_json_response({"videos": videos, "choice_set": record.choice_set.model_dump(mode="json")})
 
 
 class PostSkipRequest(BaseModel):
@@ -170,11 +246,11 @@ class PostSkipResponse(BaseModel):
     """Model for the response of the skip route."""
 
     record_id: str
-    videos: list[Video]
+    videos: list[VideoListing]
 
 
-@router.post(name="Skip", path="/skip", description="Post skip.")
-def post_skip(request: PostSkipRequest, app_state: AppStateDep) -> PostSkipResponse:
+@router.post(name="Skip", path="/skip", description="Post skip.", response_model=PostSkipResponse)
+def post_skip(request: PostSkipRequest, app_state: AppStateDep) -> Response:
     """Route for posting a skip request.
 
     Args:
@@ -182,10 +258,8 @@ def post_skip(request: PostSkipRequest, app_state: AppStateDep) -> PostSkipRespo
         app_state (AppStateDep): The application state.
 
     Returns:
-        PostSkipResponse: The response to the skip request.
+        Response: The response to the skip request, serialized like `PostSkipResponse`.
     """
-    videos = list(Matcher.match(app_state, N_VIDEOS_PER_RESPONSE, request.settings.matching_settings))
-
     record_id = get_identifier()
     created_at = get_timestamp()
     record = Record(
@@ -194,22 +268,29 @@ def post_skip(request: PostSkipRequest, app_state: AppStateDep) -> PostSkipRespo
         choice_set=request.choice_set,
     )
     app_state.record_tracker.add(record)
-    return PostSkipResponse(record_id=record_id, videos=videos)
+    app_state.choice_set_queue.invalidate(record)
+
+    videos = match_videos(app_state, request.settings.matching_settings)
+    return create_json_response({"record_id": record_id, "videos": [video.get_listing_json() for video in videos]})
 
 
 class ResponseRanking(BaseModel):
     """Model for a ranking response."""
 
-    video: Video
+    video: VideoListing
     rank: int
     rating: float
 
 
 class PostRankingsRequest(BaseModel):
-    """Model for the request of the rankings route."""
+    """Model for the request of the rankings route.
 
-    page_number: int
+    Pages are selected by number, or by a cursor from a previous response to page stably while records are added.
+    """
+
+    page_number: int = 1
     page_size: int
+    cursor: Optional[str] = None
 
 
 class PostRankingsResponse(BaseModel):
@@ -218,50 +299,108 @@ class PostRankingsResponse(BaseModel):
     page_number: int
     n_pages: int
     rankings_page: list[ResponseRanking]
+    version: str
+    next_cursor: Optional[str] = None
 
 
-@router.post(name="Rankings", path="/rankings", description="Get rankings.")
-def get_rankings(request: PostRankingsRequest, app_state: AppStateDep) -> PostRankingsResponse:
+@router.post(name="Rankings", path="/rankings", description="Get rankings.", response_model=PostRankingsResponse)
+async def get_rankings(request: PostRankingsRequest, app_state: AppStateDep) -> Response:
     """Route for getting video rankings."""
-    page_number = request.page_number
-    if page_number < 1:
-        raise HttpException(status_code=400, detail="Page number must be greater than zero")
-
     page_size = request.page_size
     if page_size < 1:
         raise HttpException(status_code=400, detail="Page size must be greater than zero")
 
-    records = app_state.record_tracker.load()
-    rankings = list(Ranker.iter_rankings(records))
-    video_ids = [ranking.video_id for ranking in rankings]
-    videos = list(app_state.youtube_facade.iter_videos(video_ids))
-    video_map = {video.id: video for video in videos}
-
-    # NOTE: We have to fetch all videos in the rankings to find out if any videos
-    # are missing from YouTube, otherwise pagination could be incorrect.
-    response_rankings = []
-    for ranking in rankings:
-        if ranking.video_id not in video_map:
-            logger.debug("Video with ID %s not found", ranking.video_id)
-            continue
-        video = video_map[ranking.video_id]
-        response_ranking = ResponseRanking(
-            video=video,
-            rank=ranking.rank,
-            rating=ranking.rating,
-        )
-        response_rankings.append(response_ranking)
-
-    n_pages = math.ceil(len(response_rankings) / page_size)
-    if page_number > n_pages:
-        raise HttpException(status_code=404, detail="Page not found")
-
-    page_start = (page_number - 1) * page_size
+    # NOTE: Rebuilding the leaderboard can resolve many uncached videos, so it must not use up the quota for matching
+    with QuotaScheduler.priority(RequestPriority.BACKGROUND):
+        leaderboard = await app_state.leaderboard.get_snapshot()
+    n_pages = math.ceil(len(leaderboard.entries) / page_size)
+
+    if request.cursor is not None:
+        try:
+            cursor = LeaderboardCursor.decode(request.cursor)
+        except ValueError as exc:
+            raise HttpException(status_code=400, detail="Invalid cursor") from exc
+        page_start = leaderboard.get_cursor_start(cursor)
+        page_number = page_start // page_size + 1
+    else:
+        page_number = request.page_number
+        if page_number < 1:
+            raise HttpException(status_code=400, detail="Page number must be greater than zero")
+        if page_number > n_pages:
+            raise HttpException(status_code=404, detail="Page not found")
+        page_start = (page_number - 1) * page_size
+
+    # NOTE: The leaderboard only holds videos that could be found on YouTube, so pages are plain slices
+    # NOTE: Keys follow the field order of ResponseRanking so the output matches the serialized model
     page_end = page_start + page_size
-    rankings_page = response_rankings[page_start:page_end]
-
-    return PostRankingsResponse(
-        page_number=page_number,
-        n_pages=n_pages,
-        rankings_page=rankings_page,
+    rankings_page = [
+        {"video": entry.video.get_listing_json(), "rank": entry.rank, "rating": entry.rating}
+        for entry in leaderboard.entries[page_start:page_end]
+    ]
+
+    next_cursor = None
+    if page_end < len(leaderboard.entries):
+        next_cursor = leaderboard.get_cursor(page_end - 1).encode()
+
+    return create_json_response(
+        {
+            "page_number": page_number,
+            "n_pages": n_pages,
+            "rankings_page": rankings_page,
+            "version": leaderboard.version,
+            "next_cursor": next_cursor,
+        }
     )
+
+
+class PostSearchRequest(BaseModel):
+    """Model for the request of the search route."""
+
+    query: str
+    n_results: int = 20
+
+
+class ResponseSearchResult(BaseModel):
+    """Model for a search result response."""
+
+    video: VideoListing
+    score: float
+
+
+class PostSearchResponse(BaseModel):
+    """Model for the response of the search route."""
+
+    results: list[ResponseSearchResult]
+
+
+@router.post(name="Search", path="/search", description="Search the playlist.", response_model=PostSearchResponse)
+async def post_search(request: PostSearchRequest, app_state: AppStateDep) -> Response:
+    """Route for searching the playlist by title, description and channel.
+
+    Args:
+        request (PostSearchRequest): The search request.
+        app_state (AppStateDep): The application state.
+
+    Returns:
+        Response: The best matching videos, serialized like `PostSearchResponse`.
+
+    Raises:
+        HttpException: If the number of results is not positive or is too large.
+    """
+    if request.n_results < 1:
+        raise HttpException(status_code=400, detail="Number of results must be greater than zero")
+    if request.n_results > MAX_SEARCH_RESULTS:
+        raise HttpException(status_code=400, detail=f"Number of results must be at most {MAX_SEARCH_RESULTS}")
+
+    hits = await run_in_threadpool(app_state.search_index.search, request.query, request.n_results)
+
+    # NOTE: Summaries of all hits are loaded in one batch, and uncached videos must not use up the quota for matching
+    with QuotaScheduler.priority(RequestPriority.BACKGROUND):
+        video_map = await app_state.youtube_facade.get_video_summaries_async(hit.video_id for hit in hits)
+    results = [
+        {"video": video_map[hit.video_id].get_listing_json(), "score": hit.score}
+        for hit in hits
+        if hit.video_id in video_map
+    ]
+
+    return create_json_response({"results": results})
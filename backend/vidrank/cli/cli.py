@@ -1,16 +1,16 @@
 # ruff: noqa: T201
 import logging
+import pstats
 from itertools import islice
-from typing import Optional
+from typing import Any, Optional
 
 import click
 
 from vidrank.app.app_state import AppState
 from vidrank.lib.analytics.analytics import print_analysis
-from vidrank.lib.models.action import Action
-from vidrank.lib.ranking.ranker import Ranker
+from vidrank.lib.caching.pickle_cache import PickleCache
+from vidrank.lib.caching.sqlite_cache import SqliteCache
 from vidrank.lib.utilities.io_utilities import print_channel, print_playlist, print_video, print_video_simple
-from vidrank.lib.utilities.search_utilities import iter_filtered_playlist_items
 
 logger = logging.getLogger(__name__)
 
@@ -99,6 +99,28 @@ def get_playlist(playlist_id: str, use_cache: bool, debug: bool, n_videos: int)
             print_video(video)
 
 
+@main.command(name="sync")
+@click.option("--debug", type=bool, default=False, is_flag=True)
+def sync_playlist(debug: bool) -> None:
+    """Sync the cached playlist with YouTube and print the changes.
+
+    Args:
+        debug (bool): Whether to enable debug logging.
+    """
+    if debug:
+        logging.basicConfig(level=logging.INFO)
+
+    app_state = AppState.get()
+    delta = app_state.playlist_syncer.sync()
+    for item in delta.added:
+        print(f"+ {item.video_id} {item.title}")
+    for video_id in delta.removed:
+        print(f"- {video_id}")
+    for item in delta.updated:
+        print(f"~ {item.video_id} {item.title}")
+    print(f"{len(delta.added)} added, {len(delta.removed)} removed, {len(delta.updated)} updated")
+
+
 @main.command(name="channel")
 @click.argument("channel_id", type=str)
 @click.option("--use-cache/--no-cache", default=True)
@@ -143,10 +165,84 @@ def cache_info() -> None:
     """Print cache summary information."""
     app_state = AppState.get()
     print(f"Cached videos: {len(app_state.youtube_facade.video_cache)}")
+    print(f"Cached video summaries: {len(app_state.youtube_facade.video_summary_cache)}")
     print(f"Cached channels: {len(app_state.youtube_facade.channel_cache)}")
     print(f"Cached playlists: {len(app_state.youtube_facade.playlist_cache)}")
 
 
+@main.command(name="quota")
+def get_quota() -> None:
+    """Print the YouTube API quota units used today."""
+    app_state = AppState.get()
+    usage = app_state.quota_scheduler.get_usage()
+    print(f"Quota used on {usage.day}: {usage.units_used} / {usage.daily_limit} units")
+    for endpoint, units in sorted(usage.units_by_endpoint.items()):
+        print(f"  {endpoint}: {units}")
+
+
+@main.command(name="migrate-cache")
+@click.option("--debug", type=bool, default=False, is_flag=True)
+def migrate_cache(debug: bool) -> None:
+    """Copy the pickle cache directories into the SQLite cache.
+
+    Args:
+        debug (bool): Whether to enable debug logging.
+    """
+    if debug:
+        logging.basicConfig(level=logging.INFO)
+
+    app_state = AppState.get()
+    for name in ["videos", "video_summaries", "channels", "playlists"]:
+        pickle_cache: PickleCache[Any] = PickleCache(app_state.cache_dirpath / name)
+        sqlite_cache: SqliteCache[Any] = SqliteCache(app_state.cache_dirpath / "cache.sqlite3", name)
+        n_items = sqlite_cache.import_pickle_cache(pickle_cache)
+        print(f"Migrated {n_items} {name}")
+    print("Set VIDRANK_CACHE_BACKEND=sqlite to use the migrated cache")
+
+
+@main.command(name="profiles")
+@click.option("--n", type=int, default=10)
+@click.option("--profile-id", type=str)
+@click.option("--n-functions", type=int, default=20)
+def list_profiles(n: int, n_functions: int, profile_id: Optional[str] = None) -> None:
+    """List recent request profiles, or summarize one profile.
+
+    Args:
+        n (int): The number of profiles to list.
+        n_functions (int): The number of functions to show when summarizing a profile.
+        profile_id (Optional[str]): The ID of the profile to summarize.
+
+    Raises:
+        ValueError: If the profile with the given ID is not found.
+    """
+    app_state = AppState.get()
+    profiles = app_state.request_profiler.list_profiles()
+
+    if profile_id is None:
+        for profile in profiles[:n]:
+            print(
+                f"{profile.profile_id}  {profile.method} {profile.route} {profile.status_code}"
+                f"  {profile.duration_seconds * 1000:.1f} ms  ({profile.trigger})"
+            )
+        print(f"{len(profiles)} profiles in {app_state.request_profiler.dirpath}")
+        return
+
+    for profile in profiles:
+        if profile.profile_id == profile_id:
+            break
+    else:
+        msg = f"Profile with ID {profile_id} not found"
+        raise ValueError(msg)
+
+    print(f"{profile.method} {profile.route} {profile.status_code} in {profile.duration_seconds * 1000:.1f} ms")
+    sections = sorted(profile.section_seconds.items(), key=lambda x: x[1], reverse=True)
+    for name, seconds in sections:
+        print(f"  {name}: {seconds * 1000:.1f} ms over {profile.section_calls[name]} calls")
+    print()
+    stats = pstats.Stats(str(app_state.request_profiler.get_stats_filepath(profile_id)))
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(n_functions)
+
+
 @main.command(name="rankings")
 @click.option("--n", type=int, default=10)
 @click.option("--video-id", type=str)
@@ -158,23 +254,18 @@ def get_video_rankings(n: int, video_id: Optional[str] = None) -> None:
         video_id (Optional[str]): The ID of the video to calculate rankings for.
     """
     app_state = AppState.get()
-    records = app_state.record_tracker.load()
-    rankings = Ranker.iter_rankings(records)
+    rating_index = app_state.ranking_engine.get_rating_index()
 
     if video_id is not None:
-        for ranking in rankings:
-            if ranking.video_id == video_id:
-                video = app_state.youtube_facade.get_video(ranking.video_id)
-                print(f"{video.title}: {ranking.rating}")
-                break
-        else:
+        ranking = rating_index.get_ranking(video_id)
+        summaries = app_state.youtube_facade.get_video_summaries([video_id]) if ranking is not None else {}
+        if ranking is None or video_id not in summaries:
             print("Video not found")
+            return
+        print(f"{summaries[video_id].title}: rank={ranking.rank}, rating={ranking.rating}")
     else:
-        for ranking in islice(rankings, n):
-            video = app_state.youtube_facade.get_video(ranking.video_id)
-            print_video_simple(video)
-            print("= = = = = = = = = = = =")
-            print()
+        video_ids = [ranking.video_id for ranking in rating_index.get_top(n)]
+        print_video_summaries(app_state, video_ids)
 
 
 @main.command(name="removed")
@@ -186,22 +277,15 @@ def list_removed_videos(n: int) -> None:
         n (int): The number of videos to list.
     """
     app_state = AppState.get()
-    records = app_state.record_tracker.load()
 
     playlist = app_state.youtube_facade.get_playlist(app_state.playlist_id)
     playlist_video_ids = {item.video_id for item in playlist.items}
 
-    removed_video_ids = []
-    for record in records:
-        for choice in record.choice_set.choices:
-            if choice.action == Action.REMOVE and choice.video_id in playlist_video_ids:
-                removed_video_ids.append(choice.video_id)
+    removed_video_ids = [
+        video_id for video_id in app_state.removed_video_index.get_removed_video_ids() if video_id in playlist_video_ids
+    ]
 
-    for video_id in islice(removed_video_ids, n):
-        video = app_state.youtube_facade.get_video(video_id)
-        print_video_simple(video)
-        print("= = = = = = = = = = = =")
-        print()
+    print_video_summaries(app_state, removed_video_ids[:n])
 
 
 @main.command(name="search")
@@ -216,10 +300,21 @@ def search_videos(query: str, n: int) -> None:
     """
     app_state = AppState.get()
 
-    playlist = app_state.youtube_facade.get_playlist(app_state.playlist_id)
+    hits = app_state.search_index.search(query, n)
+    print_video_summaries(app_state, [hit.video_id for hit in hits])
+
 
-    for item in islice(iter_filtered_playlist_items(playlist.items, query), n):
-        video = app_state.youtube_facade.get_video(item.video_id)
-        print_video_simple(video)
+def print_video_summaries(app_state: AppState, video_ids: list[str]) -> None:
+    """Print the summaries of videos in order, loading them in one batch.
+
+    Args:
+        app_state (AppState): The application state.
+        video_ids (list[str]): The IDs of the videos to print.
+    """
+    summaries = app_state.youtube_facade.get_video_summaries(video_ids)
+    for video_id in video_ids:
+        if video_id not in summaries:
+            continue
+        print_video_simple(summaries[video_id])
         print("= = = = = = = = = = = =")
         print()
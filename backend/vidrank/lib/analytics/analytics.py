@@ -1,59 +1,197 @@
 # ruff: noqa: T201
+from typing import Mapping
+
+import numpy as np
+import pendulum
+
+from vidrank.lib.analytics.analytics_report import AnalyticsReport
+from vidrank.lib.analytics.channel_stats import ChannelStats
+from vidrank.lib.analytics.daily_activity import DailyActivity
+from vidrank.lib.analytics.record_columns import ACTIONS, RecordColumns
+from vidrank.lib.analytics.selection_count import SelectionCount
 from vidrank.lib.models.action import Action
 from vidrank.lib.models.record import Record
 from vidrank.lib.youtube.playlist import Playlist
+from vidrank.lib.youtube.video_summary import VideoSummary
 from vidrank.lib.youtube.youtube_facade import YouTubeFacade
 
+N_PRINTED_CHANNELS = 10
 
-def print_analysis(records: list[Record], playlist: Playlist, youtube_facade: YouTubeFacade) -> None:
-    """Print stats about the completed records.
 
-    Args:
-        records (list[Record]): The records to analyze.
-        playlist (Playlist): The YouTube playlist.
-        youtube_facade (YouTubeFacade): The YouTube facade.
-    """
-    n_videos = len(playlist.items)
-    print(f"A total of {n_videos} videos are in the playlist.")
+class Analytics:
+    """Stats about the completed records, computed with vectorized passes over `RecordColumns`."""
+
+    MS_PER_DAY = 24 * 60 * 60 * 1000
+    MIN_SELECTIONS = 4
+
+    @classmethod
+    def get_report(
+        cls,
+        columns: RecordColumns,
+        n_playlist_videos: int,
+        video_map: Mapping[str, VideoSummary],
+        min_selections: int = MIN_SELECTIONS,
+    ) -> AnalyticsReport:
+        """Compute the stats about the records.
+
+        Args:
+            columns (RecordColumns): The columns of the records.
+            n_playlist_videos (int): The number of videos in the playlist.
+            video_map (Mapping[str, VideoSummary]): The summaries of the videos in the records, keyed by ID. Videos
+                without a summary are left out of the selections and channels, so only the videos from
+                `get_top_selection_ids` need to be resolved and channels can be counted from cached summaries.
+            min_selections (int): The number of selections a video needs to be listed in the top selections.
+
+        Returns:
+            AnalyticsReport: The stats about the records.
+        """
+        action_counts = columns.get_action_counts()
+        record_comparison_counts = columns.get_record_comparison_counts()
+        n_rated = action_counts[:, ACTIONS.index(Action.SELECT)] + action_counts[:, ACTIONS.index(Action.NOTHING)]
+
+        return AnalyticsReport(
+            n_playlist_videos=n_playlist_videos,
+            n_records=columns.n_records,
+            n_rated_videos=int(np.count_nonzero(n_rated)),
+            n_comparisons=int(record_comparison_counts.sum()),
+            top_selections=cls._get_top_selections(columns, action_counts, video_map, min_selections),
+            daily_activity=cls._get_daily_activity(columns, record_comparison_counts),
+            channels=cls._get_channels(columns, action_counts, video_map),
+        )
+
+    @classmethod
+    def get_top_selection_ids(cls, columns: RecordColumns, min_selections: int = MIN_SELECTIONS) -> list[str]:
+        """Get the videos that can be listed in the top selections.
 
-    print(f"A total of {len(records)} records have been created.")
+        Args:
+            columns (RecordColumns): The columns of the records.
+            min_selections (int): The number of selections a video needs to be listed in the top selections.
 
-    video_ids = set()
+        Returns:
+            list[str]: The IDs of the videos with enough selections, most selected first.
+        """
+        order = cls._get_top_selection_order(columns.get_action_counts(), min_selections)
+        return [columns.video_ids[video_i] for video_i in order.tolist()]
 
-    counts: dict[str, dict[str, int]] = {}
-    for record in records:
-        for choice in record.choice_set.choices:
-            video_id = choice.video_id
+    @classmethod
+    def _get_top_selection_order(cls, action_counts: np.ndarray, min_selections: int) -> np.ndarray:
+        n_selections = action_counts[:, ACTIONS.index(Action.SELECT)]
+        order = np.argsort(-n_selections, kind="stable")
+        return order[n_selections[order] >= min_selections]
 
-            if choice.action in [Action.SELECT, Action.NOTHING]:
-                video_ids.add(video_id)
+    @classmethod
+    def _get_top_selections(
+        cls,
+        columns: RecordColumns,
+        action_counts: np.ndarray,
+        video_map: Mapping[str, VideoSummary],
+        min_selections: int,
+    ) -> list[SelectionCount]:
+        n_selections = action_counts[:, ACTIONS.index(Action.SELECT)]
+        order = cls._get_top_selection_order(action_counts, min_selections)
 
-            if video_id not in counts:
-                counts[video_id] = {}
-            if choice.action not in counts[video_id]:
-                counts[video_id][choice.action] = 0
-            counts[video_id][choice.action] += 1
+        top_selections = []
+        for video_i in order.tolist():
+            video_id = columns.video_ids[video_i]
+            video = video_map.get(video_id)
+            if video is not None:
+                top_selections.append(
+                    SelectionCount(video_id=video_id, title=video.title, n_selections=int(n_selections[video_i]))
+                )
+        return top_selections
 
-    print(f"A total of {len(video_ids)} unique videos have been rated.")
+    @classmethod
+    def _get_daily_activity(cls, columns: RecordColumns, record_comparison_counts: np.ndarray) -> list[DailyActivity]:
+        days, record_days = np.unique(columns.created_at // cls.MS_PER_DAY, return_inverse=True)
+        n_records = np.bincount(record_days, minlength=len(days))
+        n_comparisons = np.bincount(record_days, weights=record_comparison_counts, minlength=len(days))
+        return [
+            DailyActivity(
+                date=pendulum.from_timestamp(day * cls.MS_PER_DAY / 1000).to_date_string(),
+                n_records=int(n_day_records),
+                n_comparisons=int(n_day_comparisons),
+            )
+            for day, n_day_records, n_day_comparisons in zip(
+                days.tolist(), n_records.tolist(), n_comparisons.tolist(), strict=True
+            )
+        ]
 
-    n_comps = 0
-    for record in records:
-        for choice_a in record.choice_set.choices:
-            for choice_b in record.choice_set.choices:
-                action_a = choice_a.action
-                action_b = choice_b.action
+    @classmethod
+    def _get_channels(
+        cls,
+        columns: RecordColumns,
+        action_counts: np.ndarray,
+        video_map: Mapping[str, VideoSummary],
+    ) -> list[ChannelStats]:
+        channel_index: dict[str, int] = {}
+        channel_names: list[str] = []
+        video_channels = np.full(columns.n_videos, -1, dtype=np.int64)
+        for video_i, video_id in enumerate(columns.video_ids):
+            video = video_map.get(video_id)
+            if video is None:
+                continue
+            if video.channel_id not in channel_index:
+                channel_index[video.channel_id] = len(channel_index)
+                channel_names.append(video.channel)
+            video_channels[video_i] = channel_index[video.channel_id]
 
-                if (action_a, action_b) == (Action.SELECT, Action.NOTHING):
-                    n_comps += 1
+        has_channel = video_channels >= 0
+        channel_codes = video_channels[has_channel]
+        channel_counts = action_counts[has_channel]
+        n_channels = len(channel_index)
+        n_videos = np.bincount(channel_codes, minlength=n_channels)
+        n_actions = {
+            action: np.bincount(channel_codes, weights=channel_counts[:, code], minlength=n_channels).astype(np.int64)
+            for code, action in enumerate(ACTIONS)
+        }
 
-    print(f"A total of {n_comps} pairs of videos have been compared.")
+        # NOTE: Channels are ordered by selections, then by videos, then by first appearance
+        order = np.lexsort((-n_videos, -n_actions[Action.SELECT]))
+        channel_ids = list(channel_index)
+        return [
+            ChannelStats(
+                channel_id=channel_ids[channel_i],
+                channel=channel_names[channel_i],
+                n_videos=int(n_videos[channel_i]),
+                n_selections=int(n_actions[Action.SELECT][channel_i]),
+                n_unselected=int(n_actions[Action.NOTHING][channel_i]),
+                n_removals=int(n_actions[Action.REMOVE][channel_i]),
+            )
+            for channel_i in order.tolist()
+        ]
+
+
+def print_analysis(records: list[Record], playlist: Playlist, youtube_facade: YouTubeFacade) -> None:
+    """Print stats about the completed records.
+
+    Args:
+        records (list[Record]): The records to analyze.
+        playlist (Playlist): The YouTube playlist.
+        youtube_facade (YouTubeFacade): The YouTube facade.
+    """
+    columns = RecordColumns.from_records(records)
+    # NOTE: Only the top selections are resolved, so deleted and private videos that are never cached cost no quota
+    video_map = youtube_facade.video_summary_cache.get_many(columns.video_ids)
+    uncached_ids = [video_id for video_id in Analytics.get_top_selection_ids(columns) if video_id not in video_map]
+    video_map.update(youtube_facade.get_video_summaries(uncached_ids))
+    report = Analytics.get_report(columns, len(playlist.items), video_map)
+
+    print(f"A total of {report.n_playlist_videos} videos are in the playlist.")
+    print(f"A total of {report.n_records} records have been created.")
+    print(f"A total of {report.n_rated_videos} unique videos have been rated.")
+    print(f"A total of {report.n_comparisons} pairs of videos have been compared.")
 
     print()
     print("Videos with the most selections:")
+    for selection_count in report.top_selections:
+        print(f"{selection_count.n_selections}: {selection_count.title}")
 
-    for video_id, ratings in sorted(counts.items(), key=lambda x: x[1].get(Action.SELECT, 0), reverse=True):
-        select_count = ratings.get(Action.SELECT, 0)
-        min_select_count = 4
-        if select_count >= min_select_count:
-            video = youtube_facade.get_video(video_id)
-            print(f"{select_count}: {video.title}")
+    print()
+    print("Channels with the most selections:")
+    for channel_stats in report.channels[:N_PRINTED_CHANNELS]:
+        print(f"{channel_stats.n_selections}: {channel_stats.channel} ({channel_stats.n_videos} videos)")
+
+    print()
+    print("Records by day:")
+    for daily_activity in report.daily_activity:
+        print(f"{daily_activity.date}: {daily_activity.n_records} records, {daily_activity.n_comparisons} comparisons")
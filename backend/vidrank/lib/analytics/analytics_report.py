@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+
+from vidrank.lib.analytics.channel_stats import ChannelStats
+from vidrank.lib.analytics.daily_activity import DailyActivity
+from vidrank.lib.analytics.selection_count import SelectionCount
+
+
+class AnalyticsReport(BaseModel):
+    """Stats about the completed records."""
+
+    n_playlist_videos: int
+    n_records: int
+    n_rated_videos: int
+    n_comparisons: int
+    top_selections: list[SelectionCount]
+    daily_activity: list[DailyActivity]
+    channels: list[ChannelStats]
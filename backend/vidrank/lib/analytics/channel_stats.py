@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+
+
+class ChannelStats(BaseModel):
+    """Actions taken on the videos of one channel."""
+
+    channel_id: str
+    channel: str
+    n_videos: int
+    n_selections: int
+    n_unselected: int
+    n_removals: int
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+
+class DailyActivity(BaseModel):
+    """Records and comparisons created on one day, in UTC."""
+
+    date: str
+    n_records: int
+    n_comparisons: int
@@ -0,0 +1,96 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from vidrank.lib.models.action import Action
+from vidrank.lib.models.record import Record
+from vidrank.lib.ranking.comparisons import Comparisons
+
+ACTIONS = list(Action)
+
+
+@dataclass
+class RecordColumns:
+    """Records stored column by column, with videos and actions as integer codes.
+
+    Every choice of every record is one row of the choice columns, ordered by record and then by position in the
+    choice set. Videos are indexed in the order they first appear and actions by their position in `Action`, so
+    analytics can be computed with vectorized passes instead of nested loops over records. The record of each
+    comparison is kept as well, as extracted by `Comparisons.from_records`.
+    """
+
+    video_ids: list[str]
+    created_at: np.ndarray
+    record_indices: np.ndarray
+    video_indices: np.ndarray
+    action_codes: np.ndarray
+    comparison_record_indices: np.ndarray
+
+    @classmethod
+    def from_records(cls, records: list[Record]) -> "RecordColumns":
+        """Convert records to columns.
+
+        Args:
+            records (list[Record]): The records of the user choices.
+
+        Returns:
+            RecordColumns: The columns of the records.
+        """
+        action_codes = {action: code for code, action in enumerate(ACTIONS)}
+        video_index: dict[str, int] = {}
+        record_indices: list[int] = []
+        video_indices: list[int] = []
+        codes: list[int] = []
+        for record_i, record in enumerate(records):
+            for choice in record.choice_set.choices:
+                record_indices.append(record_i)
+                video_indices.append(video_index.setdefault(choice.video_id, len(video_index)))
+                codes.append(action_codes[choice.action])
+
+        return cls(
+            video_ids=list(video_index),
+            created_at=np.array([record.created_at for record in records], dtype=np.int64),
+            record_indices=np.array(record_indices, dtype=np.int64),
+            video_indices=np.array(video_indices, dtype=np.int64),
+            action_codes=np.array(codes, dtype=np.int8),
+            comparison_record_indices=Comparisons.from_records(records).record_indices,
+        )
+
+    @property
+    def n_records(self) -> int:
+        """Get the number of records.
+
+        Returns:
+            int: The number of records.
+        """
+        return len(self.created_at)
+
+    @property
+    def n_videos(self) -> int:
+        """Get the number of distinct videos in the records.
+
+        Returns:
+            int: The number of videos.
+        """
+        return len(self.video_ids)
+
+    def get_action_counts(self) -> np.ndarray:
+        """Count the actions taken on each video.
+
+        Returns:
+            np.ndarray: The counts with one row per video and one column per action, in the order of `Action`.
+        """
+        n_actions = len(ACTIONS)
+        flat = np.bincount(
+            self.video_indices * n_actions + self.action_codes,
+            minlength=self.n_videos * n_actions,
+        )
+        return flat.reshape(self.n_videos, n_actions)
+
+    def get_record_comparison_counts(self) -> np.ndarray:
+        """Count the comparisons in each record.
+
+        Returns:
+            np.ndarray: The number of comparisons of each record.
+        """
+        return np.bincount(self.comparison_record_indices, minlength=self.n_records)
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+
+class SelectionCount(BaseModel):
+    """Number of times a video was selected."""
+
+    video_id: str
+    title: str
+    n_selections: int
@@ -0,0 +1,78 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, Iterable, TypeVar
+
+T = TypeVar("T")
+
+
+class AsyncSingleFlight(Generic[T]):
+    """Deduplicates concurrent coroutine calls for the same keys.
+
+    The first caller for a key starts the coroutine as a task, and callers that arrive while it is running await and
+    share its result or exception instead of starting it again. Callers await the task through a shield, so a caller
+    that is cancelled does not cancel the call for the others.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the single flight group."""
+        self._in_flight: dict[str, asyncio.Task[dict[str, T]]] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run a coroutine for a key, or await the call already in flight for that key.
+
+        Args:
+            key (str): The key identifying the call.
+            fn (Callable[[], Awaitable[T]]): The function that creates the coroutine if no call is in flight.
+
+        Returns:
+            T: The result of the coroutine.
+        """
+
+        async def load(_keys: list[str]) -> dict[str, T]:
+            return {key: await fn()}
+
+        items = await self.do_many([key], load)
+        return items[key]
+
+    async def do_many(
+        self,
+        keys: Iterable[str],
+        fn: Callable[[list[str]], Awaitable[dict[str, T]]],
+    ) -> dict[str, T]:
+        """Run a coroutine for the keys that are not in flight, and await the calls in flight for the others.
+
+        Args:
+            keys (Iterable[str]): The keys identifying the calls.
+            fn (Callable[[list[str]], Awaitable[dict[str, T]]]): The function that creates the coroutine for the keys
+                that are not in flight, whose result leaves out the keys it could not find.
+
+        Returns:
+            dict[str, T]: The results that were found, keyed by key.
+        """
+        tasks: dict[str, asyncio.Task[dict[str, T]]] = {}
+        keys_to_run: list[str] = []
+        for key in keys:
+            in_flight_task = self._in_flight.get(key)
+            if in_flight_task is not None:
+                tasks[key] = in_flight_task
+            else:
+                keys_to_run.append(key)
+
+        if len(keys_to_run) != 0:
+            task = asyncio.ensure_future(fn(keys_to_run))
+            for key in keys_to_run:
+                self._in_flight[key] = task
+                tasks[key] = task
+            task.add_done_callback(lambda done_task: self._remove(keys_to_run, done_task))
+
+        results: dict[str, T] = {}
+        for task in set(tasks.values()):
+            task_results = await asyncio.shield(task)
+            for key, item in task_results.items():
+                if tasks.get(key) is task:
+                    results[key] = item
+        return results
+
+    def _remove(self, keys: list[str], task: asyncio.Task[dict[str, T]]) -> None:
+        for key in keys:
+            if self._in_flight.get(key) is task:
+                del self._in_flight[key]
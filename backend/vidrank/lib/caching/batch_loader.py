@@ -0,0 +1,142 @@
+import contextvars
+import logging
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, Generic, Iterable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class QueuedBatch:
+    """Keys queued to be loaded together, along with the context of the caller with the highest priority."""
+
+    context: contextvars.Context
+    priority: int
+    keys: list[str] = field(default_factory=list)
+    full: threading.Event = field(default_factory=threading.Event)
+
+
+class BatchLoader(Generic[T]):
+    """Coalesces concurrent loads of items into shared batch calls.
+
+    A key that is already being loaded is never requested twice: later callers wait for the pending result. Keys
+    that are not in flight are queued, and the first caller to queue a key leads the batch. The leader loads right
+    away if no other load is pending, and otherwise waits for a short window, or until the batch is full, before
+    loading every key in the batch with a single call. Keys past the batch size go into the next batch. Each batch is
+    loaded in the context of its highest priority caller, so a background leader does not slow interactive callers.
+    """
+
+    DEFAULT_WINDOW_SECONDS = 0.005
+    DEFAULT_MAX_BATCH_SIZE = 50
+
+    def __init__(
+        self,
+        load_fn: Callable[[list[str]], dict[str, T]],
+        *,
+        window_seconds: float = DEFAULT_WINDOW_SECONDS,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        priority_fn: Optional[Callable[[], int]] = None,
+    ):
+        """Initialize the batch loader.
+
+        Args:
+            load_fn (Callable[[list[str]], dict[str, T]]): The function that loads items by key, leaving out the
+                keys it could not find.
+            window_seconds (float): How long to collect keys from concurrent callers before loading them.
+            max_batch_size (int): The maximum number of keys loaded with a single call.
+            priority_fn (Optional[Callable[[], int]]): The function that gets the priority of the calling context,
+                higher first, or None to load every batch in the context of its leader.
+        """
+        self.load_fn = load_fn
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self.priority_fn = priority_fn
+
+        self._lock = threading.Lock()
+        self._in_flight: dict[str, Future[Optional[T]]] = {}
+        self._batch: Optional[QueuedBatch] = None
+
+    def load_many(self, keys: Iterable[str]) -> dict[str, T]:
+        """Load items by key, sharing calls with concurrent callers.
+
+        Args:
+            keys (Iterable[str]): The keys of the items to load.
+
+        Returns:
+            dict[str, T]: The items that were found, keyed by key.
+        """
+        context = contextvars.copy_context()
+        priority = self.priority_fn() if self.priority_fn is not None else 0
+
+        futures: dict[str, Future[Optional[T]]] = {}
+        led_batches: list[QueuedBatch] = []
+        with self._lock:
+            is_alone = len(self._in_flight) == 0
+            for key in keys:
+                future = self._in_flight.get(key)
+                if future is None:
+                    future = Future()
+                    self._in_flight[key] = future
+                    self._queue(key, context, priority, led_batches)
+                futures[key] = future
+
+        for i, batch in enumerate(led_batches):
+            # NOTE: Only the last batch can still take keys from other callers, earlier ones are already full
+            if not (is_alone and i == len(led_batches) - 1):
+                batch.full.wait(self.window_seconds)
+            self._load_batch(batch)
+
+        items = {}
+        for key, future in futures.items():
+            item = future.result()
+            if item is not None:
+                items[key] = item
+        return items
+
+    def _queue(
+        self,
+        key: str,
+        context: contextvars.Context,
+        priority: int,
+        led_batches: list[QueuedBatch],
+    ) -> None:
+        batch = self._batch
+        if batch is None:
+            batch = QueuedBatch(context=context, priority=priority)
+            self._batch = batch
+            led_batches.append(batch)
+        elif priority > batch.priority:
+            batch.context = context
+            batch.priority = priority
+
+        batch.keys.append(key)
+        if len(batch.keys) >= self.max_batch_size:
+            batch.full.set()
+            self._batch = None
+
+    def _load_batch(self, batch: QueuedBatch) -> None:
+        with self._lock:
+            if self._batch is batch:
+                self._batch = None
+            keys = batch.keys
+            futures = {key: self._in_flight[key] for key in keys}
+
+        logger.debug("Loading a batch of %d keys", len(keys))
+        try:
+            # NOTE: The context may be running another batch in another thread, so each load runs in its own copy
+            items = batch.context.copy().run(self.load_fn, keys)
+        except BaseException as exc:  # noqa: BLE001
+            # NOTE: The error is raised to every caller from the futures, so the leader still loads its other batches
+            for future in futures.values():
+                future.set_exception(exc)
+        else:
+            for key, future in futures.items():
+                future.set_result(items.get(key))
+        finally:
+            with self._lock:
+                for key in keys:
+                    del self._in_flight[key]
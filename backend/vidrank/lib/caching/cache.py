@@ -0,0 +1,39 @@
+from typing import Iterable, Optional, Protocol, TypeVar
+
+from vidrank.lib.caching.cache_stats import CacheStats
+
+T = TypeVar("T")
+
+
+class Cache(Protocol[T]):
+    """Interface for caches of items keyed by ID."""
+
+    stats: CacheStats
+
+    def get(self, item_id: str) -> Optional[T]:
+        """Get an item from the cache."""
+        ...
+
+    def get_many(self, item_ids: Iterable[str]) -> dict[str, T]:
+        """Get the items that are in the cache, keyed by ID."""
+        ...
+
+    def get_many_sized(self, item_ids: Iterable[str]) -> dict[str, tuple[T, int]]:
+        """Get the items that are in the cache with the number of bytes each was stored in, keyed by ID."""
+        ...
+
+    def add(self, item_id: str, item: T) -> None:
+        """Add an item to the cache."""
+        ...
+
+    def add_many(self, items: dict[str, T]) -> None:
+        """Add several items to the cache."""
+        ...
+
+    def has(self, item_id: str) -> bool:
+        """Check if an item is in the cache."""
+        ...
+
+    def __len__(self) -> int:
+        """Get the number of items in the cache."""
+        ...
@@ -0,0 +1,8 @@
+from enum import StrEnum, auto
+
+
+class CacheBackend(StrEnum):
+    """Enum for on-disk cache storage backends."""
+
+    PICKLE = auto()
+    SQLITE = auto()
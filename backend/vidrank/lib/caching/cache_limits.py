@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class CacheLimits:
+    """Limits on the items kept by an in-memory cache, where None means unlimited."""
+
+    max_items: Optional[int] = None
+    max_bytes: Optional[int] = None
@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class CacheStats:
+    """Hit, miss and eviction counts for a cache."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups that were served from the cache."""
+        n_lookups = self.hits + self.misses
+        return self.hits / n_lookups if n_lookups > 0 else 0.0
@@ -0,0 +1,249 @@
+import logging
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, Iterable, Optional, TypeVar
+
+from vidrank.lib.caching.cache import Cache
+from vidrank.lib.caching.cache_stats import CacheStats
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def get_pickled_size(item: object) -> int:
+    """Estimate the size of an item by the length of its pickled form.
+
+    Args:
+        item (object): The item to measure.
+
+    Returns:
+        int: The number of bytes in the pickled item.
+    """
+    return len(pickle.dumps(item))
+
+
+class MemoryCache(Generic[T]):
+    """Size-bounded in-memory cache layered over another cache.
+
+    Items are kept in least recently used order and evicted once the cache holds more than `max_items` items or
+    their estimated sizes add up to more than `max_bytes`. Additions are written through to the backing cache and
+    replace any stale copy in memory.
+
+    Unless a size function is given, items read from the backing cache are sized by the bytes they were stored in,
+    so misses are not pickled again, and only added items are sized by pickling.
+
+    Backing cache reads happen outside the lock, so an item that is added while it is being read is not replaced in
+    memory by the value that was read. Items are handed out without copying, so callers must not mutate them.
+    """
+
+    def __init__(
+        self,
+        store: Cache[T],
+        *,
+        max_items: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        size_fn: Optional[Callable[[T], int]] = None,
+    ):
+        """Initialize the memory cache.
+
+        Args:
+            store (Cache[T]): The cache to read from and write through to.
+            max_items (Optional[int]): The maximum number of items to keep in memory.
+            max_bytes (Optional[int]): The maximum estimated size of the items kept in memory.
+            size_fn (Optional[Callable[[T], int]]): The function used to estimate the size of an item in bytes,
+                defaulting to the stored size of items read from the backing cache and the pickled size of added items.
+        """
+        self.store = store
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.size_fn = size_fn
+        self.stats = CacheStats()
+        self.n_bytes = 0
+
+        self._lock = threading.Lock()
+        self._items: OrderedDict[str, tuple[T, int]] = OrderedDict()
+        self._generation = 0
+        self._n_reads: dict[str, int] = {}
+        self._write_generations: dict[str, int] = {}
+
+    def get(self, item_id: str) -> Optional[T]:
+        """Get an item from memory, falling back to the backing cache.
+
+        Args:
+            item_id (str): The ID of the item to fetch.
+
+        Returns:
+            Optional[T]: The item with the given ID, or None if it does not exist.
+        """
+        with self._lock:
+            entry = self._items.get(item_id)
+            if entry is not None:
+                self._items.move_to_end(item_id)
+                self.stats.hits += 1
+                return entry[0]
+            self.stats.misses += 1
+            generation = self._start_reads([item_id])
+
+        try:
+            sized_item = self.store.get_many_sized([item_id]).get(item_id)
+            if sized_item is None:
+                return None
+            item, size = sized_item
+            return self._put(item_id, item, size, generation)
+        finally:
+            self._finish_reads([item_id])
+
+    def get_many(self, item_ids: Iterable[str]) -> dict[str, T]:
+        """Get several items from memory, fetching the rest from the backing cache in one batch.
+
+        Args:
+            item_ids (Iterable[str]): The IDs of the items to fetch.
+
+        Returns:
+            dict[str, T]: The items that were found, keyed by ID.
+        """
+        items: dict[str, T] = {}
+        missing_ids = []
+        with self._lock:
+            for item_id in item_ids:
+                entry = self._items.get(item_id)
+                if entry is not None:
+                    self._items.move_to_end(item_id)
+                    items[item_id] = entry[0]
+                else:
+                    missing_ids.append(item_id)
+            self.stats.hits += len(items)
+            self.stats.misses += len(missing_ids)
+            generation = self._start_reads(missing_ids)
+
+        if len(missing_ids) > 0:
+            try:
+                for item_id, (item, size) in self.store.get_many_sized(missing_ids).items():
+                    items[item_id] = self._put(item_id, item, size, generation)
+            finally:
+                self._finish_reads(missing_ids)
+        return items
+
+    def get_many_sized(self, item_ids: Iterable[str]) -> dict[str, tuple[T, int]]:
+        """Get several items with their estimated sizes, fetching the rest from the backing cache in one batch.
+
+        Args:
+            item_ids (Iterable[str]): The IDs of the items to fetch.
+
+        Returns:
+            dict[str, tuple[T, int]]: The items that were found and their estimated sizes in bytes, keyed by ID.
+        """
+        item_ids = list(item_ids)
+        items = self.get_many(item_ids)
+        with self._lock:
+            sizes = {item_id: entry[1] for item_id in items if (entry := self._items.get(item_id)) is not None}
+        return {item_id: (item, sizes.get(item_id, 0)) for item_id, item in items.items()}
+
+    def add(self, item_id: str, item: T) -> None:
+        """Add an item to the backing cache and to memory.
+
+        Args:
+            item_id (str): The ID of the item to add.
+            item (T): The item to add to the cache.
+        """
+        self.store.add(item_id, item)
+        self._put(item_id, item, None)
+
+    def add_many(self, items: dict[str, T]) -> None:
+        """Add several items to the backing cache and to memory.
+
+        Args:
+            items (dict[str, T]): The items to add, keyed by ID.
+        """
+        self.store.add_many(items)
+        for item_id, item in items.items():
+            self._put(item_id, item, None)
+
+    def has(self, item_id: str) -> bool:
+        """Check if an item is in memory or in the backing cache.
+
+        Args:
+            item_id (str): The ID of the item to check.
+
+        Returns:
+            bool: True if the item is in the cache, False otherwise.
+        """
+        with self._lock:
+            if item_id in self._items:
+                return True
+        return self.store.has(item_id)
+
+    def clear(self) -> None:
+        """Drop all items from memory without touching the backing cache."""
+        with self._lock:
+            self._items.clear()
+            self.n_bytes = 0
+
+    def __len__(self) -> int:
+        """Get the number of items in the backing cache.
+
+        Returns:
+            int: The number of items in the cache.
+        """
+        return len(self.store)
+
+    def _start_reads(self, item_ids: list[str]) -> int:
+        for item_id in item_ids:
+            self._n_reads[item_id] = self._n_reads.get(item_id, 0) + 1
+        return self._generation
+
+    def _finish_reads(self, item_ids: list[str]) -> None:
+        with self._lock:
+            for item_id in item_ids:
+                n_reads = self._n_reads[item_id] - 1
+                if n_reads > 0:
+                    self._n_reads[item_id] = n_reads
+                else:
+                    del self._n_reads[item_id]
+                    self._write_generations.pop(item_id, None)
+
+    def _put(self, item_id: str, item: T, stored_size: Optional[int], read_generation: Optional[int] = None) -> T:
+        """Put an item in memory, unless it was read before the ID was last written, and return the current item."""
+        size = 0
+        if self.max_bytes is not None:
+            if self.size_fn is not None:
+                size = self.size_fn(item)
+            elif stored_size is not None:
+                size = stored_size
+            else:
+                size = get_pickled_size(item)
+        with self._lock:
+            if read_generation is None:
+                self._generation += 1
+                if item_id in self._n_reads:
+                    self._write_generations[item_id] = self._generation
+            elif self._write_generations.get(item_id, read_generation) > read_generation:
+                logger.debug("Item %s was written while it was being read, keeping the written item", item_id)
+                entry = self._items.get(item_id)
+                return entry[0] if entry is not None else item
+
+            self._discard(item_id)
+            if self.max_bytes is not None and size > self.max_bytes:
+                logger.debug("Item %s of %d bytes does not fit in the memory cache", item_id, size)
+                return item
+
+            self._items[item_id] = (item, size)
+            self.n_bytes += size
+            self._evict()
+            return item
+
+    def _discard(self, item_id: str) -> None:
+        entry = self._items.pop(item_id, None)
+        if entry is not None:
+            self.n_bytes -= entry[1]
+
+    def _evict(self) -> None:
+        while len(self._items) > 0 and (
+            (self.max_items is not None and len(self._items) > self.max_items)
+            or (self.max_bytes is not None and self.n_bytes > self.max_bytes)
+        ):
+            _, (_, size) = self._items.popitem(last=False)
+            self.n_bytes -= size
+            self.stats.evictions += 1
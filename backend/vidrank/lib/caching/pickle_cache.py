@@ -1,7 +1,12 @@
 import logging
 import pickle
+import time
 from pathlib import Path
-from typing import Generic, Optional, TypeVar
+from typing import Generic, Iterable, Iterator, Optional, TypeVar
+
+from vidrank.lib.caching.cache_stats import CacheStats
+from vidrank.lib.profiling.request_profiler import RequestProfiler
+from vidrank.lib.utilities.identifier_utilities import get_identifier
 
 logger = logging.getLogger(__name__)
 
@@ -9,7 +14,13 @@ T = TypeVar("T")
 
 
 class PickleCache(Generic[T]):
-    """Cache that stores items on disk using pickle."""
+    """Cache that stores items on disk using pickle.
+
+    Items are written to a unique temporary file and renamed, so concurrent readers never see a partial item.
+    Temporary files left behind by a crash are removed the first time the cache is written to.
+    """
+
+    STALE_TMP_SECONDS = 60 * 60
 
     def __init__(self, cache_dirpath: Path):
         """Initialize the pickle cache.
@@ -18,9 +29,27 @@ class PickleCache(Generic[T]):
             cache_dirpath (Path): The path to the cache directory.
         """
         self.dirpath = cache_dirpath
+        self.stats = CacheStats()
+
+        self._is_cleaned = False
 
     def _ensure_exists(self) -> None:
         self.dirpath.mkdir(parents=True, exist_ok=True)
+        if not self._is_cleaned:
+            self._is_cleaned = True
+            self._remove_stale_tmp_files()
+
+    def _remove_stale_tmp_files(self) -> None:
+        # NOTE: Only old temporary files are removed, since a recent one may belong to a write still in progress
+        cutoff = time.time() - self.STALE_TMP_SECONDS
+        for tmp_filepath in self.dirpath.glob("*.tmp"):
+            try:
+                if tmp_filepath.stat().st_mtime >= cutoff:
+                    continue
+                tmp_filepath.unlink()
+            except FileNotFoundError:
+                continue
+            logger.info("Removed stale temporary file %s", tmp_filepath)
 
     def get(self, item_id: str) -> Optional[T]:
         """Get an item from the cache.
@@ -31,12 +60,48 @@ class PickleCache(Generic[T]):
         Returns:
             Optional[T]: The item with the given ID, or None if it does not exist.
         """
+        sized_item = self._load(item_id)
+        return None if sized_item is None else sized_item[0]
+
+    def get_many(self, item_ids: Iterable[str]) -> dict[str, T]:
+        """Get several items from the cache.
+
+        Args:
+            item_ids (Iterable[str]): The IDs of the items to fetch.
+
+        Returns:
+            dict[str, T]: The items that were found, keyed by ID.
+        """
+        return {item_id: item for item_id, (item, _) in self.get_many_sized(item_ids).items()}
+
+    def get_many_sized(self, item_ids: Iterable[str]) -> dict[str, tuple[T, int]]:
+        """Get several items from the cache with the sizes of their files.
+
+        Args:
+            item_ids (Iterable[str]): The IDs of the items to fetch.
+
+        Returns:
+            dict[str, tuple[T, int]]: The items that were found and the number of bytes each was stored in, keyed by
+                ID.
+        """
+        sized_items = {}
+        for item_id in item_ids:
+            sized_item = self._load(item_id)
+            if sized_item is not None:
+                sized_items[item_id] = sized_item
+        return sized_items
+
+    def _load(self, item_id: str) -> Optional[tuple[T, int]]:
         filepath = self.dirpath / f"{item_id}.pkl"
-        if not filepath.exists():
+        try:
+            with RequestProfiler.section("pickle.load"):
+                data = filepath.read_bytes()
+                item = pickle.loads(data)
+        except FileNotFoundError:
+            self.stats.misses += 1
             return None
-
-        with filepath.open("rb") as fp:
-            return pickle.load(fp)
+        self.stats.hits += 1
+        return item, len(data)
 
     def add(self, item_id: str, item: T) -> None:
         """Add an item to the cache.
@@ -47,8 +112,23 @@ class PickleCache(Generic[T]):
         """
         self._ensure_exists()
         filepath = self.dirpath / f"{item_id}.pkl"
-        with filepath.open("wb") as fp:
-            pickle.dump(item, fp)
+        tmp_filepath = self.dirpath / f"{item_id}.{get_identifier()}.tmp"
+        try:
+            with RequestProfiler.section("pickle.dump"), tmp_filepath.open("wb") as fp:
+                pickle.dump(item, fp)
+            tmp_filepath.replace(filepath)
+        except BaseException:
+            tmp_filepath.unlink(missing_ok=True)
+            raise
+
+    def add_many(self, items: dict[str, T]) -> None:
+        """Add several items to the cache.
+
+        Args:
+            items (dict[str, T]): The items to add, keyed by ID.
+        """
+        for item_id, item in items.items():
+            self.add(item_id, item)
 
     def has(self, item_id: str) -> bool:
         """Check if an item is in the cache.
@@ -62,6 +142,15 @@ class PickleCache(Generic[T]):
         filepath = self.dirpath / f"{item_id}.pkl"
         return filepath.exists()
 
+    def iter_ids(self) -> Iterator[str]:
+        """Iterate over the IDs of the items in the cache.
+
+        Yields:
+            Iterator[str]: An iterator over the item IDs.
+        """
+        for filepath in self.dirpath.glob("*.pkl"):
+            yield filepath.stem
+
     def __len__(self) -> int:
         """Get the number of items in the cache.
 
@@ -0,0 +1,79 @@
+import logging
+from abc import ABC, abstractmethod
+from typing import Generic, Optional, Protocol, TypeVar
+
+from vidrank.lib.caching.record_tracker import RecordTracker
+from vidrank.lib.caching.state_file import StateFile
+from vidrank.lib.models.record_log_entry import RecordLogEntry
+from vidrank.lib.models.record_log_watermark import RecordLogWatermark
+
+logger = logging.getLogger(__name__)
+
+
+class WatermarkedState(Protocol):
+    """State derived from the record log up to a watermark."""
+
+    watermark: RecordLogWatermark
+
+
+S = TypeVar("S", bound=WatermarkedState)
+
+
+class RecordLogIndex(ABC, Generic[S]):
+    """Base for state derived from the record log and persisted with the watermark it reflects.
+
+    Syncing loads the persisted state on first use, then reads only the record log entries after its watermark and
+    hands them to `_apply_entries`. The state is rebuilt from a snapshot of the log when it is missing or no longer
+    matches the log. Subclasses hold their own lock around syncs.
+    """
+
+    def __init__(self, record_tracker: RecordTracker, state_file: StateFile[S]):
+        """Initialize the record log index.
+
+        Args:
+            record_tracker (RecordTracker): The record tracker to read records from.
+            state_file (StateFile[S]): The file the state is persisted in.
+        """
+        self.record_tracker = record_tracker
+        self.state_file = state_file
+
+        self._state: Optional[S] = None
+
+    def _sync(self) -> S:
+        state = self._state
+        if state is None:
+            state = self.state_file.load()
+        if state is None:
+            return self._rebuild()
+
+        try:
+            entries, watermark = self.record_tracker.read_entries(state.watermark)
+        except ValueError:
+            logger.warning("State in %s does not match the record log, rebuilding", self.state_file.filepath)
+            return self._rebuild()
+
+        self._state = state
+        if len(entries) == 0:
+            return state
+        return self._apply_entries(state, entries, watermark)
+
+    @abstractmethod
+    def _apply_entries(self, state: S, entries: list[RecordLogEntry], watermark: RecordLogWatermark) -> S:
+        """Apply new record log entries to the state, saving it if needed.
+
+        Args:
+            state (S): The current state.
+            entries (list[RecordLogEntry]): The entries after the watermark of the state.
+            watermark (RecordLogWatermark): The watermark after the entries.
+
+        Returns:
+            S: The updated state, which may be a new state if the entries could not be applied incrementally.
+        """
+
+    @abstractmethod
+    def _rebuild(self) -> S:
+        """Rebuild the state from a snapshot of the record log, saving it.
+
+        Returns:
+            S: The rebuilt state.
+        """
@@ -1,12 +1,36 @@
 import json
+import logging
+import os
+import threading
 from pathlib import Path
 from typing import Optional
 
+from pydantic import ValidationError
+
 from vidrank.lib.models.record import Record
+from vidrank.lib.models.record_log_entry import RecordLogEntry
+from vidrank.lib.models.record_log_header import RecordLogHeader
+from vidrank.lib.models.record_log_watermark import RecordLogWatermark
+from vidrank.lib.models.record_operation import RecordOperation
+from vidrank.lib.profiling.request_profiler import RequestProfiler
+from vidrank.lib.utilities.identifier_utilities import get_identifier
+
+logger = logging.getLogger(__name__)
 
 
 class RecordTracker:
-    """Local cache for saving records on disk."""
+    """Local cache for saving records on disk.
+
+    Records are stored in an append-only JSON lines log. The first line of the log is a header and every following
+    line is either an ADD entry holding a full record or a REMOVE tombstone written when a record is undone. Every
+    append is flushed and fsynced, so a crash can at worst leave a torn last line, which is truncated on startup. A log
+    whose header is missing or invalid is rewritten on startup with a new header in front of its valid entries.
+    """
+
+    LOG_VERSION = 1
+
+    # Size of the chunks read when scanning backwards for the last complete line
+    RECOVERY_CHUNK_SIZE = 64 * 1024
 
     def __init__(self, cache_dirpath: Path):
         """Initialize the record tracker.
@@ -15,8 +39,29 @@ class RecordTracker:
             cache_dirpath (Path): The path to the cache directory.
         """
         self.dirpath = cache_dirpath / "records"
-        self.filepath = self.dirpath / "records.json"
+        self.filepath = self.dirpath / "records.jsonl"
+        self.legacy_filepath = self.dirpath / "records.json"
+        self.log_id = ""
+
+        self._lock = threading.Lock()
+        self._records: dict[str, Record] = {}
+        self._offset = 0
+
         self.ensure_exists()
+        with self._lock:
+            if not self.filepath.exists():
+                self._create_log()
+            self._recover()
+            header, header_size = self._read_header()
+            if header is None:
+                self._repair_header()
+                header, header_size = self._read_header()
+            if header is None:
+                msg = f"Failed to write a header to record log {self.filepath}"
+                raise ValueError(msg)
+            self.log_id = header.log_id
+            self._offset = header_size
+            self._sync()
 
     def ensure_exists(self) -> None:
         """Ensure that the cache directory exists."""
@@ -28,11 +73,49 @@ class RecordTracker:
         Returns:
             list[Record]: The records loaded from the cache.
         """
-        if not self.filepath.exists():
-            return []
-        with self.filepath.open("r") as fp:
-            records_json = json.load(fp)
-            return [Record(**r) for r in records_json]
+        with self._lock:
+            self._sync()
+            return list(self._records.values())
+
+    def snapshot(self) -> tuple[list[Record], RecordLogWatermark]:
+        """Load the records from the cache along with the log position they reflect.
+
+        Returns:
+            tuple[list[Record], RecordLogWatermark]: The records and the watermark of the last applied entry.
+        """
+        with self._lock:
+            self._sync()
+            return list(self._records.values()), self._get_watermark()
+
+    def read_entries(self, since: RecordLogWatermark) -> tuple[list[RecordLogEntry], RecordLogWatermark]:
+        """Read the log entries written after a watermark.
+
+        Args:
+            since (RecordLogWatermark): The watermark to read entries after.
+
+        Returns:
+            tuple[list[RecordLogEntry], RecordLogWatermark]: The new entries and the watermark after the last one.
+
+        Raises:
+            ValueError: If the watermark does not belong to the current log.
+        """
+        with self._lock:
+            self._sync()
+            if since.log_id != self.log_id or since.offset > self._offset:
+                msg = f"Watermark {since} does not belong to record log {self.log_id}"
+                raise ValueError(msg)
+
+            with self.filepath.open("rb") as fp:
+                fp.seek(since.offset)
+                data = fp.read(self._offset - since.offset)
+
+            entries = []
+            with RequestProfiler.section("records.read"):
+                for line in data.splitlines():
+                    entry = self._parse_entry(line)
+                    if entry is not None:
+                        entries.append(entry)
+            return entries, self._get_watermark()
 
     def add(self, record: Record) -> None:
         """Add a record to the cache.
@@ -40,12 +123,10 @@ class RecordTracker:
         Args:
             record (Record): The record to add to the cache.
         """
-        self.ensure_exists()
-        records = self.load()
-        records.append(record)
-        records_json = [r.model_dump() for r in records]
-        with self.filepath.open("w") as fp:
-            json.dump(records_json, fp)
+        entry = RecordLogEntry(operation=RecordOperation.ADD, record_id=record.id, record=record)
+        with self._lock:
+            self._append(entry)
+            self._sync()
 
     def pop(self, record_id: str) -> Optional[Record]:
         """Pop a record from the cache.
@@ -56,12 +137,149 @@ class RecordTracker:
         Returns:
             Optional[Record]: The record popped from the cache, or None if not found.
         """
-        self.ensure_exists()
-        records = self.load()
-        for record in records:
-            if record.id == record_id:
-                records_json = [r.model_dump() for r in records if r.id != record_id]
-                with self.filepath.open("w") as fp:
-                    json.dump(records_json, fp)
-                return record
-        return None
+        with self._lock:
+            self._sync()
+            record = self._records.get(record_id)
+            if record is None:
+                return None
+
+            entry = RecordLogEntry(operation=RecordOperation.REMOVE, record_id=record_id)
+            self._append(entry)
+            self._sync()
+            return record
+
+    def _create_log(self) -> None:
+        # NOTE: The log is written to a temporary file and moved into place so that an interrupted migration
+        # leaves the legacy file untouched and is simply redone on the next start
+        lines = []
+        legacy_records = self._load_legacy()
+        for record in legacy_records:
+            entry = RecordLogEntry(operation=RecordOperation.ADD, record_id=record.id, record=record)
+            lines.append(f"{entry.model_dump_json()}\n".encode())
+        self._write_log(lines)
+
+        if self.legacy_filepath.exists():
+            backup_filepath = self.legacy_filepath.with_suffix(".json.bak")
+            self.legacy_filepath.replace(backup_filepath)
+            logger.info("Migrated %d records from %s to %s", len(legacy_records), self.legacy_filepath, self.filepath)
+
+    def _write_log(self, entry_lines: list[bytes]) -> None:
+        header = RecordLogHeader(log_id=get_identifier(), version=self.LOG_VERSION)
+        tmp_filepath = self.filepath.with_suffix(".jsonl.tmp")
+        with tmp_filepath.open("wb") as fp:
+            fp.write(f"{header.model_dump_json()}\n".encode())
+            fp.writelines(entry_lines)
+            fp.flush()
+            os.fsync(fp.fileno())
+        tmp_filepath.replace(self.filepath)
+        self._fsync_dir()
+
+    def _read_header(self) -> tuple[Optional[RecordLogHeader], int]:
+        with self.filepath.open("rb") as fp:
+            line = fp.readline()
+        if not line.endswith(b"\n"):
+            return None, 0
+        try:
+            return RecordLogHeader.model_validate_json(line), len(line)
+        except ValidationError:
+            return None, 0
+
+    def _repair_header(self) -> None:
+        with self.filepath.open("rb") as fp:
+            data = fp.read()
+
+        lines = data.splitlines(keepends=True)
+        if len(lines) == 0:
+            # NOTE: An empty log is left behind if a crash tore its header, so it is created again
+            logger.warning("Record log %s is empty, creating it again", self.filepath)
+            self._create_log()
+            return
+
+        # NOTE: The first line is kept if it is an entry, since then only the header is missing
+        first_line, *entry_lines = lines
+        if self._parse_entry(first_line) is not None:
+            entry_lines.insert(0, first_line)
+        logger.warning("Record log %s has an invalid header, rewriting it with a new header", self.filepath)
+        self._write_log(entry_lines)
+
+    def _load_legacy(self) -> list[Record]:
+        if not self.legacy_filepath.exists():
+            return []
+        with self.legacy_filepath.open("r") as fp:
+            records_json = json.load(fp)
+            return [Record(**r) for r in records_json]
+
+    def _recover(self) -> None:
+        with self.filepath.open("rb+") as fp:
+            size = fp.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+
+            fp.seek(size - 1)
+            if fp.read(1) == b"\n":
+                return
+
+            # Scan backwards for the end of the last complete line
+            end = size
+            truncate_at = 0
+            while end > 0:
+                start = max(0, end - self.RECOVERY_CHUNK_SIZE)
+                fp.seek(start)
+                chunk = fp.read(end - start)
+                newline_index = chunk.rfind(b"\n")
+                if newline_index != -1:
+                    truncate_at = start + newline_index + 1
+                    break
+                end = start
+
+            logger.warning("Truncating torn record log entry of %d bytes in %s", size - truncate_at, self.filepath)
+            fp.truncate(truncate_at)
+            fp.flush()
+            os.fsync(fp.fileno())
+
+    def _append(self, entry: RecordLogEntry) -> None:
+        line = f"{entry.model_dump_json()}\n".encode()
+        with self.filepath.open("ab") as fp:
+            fp.write(line)
+            fp.flush()
+            os.fsync(fp.fileno())
+
+    def _sync(self) -> None:
+        """Apply log entries written since the last sync, including those written by other processes."""
+        with RequestProfiler.section("records.load"):
+            with self.filepath.open("rb") as fp:
+                fp.seek(self._offset)
+                data = fp.read()
+
+            # NOTE: A trailing line without a newline is still being written, so it is left for the next sync
+            end = data.rfind(b"\n") + 1
+            for line in data[:end].splitlines():
+                self._apply_line(line)
+            self._offset += end
+
+    def _apply_line(self, line: bytes) -> None:
+        entry = self._parse_entry(line)
+        if entry is None:
+            return
+
+        if entry.operation == RecordOperation.ADD and entry.record is not None:
+            self._records[entry.record_id] = entry.record
+        elif entry.operation == RecordOperation.REMOVE:
+            self._records.pop(entry.record_id, None)
+
+    def _parse_entry(self, line: bytes) -> Optional[RecordLogEntry]:
+        try:
+            return RecordLogEntry.model_validate_json(line)
+        except ValidationError:
+            logger.warning("Skipping invalid record log entry in %s", self.filepath)
+            return None
+
+    def _get_watermark(self) -> RecordLogWatermark:
+        return RecordLogWatermark(log_id=self.log_id, offset=self._offset)
+
+    def _fsync_dir(self) -> None:
+        fd = os.open(self.dirpath, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
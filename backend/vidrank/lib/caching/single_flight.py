@@ -0,0 +1,50 @@
+import threading
+from concurrent.futures import Future
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """Deduplicates concurrent calls for the same key.
+
+    The first caller for a key runs the function, and callers that arrive while it is running wait for and share its
+    result or exception instead of running the function again.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the single flight group."""
+        self._lock = threading.Lock()
+        self._in_flight: dict[str, Future[T]] = {}
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        """Run a function for a key, or wait for the call already in flight for that key.
+
+        Args:
+            key (str): The key identifying the call.
+            fn (Callable[[], T]): The function to run if no call is in flight.
+
+        Returns:
+            T: The result of the function.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            is_leader = future is None
+            if future is None:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
@@ -0,0 +1,211 @@
+import logging
+import pickle
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Generic, Iterable, Optional, TypeVar
+
+from vidrank.lib.caching.cache_stats import CacheStats
+from vidrank.lib.caching.pickle_cache import PickleCache
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SqliteCache(Generic[T]):
+    """Cache that stores pickled items in a single SQLite database.
+
+    Several caches can share one database file, each under its own namespace. The database runs in WAL mode so
+    other processes can read while the server writes, every write is a transaction, and item counts are kept up to
+    date by triggers so that counting does not scan the table.
+    """
+
+    # Stay below the SQLite limit on the number of bound parameters in a statement
+    MAX_QUERY_PARAMS = 500
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS items (
+            namespace TEXT NOT NULL,
+            id TEXT NOT NULL,
+            data BLOB NOT NULL,
+            PRIMARY KEY (namespace, id)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS counts (
+            namespace TEXT PRIMARY KEY,
+            n_items INTEGER NOT NULL
+        );
+        CREATE TRIGGER IF NOT EXISTS items_insert AFTER INSERT ON items BEGIN
+            UPDATE counts SET n_items = n_items + 1 WHERE namespace = NEW.namespace;
+        END;
+        CREATE TRIGGER IF NOT EXISTS items_delete AFTER DELETE ON items BEGIN
+            UPDATE counts SET n_items = n_items - 1 WHERE namespace = OLD.namespace;
+        END;
+    """
+
+    def __init__(self, db_filepath: Path, namespace: str):
+        """Initialize the SQLite cache.
+
+        Args:
+            db_filepath (Path): The path to the database file.
+            namespace (str): The namespace of the items in this cache.
+        """
+        self.filepath = db_filepath
+        self.namespace = namespace
+        self.stats = CacheStats()
+
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.filepath, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(self.SCHEMA)
+            self._connection.execute(
+                "INSERT OR IGNORE INTO counts (namespace, n_items) VALUES (?, 0)",
+                (self.namespace,),
+            )
+
+    def get(self, item_id: str) -> Optional[T]:
+        """Get an item from the cache.
+
+        Args:
+            item_id (str): The ID of the item to fetch.
+
+        Returns:
+            Optional[T]: The item with the given ID, or None if it does not exist.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT data FROM items WHERE namespace = ? AND id = ?",
+                (self.namespace, item_id),
+            ).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+            self.stats.hits += 1
+        return pickle.loads(row[0])
+
+    def get_many(self, item_ids: Iterable[str]) -> dict[str, T]:
+        """Get several items from the cache.
+
+        Args:
+            item_ids (Iterable[str]): The IDs of the items to fetch.
+
+        Returns:
+            dict[str, T]: The items that were found, keyed by ID.
+        """
+        return {item_id: item for item_id, (item, _) in self.get_many_sized(item_ids).items()}
+
+    def get_many_sized(self, item_ids: Iterable[str]) -> dict[str, tuple[T, int]]:
+        """Get several items from the cache with the sizes of their pickled data.
+
+        Args:
+            item_ids (Iterable[str]): The IDs of the items to fetch.
+
+        Returns:
+            dict[str, tuple[T, int]]: The items that were found and the number of bytes each was stored in, keyed by
+                ID.
+        """
+        item_ids = list(item_ids)
+        sized_items: dict[str, tuple[T, int]] = {}
+        with self._lock:
+            for chunk_start in range(0, len(item_ids), self.MAX_QUERY_PARAMS):
+                chunk_ids = item_ids[chunk_start : chunk_start + self.MAX_QUERY_PARAMS]
+                placeholders = ",".join("?" * len(chunk_ids))
+                rows = self._connection.execute(
+                    f"SELECT id, data FROM items WHERE namespace = ? AND id IN ({placeholders})",
+                    (self.namespace, *chunk_ids),
+                )
+                for item_id, data in rows:
+                    sized_items[item_id] = (pickle.loads(data), len(data))
+            self.stats.hits += len(sized_items)
+            self.stats.misses += len(item_ids) - len(sized_items)
+        return sized_items
+
+    def add(self, item_id: str, item: T) -> None:
+        """Add an item to the cache.
+
+        Args:
+            item_id (str): The ID of the item to add.
+            item (T): The item to add to the cache.
+        """
+        self.add_many({item_id: item})
+
+    def add_many(self, items: dict[str, T]) -> None:
+        """Add several items to the cache in a single transaction.
+
+        Args:
+            items (dict[str, T]): The items to add, keyed by ID.
+        """
+        rows = [(self.namespace, item_id, pickle.dumps(item)) for item_id, item in items.items()]
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._connection.executemany(
+                    "INSERT INTO items (namespace, id, data) VALUES (?, ?, ?) "
+                    "ON CONFLICT (namespace, id) DO UPDATE SET data = excluded.data",
+                    rows,
+                )
+            except sqlite3.Error:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def has(self, item_id: str) -> bool:
+        """Check if an item is in the cache.
+
+        Args:
+            item_id (str): The ID of the item to check.
+
+        Returns:
+            bool: True if the item is in the cache, False otherwise.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM items WHERE namespace = ? AND id = ?",
+                (self.namespace, item_id),
+            ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        """Get the number of items in the cache.
+
+        Returns:
+            int: The number of items in the cache.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT n_items FROM counts WHERE namespace = ?",
+                (self.namespace,),
+            ).fetchone()
+        return 0 if row is None else row[0]
+
+    def import_pickle_cache(self, pickle_cache: PickleCache[T], batch_size: int = 1000) -> int:
+        """Copy every item of a pickle cache directory into this cache.
+
+        Args:
+            pickle_cache (PickleCache[T]): The pickle cache to copy items from.
+            batch_size (int): The number of items to write per transaction.
+
+        Returns:
+            int: The number of items copied.
+        """
+        n_items = 0
+        batch: dict[str, T] = {}
+        for item_id in pickle_cache.iter_ids():
+            item = pickle_cache.get(item_id)
+            if item is None:
+                continue
+            batch[item_id] = item
+            if len(batch) >= batch_size:
+                self.add_many(batch)
+                n_items += len(batch)
+                batch = {}
+
+        if len(batch) > 0:
+            self.add_many(batch)
+            n_items += len(batch)
+
+        logger.info("Imported %d items from %s into %s", n_items, pickle_cache.dirpath, self.namespace)
+        return n_items
@@ -0,0 +1,57 @@
+import logging
+import os
+import pickle
+from pathlib import Path
+from typing import Generic, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+S = TypeVar("S")
+
+
+class StateFile(Generic[S]):
+    """File holding the pickled state of an index.
+
+    State is written to a temporary file, flushed to disk and renamed, so a crash never leaves a partial state behind.
+    State that cannot be loaded, or that is not of the expected type, is treated as missing so it can be rebuilt.
+    """
+
+    def __init__(self, filepath: Path, state_type: type[S]):
+        """Initialize the state file.
+
+        Args:
+            filepath (Path): The path to the state file.
+            state_type (type[S]): The type of the state.
+        """
+        self.filepath = filepath
+        self.state_type = state_type
+
+    def load(self) -> Optional[S]:
+        """Load the state.
+
+        Returns:
+            Optional[S]: The state, or None if it is missing or cannot be loaded.
+        """
+        if not self.filepath.exists():
+            return None
+        try:
+            with self.filepath.open("rb") as fp:
+                state = pickle.load(fp)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            logger.warning("Failed to load state from %s", self.filepath)
+            return None
+        return state if isinstance(state, self.state_type) else None
+
+    def save(self, state: S) -> None:
+        """Save the state.
+
+        Args:
+            state (S): The state to save.
+        """
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        tmp_filepath = self.filepath.with_suffix(f"{self.filepath.suffix}.tmp")
+        with tmp_filepath.open("wb") as fp:
+            pickle.dump(state, fp)
+            fp.flush()
+            os.fsync(fp.fileno())
+        tmp_filepath.replace(self.filepath)
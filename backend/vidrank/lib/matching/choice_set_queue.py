@@ -0,0 +1,210 @@
+import logging
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from vidrank.lib.models.action import Action
+from vidrank.lib.models.matching_settings import MatchingSettings
+from vidrank.lib.models.record import Record
+from vidrank.lib.youtube.video_summary import VideoSummary
+
+logger = logging.getLogger(__name__)
+
+MatchFn = Callable[[MatchingSettings], list[VideoSummary]]
+
+
+@dataclass
+class QueuedChoiceSet:
+    """Resolved choice set waiting to be served."""
+
+    videos: list[VideoSummary]
+    video_ids: frozenset[str]
+    generation: int
+
+
+class ChoiceSetQueue:
+    """Queue of precomputed choice sets for each combination of matching settings.
+
+    A background worker keeps a few fully resolved choice sets ready per settings combination, so requests can pop
+    one instead of matching while the user waits. Every added or undone record bumps the generation and drops the
+    queued choice sets that it made stale: sets with removed videos, sets of rating based strategies with videos whose
+    ratings changed, and sets of rating based strategies built too many records ago. Choice sets that were being
+    matched while records came in are checked against the same rule before they are queued.
+    """
+
+    DEFAULT_DEPTH = 2
+    MAX_RATING_AGE = 4
+    MAX_SETTINGS = 16
+    RETRY_SECONDS = 1.0
+
+    def __init__(self, *, depth: int = DEFAULT_DEPTH):
+        """Initialize the choice set queue.
+
+        Args:
+            depth (int): The number of choice sets to keep ready per settings combination.
+        """
+        self.depth = depth
+
+        self._condition = threading.Condition()
+        self._queues: OrderedDict[str, deque[QueuedChoiceSet]] = OrderedDict()
+        self._settings: dict[str, MatchingSettings] = {}
+        self._generation = 0
+        self._removed_since_match: set[str] = set()
+        self._rated_since_match: set[str] = set()
+        self._match_fn: Optional[MatchFn] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def start(self, match_fn: MatchFn) -> None:
+        """Start refilling the queue in a background thread.
+
+        Args:
+            match_fn (MatchFn): The function that matches a choice set for some settings.
+        """
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._match_fn = match_fn
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name="choice-set-queue", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            thread.join()
+
+    def pop(self, settings: MatchingSettings) -> Optional[list[VideoSummary]]:
+        """Take the next precomputed choice set for some settings, and schedule a refill.
+
+        Args:
+            settings (MatchingSettings): The matching settings of the request.
+
+        Returns:
+            Optional[list[VideoSummary]]: The videos of the choice set, or None if none is ready.
+        """
+        key = settings.model_dump_json()
+        with self._condition:
+            if self._thread is None:
+                return None
+
+            queue = self._queues.get(key)
+            if queue is None:
+                queue = deque()
+                self._queues[key] = queue
+                self._settings[key] = settings
+                if len(self._queues) > self.MAX_SETTINGS:
+                    evicted_key, _ = self._queues.popitem(last=False)
+                    del self._settings[evicted_key]
+            self._queues.move_to_end(key)
+
+            choice_set = queue.popleft() if len(queue) > 0 else None
+            self._condition.notify_all()
+
+        if choice_set is None:
+            logger.debug("No precomputed choice set ready")
+            return None
+        return choice_set.videos
+
+    def invalidate(self, record: Record) -> None:
+        """Drop the queued choice sets made stale by an added or undone record.
+
+        Args:
+            record (Record): The record that was added or undone.
+        """
+        removed_ids = {c.video_id for c in record.choice_set.choices if c.action == Action.REMOVE}
+        rated_ids = {c.video_id for c in record.choice_set.choices if c.action != Action.REMOVE}
+        with self._condition:
+            self._generation += 1
+            self._removed_since_match |= removed_ids
+            self._rated_since_match |= rated_ids
+            for key, queue in self._queues.items():
+                settings = self._settings[key]
+                fresh_choice_sets = [
+                    choice_set
+                    for choice_set in queue
+                    if not self._is_stale(choice_set, settings, removed_ids, rated_ids)
+                ]
+                if len(fresh_choice_sets) != len(queue):
+                    queue.clear()
+                    queue.extend(fresh_choice_sets)
+            self._condition.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                key = self._get_key_to_refill()
+                while not self._stopped and key is None:
+                    self._condition.wait()
+                    key = self._get_key_to_refill()
+                if self._stopped or key is None or self._match_fn is None:
+                    return
+                settings = self._settings[key]
+                generation = self._generation
+                match_fn = self._match_fn
+                self._removed_since_match = set()
+                self._rated_since_match = set()
+
+            try:
+                videos = match_fn(settings)
+            except Exception:
+                logger.exception("Failed to precompute a choice set")
+                videos = []
+
+            if len(videos) == 0:
+                # NOTE: Pops and invalidations notify the condition, so only stopping may cut the retry delay short
+                with self._condition:
+                    self._condition.wait_for(lambda: self._stopped, timeout=self.RETRY_SECONDS)
+                continue
+
+            choice_set = QueuedChoiceSet(
+                videos=videos,
+                video_ids=frozenset(video.id for video in videos),
+                generation=generation,
+            )
+            with self._condition:
+                # NOTE: Records added while matching may have made the choice set stale, so it is matched again
+                queue = self._queues.get(key)
+                if queue is not None and not self._is_stale(
+                    choice_set, settings, self._removed_since_match, self._rated_since_match
+                ):
+                    queue.append(choice_set)
+
+    def _get_key_to_refill(self) -> Optional[str]:
+        for key, queue in reversed(self._queues.items()):
+            if len(queue) < self.depth:
+                return key
+        return None
+
+    def _is_stale(
+        self,
+        choice_set: QueuedChoiceSet,
+        settings: MatchingSettings,
+        removed_ids: set[str],
+        rated_ids: set[str],
+    ) -> bool:
+        if not choice_set.video_ids.isdisjoint(removed_ids):
+            return True
+        if not self._uses_ratings(settings):
+            return False
+        return (
+            not choice_set.video_ids.isdisjoint(rated_ids)
+            or self._generation - choice_set.generation > self.MAX_RATING_AGE
+        )
+
+    @classmethod
+    def _uses_ratings(cls, settings: MatchingSettings) -> bool:
+        # NOTE: Mirrors the strategy precedence in Matcher.match
+        if settings.by_date_strategy is not None:
+            return False
+        return (
+            settings.by_rating_strategy is not None
+            or settings.finetune_strategy is not None
+            or settings.active_strategy is not None
+        )
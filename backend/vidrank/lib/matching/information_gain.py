@@ -0,0 +1,83 @@
+from typing import Iterator, Union
+
+import numpy as np
+from trueskill import calc_draw_margin, global_env
+
+from vidrank.lib.utilities.math_utilities import normal_cdf, normal_pdf
+
+
+class InformationGain:
+    """Scoring of choice sets by how much they are expected to reduce rating uncertainty.
+
+    A choice set compares every selected video with every video left alone, so any pair of videos in a set may be
+    compared. The gain of a pair is the expected reduction in the variance of both ratings from one TrueSkill 1v1
+    update, averaged over both outcomes weighted by their probability. Pairs of videos with close means and wide
+    deviations have the highest gain, since their outcome is both uncertain and informative.
+    """
+
+    @classmethod
+    def get_pair_gains(
+        cls,
+        mu_a: Union[float, np.ndarray],
+        sigma_a: Union[float, np.ndarray],
+        mu_b: np.ndarray,
+        sigma_b: np.ndarray,
+    ) -> np.ndarray:
+        """Compute the expected variance reduction of comparing videos.
+
+        Args:
+            mu_a (Union[float, np.ndarray]): The rating means of the first videos of the pairs.
+            sigma_a (Union[float, np.ndarray]): The rating deviations of the first videos of the pairs.
+            mu_b (np.ndarray): The rating means of the second videos of the pairs.
+            sigma_b (np.ndarray): The rating deviations of the second videos of the pairs.
+
+        Returns:
+            np.ndarray: The expected reduction in the sum of the rating variances of each pair.
+        """
+        env = global_env()
+        draw_margin = calc_draw_margin(env.draw_probability, 2, env)
+        var_a = np.square(sigma_a) + env.tau**2
+        var_b = np.square(sigma_b) + env.tau**2
+        c_squared = 2 * env.beta**2 + var_a + var_b
+        c = np.sqrt(c_squared)
+
+        # NOTE: A win and a loss shrink both variances by the same factor of the update, see BatchRanker._rate_1vs1
+        p_a = normal_cdf((mu_a - mu_b) / c)
+        w_a = cls._get_w((mu_a - mu_b - draw_margin) / c)
+        w_b = cls._get_w((mu_b - mu_a - draw_margin) / c)
+        return (np.square(var_a) + np.square(var_b)) / c_squared * (p_a * w_a + (1.0 - p_a) * w_b)
+
+    @classmethod
+    def iter_choice_set(cls, mu: np.ndarray, sigma: np.ndarray, rng: np.random.Generator) -> Iterator[int]:
+        """Build a choice set greedily, one video at a time.
+
+        The first video is drawn with a probability proportional to its rating variance. Each next video is the one
+        with the highest total gain when paired with every video already in the set. The gains of all candidates are
+        updated with one vectorized step per video added, so drawing k videos from n candidates costs O(k n).
+
+        Args:
+            mu (np.ndarray): The rating means of the candidates.
+            sigma (np.ndarray): The rating deviations of the candidates.
+            rng (np.random.Generator): The random number generator.
+
+        Yields:
+            Iterator[int]: The indices of the candidates, in the order they join the choice set.
+        """
+        n_candidates = len(mu)
+        if n_candidates == 0:
+            return
+
+        variance = np.square(sigma)
+        member = int(rng.choice(n_candidates, p=variance / variance.sum()))
+        scores = np.zeros(n_candidates)
+        for _ in range(n_candidates):
+            yield member
+            scores += cls.get_pair_gains(mu[member], sigma[member], mu, sigma)
+            scores[member] = -np.inf
+            member = int(np.argmax(scores))
+
+    @classmethod
+    def _get_w(cls, x: np.ndarray) -> np.ndarray:
+        denom = normal_cdf(x)
+        v = np.divide(normal_pdf(x), denom, out=-x, where=denom > 0)
+        return np.clip(v * (v + x), 0.0, 1.0)
@@ -1,18 +1,15 @@
 import logging
-from typing import TYPE_CHECKING, Iterator
-
-import numpy as np
-import pendulum
+from itertools import islice
+from typing import Iterable, Iterator, Optional
 
 from vidrank.app.app_state import AppState
-from vidrank.lib.models.action import Action
+from vidrank.lib.matching.information_gain import InformationGain
+from vidrank.lib.metrics.metrics import MATCH_RANDOM_FALLBACKS
 from vidrank.lib.models.matching_settings import ByDateStrategySettings, FinetuneStrategySettings, MatchingSettings
-from vidrank.lib.ranking.ranker import Ranker
-from vidrank.lib.youtube.video import Video
-
-if TYPE_CHECKING:
-    from vidrank.lib.ranking.ranking import Ranking
-    from vidrank.lib.youtube.playlist_item import PlaylistItem
+from vidrank.lib.ranking.ranking import Ranking
+from vidrank.lib.ranking.rating_index import RatingIndex
+from vidrank.lib.utilities.random_utilities import iter_sample_indices
+from vidrank.lib.youtube.video_summary import VideoSummary
 
 logger = logging.getLogger(__name__)
 
@@ -20,13 +17,15 @@ logger = logging.getLogger(__name__)
 class Matcher:
     """Class to help determine which videos to return for comparison."""
 
+    MAX_SAMPLE_ATTEMPTS = 32
+
     @classmethod
     def match(
         cls,
         app_state: AppState,
         n_videos: int,
         settings: MatchingSettings,
-    ) -> Iterator[Video]:
+    ) -> Iterator[VideoSummary]:
         """Match videos based on the settings.
 
         Args:
@@ -35,7 +34,7 @@ class Matcher:
             settings (MatchingSettings): The matching settings.
 
         Yields:
-            Iterator[Video]: An iterator over the matched videos
+            Iterator[VideoSummary]: An iterator over the matched videos
 
         Raises:
             ValueError: If the matching strategy is unknown.
@@ -49,6 +48,9 @@ class Matcher:
         elif settings.finetune_strategy is not None:
             logger.info("Using matching strategy: finetune with settings: %s", settings.finetune_strategy)
             yield from cls.match_finetune(app_state, n_videos, settings.finetune_strategy)
+        elif settings.active_strategy is not None:
+            logger.info("Using matching strategy: active with settings: %s", settings.active_strategy)
+            yield from cls.match_active(app_state, n_videos)
         elif settings.random_strategy is not None:
             logger.info("Using matching strategy: random with settings: %s", settings.random_strategy)
             yield from cls.match_random(app_state, n_videos)
@@ -57,33 +59,33 @@ class Matcher:
             yield from cls.match_random(app_state, n_videos)
 
     @classmethod
-    def match_random(cls, app_state: AppState, n_videos: int) -> Iterator[Video]:
+    def match_random(
+        cls, app_state: AppState, n_videos: int, excluded_ids: frozenset[str] = frozenset()
+    ) -> Iterator[VideoSummary]:
         """Match videos using a random strategy.
 
         Args:
             app_state (AppState): The application state.
             n_videos (int): The number of videos to return.
+            excluded_ids (frozenset[str]): The IDs of videos that must not be matched, like videos already matched.
 
         Yields:
-            Iterator[Video]: An iterator over the matched videos
+            Iterator[VideoSummary]: An iterator over the matched videos
         """
-        non_removed_ids = cls.get_non_removed_video_ids(app_state)
+        non_removed_ids = [
+            video_id for video_id in cls.get_non_removed_video_ids(app_state) if video_id not in excluded_ids
+        ]
 
         # Find videos that can be found in the YouTube API
-        # NOTE: iter_videos can fail to find videos, so iterate until we have enough
+        # NOTE: Some videos can fail to be found, so candidates are resolved until we have enough
         # or we run out of videos
         app_state.rng.shuffle(non_removed_ids)
-        n_found = 0
-        for video_id in non_removed_ids:
-            if n_found == n_videos:
-                return
-            for video in app_state.youtube_facade.iter_videos([video_id]):
-                logger.info("Selected video: (%s) %s", video.id, video.title)
-                n_found += 1
-                yield video
+        for _, video in cls.iter_found_videos(app_state, non_removed_ids, n_videos):
+            logger.info("Selected video: (%s) %s", video.id, video.title)
+            yield video
 
     @classmethod
-    def match_by_rating(cls, app_state: AppState, n_videos: int) -> Iterator[Video]:
+    def match_by_rating(cls, app_state: AppState, n_videos: int) -> Iterator[VideoSummary]:
         """Match videos based on their ratings.
 
         Args:
@@ -91,38 +93,40 @@ class Matcher:
             n_videos (int): The number of videos to return.
 
         Yields:
-            Iterator[Video]: An iterator over the matched videos.
+            Iterator[VideoSummary]: An iterator over the matched videos.
         """
-        records = app_state.record_tracker.load()
-
         # Rate all videos
-        rankings = list(Ranker.iter_rankings(records))
-
-        # Filter for rankings for videos that are not removed
-        non_removed_ids = cls.get_non_removed_video_ids(app_state)
-        rankings = [r for r in rankings if r.video_id in non_removed_ids]
+        rating_index = app_state.ranking_engine.get_rating_index()
 
         # If there are not enough ranked videos, return a random selection
-        if len(rankings) < n_videos:
+        if len(rating_index) < n_videos:
             logger.warning("Not enough ranked videos, will use random match")
+            MATCH_RANDOM_FALLBACKS.labels("by_rating").inc()
             yield from cls.match_random(app_state, n_videos)
-
-        # Select one video randomly
-        selected_index: int = app_state.rng.choice(np.arange(len(rankings)))
-        selected = rankings[selected_index]
+            return
+
+        # Select one video randomly, skipping videos that are removed
+        eligible_ids = cls.get_eligible_video_ids(app_state)
+        selected = cls.sample_eligible_ranking(app_state, rating_index, eligible_ids)
+        if selected is None:
+            logger.warning("No eligible ranked videos, will use random match")
+            MATCH_RANDOM_FALLBACKS.labels("by_rating").inc()
+            yield from cls.match_random(app_state, n_videos)
+            return
         logger.info("Selecting videos similar to: rank=%d, rating=%d", selected.rank, int(selected.rating))
 
-        # Sort rankings based on distance to the selected video's rating
-        sorted_rankings = sorted(rankings, key=lambda x: np.abs(selected.rating - x.rating))
+        # Walk outwards from the selected video's rating, nearest first
+        # NOTE: Only as many rankings are visited as it takes to find enough videos, instead of sorting all of them
+        nearest_rankings = (r for r in rating_index.iter_nearest(selected.rating) if r.video_id in eligible_ids)
 
         # Fetch video metadata for the most similar videos
-        # NOTE: iter_videos can fail to find videos, so iterate until we have enough
+        # NOTE: Some videos can fail to be found, so candidates are resolved until we have enough
         # or we run out of videos in the rankings
-        n_found = 0
-        for ranking in sorted_rankings:
-            if n_found == n_videos:
-                return
-            for video in app_state.youtube_facade.iter_videos([ranking.video_id]):
+        candidate_ids = (ranking.video_id for ranking in nearest_rankings)
+        found_ids = []
+        for _, video in cls.iter_found_videos(app_state, candidate_ids, n_videos):
+            ranking = rating_index.get_ranking(video.id)
+            if ranking is not None:
                 logger.info(
                     "Selected video: rank=%d, rating=%d: (%s) %s",
                     ranking.rank,
@@ -130,11 +134,46 @@ class Matcher:
                     video.id,
                     video.title,
                 )
-                n_found += 1
-                yield video
+            found_ids.append(video.id)
+            yield video
+
+        # If there were not enough eligible ranked videos, fill up the choice set with random videos
+        yield from cls.top_up_random(app_state, n_videos, found_ids, "by_rating")
 
     @classmethod
-    def match_finetune(cls, app_state: AppState, n_videos: int, settings: FinetuneStrategySettings) -> Iterator[Video]:
+    def sample_eligible_ranking(
+        cls, app_state: AppState, rating_index: RatingIndex, eligible_ids: frozenset[str]
+    ) -> Optional[Ranking]:
+        """Pick a ranking uniformly at random among the rankings of eligible videos.
+
+        Random rankings are drawn until one is eligible, which takes a few draws as long as most ranked videos are
+        eligible, instead of filtering all rankings. If too many draws fail, the eligible rankings are listed.
+
+        Args:
+            app_state (AppState): The application state.
+            rating_index (RatingIndex): The index of the rankings of the videos.
+            eligible_ids (frozenset[str]): The IDs of the videos that can be matched.
+
+        Returns:
+            Optional[Ranking]: The picked ranking, or None if no ranked video is eligible.
+        """
+        for _ in range(cls.MAX_SAMPLE_ATTEMPTS):
+            # NOTE: The position is drawn under the index lock, since the index can shrink while it is updated
+            ranking = rating_index.sample(app_state.rng)
+            if ranking is None:
+                return None
+            if ranking.video_id in eligible_ids:
+                return ranking
+
+        eligible_rankings = [r for r in rating_index.rankings if r.video_id in eligible_ids]
+        if len(eligible_rankings) == 0:
+            return None
+        return eligible_rankings[int(app_state.rng.integers(len(eligible_rankings)))]
+
+    @classmethod
+    def match_finetune(
+        cls, app_state: AppState, n_videos: int, settings: FinetuneStrategySettings
+    ) -> Iterator[VideoSummary]:
         """Match videos from the upper part of rankings.
 
         Args:
@@ -143,36 +182,32 @@ class Matcher:
             settings (FinetuneStrategySettings): The finetune strategy settings.
 
         Yields:
-            Iterator[Video]: An iterator over the matched videos.
+            Iterator[VideoSummary]: An iterator over the matched videos.
         """
-        records = app_state.record_tracker.load()
-
         # Rate all videos
-        rankings = list(Ranker.iter_rankings(records))
-
-        # Filter for rankings for videos that are not removed
-        non_removed_ids = cls.get_non_removed_video_ids(app_state)
-        rankings = [r for r in rankings if r.video_id in non_removed_ids]
-
-        n_top_rankings = int(len(rankings) * settings.fraction)
+        rating_index = app_state.ranking_engine.get_rating_index()
+        n_top_rankings = int(len(rating_index) * settings.fraction)
 
         # If there are not enough ranked videos, return a random selection
         if n_top_rankings < n_videos:
             logger.warning("Not enough ranked videos, will use random match")
+            MATCH_RANDOM_FALLBACKS.labels("finetune").inc()
             yield from cls.match_random(app_state, n_videos)
+            return
 
-        # Randomly sample from the top half of videos
-        selected_indices: np.ndarray = app_state.rng.choice(n_top_rankings, n_top_rankings, replace=False)
-        top_rankings: list[Ranking] = [rankings[i] for i in selected_indices]
+        # Randomly sample from the top of the rankings, skipping videos that are removed
+        # NOTE: Rankings are only drawn as candidates are needed, instead of shuffling the whole top fraction
+        eligible_ids = cls.get_eligible_video_ids(app_state)
+        top_rankings = (rating_index.get_ranking_at(i) for i in iter_sample_indices(app_state.rng, n_top_rankings))
 
         # Fetch video metadata for the most similar videos
-        # NOTE: iter_videos can fail to find videos, so iterate until we have enough
+        # NOTE: Some videos can fail to be found, so candidates are resolved until we have enough
         # or we run out of videos in the rankings
-        n_found = 0
-        for ranking in top_rankings:
-            if n_found == n_videos:
-                return
-            for video in app_state.youtube_facade.iter_videos([ranking.video_id]):
+        candidate_ids = (ranking.video_id for ranking in top_rankings if ranking.video_id in eligible_ids)
+        found_ids = []
+        for _, video in cls.iter_found_videos(app_state, candidate_ids, n_videos):
+            ranking = rating_index.get_ranking(video.id)
+            if ranking is not None:
                 logger.info(
                     "Selected video: rank=%d, rating=%d: (%s) %s",
                     ranking.rank,
@@ -180,11 +215,16 @@ class Matcher:
                     video.id,
                     video.title,
                 )
-                n_found += 1
-                yield video
+            found_ids.append(video.id)
+            yield video
+
+        # If too many of the top videos were removed, fill up the choice set with random videos
+        yield from cls.top_up_random(app_state, n_videos, found_ids, "finetune")
 
     @classmethod
-    def match_by_date(cls, app_state: AppState, n_videos: int, settings: ByDateStrategySettings) -> Iterator[Video]:
+    def match_by_date(
+        cls, app_state: AppState, n_videos: int, settings: ByDateStrategySettings
+    ) -> Iterator[VideoSummary]:
         """Match videos added to the playlist most recently.
 
         Args:
@@ -193,43 +233,144 @@ class Matcher:
             settings (ByDateStrategySettings): The by date strategy settings.
 
         Yields:
-            Iterator[Video]: An iterator over the matched videos.
+            Iterator[VideoSummary]: An iterator over the matched videos.
         """
         playlist = app_state.youtube_facade.get_playlist(app_state.playlist_id)
 
-        # Sort items by date added
-        items = sorted(playlist.items, key=lambda x: x.added_at, reverse=True)
-
-        # Filter for videos that have not been removed
-        non_removed_ids = cls.get_non_removed_video_ids(app_state)
-        items = [item for item in items if item.video_id in non_removed_ids]
-
-        # Filter for items within the date range
-        n_days = settings.days
-        now = pendulum.now()
-        items = [item for item in items if (now - item.added_at).days <= n_days]
-        n_within_range = len(items)
+        # Find the videos added within the date range, which lead the index of videos by date added
+        video_ids, n_within_range = app_state.playlist_date_index.get_recent_video_ids(playlist, settings.days)
 
         # If there are not enough videos within the date range, return a random selection
         if n_within_range < n_videos:
             logger.warning("Not enough videos within the date range, will use random match")
+            MATCH_RANDOM_FALLBACKS.labels("by_date").inc()
             yield from cls.match_random(app_state, n_videos)
+            return
 
-        # Randomly sample from the most recently added videos
-        selected_indices: np.ndarray = app_state.rng.choice(n_within_range, n_within_range, replace=False)
-        latest_items: list[PlaylistItem] = [items[i] for i in selected_indices]
+        # Randomly sample from the most recently added videos, skipping videos that are removed
+        eligible_ids = cls.get_eligible_video_ids(app_state)
+        latest_ids = (video_ids[i] for i in iter_sample_indices(app_state.rng, n_within_range))
 
         # Fetch video metadata for the most recently added videos
-        # NOTE: iter_videos can fail to find videos, so iterate until we have enough
+        # NOTE: Some videos can fail to be found, so candidates are resolved until we have enough
         # or we run out of videos in the rankings
+        candidate_ids = (video_id for video_id in latest_ids if video_id in eligible_ids)
+        found_ids = []
+        for _, video in cls.iter_found_videos(app_state, candidate_ids, n_videos):
+            logger.info("Selected video: (%s) %s", video.id, video.title)
+            found_ids.append(video.id)
+            yield video
+
+        # If too many of the recent videos were removed, fill up the choice set with random videos
+        yield from cls.top_up_random(app_state, n_videos, found_ids, "by_date")
+
+    @classmethod
+    def top_up_random(
+        cls, app_state: AppState, n_videos: int, found_ids: list[str], strategy: str
+    ) -> Iterator[VideoSummary]:
+        """Fill up a choice set with random videos if a strategy ran out of candidates.
+
+        Strategies only check the number of candidates up front, and candidates can still turn out to be removed or
+        missing from YouTube, so a strategy can find fewer videos than requested.
+
+        Args:
+            app_state (AppState): The application state.
+            n_videos (int): The number of videos in the choice set.
+            found_ids (list[str]): The IDs of the videos the strategy found.
+            strategy (str): The name of the strategy, for logs and metrics.
+
+        Yields:
+            Iterator[VideoSummary]: An iterator over the random videos, none of which were found by the strategy.
+        """
+        if len(found_ids) >= n_videos:
+            return
+
+        logger.warning("Not enough videos matched by %s, will top up with random match", strategy)
+        MATCH_RANDOM_FALLBACKS.labels(strategy).inc()
+        yield from cls.match_random(app_state, n_videos - len(found_ids), excluded_ids=frozenset(found_ids))
+
+    @classmethod
+    def match_active(cls, app_state: AppState, n_videos: int) -> Iterator[VideoSummary]:
+        """Match videos that are expected to reduce rating uncertainty the most when compared.
+
+        Args:
+            app_state (AppState): The application state.
+            n_videos (int): The number of videos to return.
+
+        Yields:
+            Iterator[VideoSummary]: An iterator over the matched videos.
+        """
+        # Look up the ratings of the videos that are not removed, including videos without any comparisons yet
+        eligible_ids = cls.get_non_removed_video_ids(app_state)
+        mu, sigma = app_state.ranking_engine.get_rating_table().get_ratings(eligible_ids)
+
+        # If there are not enough videos, return a random selection
+        if len(eligible_ids) < n_videos:
+            logger.warning("Not enough videos, will use random match")
+            MATCH_RANDOM_FALLBACKS.labels("active").inc()
+            yield from cls.match_random(app_state, n_videos)
+            return
+
+        # Build the choice set greedily by expected information gain
+        # NOTE: Candidates are pulled a batch at a time, so videos that fail to be found still count towards the gains
+        # of the candidates drawn after them, and are replaced by the next best video given every video drawn so far
+        candidate_indices = InformationGain.iter_choice_set(mu, sigma, app_state.rng)
+        candidate_ids = (eligible_ids[i] for i in candidate_indices)
+        for _, video in cls.iter_found_videos(app_state, candidate_ids, n_videos):
+            logger.info("Selected video: (%s) %s", video.id, video.title)
+            yield video
+
+    @classmethod
+    def iter_found_videos(
+        cls, app_state: AppState, video_ids: Iterable[str], n_videos: int
+    ) -> Iterator[tuple[int, VideoSummary]]:
+        """Resolve candidate videos in batches until enough of them are found.
+
+        Candidates are resolved in order. Each batch holds the number of videos still needed plus the configured
+        over-fetch, so that deleted or private videos rarely require another round trip, and all cache misses in a
+        batch are fetched with a single API request.
+
+        Args:
+            app_state (AppState): The application state.
+            video_ids (Iterable[str]): The IDs of the candidate videos, in order of preference.
+            n_videos (int): The number of videos to return.
+
+        Yields:
+            Iterator[tuple[int, VideoSummary]]: The index of each found candidate and its summary, in candidate order.
+        """
+        # NOTE: Candidates are consumed lazily, so they can be generated while walking an index
+        candidate_ids = iter(video_ids)
         n_found = 0
-        for item in latest_items:
-            if n_found == n_videos:
+        batch_start = 0
+        while n_found < n_videos:
+            batch_size = n_videos - n_found + app_state.match_overfetch
+            batch_ids = list(islice(candidate_ids, batch_size))
+            if len(batch_ids) == 0:
                 return
-            for video in app_state.youtube_facade.iter_videos([item.video_id]):
-                logger.info("Selected video: (%s) %s", video.id, video.title)
+            videos = app_state.youtube_facade.get_video_summaries(batch_ids)
+            for video_i, video_id in enumerate(batch_ids, start=batch_start):
+                video = videos.get(video_id)
+                if video is None:
+                    logger.debug("Video %s could not be found", video_id)
+                    continue
+                yield video_i, video
                 n_found += 1
-                yield video
+                if n_found == n_videos:
+                    return
+            batch_start += len(batch_ids)
+
+    @classmethod
+    def get_eligible_video_ids(cls, app_state: AppState) -> frozenset[str]:
+        """Return the IDs of the playlist videos that are not removed in the records.
+
+        Args:
+            app_state (AppState): The application state.
+
+        Returns:
+            frozenset[str]: The video IDs that are not removed in the records.
+        """
+        playlist = app_state.youtube_facade.get_playlist(app_state.playlist_id)
+        return app_state.removed_video_index.get_eligible_video_ids(playlist)
 
     @classmethod
     def get_non_removed_video_ids(cls, app_state: AppState) -> list[str]:
@@ -239,12 +380,9 @@ class Matcher:
             app_state (AppState): The application state.
 
         Returns:
-            list[str]: The video IDs that are not removed in the records.
+            list[str]: The video IDs that are not removed in the records, in playlist order.
         """
+        # NOTE: The IDs are listed in playlist order instead of set order, so seeded matches do not depend on hashing
         playlist = app_state.youtube_facade.get_playlist(app_state.playlist_id)
-        records = app_state.record_tracker.load()
-        ids_set = {item.video_id for item in playlist.items}
-        for record in records:
-            choices = record.choice_set.choices
-            ids_set -= {c.video_id for c in choices if c.action == Action.REMOVE}
-        return list(ids_set)
+        eligible_ids = app_state.removed_video_index.get_eligible_video_ids(playlist)
+        return list(dict.fromkeys(item.video_id for item in playlist.items if item.video_id in eligible_ids))
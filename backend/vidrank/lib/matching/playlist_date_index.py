@@ -0,0 +1,47 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Optional
+
+from vidrank.lib.youtube.playlist import Playlist
+
+
+class PlaylistDateIndex:
+    """Index of the videos in a playlist by the time they were added.
+
+    Video IDs are kept newest first next to their negated epoch timestamps, so the videos added within a number of days
+    are a prefix found with a binary search. The index is only rebuilt when the cache hands out a different playlist
+    object.
+    """
+
+    SECONDS_PER_DAY = 24 * 60 * 60
+
+    def __init__(self) -> None:
+        """Initialize the playlist date index."""
+        self._lock = threading.Lock()
+        self._playlist: Optional[Playlist] = None
+        self._video_ids: list[str] = []
+        self._neg_timestamps: list[int] = []
+
+    def get_recent_video_ids(self, playlist: Playlist, days: int) -> tuple[list[str], int]:
+        """Get the IDs of the videos in a playlist with the number of them added within some days.
+
+        Args:
+            playlist (Playlist): The playlist to select videos from.
+            days (int): The number of whole days since a video was added for it to count as recent.
+
+        Returns:
+            tuple[list[str], int]: The IDs of all videos in the playlist, newest first, and the number of recent videos
+                at the start of the list.
+        """
+        with self._lock:
+            if playlist is not self._playlist:
+                items = sorted(playlist.items, key=lambda x: x.added_at, reverse=True)
+                self._video_ids = [item.video_id for item in items]
+                self._neg_timestamps = [-int(item.added_at.timestamp()) for item in items]
+                self._playlist = playlist
+            video_ids, neg_timestamps = self._video_ids, self._neg_timestamps
+
+        # NOTE: A video added less than days + 1 days ago has been in the playlist for at most days whole days
+        cutoff = int(time.time()) - (days + 1) * self.SECONDS_PER_DAY
+        return video_ids, bisect_left(neg_timestamps, -cutoff)
@@ -0,0 +1,175 @@
+import logging
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from vidrank.lib.caching.record_log_index import RecordLogIndex
+from vidrank.lib.caching.record_tracker import RecordTracker
+from vidrank.lib.caching.state_file import StateFile
+from vidrank.lib.models.action import Action
+from vidrank.lib.models.record import Record
+from vidrank.lib.models.record_log_entry import RecordLogEntry
+from vidrank.lib.models.record_log_watermark import RecordLogWatermark
+from vidrank.lib.models.record_operation import RecordOperation
+from vidrank.lib.youtube.playlist import Playlist
+from vidrank.lib.youtube.playlist_delta import PlaylistDelta
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RemovedVideoState:
+    """Persisted state of the removed video index."""
+
+    watermark: RecordLogWatermark
+    removals: dict[str, list[str]] = field(default_factory=dict)
+    counts: Counter[str] = field(default_factory=Counter)
+
+
+class RemovedVideoIndex(RecordLogIndex[RemovedVideoState]):
+    """Index of the videos removed by user choices.
+
+    Keeps, for every record that removed videos, the IDs it removed, along with a count of removals per video, and
+    brings them up to date by reading only the record log entries after its watermark. Adding a record with removals
+    increments the counts and undoing it decrements them. The state is saved when the removals change, and at least
+    every `SAVE_INTERVAL` entries so the log tail read on startup stays short. The eligible video IDs of a playlist are
+    cached as a set until either the playlist or the removals change.
+    """
+
+    SAVE_INTERVAL = 256
+
+    def __init__(self, record_tracker: RecordTracker, cache_dirpath: Path):
+        """Initialize the removed video index.
+
+        Args:
+            record_tracker (RecordTracker): The record tracker to read records from.
+            cache_dirpath (Path): The path to the cache directory.
+        """
+        super().__init__(
+            record_tracker,
+            StateFile(cache_dirpath / "removals" / "removed_video_index.pkl", RemovedVideoState),
+        )
+
+        self._lock = threading.Lock()
+        self._playlist: Optional[Playlist] = None
+        self._eligible_video_ids: Optional[frozenset[str]] = None
+        self._n_unsaved_entries = 0
+
+    def get_eligible_video_ids(self, playlist: Playlist) -> frozenset[str]:
+        """Get the IDs of the videos in a playlist that have not been removed.
+
+        Args:
+            playlist (Playlist): The playlist to select videos from.
+
+        Returns:
+            frozenset[str]: The IDs of the eligible videos.
+        """
+        with self._lock:
+            state = self._sync()
+            if self._eligible_video_ids is None or self._playlist is not playlist:
+                video_ids = {item.video_id for item in playlist.items}
+                self._eligible_video_ids = frozenset(video_ids - state.counts.keys())
+                self._playlist = playlist
+            return self._eligible_video_ids
+
+    def apply_playlist_delta(self, previous: Optional[Playlist], playlist: Playlist, delta: PlaylistDelta) -> None:
+        """Update the cached eligible video IDs with the changes from a playlist sync.
+
+        Args:
+            previous (Optional[Playlist]): The playlist before the sync.
+            playlist (Playlist): The playlist after the sync.
+            delta (PlaylistDelta): The items added to and removed from the playlist.
+        """
+        with self._lock:
+            state = self._state
+            if state is None or self._eligible_video_ids is None or self._playlist is not previous:
+                self._eligible_video_ids = None
+                return
+
+            added_ids = {item.video_id for item in delta.added} - state.counts.keys()
+            self._eligible_video_ids = (self._eligible_video_ids - set(delta.removed)) | added_ids
+            self._playlist = playlist
+
+    def get_removed_video_ids(self) -> list[str]:
+        """Get the IDs of the removed videos, in the order they were removed.
+
+        Returns:
+            list[str]: The IDs of the removed videos.
+        """
+        with self._lock:
+            state = self._sync()
+            return [video_id for video_ids in state.removals.values() for video_id in video_ids]
+
+    def is_removed(self, video_id: str) -> bool:
+        """Check if a video has been removed.
+
+        Args:
+            video_id (str): The ID of the video to check.
+
+        Returns:
+            bool: True if the video has been removed, False otherwise.
+        """
+        with self._lock:
+            return video_id in self._sync().counts
+
+    def _apply_entries(
+        self,
+        state: RemovedVideoState,
+        entries: list[RecordLogEntry],
+        watermark: RecordLogWatermark,
+    ) -> RemovedVideoState:
+        changed = False
+        for entry in entries:
+            changed |= self._apply_entry(state, entry)
+
+        state.watermark = watermark
+        # NOTE: Between saves, entries are re-read from the log after the persisted watermark on startup
+        self._n_unsaved_entries += len(entries)
+        if changed:
+            self._eligible_video_ids = None
+        if changed or self._n_unsaved_entries >= self.SAVE_INTERVAL:
+            self._save(state)
+        return state
+
+    def _apply_entry(self, state: RemovedVideoState, entry: RecordLogEntry) -> bool:
+        """Apply a single log entry, returning True if the removed videos changed."""
+        if entry.operation == RecordOperation.ADD and entry.record is not None:
+            return self._add_record(state, entry.record)
+
+        if entry.operation == RecordOperation.REMOVE:
+            video_ids = state.removals.pop(entry.record_id, None)
+            if video_ids is None:
+                return False
+            state.counts.subtract(video_ids)
+            for video_id in video_ids:
+                if state.counts[video_id] <= 0:
+                    del state.counts[video_id]
+            return True
+
+        return False
+
+    def _add_record(self, state: RemovedVideoState, record: Record) -> bool:
+        choices = record.choice_set.choices
+        video_ids = [choice.video_id for choice in choices if choice.action == Action.REMOVE]
+        if len(video_ids) == 0:
+            return False
+        state.removals[record.id] = video_ids
+        state.counts.update(video_ids)
+        return True
+
+    def _rebuild(self) -> RemovedVideoState:
+        records, watermark = self.record_tracker.snapshot()
+        state = RemovedVideoState(watermark=watermark)
+        for record in records:
+            self._add_record(state, record)
+
+        self._state = state
+        self._eligible_video_ids = None
+        self._save(state)
+        return state
+
+    def _save(self, state: RemovedVideoState) -> None:
+        self.state_file.save(state)
+        self._n_unsaved_entries = 0
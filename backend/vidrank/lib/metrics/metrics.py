@@ -0,0 +1,88 @@
+import threading
+
+from vidrank.lib.caching.cache_stats import CacheStats
+from vidrank.lib.metrics.metrics_registry import LabelValues, MetricsRegistry
+
+REGISTRY = MetricsRegistry()
+
+ROUTE_LATENCY = REGISTRY.histogram(
+    "vidrank_route_latency_seconds",
+    "Latency of API requests by route.",
+    ("method", "route", "status"),
+)
+
+YOUTUBE_REQUESTS = REGISTRY.counter(
+    "vidrank_youtube_requests_total",
+    "Requests sent to the YouTube API by endpoint.",
+    ("endpoint",),
+)
+YOUTUBE_REQUEST_ERRORS = REGISTRY.counter(
+    "vidrank_youtube_request_errors_total",
+    "Requests to the YouTube API that failed, by endpoint.",
+    ("endpoint",),
+)
+YOUTUBE_REQUEST_LATENCY = REGISTRY.histogram(
+    "vidrank_youtube_request_latency_seconds",
+    "Latency of requests to the YouTube API by endpoint.",
+    ("endpoint",),
+)
+
+RANKING_UPDATE_LATENCY = REGISTRY.histogram(
+    "vidrank_ranking_update_seconds",
+    "Time spent bringing the rankings up to date, by kind of update.",
+    ("kind",),
+)
+RANKING_RECORDS_APPLIED = REGISTRY.counter(
+    "vidrank_ranking_records_applied_total",
+    "Records rated by the ranking engine, including records rated again during replays and rebuilds.",
+)
+RANKING_RECORDS = REGISTRY.gauge(
+    "vidrank_ranking_records",
+    "Records reflected in the current rankings.",
+)
+
+MATCH_RANDOM_FALLBACKS = REGISTRY.counter(
+    "vidrank_match_random_fallbacks_total",
+    "Matches that fell back to a random choice set because the strategy had too few candidates, by strategy.",
+    ("strategy",),
+)
+
+_cache_stats: dict[LabelValues, CacheStats] = {}
+_cache_stats_lock = threading.Lock()
+
+
+def track_cache_stats(cache: str, layer: str, stats: CacheStats) -> None:
+    """Report the hit, miss and eviction counts of a cache in the metrics.
+
+    Args:
+        cache (str): The name of the cache, like "videos".
+        layer (str): The layer of the cache, like "memory" or "disk".
+        stats (CacheStats): The stats kept by the cache.
+    """
+    with _cache_stats_lock:
+        _cache_stats[(cache, layer)] = stats
+
+
+def _get_cache_samples(attribute: str) -> dict[LabelValues, float]:
+    with _cache_stats_lock:
+        return {labels: getattr(stats, attribute) for labels, stats in _cache_stats.items()}
+
+
+REGISTRY.counter_function(
+    "vidrank_cache_hits_total",
+    "Cache lookups that found the item, by cache and layer.",
+    ("cache", "layer"),
+    lambda: _get_cache_samples("hits"),
+)
+REGISTRY.counter_function(
+    "vidrank_cache_misses_total",
+    "Cache lookups that did not find the item, by cache and layer.",
+    ("cache", "layer"),
+    lambda: _get_cache_samples("misses"),
+)
+REGISTRY.counter_function(
+    "vidrank_cache_evictions_total",
+    "Items evicted to stay within the size limit of the cache, by cache and layer.",
+    ("cache", "layer"),
+    lambda: _get_cache_samples("evictions"),
+)
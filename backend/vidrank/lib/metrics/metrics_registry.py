@@ -0,0 +1,371 @@
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Generic, Iterator, TypeVar, Union
+
+LabelValues = tuple[str, ...]
+SampleFn = Callable[[], dict[LabelValues, float]]
+
+C = TypeVar("C")
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class CounterChild:
+    """Value of a counter for one combination of label values."""
+
+    def __init__(self) -> None:
+        """Initialize the counter at zero."""
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the counter.
+
+        Args:
+            amount (float): The amount to add, which must not be negative.
+        """
+        with self._lock:
+            self.value += amount
+
+
+class GaugeChild:
+    """Value of a gauge for one combination of label values."""
+
+    def __init__(self) -> None:
+        """Initialize the gauge at zero."""
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        """Set the gauge.
+
+        Args:
+            value (float): The new value.
+        """
+        self.value = value
+
+
+class HistogramChild:
+    """Bucketed observations of a histogram for one combination of label values."""
+
+    def __init__(self, buckets: tuple[float, ...]):
+        """Initialize the histogram with no observations.
+
+        Args:
+            buckets (tuple[float, ...]): The upper bounds of the buckets, in increasing order.
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """Record an observation.
+
+        Args:
+            value (float): The observed value.
+        """
+        bucket_i = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[bucket_i] += 1
+            self.sum += value
+
+    def get_snapshot(self) -> tuple[list[int], float]:
+        """Get a consistent copy of the bucket counts and the sum.
+
+        Returns:
+            tuple[list[int], float]: The count of observations in each bucket, not cumulative, and their sum.
+        """
+        with self._lock:
+            return list(self.counts), self.sum
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observe the duration of a block in seconds.
+
+        Yields:
+            Iterator[None]: A context whose duration is observed.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Metric(Generic[C]):
+    """Metric family with a child per combination of label values."""
+
+    TYPE = ""
+
+    def __init__(self, name: str, documentation: str, label_names: LabelValues, child_fn: Callable[[], C]):
+        """Initialize the metric.
+
+        Args:
+            name (str): The name of the metric.
+            documentation (str): The help text of the metric.
+            label_names (LabelValues): The names of the labels.
+            child_fn (Callable[[], C]): The function that creates the child for new label values.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._child_fn = child_fn
+        self._children: dict[LabelValues, C] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *label_values: str) -> C:
+        """Get the child for some label values, creating it on first use.
+
+        Args:
+            label_values (str): The values of the labels, in the order of the label names.
+
+        Returns:
+            C: The child for the label values.
+
+        Raises:
+            ValueError: If the number of label values does not match the number of label names.
+        """
+        child = self._children.get(label_values)
+        if child is not None:
+            return child
+
+        if len(label_values) != len(self.label_names):
+            msg = f"Metric {self.name} expects labels {self.label_names}, got {label_values}"
+            raise ValueError(msg)
+        with self._lock:
+            return self._children.setdefault(label_values, self._child_fn())
+
+    def get_children(self) -> list[tuple[LabelValues, C]]:
+        """Get the children of the metric.
+
+        Returns:
+            list[tuple[LabelValues, C]]: The label values and child of every combination seen so far.
+        """
+        with self._lock:
+            return list(self._children.items())
+
+
+class Counter(Metric[CounterChild]):
+    """Monotonically increasing count."""
+
+    TYPE = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: LabelValues = ()):
+        """Initialize the counter.
+
+        Args:
+            name (str): The name of the metric.
+            documentation (str): The help text of the metric.
+            label_names (LabelValues): The names of the labels.
+        """
+        super().__init__(name, documentation, label_names, CounterChild)
+
+
+class Gauge(Metric[GaugeChild]):
+    """Value that can go up and down."""
+
+    TYPE = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: LabelValues = ()):
+        """Initialize the gauge.
+
+        Args:
+            name (str): The name of the metric.
+            documentation (str): The help text of the metric.
+            label_names (LabelValues): The names of the labels.
+        """
+        super().__init__(name, documentation, label_names, GaugeChild)
+
+
+class Histogram(Metric[HistogramChild]):
+    """Distribution of observations in cumulative buckets."""
+
+    TYPE = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: LabelValues = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        """Initialize the histogram.
+
+        Args:
+            name (str): The name of the metric.
+            documentation (str): The help text of the metric.
+            label_names (LabelValues): The names of the labels.
+            buckets (tuple[float, ...]): The upper bounds of the buckets, in increasing order.
+        """
+        super().__init__(name, documentation, label_names, lambda: HistogramChild(buckets))
+
+
+class CounterFunction:
+    """Counter whose values are read from a function when metrics are rendered.
+
+    Used for counts that are already kept elsewhere, so that the hot path does not update them twice.
+    """
+
+    TYPE = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: LabelValues, sample_fn: SampleFn):
+        """Initialize the counter function.
+
+        Args:
+            name (str): The name of the metric.
+            documentation (str): The help text of the metric.
+            label_names (LabelValues): The names of the labels.
+            sample_fn (SampleFn): The function returning the value for every combination of label values.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.sample_fn = sample_fn
+
+
+M = TypeVar("M", bound=Union[Metric[Any], CounterFunction])
+
+
+class MetricsRegistry:
+    """Registry of metrics rendered in the Prometheus text exposition format.
+
+    Metrics are kept in process with a lock per label combination, so recording a value costs about as much as a dict
+    lookup and no metrics service is needed. Histograms keep cumulative bucket counts, a sum and a count, the same as
+    Prometheus client libraries.
+    """
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._metrics: list[Union[Metric[Any], CounterFunction]] = []
+
+    def counter(self, name: str, documentation: str, label_names: LabelValues = ()) -> Counter:
+        """Register a counter.
+
+        Args:
+            name (str): The name of the metric, ending in "_total".
+            documentation (str): The help text of the metric.
+            label_names (LabelValues): The names of the labels.
+
+        Returns:
+            Counter: The counter.
+        """
+        return self._register(Counter(name, documentation, label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: LabelValues = ()) -> Gauge:
+        """Register a gauge.
+
+        Args:
+            name (str): The name of the metric.
+            documentation (str): The help text of the metric.
+            label_names (LabelValues): The names of the labels.
+
+        Returns:
+            Gauge: The gauge.
+        """
+        return self._register(Gauge(name, documentation, label_names))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: LabelValues = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Register a histogram.
+
+        Args:
+            name (str): The name of the metric.
+            documentation (str): The help text of the metric.
+            label_names (LabelValues): The names of the labels.
+            buckets (tuple[float, ...]): The upper bounds of the buckets, in increasing order.
+
+        Returns:
+            Histogram: The histogram.
+        """
+        return self._register(Histogram(name, documentation, label_names, buckets))
+
+    def counter_function(
+        self,
+        name: str,
+        documentation: str,
+        label_names: LabelValues,
+        sample_fn: SampleFn,
+    ) -> CounterFunction:
+        """Register a counter whose values are read from a function.
+
+        Args:
+            name (str): The name of the metric, ending in "_total".
+            documentation (str): The help text of the metric.
+            label_names (LabelValues): The names of the labels.
+            sample_fn (SampleFn): The function returning the value for every combination of label values.
+
+        Returns:
+            CounterFunction: The counter function.
+        """
+        return self._register(CounterFunction(name, documentation, label_names, sample_fn))
+
+    def render(self) -> str:
+        """Render all metrics.
+
+        Returns:
+            str: The metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {self._escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.TYPE}")
+            if isinstance(metric, CounterFunction):
+                for label_values, value in metric.sample_fn().items():
+                    lines.append(self._format_sample(metric.name, metric.label_names, label_values, value))
+            elif isinstance(metric, Histogram):
+                for label_values, child in metric.get_children():
+                    lines.extend(self._format_histogram(metric, label_values, child))
+            else:
+                for label_values, child in metric.get_children():
+                    lines.append(self._format_sample(metric.name, metric.label_names, label_values, child.value))
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: M) -> M:
+        self._metrics.append(metric)
+        return metric
+
+    def _format_histogram(self, metric: Histogram, label_values: LabelValues, child: HistogramChild) -> list[str]:
+        counts, total = child.get_snapshot()
+
+        lines = []
+        label_names = (*metric.label_names, "le")
+        cumulative_count = 0
+        for bound, count in zip([*child.buckets, math.inf], counts, strict=True):
+            cumulative_count += count
+            bucket_values = (*label_values, self._format_value(bound))
+            lines.append(self._format_sample(f"{metric.name}_bucket", label_names, bucket_values, cumulative_count))
+        lines.append(self._format_sample(f"{metric.name}_sum", metric.label_names, label_values, total))
+        lines.append(self._format_sample(f"{metric.name}_count", metric.label_names, label_values, cumulative_count))
+        return lines
+
+    @classmethod
+    def _format_sample(cls, name: str, label_names: LabelValues, label_values: LabelValues, value: float) -> str:
+        if len(label_names) == 0:
+            return f"{name} {cls._format_value(value)}"
+        labels = ",".join(
+            f'{label_name}="{cls._escape(label_value)}"'
+            for label_name, label_value in zip(label_names, label_values, strict=True)
+        )
+        return f"{name}{{{labels}}} {cls._format_value(value)}"
+
+    @classmethod
+    def _format_value(cls, value: float) -> str:
+        if value == math.inf:
+            return "+Inf"
+        if float(value).is_integer():
+            return str(int(value))
+        return repr(float(value))
+
+    @classmethod
+    def _escape(cls, text: str) -> str:
+        return text.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
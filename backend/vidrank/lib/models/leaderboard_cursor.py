@@ -0,0 +1,38 @@
+import base64
+import binascii
+
+from pydantic import BaseModel, ValidationError
+
+
+class LeaderboardCursor(BaseModel):
+    """Position in the leaderboard after the last entry a client has seen."""
+
+    rating: float
+    video_id: str
+
+    def encode(self) -> str:
+        """Encode the cursor as an opaque string for clients.
+
+        Returns:
+            str: The encoded cursor.
+        """
+        return base64.urlsafe_b64encode(self.model_dump_json().encode()).decode()
+
+    @classmethod
+    def decode(cls, cursor: str) -> "LeaderboardCursor":
+        """Decode a cursor from the string given to a client.
+
+        Args:
+            cursor (str): The encoded cursor.
+
+        Returns:
+            LeaderboardCursor: The decoded cursor.
+
+        Raises:
+            ValueError: If the cursor is not valid.
+        """
+        try:
+            return cls.model_validate_json(base64.urlsafe_b64decode(cursor.encode()))
+        except (binascii.Error, ValidationError) as exc:
+            msg = f"Invalid leaderboard cursor: {cursor}"
+            raise ValueError(msg) from exc
@@ -19,6 +19,10 @@ class FinetuneStrategySettings(BaseModel):
     fraction: float
 
 
+class ActiveStrategySettings(BaseModel):
+    """Active strategy settings model."""
+
+
 class RandomStrategySettings(BaseModel):
     """Random strategy settings model."""
 
@@ -30,3 +34,4 @@ class MatchingSettings(BaseModel):
     by_rating_strategy: Optional[ByRatingStrategySettings]
     finetune_strategy: Optional[FinetuneStrategySettings]
     random_strategy: Optional[RandomStrategySettings]
+    active_strategy: Optional[ActiveStrategySettings] = None
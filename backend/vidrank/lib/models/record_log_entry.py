@@ -0,0 +1,17 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+from vidrank.lib.models.record import Record
+from vidrank.lib.models.record_operation import RecordOperation
+
+
+class RecordLogEntry(BaseModel):
+    """Record log entry model.
+
+    An ADD entry carries the full record, a REMOVE entry is a tombstone that only carries the record ID.
+    """
+
+    operation: RecordOperation
+    record_id: str
+    record: Optional[Record] = None
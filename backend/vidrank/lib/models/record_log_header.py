@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+
+class RecordLogHeader(BaseModel):
+    """Record log header model."""
+
+    log_id: str
+    version: int
@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+
+class RecordLogWatermark(BaseModel):
+    """Position in the record log up to which a consumer has applied entries."""
+
+    log_id: str
+    offset: int
@@ -0,0 +1,8 @@
+from enum import StrEnum, auto
+
+
+class RecordOperation(StrEnum):
+    """Enum for operations stored in the record log."""
+
+    ADD = auto()
+    REMOVE = auto()
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+
+from vidrank.lib.profiling.profile_trigger import ProfileTrigger
+
+
+class ProfileMetadata(BaseModel):
+    """Model for the metadata stored next to the profile of a request."""
+
+    profile_id: str
+    created_at: int
+    method: str
+    route: str
+    status_code: int
+    duration_seconds: float
+    trigger: ProfileTrigger
+    section_seconds: dict[str, float]
+    section_calls: dict[str, int]
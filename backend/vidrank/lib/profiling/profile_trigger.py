@@ -0,0 +1,8 @@
+from enum import StrEnum, auto
+
+
+class ProfileTrigger(StrEnum):
+    """Enum for the reasons a request is profiled."""
+
+    HEADER = auto()
+    SAMPLE = auto()
@@ -0,0 +1,265 @@
+import cProfile
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from pydantic import ValidationError
+
+from vidrank.lib.profiling.profile_metadata import ProfileMetadata
+from vidrank.lib.profiling.profile_trigger import ProfileTrigger
+from vidrank.lib.utilities.datetime_utilities import get_timestamp
+from vidrank.lib.utilities.identifier_utilities import get_identifier
+
+logger = logging.getLogger(__name__)
+
+
+class ActiveProfile:
+    """Profile of a request that is being handled."""
+
+    def __init__(self, trigger: ProfileTrigger):
+        """Initialize an empty profile.
+
+        Args:
+            trigger (ProfileTrigger): The reason the request is profiled.
+        """
+        self.trigger = trigger
+        self.profile = cProfile.Profile()
+        self.section_seconds: defaultdict[str, float] = defaultdict(float)
+        self.section_calls: defaultdict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def add_section(self, name: str, seconds: float) -> None:
+        """Add the wall time of a section of the request.
+
+        Args:
+            name (str): The name of the section.
+            seconds (float): The wall time spent in the section.
+        """
+        with self._lock:
+            self.section_seconds[name] += seconds
+            self.section_calls[name] += 1
+
+    def get_metadata(self, method: str, route: str, status_code: int, duration_seconds: float) -> ProfileMetadata:
+        """Describe the profiled request.
+
+        Args:
+            method (str): The HTTP method of the request.
+            route (str): The path template of the route that handled the request.
+            status_code (int): The status code of the response.
+            duration_seconds (float): The wall time of the request.
+
+        Returns:
+            ProfileMetadata: The metadata of the profile, with a new profile ID.
+        """
+        with self._lock:
+            section_seconds = dict(self.section_seconds)
+            section_calls = dict(self.section_calls)
+        return ProfileMetadata(
+            # NOTE: IDs start with a nanosecond timestamp so that sorting the file names sorts the profiles by time,
+            # even for profiles saved within the same millisecond
+            profile_id=f"{time.time_ns()}-{get_identifier()[:8]}",
+            created_at=get_timestamp(),
+            method=method,
+            route=route,
+            status_code=status_code,
+            duration_seconds=duration_seconds,
+            trigger=self.trigger,
+            section_seconds=section_seconds,
+            section_calls=section_calls,
+        )
+
+    @contextmanager
+    def run(self) -> Iterator[None]:
+        """Run the deterministic profiler on the current thread during a block.
+
+        Yields:
+            Iterator[None]: A context whose function calls on this thread are profiled.
+        """
+        try:
+            self.profile.enable()
+        except ValueError:
+            # NOTE: Only one profiler can run per thread, so a concurrent profiled request on the event loop only
+            # records its sections
+            logger.debug("Another profiler is active on this thread, only recording sections")
+            yield
+            return
+
+        try:
+            yield
+        finally:
+            self.profile.disable()
+
+
+_active_profile: ContextVar[Optional[ActiveProfile]] = ContextVar("active_profile", default=None)
+
+
+class RequestProfiler:
+    """Opt-in profiler of API requests.
+
+    A request is profiled when it has the profile header and header profiling is enabled, or when it is picked by the
+    sampling rate. Profiled requests run their handler under cProfile and record the wall time of named sections, like
+    record loading or YouTube requests, including sections that run on other threads. Each profile is written to the
+    profiles directory as a pstats file with a JSON metadata file next to it, and only the latest profiles are kept.
+
+    When profiling is disabled, deciding whether to profile a request is a single attribute check, and sections only
+    read a context variable.
+    """
+
+    HEADER_NAME = "x-vidrank-profile"
+    DEFAULT_MAX_PROFILES = 100
+
+    def __init__(
+        self,
+        dirpath: Path,
+        sample_rate: float = 0.0,
+        on_header: bool = False,
+        max_profiles: int = DEFAULT_MAX_PROFILES,
+    ):
+        """Initialize the profiler.
+
+        Args:
+            dirpath (Path): The directory the profiles are written to.
+            sample_rate (float): The fraction of requests profiled without the header.
+            on_header (bool): Whether requests with the profile header are profiled.
+            max_profiles (int): The number of latest profiles to keep.
+
+        Raises:
+            ValueError: If the sample rate is not between zero and one.
+        """
+        if not 0.0 <= sample_rate <= 1.0:
+            msg = f"Profile sample rate must be between 0 and 1, got {sample_rate}"
+            raise ValueError(msg)
+
+        self.dirpath = dirpath
+        self.sample_rate = sample_rate
+        self.on_header = on_header
+        self.max_profiles = max_profiles
+        self.enabled = on_header or sample_rate > 0.0
+
+        self._header_name = self.HEADER_NAME.encode()
+        self._rng = random.Random()
+        self._lock = threading.Lock()
+
+    @classmethod
+    @contextmanager
+    def section(cls, name: str) -> Iterator[None]:
+        """Record the wall time of a block in the profile of the current request, if it is profiled.
+
+        Args:
+            name (str): The name of the section.
+
+        Yields:
+            Iterator[None]: A context whose wall time is recorded.
+        """
+        active_profile = _active_profile.get()
+        if active_profile is None:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            active_profile.add_section(name, time.perf_counter() - start)
+
+    @classmethod
+    def get_active_profile(cls) -> Optional[ActiveProfile]:
+        """Get the profile of the current request.
+
+        Returns:
+            Optional[ActiveProfile]: The profile, or None if the current request is not profiled.
+        """
+        return _active_profile.get()
+
+    def get_trigger(self, headers: Iterable[tuple[bytes, bytes]]) -> Optional[ProfileTrigger]:
+        """Decide whether to profile a request.
+
+        Args:
+            headers (Iterable[tuple[bytes, bytes]]): The raw headers of the request, with lowercase names.
+
+        Returns:
+            Optional[ProfileTrigger]: The reason to profile the request, or None if it is not profiled.
+        """
+        if not self.enabled:
+            return None
+
+        if self.on_header:
+            for name, value in headers:
+                if name == self._header_name and value not in (b"", b"0", b"false"):
+                    return ProfileTrigger.HEADER
+
+        if self.sample_rate > 0.0 and self._rng.random() < self.sample_rate:
+            return ProfileTrigger.SAMPLE
+        return None
+
+    @contextmanager
+    def activate(self, trigger: ProfileTrigger) -> Iterator[ActiveProfile]:
+        """Profile the request handled in a block.
+
+        Args:
+            trigger (ProfileTrigger): The reason the request is profiled.
+
+        Yields:
+            Iterator[ActiveProfile]: The profile of the request.
+        """
+        active_profile = ActiveProfile(trigger)
+        token = _active_profile.set(active_profile)
+        try:
+            yield active_profile
+        finally:
+            _active_profile.reset(token)
+
+    def save(self, active_profile: ActiveProfile, metadata: ProfileMetadata) -> None:
+        """Write a profile to the profiles directory, removing the oldest profiles beyond the limit.
+
+        Args:
+            active_profile (ActiveProfile): The profile of the request.
+            metadata (ProfileMetadata): The metadata of the profile, from `ActiveProfile.get_metadata`.
+        """
+        with self._lock:
+            self.dirpath.mkdir(parents=True, exist_ok=True)
+            active_profile.profile.dump_stats(self.get_stats_filepath(metadata.profile_id))
+            self._get_metadata_filepath(metadata.profile_id).write_text(metadata.model_dump_json(indent=2))
+
+            for filepath in sorted(self.dirpath.glob("*.json"))[: -self.max_profiles]:
+                self.get_stats_filepath(filepath.stem).unlink(missing_ok=True)
+                filepath.unlink(missing_ok=True)
+
+        logger.info("Saved profile %s of %s %s", metadata.profile_id, metadata.method, metadata.route)
+
+    def list_profiles(self) -> list[ProfileMetadata]:
+        """List the saved profiles.
+
+        Returns:
+            list[ProfileMetadata]: The metadata of the saved profiles, newest first.
+        """
+        if not self.dirpath.exists():
+            return []
+
+        profiles = []
+        for filepath in sorted(self.dirpath.glob("*.json"), reverse=True):
+            try:
+                profiles.append(ProfileMetadata.model_validate_json(filepath.read_text()))
+            except (OSError, ValidationError):
+                logger.warning("Skipping unreadable profile metadata %s", filepath)
+        return profiles
+
+    def get_stats_filepath(self, profile_id: str) -> Path:
+        """Get the path of the pstats file of a profile.
+
+        Args:
+            profile_id (str): The ID of the profile.
+
+        Returns:
+            Path: The path of the pstats file.
+        """
+        return self.dirpath / f"{profile_id}.prof"
+
+    def _get_metadata_filepath(self, profile_id: str) -> Path:
+        return self.dirpath / f"{profile_id}.json"
@@ -0,0 +1,195 @@
+import math
+from typing import Iterator, Optional
+
+import numpy as np
+from trueskill import Rating, TrueSkill, calc_draw_margin, global_env
+
+from vidrank.lib.models.record import Record
+from vidrank.lib.ranking.comparisons import Comparisons
+from vidrank.lib.ranking.ranking import Ranking
+from vidrank.lib.ranking.ranking_method import RankingMethod
+from vidrank.lib.ranking.rating_arrays import RatingArrays
+from vidrank.lib.utilities.math_utilities import normal_cdf, normal_pdf
+
+# Scale between logistic Bradley-Terry strengths and normal TrueSkill performance differences
+LOGISTIC_SCALE = 1.702
+
+
+class BatchRanker:
+    """Vectorized video ranker for full recomputes.
+
+    Comparisons are converted to integer-indexed winner and loser arrays. The TrueSkill method groups comparisons
+    into levels in which no video appears twice, so each level is rated with one vectorized 1v1 update while giving
+    the same ratings as applying the comparisons one by one. The Bradley-Terry method fits strengths to all
+    comparisons at once with minorization-maximization.
+    """
+
+    BT_MAX_ITERATIONS = 1000
+    BT_TOLERANCE = 1e-9
+    BT_PRIOR_WEIGHT = 1.0
+
+    @classmethod
+    def iter_rankings(
+        cls,
+        records: list[Record],
+        method: RankingMethod = RankingMethod.BATCH_TRUESKILL,
+    ) -> Iterator[Ranking]:
+        """Iterate over the rankings of the videos.
+
+        Args:
+            records (list[Record]): The records of the user choices.
+            method (RankingMethod): The method used to compute ratings.
+
+        Yields:
+            Iterator[Ranking]: An iterator over the rankings of the videos.
+
+        Raises:
+            ValueError: If the ranking method is not a batch method.
+        """
+        comparisons = Comparisons.from_records(records)
+        video_ids = comparisons.video_ids
+        winners, losers = comparisons.winners, comparisons.losers
+
+        if method == RankingMethod.BATCH_TRUESKILL:
+            ratings = cls.rate_trueskill(winners, losers, len(video_ids)).mu
+        elif method == RankingMethod.BRADLEY_TERRY:
+            ratings = cls.rate_bradley_terry(winners, losers, len(video_ids))
+        else:
+            msg = f"Ranking method {method} is not a batch method"
+            raise ValueError(msg)
+
+        # NOTE: Ties are ordered by video ID, as in Ranker
+        for i, video_index_i in enumerate(np.lexsort((np.array(video_ids), -ratings))):
+            yield Ranking(video_id=video_ids[video_index_i], rank=i + 1, rating=float(ratings[video_index_i]))
+
+    @classmethod
+    def update_rating_map(cls, rating_map: dict[str, Rating], records: list[Record]) -> None:
+        """Update a rating map in place with the comparisons from new records.
+
+        Args:
+            rating_map (dict[str, Rating]): The ratings of the videos, keyed by video ID.
+            records (list[Record]): The records of the user choices, in the order they were made.
+        """
+        comparisons = Comparisons.from_records(records, known_video_ids=rating_map)
+        winners, losers = comparisons.winners, comparisons.losers
+        if len(winners) == 0:
+            return
+
+        n_videos = len(comparisons.video_ids)
+        prior = RatingArrays.from_prior(n_videos)
+        for i, rating in enumerate(rating_map.values()):
+            prior.mu[i] = rating.mu
+            prior.sigma[i] = rating.sigma
+
+        ratings = cls.rate_trueskill(winners, losers, n_videos, prior)
+        touched = np.zeros(n_videos, dtype=bool)
+        touched[winners] = True
+        touched[losers] = True
+        for i, video_id in enumerate(comparisons.video_ids):
+            if touched[i]:
+                rating_map[video_id] = Rating(mu=float(ratings.mu[i]), sigma=float(ratings.sigma[i]))
+
+    @classmethod
+    def rate_trueskill(
+        cls,
+        winners: np.ndarray,
+        losers: np.ndarray,
+        n_videos: int,
+        prior: Optional[RatingArrays] = None,
+    ) -> RatingArrays:
+        """Compute TrueSkill ratings by applying comparisons in order.
+
+        Args:
+            winners (np.ndarray): The video index of the winner of each comparison.
+            losers (np.ndarray): The video index of the loser of each comparison.
+            n_videos (int): The number of videos.
+            prior (Optional[RatingArrays]): The initial ratings, defaulting to the TrueSkill prior. They are not
+                modified.
+
+        Returns:
+            RatingArrays: The rating means and deviations of the videos.
+        """
+        env = global_env()
+        ratings = RatingArrays.from_prior(n_videos) if prior is None else prior.copy()
+        if len(winners) == 0:
+            return ratings
+
+        levels = cls._get_levels(winners, losers, n_videos)
+        order = np.argsort(levels, kind="stable")
+        boundaries = np.flatnonzero(np.diff(levels[order])) + 1
+        for level_comps in np.split(order, boundaries):
+            cls._rate_1vs1(ratings, winners[level_comps], losers[level_comps], env)
+        return ratings
+
+    @classmethod
+    def rate_bradley_terry(cls, winners: np.ndarray, losers: np.ndarray, n_videos: int) -> np.ndarray:
+        """Fit Bradley-Terry ratings to all comparisons at once.
+
+        Every video also plays one virtual win and one virtual loss against a reference video of strength one, which
+        keeps the fit finite for videos that never won or never lost. Strengths are mapped onto the TrueSkill scale so
+        that ratings from both methods can be compared.
+
+        Args:
+            winners (np.ndarray): The video index of the winner of each comparison.
+            losers (np.ndarray): The video index of the loser of each comparison.
+            n_videos (int): The number of videos.
+
+        Returns:
+            np.ndarray: The ratings of the videos.
+        """
+        prior_weight = cls.BT_PRIOR_WEIGHT
+        wins = np.bincount(winners, minlength=n_videos) + prior_weight
+        strengths = np.ones(n_videos)
+        for _ in range(cls.BT_MAX_ITERATIONS):
+            pair_weights = 1.0 / (strengths[winners] + strengths[losers])
+            denoms = (
+                np.bincount(winners, weights=pair_weights, minlength=n_videos)
+                + np.bincount(losers, weights=pair_weights, minlength=n_videos)
+                + 2 * prior_weight / (strengths + 1.0)
+            )
+            new_strengths = wins / denoms
+            delta = np.max(np.abs(np.log(new_strengths) - np.log(strengths)), initial=0.0)
+            strengths = new_strengths
+            if delta < cls.BT_TOLERANCE:
+                break
+
+        env = global_env()
+        return env.mu + np.log(strengths) * math.sqrt(2) * env.beta / LOGISTIC_SCALE
+
+    @classmethod
+    def _rate_1vs1(
+        cls,
+        ratings: RatingArrays,
+        winners: np.ndarray,
+        losers: np.ndarray,
+        env: TrueSkill,
+    ) -> None:
+        # NOTE: Videos within a level are distinct, so updates can be scattered without conflicts
+        mu, sigma = ratings.mu, ratings.sigma
+        draw_margin = calc_draw_margin(env.draw_probability, 2, env)
+        winner_var = sigma[winners] ** 2 + env.tau**2
+        loser_var = sigma[losers] ** 2 + env.tau**2
+        c_squared = 2 * env.beta**2 + winner_var + loser_var
+        c = np.sqrt(c_squared)
+
+        x = (mu[winners] - mu[losers] - draw_margin) / c
+        denom = normal_cdf(x)
+        v = np.divide(normal_pdf(x), denom, out=-x, where=denom > 0)
+        w = np.clip(v * (v + x), np.finfo(np.float64).tiny, 1.0 - np.finfo(np.float64).epsneg)
+
+        mu[winners] += winner_var / c * v
+        mu[losers] -= loser_var / c * v
+        sigma[winners] = np.sqrt(winner_var * (1.0 - winner_var / c_squared * w))
+        sigma[losers] = np.sqrt(loser_var * (1.0 - loser_var / c_squared * w))
+
+    @classmethod
+    def _get_levels(cls, winners: np.ndarray, losers: np.ndarray, n_videos: int) -> np.ndarray:
+        # A comparison's level is one past the latest level of either of its videos, which keeps every video's
+        # comparisons in their original order while letting independent comparisons share a level
+        next_levels = [0] * n_videos
+        levels = []
+        for winner, loser in zip(winners.tolist(), losers.tolist(), strict=True):
+            level = max(next_levels[winner], next_levels[loser])
+            next_levels[winner] = next_levels[loser] = level + 1
+            levels.append(level)
+        return np.array(levels, dtype=np.int64)
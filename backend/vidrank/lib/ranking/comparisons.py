@@ -0,0 +1,95 @@
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+
+from vidrank.lib.models.action import Action
+from vidrank.lib.models.record import Record
+
+
+@dataclass
+class Comparisons:
+    """Pairwise comparisons between videos, stored as integer-indexed arrays.
+
+    Every selected video in a record wins against every video in the same record that was left alone. Comparisons
+    are ordered by record, then by the position of the winner, then by the position of the loser.
+    """
+
+    video_ids: list[str]
+    winners: np.ndarray
+    losers: np.ndarray
+    record_indices: np.ndarray
+
+    def __len__(self) -> int:
+        """Get the number of comparisons.
+
+        Returns:
+            int: The number of comparisons.
+        """
+        return len(self.winners)
+
+    @classmethod
+    def from_records(cls, records: list[Record], known_video_ids: Iterable[str] = ()) -> "Comparisons":
+        """Extract the comparisons from records.
+
+        Each choice set is partitioned into selected and unselected videos once, and the pairs between them are
+        generated with vectorized index arithmetic instead of an all-pairs loop.
+
+        Args:
+            records (list[Record]): The records of the user choices.
+            known_video_ids (Iterable[str]): Video IDs that keep the first indices, in order. Other videos are indexed
+                in the order they first appear in a comparison, and videos without comparisons are left out.
+
+        Returns:
+            Comparisons: The comparisons from the records.
+        """
+        video_index = {video_id: i for i, video_id in enumerate(known_video_ids)}
+        n_known = len(video_index)
+
+        select_records: list[int] = []
+        select_videos: list[int] = []
+        nothing_records: list[int] = []
+        nothing_videos: list[int] = []
+        for record_i, record in enumerate(records):
+            for choice in record.choice_set.choices:
+                if choice.action == Action.SELECT:
+                    select_records.append(record_i)
+                    select_videos.append(video_index.setdefault(choice.video_id, len(video_index)))
+                elif choice.action == Action.NOTHING:
+                    nothing_records.append(record_i)
+                    nothing_videos.append(video_index.setdefault(choice.video_id, len(video_index)))
+
+        select_record_array = np.array(select_records, dtype=np.int64)
+        nothing_video_array = np.array(nothing_videos, dtype=np.int64)
+
+        # Each selected video is paired with the unselected videos of its record, which are stored contiguously
+        nothing_record_array = np.array(nothing_records, dtype=np.int64)
+        nothing_counts = np.bincount(nothing_record_array, minlength=len(records))
+        nothing_starts = np.cumsum(nothing_counts) - nothing_counts
+        pair_counts = nothing_counts[select_record_array]
+        n_pairs = int(pair_counts.sum())
+        pair_offsets = np.arange(n_pairs, dtype=np.int64) - np.repeat(np.cumsum(pair_counts) - pair_counts, pair_counts)
+
+        winners = np.repeat(np.array(select_videos, dtype=np.int64), pair_counts)
+        losers = nothing_video_array[np.repeat(nothing_starts[select_record_array], pair_counts) + pair_offsets]
+        record_indices = np.repeat(select_record_array, pair_counts)
+
+        # Reindex new videos by their first appearance in a comparison, winner before loser
+        interleaved = np.empty(2 * n_pairs, dtype=np.int64)
+        interleaved[0::2] = winners
+        interleaved[1::2] = losers
+        unique_indices, first_positions = np.unique(interleaved, return_index=True)
+        is_new = unique_indices >= n_known
+        new_indices = unique_indices[is_new][np.argsort(first_positions[is_new], kind="stable")]
+
+        remap = np.arange(len(video_index), dtype=np.int64)
+        remap[new_indices] = n_known + np.arange(len(new_indices), dtype=np.int64)
+        all_video_ids = list(video_index)
+        video_ids = all_video_ids[:n_known] + [all_video_ids[i] for i in new_indices.tolist()]
+
+        return cls(
+            video_ids=video_ids,
+            winners=remap[winners],
+            losers=remap[losers],
+            record_indices=record_indices,
+        )
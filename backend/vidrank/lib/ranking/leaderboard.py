@@ -0,0 +1,132 @@
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import Optional
+
+from vidrank.lib.models.leaderboard_cursor import LeaderboardCursor
+from vidrank.lib.ranking.ranking import Ranking
+from vidrank.lib.ranking.ranking_engine import RankingEngine
+from vidrank.lib.ranking.rating_index import RatingIndex
+from vidrank.lib.youtube.playlist import Playlist
+from vidrank.lib.youtube.video_summary import VideoSummary
+from vidrank.lib.youtube.youtube_facade import YouTubeFacade
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class LeaderboardEntry:
+    """A ranked video that could be resolved through the YouTube API."""
+
+    video: VideoSummary
+    rank: int
+    rating: float
+
+
+@dataclass
+class LeaderboardSnapshot:
+    """Materialized leaderboard for one version of the records and the playlist."""
+
+    version: str
+    entries: list[LeaderboardEntry]
+    rating_index: RatingIndex = field(init=False)
+
+    def __post_init__(self) -> None:
+        """Index the ratings so that cursors can be found with a binary search."""
+        self.rating_index = RatingIndex(
+            [
+                Ranking.model_construct(video_id=entry.video.id, rank=entry.rank, rating=entry.rating)
+                for entry in self.entries
+            ]
+        )
+
+    def get_cursor_start(self, cursor: LeaderboardCursor) -> int:
+        """Find the index of the first entry after a cursor.
+
+        Entries are ordered by rating, so the cursor is located by its rating and ties are broken by the video ID
+        it points at. This keeps pages stable when new records shift ranks while a client is paging.
+
+        Args:
+            cursor (LeaderboardCursor): The cursor after the last entry a client has seen.
+
+        Returns:
+            int: The index of the first entry after the cursor.
+        """
+        tie_start, tie_end = self.rating_index.get_range_bounds(cursor.rating, cursor.rating)
+        position = self.rating_index.get_position(cursor.video_id)
+        if position is not None and tie_start <= position < tie_end:
+            return position + 1
+        return tie_end
+
+    def get_cursor(self, index: int) -> LeaderboardCursor:
+        """Get the cursor pointing after an entry.
+
+        Args:
+            index (int): The index of the entry.
+
+        Returns:
+            LeaderboardCursor: The cursor after the entry.
+        """
+        entry = self.entries[index]
+        return LeaderboardCursor(rating=entry.rating, video_id=entry.video.id)
+
+
+class Leaderboard:
+    """Materialized leaderboard of resolved videos.
+
+    Rankings are resolved through the YouTube facade once per version, dropping videos that can no longer be found,
+    so that page requests become slices of the materialized entries. The version combines the record log watermark
+    of the rankings with a fingerprint of the playlist, and the leaderboard is rebuilt only when either changes.
+    """
+
+    def __init__(self, ranking_engine: RankingEngine, youtube_facade: YouTubeFacade, playlist_id: str):
+        """Initialize the leaderboard.
+
+        Args:
+            ranking_engine (RankingEngine): The ranking engine to read rankings from.
+            youtube_facade (YouTubeFacade): The facade used to resolve ranked videos.
+            playlist_id (str): The ID of the playlist whose changes trigger a rebuild.
+        """
+        self.ranking_engine = ranking_engine
+        self.youtube_facade = youtube_facade
+        self.playlist_id = playlist_id
+
+        self._lock = asyncio.Lock()
+        self._snapshot: Optional[LeaderboardSnapshot] = None
+        self._playlist: Optional[Playlist] = None
+        self._playlist_fingerprint = ""
+
+    async def get_snapshot(self) -> LeaderboardSnapshot:
+        """Get the leaderboard, rebuilding it if the records or the playlist changed.
+
+        Returns:
+            LeaderboardSnapshot: The current leaderboard.
+        """
+        async with self._lock:
+            rankings, watermark = await asyncio.to_thread(self.ranking_engine.get_versioned_rankings)
+            playlist = await self.youtube_facade.get_playlist_async(self.playlist_id)
+            version = f"{watermark.log_id}.{watermark.offset}.{self._get_playlist_fingerprint(playlist)}"
+            if self._snapshot is not None and self._snapshot.version == version:
+                return self._snapshot
+
+            logger.info("Rebuilding leaderboard for version %s", version)
+            video_map = await self.youtube_facade.get_video_summaries_async(ranking.video_id for ranking in rankings)
+            entries = []
+            for ranking in rankings:
+                video = video_map.get(ranking.video_id)
+                if video is None:
+                    logger.debug("Video with ID %s not found", ranking.video_id)
+                    continue
+                entries.append(LeaderboardEntry(video=video, rank=ranking.rank, rating=ranking.rating))
+
+            self._snapshot = LeaderboardSnapshot(version=version, entries=entries)
+            return self._snapshot
+
+    def _get_playlist_fingerprint(self, playlist: Playlist) -> str:
+        # NOTE: The fingerprint is only recomputed when the cache hands out a different playlist object
+        if playlist is not self._playlist:
+            video_ids = sorted(item.video_id for item in playlist.items)
+            self._playlist_fingerprint = hashlib.sha256("\n".join(video_ids).encode()).hexdigest()[:16]
+            self._playlist = playlist
+        return self._playlist_fingerprint
@@ -1,19 +1,12 @@
-from dataclasses import dataclass
 from typing import Iterator
 
 from trueskill import Rating, rate
 
-from vidrank.lib.models.action import Action
 from vidrank.lib.models.record import Record
+from vidrank.lib.ranking.batch_ranker import BatchRanker
+from vidrank.lib.ranking.comparisons import Comparisons
 from vidrank.lib.ranking.ranking import Ranking
-
-
-@dataclass
-class Comp:
-    """A comparison between two videos."""
-
-    winner_id: str
-    loser_id: str
+from vidrank.lib.ranking.ranking_method import RankingMethod
 
 
 class Ranker:
@@ -23,44 +16,66 @@ class Ranker:
     """
 
     @classmethod
-    def iter_rankings(cls, records: list[Record]) -> Iterator[Ranking]:
+    def iter_rankings(
+        cls,
+        records: list[Record],
+        method: RankingMethod = RankingMethod.TRUESKILL,
+    ) -> Iterator[Ranking]:
         """Iterate over the rankings of the videos.
 
         Args:
             records (list[Record]): The records of the user choices.
+            method (RankingMethod): The method used to compute ratings.
 
         Yields:
             Iterator[Ranking]: An iterator over the rankings of the videos.
         """
+        if method != RankingMethod.TRUESKILL:
+            yield from BatchRanker.iter_rankings(records, method)
+            return
+
         rating_map: dict[str, Rating] = {}
-        for comp in cls._get_comps(records):
-            cls._update_ratings(rating_map, comp)
+        cls.update_rating_map(rating_map, records)
+        yield from cls.iter_rating_map_rankings(rating_map)
+
+    @classmethod
+    def update_rating_map(cls, rating_map: dict[str, Rating], records: list[Record]) -> None:
+        """Update a rating map in place with the comparisons from new records.
+
+        Args:
+            rating_map (dict[str, Rating]): The ratings of the videos, keyed by video ID.
+            records (list[Record]): The records of the user choices, in the order they were made.
+        """
+        comparisons = Comparisons.from_records(records)
+        video_ids = comparisons.video_ids
+        for winner, loser in zip(comparisons.winners.tolist(), comparisons.losers.tolist(), strict=True):
+            cls._update_ratings(rating_map, video_ids[winner], video_ids[loser])
 
-        sorted_ratings = sorted(rating_map.items(), key=lambda x: x[1].mu, reverse=True)
+    @classmethod
+    def iter_rating_map_rankings(cls, rating_map: dict[str, Rating]) -> Iterator[Ranking]:
+        """Iterate over the rankings of the videos in a rating map.
+
+        Args:
+            rating_map (dict[str, Rating]): The ratings of the videos, keyed by video ID.
+
+        Yields:
+            Iterator[Ranking]: An iterator over the rankings of the videos.
+        """
+        # NOTE: Ties are ordered by video ID, so they are ordered the same way as in the rating index
+        sorted_ratings = sorted(rating_map.items(), key=lambda x: (-x[1].mu, x[0]))
         for i, (video_id, rating) in enumerate(sorted_ratings):
             yield Ranking(video_id=video_id, rank=i + 1, rating=rating.mu)
 
     @classmethod
-    def _update_ratings(cls, rating_map: dict[str, Rating], comp: Comp) -> None:
-        for video_id in [comp.winner_id, comp.loser_id]:
+    def _update_ratings(cls, rating_map: dict[str, Rating], winner_id: str, loser_id: str) -> None:
+        for video_id in [winner_id, loser_id]:
             if video_id not in rating_map:
                 rating_map[video_id] = Rating()
 
-        winner_rating = rating_map[comp.winner_id]
-        loser_rating = rating_map[comp.loser_id]
+        winner_rating = rating_map[winner_id]
+        loser_rating = rating_map[loser_id]
 
-        rating_groups = [{comp.winner_id: winner_rating}, {comp.loser_id: loser_rating}]
+        rating_groups = [{winner_id: winner_rating}, {loser_id: loser_rating}]
         comp_ratings = rate(rating_groups, ranks=[0, 1])
         rating_map.update(comp_ratings[0])
         rating_map.update(comp_ratings[1])
-
-    @classmethod
-    def _get_comps(cls, records: list[Record]) -> Iterator[Comp]:
-        for record in records:
-            for choice_a in record.choice_set.choices:
-                for choice_b in record.choice_set.choices:
-                    action_a = choice_a.action
-                    action_b = choice_b.action
-
-                    if (action_a, action_b) == (Action.SELECT, Action.NOTHING):
-                        yield Comp(choice_a.video_id, choice_b.video_id)
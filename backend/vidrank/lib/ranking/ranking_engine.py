@@ -0,0 +1,308 @@
+import logging
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, Optional
+
+from trueskill import Rating
+
+from vidrank.lib.caching.record_log_index import RecordLogIndex
+from vidrank.lib.caching.record_tracker import RecordTracker
+from vidrank.lib.caching.state_file import StateFile
+from vidrank.lib.metrics.metrics import RANKING_RECORDS, RANKING_RECORDS_APPLIED, RANKING_UPDATE_LATENCY
+from vidrank.lib.models.record import Record
+from vidrank.lib.models.record_log_entry import RecordLogEntry
+from vidrank.lib.models.record_log_watermark import RecordLogWatermark
+from vidrank.lib.models.record_operation import RecordOperation
+from vidrank.lib.profiling.request_profiler import RequestProfiler
+from vidrank.lib.ranking.batch_ranker import BatchRanker
+from vidrank.lib.ranking.ranker import Ranker
+from vidrank.lib.ranking.ranking import Ranking
+from vidrank.lib.ranking.rating_index import RatingIndex
+from vidrank.lib.ranking.rating_table import RatingTable
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Checkpoint:
+    """Ratings after applying a prefix of the records."""
+
+    n_records: int
+    rating_map: dict[str, Rating]
+
+
+@dataclass
+class UndoEntry:
+    """Ratings of the videos rated by a record, from before it was applied."""
+
+    record_id: str
+    prior_ratings: dict[str, Optional[Rating]]
+
+
+@dataclass
+class RankingState:
+    """Persisted state of the ranking engine."""
+
+    watermark: RecordLogWatermark
+    record_ids: list[str] = field(default_factory=list)
+    record_id_set: set[str] = field(default_factory=set)
+    rating_map: dict[str, Rating] = field(default_factory=dict)
+    checkpoints: list[Checkpoint] = field(default_factory=list)
+    undo_entries: list[UndoEntry] = field(default_factory=list)
+
+
+class RankingEngine(RecordLogIndex[RankingState]):
+    """Stateful video ranker.
+
+    Keeps the TrueSkill ratings of all videos along with the record log watermark they reflect, so new records are
+    applied incrementally instead of replaying the whole history. Undoing one of the latest records, newest first,
+    restores the ratings it changed, and undoing an older record replays from the nearest checkpoint. Replays and
+    rebuilds are rated in bulk with the vectorized batch ranker. The rating index is updated for just the videos whose
+    ratings changed, unless too many changed since it was built.
+    """
+
+    CHECKPOINT_INTERVAL = 256
+    MAX_CHECKPOINTS = 8
+    MAX_INDEX_UPDATES = 256
+    MAX_UNDO_ENTRIES = 16
+
+    def __init__(self, record_tracker: RecordTracker, cache_dirpath: Path):
+        """Initialize the ranking engine.
+
+        Args:
+            record_tracker (RecordTracker): The record tracker to read records from.
+            cache_dirpath (Path): The path to the cache directory.
+        """
+        super().__init__(record_tracker, StateFile(cache_dirpath / "rankings" / "ranking_state.pkl", RankingState))
+
+        self._lock = threading.Lock()
+        self._rating_index: Optional[RatingIndex] = None
+        self._changed_video_ids: set[str] = set()
+        self._rating_table: Optional[RatingTable] = None
+
+    def iter_rankings(self) -> Iterator[Ranking]:
+        """Iterate over the rankings of the videos.
+
+        Yields:
+            Iterator[Ranking]: An iterator over the rankings of the videos.
+        """
+        yield from self.get_rankings()
+
+    def get_rankings(self) -> list[Ranking]:
+        """Get the rankings of the videos, bringing the ratings up to date with the record log first.
+
+        Returns:
+            list[Ranking]: The rankings of the videos, best first.
+        """
+        rankings, _ = self.get_versioned_rankings()
+        return rankings
+
+    def get_versioned_rankings(self) -> tuple[list[Ranking], RecordLogWatermark]:
+        """Get the rankings of the videos together with the record log watermark they reflect.
+
+        Returns:
+            tuple[list[Ranking], RecordLogWatermark]: The rankings of the videos, best first, and their watermark.
+        """
+        rating_index, watermark = self.get_versioned_rating_index()
+        return rating_index.rankings, watermark
+
+    def get_rating_index(self) -> RatingIndex:
+        """Get the rankings of the videos indexed by rating, bringing the ratings up to date with the record log first.
+
+        Returns:
+            RatingIndex: The index of the rankings of the videos.
+        """
+        rating_index, _ = self.get_versioned_rating_index()
+        return rating_index
+
+    def get_versioned_rating_index(self) -> tuple[RatingIndex, RecordLogWatermark]:
+        """Get the rankings of the videos indexed by rating together with the record log watermark they reflect.
+
+        Returns:
+            tuple[RatingIndex, RecordLogWatermark]: The index of the rankings of the videos and their watermark.
+        """
+        with self._lock, RequestProfiler.section("ranking"):
+            state = self._sync()
+            if self._rating_index is None or len(self._changed_video_ids) > self.MAX_INDEX_UPDATES:
+                with RANKING_UPDATE_LATENCY.labels("rankings").time():
+                    self._rating_index = RatingIndex(list(Ranker.iter_rating_map_rankings(state.rating_map)))
+            elif len(self._changed_video_ids) > 0:
+                with RANKING_UPDATE_LATENCY.labels("rankings_update").time():
+                    ratings = {
+                        video_id: rating.mu if (rating := state.rating_map.get(video_id)) is not None else None
+                        for video_id in self._changed_video_ids
+                    }
+                    self._rating_index.update(ratings)
+            self._changed_video_ids.clear()
+            return self._rating_index, state.watermark
+
+    def get_rating_table(self) -> RatingTable:
+        """Get the rating means and deviations of the videos, bringing the ratings up to date with the record log first.
+
+        Returns:
+            RatingTable: The table of the ratings of the videos.
+        """
+        with self._lock:
+            state = self._sync()
+            if self._rating_table is None:
+                self._rating_table = RatingTable.from_rating_map(state.rating_map)
+            return self._rating_table
+
+    def get_watermark(self) -> RecordLogWatermark:
+        """Get the record log watermark that the current ratings reflect.
+
+        Returns:
+            RecordLogWatermark: The watermark of the last applied record log entry.
+        """
+        with self._lock:
+            return self._sync().watermark
+
+    def _apply_entries(
+        self,
+        state: RankingState,
+        entries: list[RecordLogEntry],
+        watermark: RecordLogWatermark,
+    ) -> RankingState:
+        self._rating_table = None
+        last_checkpoint = self._get_last_checkpoint(state)
+        with RANKING_UPDATE_LATENCY.labels("incremental").time():
+            for entry in entries:
+                if not self._apply_entry(state, entry):
+                    return self._replay(state)
+
+        state.watermark = watermark
+        RANKING_RECORDS.labels().set(len(state.record_ids))
+        # NOTE: State is only persisted at checkpoints and rebuilds, entries after that are re-read from the log
+        # NOTE: Old checkpoints are trimmed as new ones are added, so the last one shows whether the list changed
+        if self._get_last_checkpoint(state) is not last_checkpoint:
+            self.state_file.save(state)
+        return state
+
+    @classmethod
+    def _get_last_checkpoint(cls, state: RankingState) -> Optional[Checkpoint]:
+        return state.checkpoints[-1] if len(state.checkpoints) > 0 else None
+
+    def _apply_entry(self, state: RankingState, entry: RecordLogEntry) -> bool:
+        """Apply a single log entry, returning False if it can only be handled by a replay."""
+        if entry.operation == RecordOperation.ADD and entry.record is not None:
+            self._apply_record(state, entry.record)
+            return True
+
+        if entry.operation == RecordOperation.REMOVE:
+            if entry.record_id not in state.record_id_set:
+                return True
+
+            if len(state.undo_entries) == 0 or state.undo_entries[-1].record_id != entry.record_id:
+                return False
+
+            undo_entry = state.undo_entries.pop()
+            self._changed_video_ids.update(undo_entry.prior_ratings)
+            for video_id, rating in undo_entry.prior_ratings.items():
+                if rating is None:
+                    state.rating_map.pop(video_id, None)
+                else:
+                    state.rating_map[video_id] = rating
+            state.record_id_set.discard(state.record_ids.pop())
+            state.checkpoints = [c for c in state.checkpoints if c.n_records <= len(state.record_ids)]
+            return True
+
+        return True
+
+    def _apply_record(self, state: RankingState, record: Record) -> None:
+        video_ids = [choice.video_id for choice in record.choice_set.choices]
+        prior_ratings = {video_id: state.rating_map.get(video_id) for video_id in video_ids}
+        Ranker.update_rating_map(state.rating_map, [record])
+        # NOTE: Skipped and removed videos without earlier comparisons are never rated, so there is nothing to restore
+        prior_ratings = {video_id: rating for video_id, rating in prior_ratings.items() if video_id in state.rating_map}
+        self._changed_video_ids.update(prior_ratings)
+        state.record_ids.append(record.id)
+        state.record_id_set.add(record.id)
+        RANKING_RECORDS_APPLIED.labels().inc()
+        state.undo_entries.append(UndoEntry(record_id=record.id, prior_ratings=prior_ratings))
+        state.undo_entries = state.undo_entries[-self.MAX_UNDO_ENTRIES :]
+
+        if len(state.record_ids) % self.CHECKPOINT_INTERVAL == 0:
+            self._add_checkpoint(state)
+
+    def _apply_records(self, state: RankingState, records: list[Record]) -> None:
+        if len(records) == 0:
+            return
+
+        # Rate everything but the latest records in bulk, stopping at the checkpoints that will be kept
+        n_latest = min(len(records), self.MAX_UNDO_ENTRIES)
+        bulk_records, latest_records = records[:-n_latest], records[-n_latest:]
+        n_start = len(state.record_ids)
+        n_end = n_start + len(bulk_records)
+        first_checkpoint = max(n_start + 1, n_end + 1 - self.CHECKPOINT_INTERVAL * self.MAX_CHECKPOINTS)
+        first_checkpoint += -first_checkpoint % self.CHECKPOINT_INTERVAL
+        boundaries = [*range(first_checkpoint, n_end + 1, self.CHECKPOINT_INTERVAL), n_end]
+
+        start = 0
+        for boundary in boundaries:
+            chunk = bulk_records[start : boundary - n_start]
+            BatchRanker.update_rating_map(state.rating_map, chunk)
+            state.record_ids.extend(record.id for record in chunk)
+            state.record_id_set.update(record.id for record in chunk)
+            RANKING_RECORDS_APPLIED.labels().inc(len(chunk))
+            start = boundary - n_start
+            if len(chunk) > 0 and boundary % self.CHECKPOINT_INTERVAL == 0:
+                self._add_checkpoint(state)
+
+        # The latest records are applied one at a time so that they can be undone without a replay
+        for record in latest_records:
+            self._apply_record(state, record)
+
+    def _add_checkpoint(self, state: RankingState) -> None:
+        checkpoint = Checkpoint(n_records=len(state.record_ids), rating_map=dict(state.rating_map))
+        state.checkpoints.append(checkpoint)
+        state.checkpoints = state.checkpoints[-self.MAX_CHECKPOINTS :]
+
+    def _replay(self, state: RankingState) -> RankingState:
+        records, watermark = self.record_tracker.snapshot()
+        record_ids = [record.id for record in records]
+
+        # Find the latest checkpoint whose prefix of records is unchanged
+        checkpoint: Optional[Checkpoint] = None
+        for candidate in reversed(state.checkpoints):
+            n = candidate.n_records
+            if n <= len(record_ids) and state.record_ids[:n] == record_ids[:n]:
+                checkpoint = candidate
+                break
+
+        if checkpoint is None:
+            logger.info("No usable ranking checkpoint, rebuilding from %d records", len(records))
+            return self._rebuild_from(records, watermark)
+
+        logger.info(
+            "Replaying %d records from checkpoint at %d", len(records) - checkpoint.n_records, checkpoint.n_records
+        )
+        new_state = RankingState(
+            watermark=watermark,
+            record_ids=record_ids[: checkpoint.n_records],
+            record_id_set=set(record_ids[: checkpoint.n_records]),
+            rating_map=dict(checkpoint.rating_map),
+            checkpoints=[c for c in state.checkpoints if c.n_records <= checkpoint.n_records],
+        )
+        with RANKING_UPDATE_LATENCY.labels("replay").time():
+            self._apply_records(new_state, records[checkpoint.n_records :])
+        return self._set_state(new_state)
+
+    def _rebuild(self) -> RankingState:
+        records, watermark = self.record_tracker.snapshot()
+        return self._rebuild_from(records, watermark)
+
+    def _rebuild_from(self, records: list[Record], watermark: RecordLogWatermark) -> RankingState:
+        state = RankingState(watermark=watermark)
+        with RANKING_UPDATE_LATENCY.labels("rebuild").time():
+            self._apply_records(state, records)
+        return self._set_state(state)
+
+    def _set_state(self, state: RankingState) -> RankingState:
+        self._state = state
+        self._rating_index = None
+        self._changed_video_ids.clear()
+        self._rating_table = None
+        RANKING_RECORDS.labels().set(len(state.record_ids))
+        self.state_file.save(state)
+        return state
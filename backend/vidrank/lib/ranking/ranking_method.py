@@ -0,0 +1,9 @@
+from enum import StrEnum, auto
+
+
+class RankingMethod(StrEnum):
+    """Enum for methods of computing ratings from comparisons."""
+
+    TRUESKILL = auto()
+    BATCH_TRUESKILL = auto()
+    BRADLEY_TERRY = auto()
@@ -0,0 +1,33 @@
+from dataclasses import dataclass
+
+import numpy as np
+from trueskill import global_env
+
+
+@dataclass
+class RatingArrays:
+    """TrueSkill rating means and deviations of videos, indexed like the videos of `Comparisons`."""
+
+    mu: np.ndarray
+    sigma: np.ndarray
+
+    @classmethod
+    def from_prior(cls, n_videos: int) -> "RatingArrays":
+        """Create ratings at the TrueSkill prior.
+
+        Args:
+            n_videos (int): The number of videos.
+
+        Returns:
+            RatingArrays: The prior ratings of the videos.
+        """
+        env = global_env()
+        return cls(mu=np.full(n_videos, env.mu), sigma=np.full(n_videos, env.sigma))
+
+    def copy(self) -> "RatingArrays":
+        """Copy the ratings, so they can be updated in place.
+
+        Returns:
+            RatingArrays: A copy of the ratings as float arrays.
+        """
+        return RatingArrays(mu=self.mu.astype(np.float64, copy=True), sigma=self.sigma.astype(np.float64, copy=True))
@@ -0,0 +1,236 @@
+import threading
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from operator import itemgetter
+from typing import Iterator, Mapping, Optional
+
+import numpy as np
+
+from vidrank.lib.ranking.ranking import Ranking
+
+
+class RatingIndex:
+    """Index of rankings sorted by rating.
+
+    Rankings are kept best first, with ties ordered by video ID, next to their sort keys, so ratings and videos can be
+    found with a binary search. The rating of each video is kept in a dict to build its key. Lookups by video take
+    O(log n) time and queries by rating take O(log n + k) time for k results.
+
+    New ratings for a few videos are applied in place with binary search insertions and deletions instead of a
+    rebuild. Rankings that only moved because other videos moved keep their old rank until they are read, so an update
+    costs a few list operations instead of a new ranking for every video below the changed ones. Updates and reads
+    are serialized by a lock, since the index is read by requests while it is updated.
+    """
+
+    def __init__(self, rankings: list[Ranking]):
+        """Initialize the rating index.
+
+        Args:
+            rankings (list[Ranking]): The rankings, sorted by rating with the best first and ties ordered by video ID.
+        """
+        self._lock = threading.RLock()
+        self._rankings = rankings
+        self._keys = [self._get_key(ranking.video_id, ranking.rating) for ranking in rankings]
+        self._ratings = {ranking.video_id: ranking.rating for ranking in rankings}
+        self._stale_start = len(rankings)
+
+    def __len__(self) -> int:
+        """Get the number of ranked videos.
+
+        Returns:
+            int: The number of ranked videos.
+        """
+        return len(self._rankings)
+
+    @property
+    def rankings(self) -> list[Ranking]:
+        """Get all rankings.
+
+        Returns:
+            list[Ranking]: A copy of the rankings, best first.
+        """
+        with self._lock:
+            for i in range(self._stale_start, len(self._rankings)):
+                self.get_ranking_at(i)
+            self._stale_start = len(self._rankings)
+            return list(self._rankings)
+
+    def update(self, ratings: Mapping[str, Optional[float]]) -> None:
+        """Apply new ratings for a few videos.
+
+        Args:
+            ratings (Mapping[str, Optional[float]]): The new ratings keyed by video ID, with None for videos that are
+                no longer ranked.
+        """
+        with self._lock:
+            changed_positions = []
+            for video_id in ratings:
+                old_rating = self._ratings.pop(video_id, None)
+                if old_rating is not None:
+                    position = bisect_left(self._keys, self._get_key(video_id, old_rating))
+                    del self._rankings[position]
+                    del self._keys[position]
+                    changed_positions.append(position)
+
+            for video_id, rating in ratings.items():
+                if rating is None:
+                    continue
+                key = self._get_key(video_id, rating)
+                position = bisect_left(self._keys, key)
+                self._rankings.insert(position, Ranking(video_id=video_id, rank=position + 1, rating=rating))
+                self._keys.insert(position, key)
+                self._ratings[video_id] = rating
+                changed_positions.append(position)
+
+            self._stale_start = min(self._stale_start, *changed_positions, len(self._rankings))
+
+    def get_position(self, video_id: str) -> Optional[int]:
+        """Get the position of a video in the index.
+
+        Args:
+            video_id (str): The ID of the video.
+
+        Returns:
+            Optional[int]: The position of the video, best first, or None if the video is not ranked.
+        """
+        with self._lock:
+            rating = self._ratings.get(video_id)
+            return None if rating is None else bisect_left(self._keys, self._get_key(video_id, rating))
+
+    def get_ranking(self, video_id: str) -> Optional[Ranking]:
+        """Get the ranking of a video.
+
+        Args:
+            video_id (str): The ID of the video.
+
+        Returns:
+            Optional[Ranking]: The ranking of the video, or None if the video is not ranked.
+        """
+        with self._lock:
+            position = self.get_position(video_id)
+            return None if position is None else self.get_ranking_at(position)
+
+    def get_ranking_at(self, position: int) -> Ranking:
+        """Get the ranking at a position in the index.
+
+        Args:
+            position (int): The position, best first.
+
+        Returns:
+            Ranking: The ranking at the position.
+        """
+        with self._lock:
+            ranking = self._rankings[position]
+            if position >= self._stale_start and ranking.rank != position + 1:
+                ranking = Ranking(video_id=ranking.video_id, rank=position + 1, rating=ranking.rating)
+                self._rankings[position] = ranking
+            return ranking
+
+    def sample(self, rng: np.random.Generator) -> Optional[Ranking]:
+        """Get a ranking drawn uniformly at random.
+
+        Args:
+            rng (np.random.Generator): The random number generator.
+
+        Returns:
+            Optional[Ranking]: The drawn ranking, or None if no video is ranked.
+        """
+        with self._lock:
+            if len(self._rankings) == 0:
+                return None
+            return self.get_ranking_at(int(rng.integers(len(self._rankings))))
+
+    def get_top(self, k: int) -> list[Ranking]:
+        """Get the best rankings.
+
+        Args:
+            k (int): The number of rankings to get.
+
+        Returns:
+            list[Ranking]: The k best rankings, best first.
+        """
+        with self._lock:
+            return [self.get_ranking_at(i) for i in range(min(k, len(self._rankings)))]
+
+    def get_range_bounds(self, min_rating: float, max_rating: float) -> tuple[int, int]:
+        """Get the positions of the rankings with a rating in a range.
+
+        Args:
+            min_rating (float): The lowest rating in the range.
+            max_rating (float): The highest rating in the range.
+
+        Returns:
+            tuple[int, int]: The start and end positions of the rankings in the range, with the end excluded.
+        """
+        with self._lock:
+            start = bisect_left(self._keys, -max_rating, key=itemgetter(0))
+            end = bisect_right(self._keys, -min_rating, key=itemgetter(0))
+            return start, max(start, end)
+
+    def get_range(self, min_rating: float, max_rating: float) -> list[Ranking]:
+        """Get the rankings with a rating in a range.
+
+        Args:
+            min_rating (float): The lowest rating in the range.
+            max_rating (float): The highest rating in the range.
+
+        Returns:
+            list[Ranking]: The rankings in the range, best first.
+        """
+        with self._lock:
+            start, end = self.get_range_bounds(min_rating, max_rating)
+            return [self.get_ranking_at(i) for i in range(start, end)]
+
+    def iter_nearest(self, rating: float) -> Iterator[Ranking]:
+        """Iterate over the rankings in order of their distance to a rating.
+
+        The iteration expands outwards from the position of the rating, so taking the first k rankings only costs
+        O(log n + k). When a higher and a lower rating are equally distant, the higher one comes first. The index is
+        only locked while each ranking is found, so rankings updated during the iteration may be skipped, but each
+        video is yielded at most once.
+
+        Args:
+            rating (float): The rating to measure distances from.
+
+        Yields:
+            Iterator[Ranking]: An iterator over the rankings, nearest first.
+        """
+        with self._lock:
+            above = bisect_left(self._keys, -rating, key=itemgetter(0)) - 1
+        below = above + 1
+        seen_ids: set[str] = set()
+        while True:
+            with self._lock:
+                keys = self._keys
+                # NOTE: Videos may have been removed since the last step, so the positions are kept in bounds
+                above = min(above, len(keys) - 1)
+                below = min(below, len(keys))
+                if above < 0 and below == len(keys):
+                    return
+                if below == len(keys) or (above >= 0 and rating + keys[below][0] >= -keys[above][0] - rating):
+                    ranking = self.get_ranking_at(above)
+                    above -= 1
+                else:
+                    ranking = self.get_ranking_at(below)
+                    below += 1
+            # NOTE: A video that moved past the walk during an update would be visited again, so repeats are skipped
+            if ranking.video_id in seen_ids:
+                continue
+            seen_ids.add(ranking.video_id)
+            yield ranking
+
+    def get_nearest(self, rating: float, k: int) -> list[Ranking]:
+        """Get the rankings nearest to a rating.
+
+        Args:
+            rating (float): The rating to measure distances from.
+            k (int): The number of rankings to get.
+
+        Returns:
+            list[Ranking]: The k nearest rankings, nearest first.
+        """
+        return list(islice(self.iter_nearest(rating), k))
+
+    @classmethod
+    def _get_key(cls, video_id: str, rating: float) -> tuple[float, str]:
+        return -rating, video_id
@@ -0,0 +1,52 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+from trueskill import Rating, global_env
+
+
+@dataclass
+class RatingTable:
+    """Means and deviations of the ratings of all rated videos, stored as arrays for vectorized scoring."""
+
+    video_ids: list[str]
+    mu: np.ndarray
+    sigma: np.ndarray
+    positions: dict[str, int] = field(init=False)
+
+    def __post_init__(self) -> None:
+        """Index the positions of the videos."""
+        self.positions = {video_id: i for i, video_id in enumerate(self.video_ids)}
+
+    @classmethod
+    def from_rating_map(cls, rating_map: dict[str, Rating]) -> "RatingTable":
+        """Create a rating table from a rating map.
+
+        Args:
+            rating_map (dict[str, Rating]): The ratings of the videos, keyed by video ID.
+
+        Returns:
+            RatingTable: The table of the ratings.
+        """
+        return cls(
+            video_ids=list(rating_map),
+            mu=np.array([rating.mu for rating in rating_map.values()], dtype=np.float64),
+            sigma=np.array([rating.sigma for rating in rating_map.values()], dtype=np.float64),
+        )
+
+    def get_ratings(self, video_ids: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        """Get the rating means and deviations of videos, using the TrueSkill prior for videos that are not rated.
+
+        Args:
+            video_ids (list[str]): The IDs of the videos.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The rating means and deviations of the videos, in order.
+        """
+        env = global_env()
+        indices = np.array([self.positions.get(video_id, -1) for video_id in video_ids], dtype=np.int64)
+        rated = indices >= 0
+        mu = np.full(len(video_ids), env.mu)
+        sigma = np.full(len(video_ids), env.sigma)
+        mu[rated] = self.mu[indices[rated]]
+        sigma[rated] = self.sigma[indices[rated]]
+        return mu, sigma
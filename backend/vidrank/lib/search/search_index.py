@@ -0,0 +1,222 @@
+import hashlib
+import heapq
+import logging
+import math
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import ClassVar, Iterable, Optional
+
+from vidrank.lib.caching.state_file import StateFile
+from vidrank.lib.youtube.playlist import Playlist
+from vidrank.lib.youtube.playlist_delta import PlaylistDelta
+from vidrank.lib.youtube.playlist_item import PlaylistItem
+from vidrank.lib.youtube.youtube_facade import YouTubeFacade
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """A video matching a search query."""
+
+    video_id: str
+    score: float
+
+
+@dataclass
+class SearchIndexState:
+    """Persisted state of the search index."""
+
+    playlist_id: str
+    documents: dict[str, list[str]] = field(default_factory=dict)
+    fingerprints: dict[str, bytes] = field(default_factory=dict)
+    postings: dict[str, dict[str, float]] = field(default_factory=dict)
+
+
+class SearchIndex:
+    """Inverted index over the titles, descriptions and channel names of the videos in a playlist.
+
+    Every token maps to the videos containing it, with a weight that adds up the fields it appears in, titles counting
+    the most. Queries match every term, the last one as a prefix so results can update while a query is typed, and
+    rank videos by the inverse document frequency of each term times its saturated weight. The index is updated with
+    the deltas of playlist syncs and persisted, so it is only built from scratch once. A fingerprint of the text of
+    each video is kept, so videos whose title, description or channel was edited are indexed again.
+    """
+
+    FIELD_WEIGHTS: ClassVar[dict[str, float]] = {"title": 3.0, "channel": 2.0, "description": 1.0}
+    SATURATION: ClassVar[float] = 1.2
+
+    def __init__(self, youtube_facade: YouTubeFacade, playlist_id: str, cache_dirpath: Path):
+        """Initialize the search index.
+
+        Args:
+            youtube_facade (YouTubeFacade): The facade used to read the playlist.
+            playlist_id (str): The ID of the playlist to index.
+            cache_dirpath (Path): The path to the cache directory.
+        """
+        self.youtube_facade = youtube_facade
+        self.playlist_id = playlist_id
+        self.state_file = StateFile(cache_dirpath / "search" / "search_state.pkl", SearchIndexState)
+
+        self._lock = threading.Lock()
+        self._state: Optional[SearchIndexState] = None
+        self._playlist: Optional[Playlist] = None
+        self._vocabulary: Optional[list[str]] = None
+
+    @classmethod
+    def tokenize(cls, text: str) -> list[str]:
+        """Split text into lowercase word tokens.
+
+        Args:
+            text (str): The text to tokenize.
+
+        Returns:
+            list[str]: The tokens, in order.
+        """
+        return TOKEN_PATTERN.findall(text.casefold())
+
+    def search(self, query: str, n_results: int, prefix: bool = True) -> list[SearchHit]:
+        """Search the playlist for videos matching every term of a query.
+
+        Args:
+            query (str): The search query.
+            n_results (int): The maximum number of hits to return.
+            prefix (bool): Whether the last term of the query also matches tokens it is a prefix of.
+
+        Returns:
+            list[SearchHit]: The best matching videos, best first.
+        """
+        terms = self.tokenize(query)
+        if len(terms) == 0:
+            return []
+
+        playlist = self.youtube_facade.get_playlist(self.playlist_id)
+        with self._lock:
+            state = self._sync(playlist)
+            scores: Optional[dict[str, float]] = None
+            for term_i, term in enumerate(terms):
+                is_prefix = prefix and term_i == len(terms) - 1
+                term_scores = self._score_term(state, term, is_prefix)
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {
+                        video_id: scores[video_id] + s for video_id, s in term_scores.items() if video_id in scores
+                    }
+                if len(scores) == 0:
+                    return []
+
+        top = heapq.nlargest(n_results, (scores or {}).items(), key=lambda x: (x[1], x[0]))
+        return [SearchHit(video_id=video_id, score=score) for video_id, score in top]
+
+    def apply_playlist_delta(self, previous: Optional[Playlist], playlist: Playlist, delta: PlaylistDelta) -> None:
+        """Index the items added to or updated in a playlist and drop the removed ones.
+
+        Args:
+            previous (Optional[Playlist]): The playlist before the sync.
+            playlist (Playlist): The playlist after the sync.
+            delta (PlaylistDelta): The items added to, removed from and updated in the playlist.
+        """
+        with self._lock:
+            state = self._state
+            if state is None or self._playlist is not previous:
+                self._sync(playlist)
+                return
+
+            self._remove_documents(state, delta.removed)
+            self._add_documents(state, [*delta.added, *delta.updated])
+            self._playlist = playlist
+            self.state_file.save(state)
+
+    def _sync(self, playlist: Playlist) -> SearchIndexState:
+        state = self._state
+        if state is None:
+            state = self.state_file.load()
+        if state is None or state.playlist_id != self.playlist_id:
+            state = SearchIndexState(playlist_id=self.playlist_id)
+        self._state = state
+        if playlist is self._playlist:
+            return state
+
+        # NOTE: The index is reconciled with the playlist by fingerprint, so only items added, removed or edited since
+        # it was saved are indexed again
+        item_ids = {item.video_id for item in playlist.items}
+        removed_ids = [video_id for video_id in state.documents if video_id not in item_ids]
+        changed_items = [
+            item for item in playlist.items if state.fingerprints.get(item.video_id) != self._get_fingerprint(item)
+        ]
+        if len(removed_ids) != 0 or len(changed_items) != 0:
+            logger.info("Indexing %d changed and %d removed videos for search", len(changed_items), len(removed_ids))
+            self._remove_documents(state, removed_ids)
+            self._add_documents(state, changed_items)
+            self.state_file.save(state)
+        self._playlist = playlist
+        return state
+
+    def _score_term(self, state: SearchIndexState, term: str, is_prefix: bool) -> dict[str, float]:
+        tokens = self._get_prefixed_tokens(state, term) if is_prefix else [term]
+        n_documents = len(state.documents)
+        term_scores: dict[str, float] = {}
+        for token in tokens:
+            postings = state.postings.get(token)
+            if postings is None:
+                continue
+            idf = math.log(1 + n_documents / len(postings))
+            for video_id, weight in postings.items():
+                score = idf * weight / (weight + self.SATURATION)
+                if score > term_scores.get(video_id, 0.0):
+                    term_scores[video_id] = score
+        return term_scores
+
+    def _get_prefixed_tokens(self, state: SearchIndexState, prefix: str) -> list[str]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(state.postings)
+        vocabulary = self._vocabulary
+        tokens = []
+        for token_i in range(bisect_left(vocabulary, prefix), len(vocabulary)):
+            if not vocabulary[token_i].startswith(prefix):
+                break
+            tokens.append(vocabulary[token_i])
+        return tokens
+
+    def _add_documents(self, state: SearchIndexState, items: list[PlaylistItem]) -> None:
+        if len(items) == 0:
+            return
+
+        for item in items:
+            fields = {"title": item.title, "channel": item.channel, "description": item.description}
+            weights: dict[str, float] = defaultdict(float)
+            for field_name, text in fields.items():
+                for token in self.tokenize(text):
+                    weights[token] += self.FIELD_WEIGHTS[field_name]
+
+            self._remove_documents(state, [item.video_id])
+            state.documents[item.video_id] = list(weights)
+            state.fingerprints[item.video_id] = self._get_fingerprint(item)
+            for token, weight in weights.items():
+                state.postings.setdefault(token, {})[item.video_id] = weight
+        self._vocabulary = None
+
+    def _remove_documents(self, state: SearchIndexState, video_ids: Iterable[str]) -> None:
+        for video_id in video_ids:
+            tokens = state.documents.pop(video_id, None)
+            state.fingerprints.pop(video_id, None)
+            if tokens is None:
+                continue
+            for token in tokens:
+                postings = state.postings[token]
+                del postings[video_id]
+                if len(postings) == 0:
+                    del state.postings[token]
+            self._vocabulary = None
+
+    @classmethod
+    def _get_fingerprint(cls, item: PlaylistItem) -> bytes:
+        text = "\0".join([item.title, item.channel, item.description])
+        return hashlib.blake2b(text.encode(), digest_size=8).digest()
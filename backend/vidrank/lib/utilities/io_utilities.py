@@ -3,6 +3,7 @@ from vidrank.lib.utilities.url_utilities import url_from_channel_id, url_from_pl
 from vidrank.lib.youtube.channel import Channel
 from vidrank.lib.youtube.playlist import Playlist
 from vidrank.lib.youtube.video import Video
+from vidrank.lib.youtube.video_summary import VideoSummary
 
 
 def print_video(video: Video) -> None:
@@ -29,11 +30,11 @@ def print_video(video: Video) -> None:
     print(f"\tComments: {video.stats.n_comments}")
 
 
-def print_video_simple(video: Video) -> None:
+def print_video_simple(video: VideoSummary) -> None:
     """Print simplified YouTube video details to the console.
 
     Args:
-        video (Video): The video to print.
+        video (VideoSummary): The summary of the video to print.
     """
     print(f"URL: {url_from_video_id(video.id)}")
     print(f"Title: {video.title}")
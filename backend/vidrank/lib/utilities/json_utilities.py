@@ -0,0 +1,61 @@
+import json
+import re
+from typing import Any
+from uuid import uuid4
+
+# NOTE: The token makes the placeholders impossible to guess, so strings in the content cannot be mistaken for them
+_PLACEHOLDER_PREFIX = f"__vidrank_json_{uuid4().hex}_"
+_PLACEHOLDER_PATTERN = re.compile(rb'"' + re.escape(_PLACEHOLDER_PREFIX.encode()) + rb'(\d+)"')
+
+
+def dump_json(content: Any) -> bytes:
+    """Serialize content to JSON bytes exactly the way the JSON responses of the API are rendered.
+
+    Args:
+        content (Any): The JSON compatible content.
+
+    Returns:
+        bytes: The UTF-8 encoded JSON.
+    """
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def dump_json_with_fragments(content: Any) -> bytes:
+    """Serialize content to JSON bytes, splicing in any `bytes` values as already serialized JSON.
+
+    The content is encoded in a single pass of the C encoder with a placeholder for each fragment, and the
+    placeholders are then replaced by the fragments. The output is byte for byte the same as `dump_json` of the content
+    with each fragment decoded in place.
+
+    Args:
+        content (Any): The JSON compatible content, where `bytes` values hold serialized JSON.
+
+    Returns:
+        bytes: The UTF-8 encoded JSON.
+    """
+    fragments: list[bytes] = []
+
+    def default(value: Any) -> str:
+        if isinstance(value, bytes):
+            fragments.append(value)
+            return f"{_PLACEHOLDER_PREFIX}{len(fragments) - 1}"
+        msg = f"Object of type {type(value).__name__} is not JSON serializable"
+        raise TypeError(msg)
+
+    data = json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+        default=default,
+    ).encode("utf-8")
+    if len(fragments) == 0:
+        return data
+    return _PLACEHOLDER_PATTERN.sub(lambda match: fragments[int(match[1])], data)
@@ -0,0 +1,38 @@
+import math
+
+import numpy as np
+
+
+def normal_cdf(x: np.ndarray) -> np.ndarray:
+    """Compute the cumulative distribution function of the standard normal distribution.
+
+    Args:
+        x (np.ndarray): The values to evaluate.
+
+    Returns:
+        np.ndarray: The probabilities of a standard normal variable being at most each value.
+    """
+    return 0.5 * _erfc(-x / math.sqrt(2))
+
+
+def normal_pdf(x: np.ndarray) -> np.ndarray:
+    """Compute the probability density function of the standard normal distribution.
+
+    Args:
+        x (np.ndarray): The values to evaluate.
+
+    Returns:
+        np.ndarray: The densities of the standard normal distribution at each value.
+    """
+    return np.exp(-(x**2) / 2) / math.sqrt(2 * math.pi)
+
+
+def _erfc(x: np.ndarray) -> np.ndarray:
+    # Same Chebyshev approximation as the trueskill backend, so both rankers agree to floating point precision
+    z = np.abs(x)
+    t = 1.0 / (1.0 + z / 2.0)
+    poly = -0.82215223 + t * 0.17087277
+    for coeff in [1.48851587, -1.13520398, 0.27886807, -0.18628806, 0.09678418, 0.37409196, 1.00002368]:
+        poly = coeff + t * poly
+    r = t * np.exp(-z * z - 1.26551223 + t * poly)
+    return np.where(x < 0, 2.0 - r, r)
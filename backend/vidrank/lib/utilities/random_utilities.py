@@ -0,0 +1,23 @@
+from typing import Iterator
+
+import numpy as np
+
+
+def iter_sample_indices(rng: np.random.Generator, n: int) -> Iterator[int]:
+    """Sample indices without replacement, drawing each one only when it is needed.
+
+    This is a Fisher-Yates shuffle that only records the swapped positions, so drawing k indices costs O(k) time and
+    memory no matter how large the range is.
+
+    Args:
+        rng (np.random.Generator): The random number generator.
+        n (int): The number of indices to sample from.
+
+    Yields:
+        Iterator[int]: An iterator over the indices from 0 to n in a random order.
+    """
+    swapped: dict[int, int] = {}
+    for i in range(n):
+        j = int(rng.integers(i, n))
+        yield swapped.get(j, j)
+        swapped[j] = swapped.pop(i, i)
@@ -0,0 +1,231 @@
+import asyncio
+import logging
+import math
+import time
+from typing import Optional
+
+from httpx import AsyncClient as AsyncHttpClient
+from httpx import HTTPError, Limits
+
+from vidrank.lib.metrics.metrics import YOUTUBE_REQUEST_ERRORS, YOUTUBE_REQUEST_LATENCY, YOUTUBE_REQUESTS
+from vidrank.lib.profiling.request_profiler import RequestProfiler
+from vidrank.lib.utilities.typing_utilities import JsonObject
+from vidrank.lib.youtube.channel import Channel
+from vidrank.lib.youtube.fetch_limits import FetchLimits
+from vidrank.lib.youtube.playlist import Playlist
+from vidrank.lib.youtube.playlist_item import PlaylistItem
+from vidrank.lib.youtube.quota_scheduler import QuotaScheduler
+from vidrank.lib.youtube.video import Video
+from vidrank.lib.youtube.youtube_client import QueryParams, YouTubeClient
+from vidrank.lib.youtube.youtube_marshaller import YouTubeMarshaller
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncYouTubeClient:
+    """Asynchronous client for the YouTube API.
+
+    Video chunks are requested concurrently over a shared pool of keep-alive connections, with the number of requests
+    in flight bounded by the `max_concurrency` of its fetch limits. Pages of playlist items depend on the previous page
+    token, so they are still requested one after another.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        *,
+        scheduler: Optional[QuotaScheduler] = None,
+        base_url: str = YouTubeClient.BASE_URL,
+        fetch_limits: Optional[FetchLimits] = None,
+    ):
+        """Initialize the AsyncYouTubeClient.
+
+        Args:
+            api_key (str): The API key for the YouTube API.
+            scheduler (Optional[QuotaScheduler]): The scheduler that paces requests and tracks quota usage.
+            base_url (str): The base URL of the YouTube Data API, which can point at a local fake for load tests.
+            fetch_limits (Optional[FetchLimits]): The batch size and the maximum number of requests in flight at once.
+        """
+        fetch_limits = FetchLimits() if fetch_limits is None else fetch_limits
+        self.api_key = api_key
+        self.batch_size = fetch_limits.batch_size
+        self.max_concurrency = fetch_limits.max_concurrency
+        self.scheduler = scheduler
+        self.base_url = base_url
+        limits = Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+        self.http_client = AsyncHttpClient(limits=limits)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def get_videos(self, video_ids: list[str], timeout: Optional[int] = None) -> list[Video]:
+        """Get videos by their IDs, requesting all chunks concurrently.
+
+        Args:
+            video_ids (list[str]): The IDs of the videos to fetch.
+            timeout (int): The timeout for each request.
+
+        Returns:
+            list[Video]: The videos that were found, in the order returned by the API for each chunk.
+
+        Raises:
+            ValueError: If the API request fails.
+        """
+        n_chunks = math.ceil(len(video_ids) / self.batch_size)
+        chunks = [video_ids[i * self.batch_size : (i + 1) * self.batch_size] for i in range(n_chunks)]
+        chunk_videos = await asyncio.gather(*[self._get_video_chunk(chunk_ids, timeout) for chunk_ids in chunks])
+        return [video for videos in chunk_videos for video in videos]
+
+    async def get_channel(self, channel_id: str, timeout: Optional[int] = None) -> Channel:
+        """Get a channel by its ID.
+
+        Args:
+            channel_id (str): The ID of the channel to fetch.
+            timeout (int): The timeout for the request.
+
+        Returns:
+            Channel: The channel with the given ID.
+
+        Raises:
+            ValueError: If the API request fails.
+        """
+        params: QueryParams = {
+            "id": channel_id,
+            "key": self.api_key,
+            "hl": "en_US",
+            "part": ["id", "snippet", "statistics"],
+        }
+
+        logger.debug("Requesting channel from the YouTube API.")
+
+        response_json = await self._get_json("channels", params, timeout)
+        if "error" in response_json:
+            raise ValueError(response_json["error"]["message"])
+        if response_json["pageInfo"]["totalResults"] == 0:
+            msg = f"Channel with ID {channel_id} not found"
+            raise ValueError(msg)
+
+        response_item = response_json["items"][0]
+        return YouTubeMarshaller.parse_channel(response_item)
+
+    async def get_playlist(self, playlist_id: str, timeout: Optional[int] = None) -> Playlist:
+        """Get a playlist by its ID, requesting its details and its items concurrently.
+
+        Args:
+            playlist_id (str): The ID of the playlist to fetch.
+            timeout (int): The timeout for each request.
+
+        Returns:
+            Playlist: The playlist with the given ID.
+
+        Raises:
+            ValueError: If the API request fails.
+        """
+        params: QueryParams = {
+            "id": playlist_id,
+            "key": self.api_key,
+            "hl": "en_US",
+            "part": ["id", "snippet"],
+        }
+
+        logger.debug("Requesting playlist from the YouTube API.")
+
+        response_json, items = await asyncio.gather(
+            self._get_json("playlists", params, timeout),
+            self._get_playlist_items(playlist_id, timeout),
+        )
+        if "error" in response_json:
+            raise ValueError(response_json["error"]["message"])
+        if response_json["pageInfo"]["totalResults"] == 0:
+            msg = f"Playlist with ID {playlist_id} not found"
+            raise ValueError(msg)
+
+        response_item = response_json["items"][0]
+        return YouTubeMarshaller.parse_playlist(response_item, items)
+
+    async def aclose(self) -> None:
+        """Close the pooled connections."""
+        await self.http_client.aclose()
+
+    async def _get_video_chunk(self, chunk_ids: list[str], timeout: Optional[int]) -> list[Video]:
+        logger.debug("Requesting %d videos from the YouTube API.", len(chunk_ids))
+
+        params: QueryParams = {
+            "id": ",".join(chunk_ids),
+            "key": self.api_key,
+            "hl": "en_US",
+            "part": YouTubeClient.VIDEO_PARTS,
+            "maxResults": self.batch_size,
+        }
+
+        videos: list[Video] = []
+        page_token = None
+        while True:
+            request_params = {**params}
+            if page_token is not None:
+                request_params["pageToken"] = page_token
+
+            response_json = await self._get_json("videos", request_params, timeout)
+            if "error" in response_json:
+                raise ValueError(response_json["error"]["message"])
+
+            videos.extend(YouTubeMarshaller.parse_video(response_item) for response_item in response_json["items"])
+
+            if "nextPageToken" in response_json:
+                page_token = response_json["nextPageToken"]
+            else:
+                return videos
+
+    async def _get_playlist_items(self, playlist_id: str, timeout: Optional[int]) -> list[PlaylistItem]:
+        params: QueryParams = {
+            "playlistId": playlist_id,
+            "key": self.api_key,
+            "hl": "en_US",
+            "part": YouTubeClient.PLAYLIST_PARTS,
+            "maxResults": self.batch_size,
+        }
+
+        items: list[PlaylistItem] = []
+        page_token = None
+        while True:
+            request_params = {**params}
+            if page_token is not None:
+                request_params["pageToken"] = page_token
+
+            logger.debug("Requesting playlist items from the YouTube API.")
+
+            response_json = await self._get_json("playlistItems", request_params, timeout)
+            if "error" in response_json:
+                not_found_code = 404
+                if response_json["error"]["code"] == not_found_code:
+                    msg = f"Playlist with ID {playlist_id} not found"
+                    raise ValueError(msg)
+                raise ValueError(response_json["error"]["message"])
+
+            items.extend(
+                YouTubeMarshaller.parse_playlist_item(response_item) for response_item in response_json["items"]
+            )
+
+            if "nextPageToken" in response_json:
+                page_token = response_json["nextPageToken"]
+            else:
+                return items
+
+    async def _get_json(self, resource: str, params: QueryParams, timeout: Optional[int]) -> JsonObject:
+        if self.scheduler is not None:
+            await self.scheduler.acquire_async(resource)
+
+        request_url = f"{self.base_url}/{resource}"
+        async with self._semaphore:
+            YOUTUBE_REQUESTS.labels(resource).inc()
+            start = time.perf_counter()
+            try:
+                with RequestProfiler.section(f"youtube.{resource}"):
+                    response = await self.http_client.get(request_url, params=params, timeout=timeout)
+            except HTTPError:
+                YOUTUBE_REQUEST_ERRORS.labels(resource).inc()
+                raise
+            finally:
+                YOUTUBE_REQUEST_LATENCY.labels(resource).observe(time.perf_counter() - start)
+        if response.is_error:
+            YOUTUBE_REQUEST_ERRORS.labels(resource).inc()
+        logger.debug("Request URL: %s", response.request.url)
+        return response.json()
@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+from vidrank.lib.youtube.youtube_client import YouTubeClient
+
+
+@dataclass(frozen=True)
+class FetchLimits:
+    """Limits on how the asynchronous YouTube client splits and overlaps requests."""
+
+    batch_size: int = YouTubeClient.DEFAULT_BATCH_SIZE
+    max_concurrency: int = 8
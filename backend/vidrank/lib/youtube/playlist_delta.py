@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+
+from vidrank.lib.youtube.playlist_item import PlaylistItem
+
+
+class PlaylistDelta(BaseModel):
+    """Changes to the items of a playlist between two syncs.
+
+    Updated items are items whose title, description or channel changed, not items that only moved.
+    """
+
+    added: list[PlaylistItem]
+    removed: list[str]
+    updated: list[PlaylistItem]
+
+    def is_empty(self) -> bool:
+        """Check if the playlist did not change.
+
+        Returns:
+            bool: True if no items were added, removed or updated, False otherwise.
+        """
+        return len(self.added) == 0 and len(self.removed) == 0 and len(self.updated) == 0
@@ -1,3 +1,5 @@
+from typing import Any
+
 from pydantic import BaseModel
 from pydantic_extra_types.pendulum_dt import DateTime
 
@@ -13,3 +15,24 @@ class PlaylistItem(BaseModel):
     title: str
     description: str
     thumbnails: ThumbnailSet
+    channel: str = ""
+
+    def __setstate__(self, state: dict[Any, Any]) -> None:
+        """Restore the item from its pickled state, filling in fields that were added since it was cached.
+
+        Args:
+            state (dict[Any, Any]): The pickled state of the model.
+        """
+        state["__dict__"].setdefault("channel", "")
+        super().__setstate__(state)
+
+    def has_same_text(self, other: "PlaylistItem") -> bool:
+        """Check if another item has the same title, description and channel.
+
+        Args:
+            other (PlaylistItem): The item to compare with.
+
+        Returns:
+            bool: True if the searchable text of the items is the same, False otherwise.
+        """
+        return (self.title, self.description, self.channel) == (other.title, other.description, other.channel)
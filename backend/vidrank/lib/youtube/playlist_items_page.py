@@ -0,0 +1,14 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+from vidrank.lib.youtube.playlist_item import PlaylistItem
+
+
+class PlaylistItemsPage(BaseModel):
+    """One page of playlist items from the YouTube API."""
+
+    items: list[PlaylistItem]
+    next_page_token: Optional[str]
+    total_results: int
+    etag: Optional[str]
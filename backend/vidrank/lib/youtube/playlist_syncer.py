@@ -0,0 +1,179 @@
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+from vidrank.lib.youtube.playlist import Playlist
+from vidrank.lib.youtube.playlist_delta import PlaylistDelta
+from vidrank.lib.youtube.playlist_item import PlaylistItem
+from vidrank.lib.youtube.quota_scheduler import QuotaScheduler
+from vidrank.lib.youtube.request_priority import RequestPriority
+from vidrank.lib.youtube.youtube_facade import YouTubeFacade
+
+logger = logging.getLogger(__name__)
+
+# Called with the playlist before the sync, the playlist after the sync, and the delta between them
+PlaylistListener = Callable[[Optional[Playlist], Playlist, PlaylistDelta], None]
+
+
+class PlaylistSyncer:
+    """Keeps a cached playlist up to date with the YouTube API.
+
+    The first page of items is requested with the ETag of the previous sync, so an unchanged playlist costs a single
+    304 response. Otherwise pages are requested in position order only until a page contains items that are already
+    known. If the number of known and new items then adds up to the total reported by the API, the remaining items are
+    kept from the cache. If not, something was removed and the rest of the playlist is paged through to find it. A
+    removal paired with an addition further along keeps the total unchanged, so the whole playlist is also paged
+    through periodically to reconcile it. Listeners receive the delta so they can update their indexes instead of
+    rebuilding them.
+    """
+
+    FULL_SYNC_SECONDS = 6 * 60 * 60
+
+    def __init__(
+        self,
+        youtube_facade: YouTubeFacade,
+        playlist_id: str,
+        *,
+        interval_seconds: Optional[float] = None,
+    ):
+        """Initialize the playlist syncer.
+
+        Args:
+            youtube_facade (YouTubeFacade): The facade whose client and playlist cache are used.
+            playlist_id (str): The ID of the playlist to sync.
+            interval_seconds (Optional[float]): The time between background syncs, or None to only sync on demand.
+        """
+        self.youtube_facade = youtube_facade
+        self.playlist_id = playlist_id
+        self.interval_seconds = interval_seconds
+
+        self._lock = threading.Lock()
+        self._etag: Optional[str] = None
+        self._full_synced_at = time.monotonic()
+        self._listeners: list[PlaylistListener] = []
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_listener(self, listener: PlaylistListener) -> None:
+        """Register a function to call with every non-empty delta.
+
+        Args:
+            listener (PlaylistListener): The function to call.
+        """
+        self._listeners.append(listener)
+
+    def sync(self) -> PlaylistDelta:
+        """Bring the cached playlist up to date.
+
+        Returns:
+            PlaylistDelta: The items added to, removed from and updated in the playlist since the last sync.
+
+        Raises:
+            ValueError: If the API request fails.
+        """
+        with self._lock:
+            previous = self.youtube_facade.playlist_cache.get(self.playlist_id)
+            if previous is None:
+                playlist = self.youtube_facade.get_playlist(self.playlist_id, use_cache=False)
+                self._full_synced_at = time.monotonic()
+                delta = PlaylistDelta(added=playlist.items, removed=[], updated=[])
+            else:
+                result = self._sync_items(previous)
+                if result is None:
+                    return PlaylistDelta(added=[], removed=[], updated=[])
+                items, delta = result
+                if delta.is_empty():
+                    return delta
+                playlist = previous.model_copy(update={"items": items})
+                self.youtube_facade.playlist_cache.add(playlist.id, playlist)
+
+            logger.info(
+                "Synced playlist %s: %d added, %d removed, %d updated",
+                self.playlist_id,
+                len(delta.added),
+                len(delta.removed),
+                len(delta.updated),
+            )
+            for listener in self._listeners:
+                listener(previous, playlist, delta)
+            return delta
+
+    def start(self) -> None:
+        """Start syncing in a background thread, if an interval is configured."""
+        if self.interval_seconds is None or self._thread is not None:
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="playlist-syncer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval_seconds):
+            try:
+                with QuotaScheduler.priority(RequestPriority.BACKGROUND):
+                    self.sync()
+            except Exception:
+                logger.exception("Failed to sync playlist %s", self.playlist_id)
+
+    def _sync_items(self, previous: Playlist) -> Optional[tuple[list[PlaylistItem], PlaylistDelta]]:
+        youtube_client = self.youtube_facade.youtube_client
+        known_items = {item.video_id: item for item in previous.items}
+
+        # NOTE: An unchanged first page says nothing about removals further along, so full syncs skip the ETag
+        full_sync = time.monotonic() - self._full_synced_at >= self.FULL_SYNC_SECONDS
+        etag = None if full_sync else self._etag
+        page = youtube_client.get_playlist_items_page(self.playlist_id, etag=etag)
+        if page is None:
+            logger.debug("Playlist %s has not changed", self.playlist_id)
+            return None
+        first_page_etag = page.etag
+
+        fetched_items = list(page.items)
+        n_added = sum(1 for item in page.items if item.video_id not in known_items)
+        reached_known = n_added < len(page.items)
+        while page.next_page_token is not None:
+            if reached_known and not full_sync:
+                # NOTE: If the known and new items do not add up to the total, something was removed further along
+                if len(known_items) + n_added == page.total_results:
+                    break
+                full_sync = True
+
+            page = youtube_client.get_playlist_items_page(self.playlist_id, page_token=page.next_page_token)
+            if page is None:
+                msg = f"Unexpected not modified response for playlist {self.playlist_id}"
+                raise ValueError(msg)
+            fetched_items.extend(page.items)
+            page_added = sum(1 for item in page.items if item.video_id not in known_items)
+            n_added += page_added
+            reached_known |= page_added < len(page.items)
+
+        self._etag = first_page_etag
+        fetched_ids = {item.video_id for item in fetched_items}
+        if page.next_page_token is None:
+            self._full_synced_at = time.monotonic()
+            items = fetched_items
+            removed = [item.video_id for item in previous.items if item.video_id not in fetched_ids]
+        else:
+            # NOTE: Nothing was removed, so the items that were not fetched only moved down behind the fetched ones
+            unfetched_items = [item for item in previous.items if item.video_id not in fetched_ids]
+            items = fetched_items + [
+                item.model_copy(update={"position": position})
+                for position, item in enumerate(unfetched_items, start=len(fetched_items))
+            ]
+            removed = []
+
+        added = [item for item in fetched_items if item.video_id not in known_items]
+        updated = [
+            item
+            for item in fetched_items
+            if (known_item := known_items.get(item.video_id)) is not None and not item.has_same_text(known_item)
+        ]
+        return items, PlaylistDelta(added=added, removed=removed, updated=updated)
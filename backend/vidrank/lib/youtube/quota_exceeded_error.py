@@ -0,0 +1,12 @@
+class QuotaExceededError(ValueError):
+    """Error raised when a YouTube API request would exceed the daily quota."""
+
+    def __init__(self, message: str, retry_after_seconds: int):
+        """Initialize the error.
+
+        Args:
+            message (str): The error message.
+            retry_after_seconds (int): The number of seconds until the quota resets.
+        """
+        super().__init__(message)
+        self.retry_after_seconds = retry_after_seconds
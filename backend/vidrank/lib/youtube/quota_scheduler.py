@@ -0,0 +1,251 @@
+import asyncio
+import atexit
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import ClassVar, Iterator, Optional
+
+import pendulum
+from pydantic import ValidationError
+
+from vidrank.lib.youtube.quota_exceeded_error import QuotaExceededError
+from vidrank.lib.youtube.quota_usage import QuotaUsage
+from vidrank.lib.youtube.request_priority import RequestPriority
+
+logger = logging.getLogger(__name__)
+
+_request_priority: ContextVar[RequestPriority] = ContextVar("request_priority", default=RequestPriority.INTERACTIVE)
+
+
+@dataclass
+class TokenBucket:
+    """Token bucket that limits the request rate of one endpoint."""
+
+    rate: float
+    capacity: float
+    tokens: float
+    updated_at: float
+
+    def reserve(self, now: float, reserved_tokens: float) -> float:
+        """Take a token, going into debt if none is available.
+
+        Args:
+            now (float): The current monotonic time.
+            reserved_tokens (float): The number of tokens that must be left for other requests.
+
+        Returns:
+            float: The number of seconds to wait before sending the request.
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        wait_seconds = max(0.0, (1.0 + reserved_tokens - self.tokens) / self.rate)
+        self.tokens -= 1.0
+        return wait_seconds
+
+
+class QuotaScheduler:
+    """Scheduler that keeps YouTube API requests within rate limits and the daily quota.
+
+    Every endpoint has a token bucket that spaces out bursts of requests. Each request is charged the unit cost of its
+    endpoint against a daily quota that resets at midnight Pacific time, and the counters are persisted so that they
+    survive restarts. Counters are written at most once per save interval and when the process exits, so requests do
+    not each rewrite the file. Background requests leave part of every bucket and part of the daily quota to interactive
+    requests, and are refused once only that reserve is left.
+    """
+
+    UNIT_COSTS: ClassVar[dict[str, int]] = {
+        "videos": 1,
+        "playlistItems": 1,
+        "playlists": 1,
+        "channels": 1,
+    }
+
+    PRIORITY_RANKS: ClassVar[dict[RequestPriority, int]] = {
+        RequestPriority.BACKGROUND: 0,
+        RequestPriority.INTERACTIVE: 1,
+    }
+
+    DEFAULT_DAILY_LIMIT = 10_000
+    DEFAULT_REQUESTS_PER_SECOND = 5.0
+    DEFAULT_BURST = 10
+    INTERACTIVE_RESERVE_FRACTION = 0.2
+    SAVE_INTERVAL_SECONDS = 5.0
+    QUOTA_TIMEZONE = "America/Los_Angeles"
+
+    def __init__(
+        self,
+        state_filepath: Optional[Path] = None,
+        *,
+        daily_limit: int = DEFAULT_DAILY_LIMIT,
+        requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+        burst: int = DEFAULT_BURST,
+    ):
+        """Initialize the quota scheduler.
+
+        Args:
+            state_filepath (Optional[Path]): The path to persist usage counters to, or None to keep them in memory.
+            daily_limit (int): The number of quota units available per day.
+            requests_per_second (float): The sustained request rate allowed per endpoint.
+            burst (int): The number of requests per endpoint that can be sent at once.
+        """
+        self.filepath = state_filepath
+        self.daily_limit = daily_limit
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+
+        self._lock = threading.Lock()
+        self._buckets: dict[str, TokenBucket] = {}
+        self._usage = self._load_usage()
+        self._is_dirty = False
+        self._saved_at = -math.inf
+        if self.filepath is not None:
+            atexit.register(self.flush)
+
+    @classmethod
+    @contextmanager
+    def priority(cls, priority: RequestPriority) -> Iterator[None]:
+        """Set the priority of the requests made in a block.
+
+        Args:
+            priority (RequestPriority): The priority of the requests.
+
+        Yields:
+            Iterator[None]: A context in which requests have the given priority.
+        """
+        token = _request_priority.set(priority)
+        try:
+            yield
+        finally:
+            _request_priority.reset(token)
+
+    @classmethod
+    def get_priority_rank(cls) -> int:
+        """Get the rank of the priority of the requests made in the current context.
+
+        Returns:
+            int: The rank of the priority, higher for more urgent requests.
+        """
+        return cls.PRIORITY_RANKS[_request_priority.get()]
+
+    def acquire(self, endpoint: str) -> None:
+        """Wait until a request to an endpoint may be sent, and charge it against the quota.
+
+        Args:
+            endpoint (str): The API endpoint, like "videos" or "playlistItems".
+
+        Raises:
+            QuotaExceededError: If the request would exceed the quota available to its priority.
+        """
+        wait_seconds = self._reserve(endpoint)
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+
+    async def acquire_async(self, endpoint: str) -> None:
+        """Wait without blocking the event loop until a request to an endpoint may be sent.
+
+        Args:
+            endpoint (str): The API endpoint, like "videos" or "playlistItems".
+
+        Raises:
+            QuotaExceededError: If the request would exceed the quota available to its priority.
+        """
+        wait_seconds = self._reserve(endpoint)
+        if wait_seconds > 0:
+            await asyncio.sleep(wait_seconds)
+
+    def get_usage(self) -> QuotaUsage:
+        """Get the quota units used today.
+
+        Returns:
+            QuotaUsage: A copy of today's usage counters.
+        """
+        with self._lock:
+            self._roll_over()
+            return self._usage.model_copy(deep=True)
+
+    def flush(self) -> None:
+        """Persist the usage counters if they changed since they were last saved."""
+        with self._lock:
+            if self._is_dirty:
+                self._save_usage(time.monotonic())
+
+    def _reserve(self, endpoint: str) -> float:
+        priority = _request_priority.get()
+        cost = self.UNIT_COSTS.get(endpoint, 1)
+        with self._lock:
+            self._roll_over()
+            usage = self._usage
+            limit = self.daily_limit
+            if priority == RequestPriority.BACKGROUND:
+                limit -= int(self.daily_limit * self.INTERACTIVE_RESERVE_FRACTION)
+            if usage.units_used + cost > limit:
+                msg = f"YouTube API quota exceeded for {priority} requests: {usage.units_used} of {limit} units used"
+                raise QuotaExceededError(msg, retry_after_seconds=self._get_seconds_until_reset())
+
+            now = time.monotonic()
+            usage.units_used += cost
+            usage.units_by_endpoint[endpoint] = usage.units_by_endpoint.get(endpoint, 0) + cost
+            self._is_dirty = True
+            if now - self._saved_at >= self.SAVE_INTERVAL_SECONDS:
+                self._save_usage(now)
+
+            bucket = self._buckets.get(endpoint)
+            if bucket is None:
+                bucket = TokenBucket(
+                    rate=self.requests_per_second,
+                    capacity=self.burst,
+                    tokens=self.burst,
+                    updated_at=now,
+                )
+                self._buckets[endpoint] = bucket
+            reserved_tokens = 0.0
+            if priority == RequestPriority.BACKGROUND:
+                reserved_tokens = self.burst * self.INTERACTIVE_RESERVE_FRACTION
+            wait_seconds = bucket.reserve(now, reserved_tokens)
+
+        if wait_seconds > 0:
+            logger.debug("Delaying %s request to %s by %.3f seconds", priority, endpoint, wait_seconds)
+        return wait_seconds
+
+    def _roll_over(self) -> None:
+        day = self._get_day()
+        if self._usage.day != day:
+            logger.info("Resetting YouTube API quota usage for %s", day)
+            self._usage = QuotaUsage(day=day, daily_limit=self.daily_limit)
+            self._save_usage(time.monotonic())
+
+    def _load_usage(self) -> QuotaUsage:
+        day = self._get_day()
+        if self.filepath is not None and self.filepath.exists():
+            try:
+                usage = QuotaUsage.model_validate_json(self.filepath.read_text())
+            except (OSError, ValidationError):
+                logger.warning("Failed to load quota usage from %s", self.filepath)
+            else:
+                if usage.day == day:
+                    return usage.model_copy(update={"daily_limit": self.daily_limit})
+        return QuotaUsage(day=day, daily_limit=self.daily_limit)
+
+    def _save_usage(self, now: float) -> None:
+        self._is_dirty = False
+        self._saved_at = now
+        if self.filepath is None:
+            return
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        tmp_filepath = self.filepath.with_suffix(".json.tmp")
+        tmp_filepath.write_text(self._usage.model_dump_json())
+        tmp_filepath.replace(self.filepath)
+
+    @classmethod
+    def _get_day(cls) -> str:
+        return pendulum.now(cls.QUOTA_TIMEZONE).to_date_string()
+
+    @classmethod
+    def _get_seconds_until_reset(cls) -> int:
+        now = pendulum.now(cls.QUOTA_TIMEZONE)
+        return math.ceil((now.add(days=1).start_of("day") - now).total_seconds())
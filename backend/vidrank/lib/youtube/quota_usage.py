@@ -0,0 +1,10 @@
+from pydantic import BaseModel, Field
+
+
+class QuotaUsage(BaseModel):
+    """YouTube API quota units used on one day, in Pacific time when the quota resets."""
+
+    day: str
+    daily_limit: int
+    units_used: int = 0
+    units_by_endpoint: dict[str, int] = Field(default_factory=dict)
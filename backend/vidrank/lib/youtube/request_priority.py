@@ -0,0 +1,8 @@
+from enum import StrEnum, auto
+
+
+class RequestPriority(StrEnum):
+    """Enum for the priority of YouTube API requests."""
+
+    INTERACTIVE = auto()
+    BACKGROUND = auto()
@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+
+from vidrank.lib.youtube.thumbnail_set import ThumbnailSet
+from vidrank.lib.youtube.video_stats import VideoStats
+
+
+class VideoListing(BaseModel):
+    """Model for a video in API responses, with the fields needed to show it in a list or a choice set.
+
+    The duration and publish time are kept in the serialized form of `Video`, so that the JSON matches a `Video`
+    without its description.
+    """
+
+    id: str
+    title: str
+    duration: str
+    channel_id: str
+    channel: str
+    published_at: str
+    thumbnails: ThumbnailSet
+    stats: VideoStats
@@ -0,0 +1,146 @@
+import sys
+from dataclasses import dataclass, field, fields
+from typing import Any, Optional
+
+from vidrank.lib.utilities.json_utilities import dump_json
+from vidrank.lib.youtube.thumbnail import Thumbnail
+from vidrank.lib.youtube.thumbnail_set import ThumbnailSet
+from vidrank.lib.youtube.video import Video
+from vidrank.lib.youtube.video_listing import VideoListing
+from vidrank.lib.youtube.video_stats import VideoStats
+
+
+@dataclass(slots=True)
+class VideoSummary:
+    """Compact summary of a video, used to list and match videos without loading the full `Video`.
+
+    Summaries keep the fields shown in rankings and choice sets, only the highest resolution thumbnail, and no
+    description. They have no instance dict, channel strings are interned because many videos share a channel, and
+    they pickle as a flat tuple, so loading one skips pydantic validation entirely.
+
+    The serialized JSON of the listing is kept on the summary once it is first needed, so responses can reuse it for
+    as long as the summary is cached. A refetched video gets a new summary, so stale JSON is never served.
+    """
+
+    id: str
+    title: str
+    duration: str
+    channel_id: str
+    channel: str
+    published_at: str
+    thumbnail_key: Optional[str]
+    thumbnail_url: str
+    thumbnail_width: int
+    thumbnail_height: int
+    n_favorites: int
+    n_comments: int
+    n_dislikes: int
+    n_likes: int
+    n_views: int
+    _listing_json: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+
+    THUMBNAIL_KEYS = ("maxres", "high", "medium", "standard", "default")
+
+    def __post_init__(self) -> None:
+        """Intern the strings shared between videos."""
+        self.channel_id = sys.intern(self.channel_id)
+        self.channel = sys.intern(self.channel)
+        if self.thumbnail_key is not None:
+            self.thumbnail_key = sys.intern(self.thumbnail_key)
+
+    def __getstate__(self) -> tuple[Any, ...]:
+        """Get the state of the summary for pickling.
+
+        Returns:
+            tuple[Any, ...]: The field values in order, without the serialized listing.
+        """
+        return tuple(getattr(self, f.name) for f in fields(self) if f.init)
+
+    def __setstate__(self, state: tuple[Any, ...]) -> None:
+        """Restore the summary from its pickled state, interning the shared strings again.
+
+        Args:
+            state (tuple[Any, ...]): The field values in order.
+        """
+        init_fields = [f for f in fields(self) if f.init]
+        for init_field, value in zip(init_fields, state, strict=True):
+            setattr(self, init_field.name, value)
+        self._listing_json = None
+        self.__post_init__()
+
+    @classmethod
+    def from_video(cls, video: Video) -> "VideoSummary":
+        """Summarize a video.
+
+        Args:
+            video (Video): The full video.
+
+        Returns:
+            VideoSummary: The summary of the video.
+        """
+        video_json = video.model_dump(mode="json", include={"duration", "published_at"})
+        thumbnail_key, thumbnail = None, None
+        for key in cls.THUMBNAIL_KEYS:
+            thumbnail = getattr(video.thumbnails, key)
+            if thumbnail is not None:
+                thumbnail_key = key
+                break
+
+        return cls(
+            id=video.id,
+            title=video.title,
+            duration=video_json["duration"],
+            channel_id=video.channel_id,
+            channel=video.channel,
+            published_at=video_json["published_at"],
+            thumbnail_key=thumbnail_key,
+            thumbnail_url="" if thumbnail is None else thumbnail.url,
+            thumbnail_width=0 if thumbnail is None else thumbnail.width,
+            thumbnail_height=0 if thumbnail is None else thumbnail.height,
+            n_favorites=video.stats.n_favorites,
+            n_comments=video.stats.n_comments,
+            n_dislikes=video.stats.n_dislikes,
+            n_likes=video.stats.n_likes,
+            n_views=video.stats.n_views,
+        )
+
+    def to_listing(self) -> VideoListing:
+        """Convert the summary to the model returned by the API.
+
+        Returns:
+            VideoListing: The video for API responses, with only the highest resolution thumbnail set.
+        """
+        thumbnails: dict[str, Optional[Thumbnail]] = dict.fromkeys(self.THUMBNAIL_KEYS)
+        if self.thumbnail_key is not None:
+            thumbnails[self.thumbnail_key] = Thumbnail(
+                width=self.thumbnail_width,
+                height=self.thumbnail_height,
+                url=self.thumbnail_url,
+            )
+
+        return VideoListing(
+            id=self.id,
+            title=self.title,
+            duration=self.duration,
+            channel_id=self.channel_id,
+            channel=self.channel,
+            published_at=self.published_at,
+            thumbnails=ThumbnailSet(**thumbnails),
+            stats=VideoStats(
+                n_favorites=self.n_favorites,
+                n_comments=self.n_comments,
+                n_dislikes=self.n_dislikes,
+                n_likes=self.n_likes,
+                n_views=self.n_views,
+            ),
+        )
+
+    def get_listing_json(self) -> bytes:
+        """Get the serialized JSON of the listing, serializing it on first use.
+
+        Returns:
+            bytes: The listing serialized the same way as in API responses.
+        """
+        if self._listing_json is None:
+            self._listing_json = dump_json(self.to_listing().model_dump(mode="json"))
+        return self._listing_json
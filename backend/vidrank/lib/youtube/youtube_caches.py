@@ -0,0 +1,17 @@
+from dataclasses import dataclass
+
+from vidrank.lib.caching.cache import Cache
+from vidrank.lib.youtube.channel import Channel
+from vidrank.lib.youtube.playlist import Playlist
+from vidrank.lib.youtube.video import Video
+from vidrank.lib.youtube.video_summary import VideoSummary
+
+
+@dataclass(frozen=True)
+class YouTubeCaches:
+    """Caches for the data fetched from the YouTube API."""
+
+    videos: Cache[Video]
+    video_summaries: Cache[VideoSummary]
+    channels: Cache[Channel]
+    playlists: Cache[Playlist]
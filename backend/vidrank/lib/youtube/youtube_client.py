@@ -1,12 +1,18 @@
 import logging
 import math
+import time
 from typing import ClassVar, Iterator, Mapping, Optional, Union
 
 from httpx import Client as HttpClient
+from httpx import HTTPError, Response
 
+from vidrank.lib.metrics.metrics import YOUTUBE_REQUEST_ERRORS, YOUTUBE_REQUEST_LATENCY, YOUTUBE_REQUESTS
+from vidrank.lib.profiling.request_profiler import RequestProfiler
 from vidrank.lib.youtube.channel import Channel
 from vidrank.lib.youtube.playlist import Playlist
 from vidrank.lib.youtube.playlist_item import PlaylistItem
+from vidrank.lib.youtube.playlist_items_page import PlaylistItemsPage
+from vidrank.lib.youtube.quota_scheduler import QuotaScheduler
 from vidrank.lib.youtube.video import Video
 from vidrank.lib.youtube.youtube_marshaller import YouTubeMarshaller
 
@@ -38,15 +44,26 @@ class YouTubeClient:
 
     DEFAULT_BATCH_SIZE = 50
 
-    def __init__(self, api_key: str, *, batch_size: int = DEFAULT_BATCH_SIZE):
+    def __init__(
+        self,
+        api_key: str,
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        scheduler: Optional[QuotaScheduler] = None,
+        base_url: str = BASE_URL,
+    ):
         """Initialize the YouTubeClient.
 
         Args:
             api_key (str): The API key for the YouTube API.
             batch_size (int): The number of items to request in each batch.
+            scheduler (Optional[QuotaScheduler]): The scheduler that paces requests and tracks quota usage.
+            base_url (str): The base URL of the YouTube Data API, which can point at a local fake for load tests.
         """
         self.api_key = api_key
         self.batch_size = batch_size
+        self.scheduler = scheduler
+        self.base_url = base_url
         self.http_client = HttpClient()
 
     def iter_videos(self, video_ids: list[str], timeout: Optional[int] = None) -> Iterator[Video]:
@@ -83,12 +100,7 @@ class YouTubeClient:
                 if page_token is not None:
                     request_params["pageToken"] = page_token
 
-                request_url = f"{self.BASE_URL}/videos"
-                response = self.http_client.get(
-                    request_url,
-                    params=request_params,
-                    timeout=timeout,
-                )
+                response = self._get("videos", request_params, timeout)
 
                 logger.debug("Request URL: %s", response.request.url)
 
@@ -126,12 +138,7 @@ class YouTubeClient:
 
         logger.debug("Requesting channel from the YouTube API.")
 
-        request_url = f"{self.BASE_URL}/channels"
-        response = self.http_client.get(
-            request_url,
-            params=params,
-            timeout=timeout,
-        )
+        response = self._get("channels", params, timeout)
         logger.debug("Request URL: %s", response.request.url)
 
         response_json = response.json()
@@ -166,12 +173,7 @@ class YouTubeClient:
 
         logger.debug("Requesting playlist from the YouTube API.")
 
-        request_url = f"{self.BASE_URL}/playlists"
-        response = self.http_client.get(
-            request_url,
-            params=params,
-            timeout=timeout,
-        )
+        response = self._get("playlists", params, timeout)
         logger.debug("Request URL: %s", response.request.url)
 
         response_json = response.json()
@@ -185,7 +187,27 @@ class YouTubeClient:
         response_item = response_json["items"][0]
         return YouTubeMarshaller.parse_playlist(response_item, items)
 
-    def _iter_playlist_items(self, playlist_id: str, timeout: Optional[int] = None) -> Iterator[PlaylistItem]:
+    def get_playlist_items_page(
+        self,
+        playlist_id: str,
+        page_token: Optional[str] = None,
+        etag: Optional[str] = None,
+        timeout: Optional[int] = None,
+    ) -> Optional[PlaylistItemsPage]:
+        """Get one page of the items in a playlist.
+
+        Args:
+            playlist_id (str): The ID of the playlist to fetch items from.
+            page_token (Optional[str]): The token of the page to fetch, or None for the first page.
+            etag (Optional[str]): The ETag of a previous response for the same page, sent as If-None-Match.
+            timeout (int): The timeout for the request.
+
+        Returns:
+            Optional[PlaylistItemsPage]: The page of items, or None if the page has not changed since the ETag.
+
+        Raises:
+            ValueError: If the API request fails.
+        """
         params: QueryParams = {
             "playlistId": playlist_id,
             "key": self.api_key,
@@ -193,35 +215,74 @@ class YouTubeClient:
             "part": self.PLAYLIST_PARTS,
             "maxResults": self.batch_size,
         }
+        if page_token is not None:
+            params = {**params, "pageToken": page_token}
+
+        headers = {}
+        if etag is not None:
+            headers["If-None-Match"] = etag
+
+        logger.debug("Requesting playlist items from the YouTube API.")
 
+        response = self._get("playlistItems", params, timeout, headers=headers)
+        logger.debug("Request URL: %s", response.request.url)
+
+        not_modified_code = 304
+        if response.status_code == not_modified_code:
+            return None
+
+        response_json = response.json()
+        if "error" in response_json:
+            not_found_code = 404
+            if response_json["error"]["code"] == not_found_code:
+                msg = f"Playlist with ID {playlist_id} not found"
+                raise ValueError(msg)
+            raise ValueError(response_json["error"]["message"])
+
+        items = [YouTubeMarshaller.parse_playlist_item(response_item) for response_item in response_json["items"]]
+        return PlaylistItemsPage(
+            items=items,
+            next_page_token=response_json.get("nextPageToken"),
+            total_results=response_json.get("pageInfo", {}).get("totalResults", len(items)),
+            etag=response_json.get("etag", response.headers.get("ETag")),
+        )
+
+    def _iter_playlist_items(self, playlist_id: str, timeout: Optional[int] = None) -> Iterator[PlaylistItem]:
         page_token = None
         while True:
-            request_params = {**params}
-            if page_token is not None:
-                request_params["pageToken"] = page_token
-
-            logger.debug("Requesting playlist items from the YouTube API.")
-
-            request_url = f"{self.BASE_URL}/playlistItems"
-            response = self.http_client.get(
-                request_url,
-                timeout=timeout,
-                params=request_params,
-            )
-            logger.debug("Request URL: %s", response.request.url)
-
-            response_json = response.json()
-            if "error" in response_json:
-                not_found_code = 404
-                if response_json["error"]["code"] == not_found_code:
-                    msg = f"Playlist with ID {playlist_id} not found"
-                    raise ValueError(msg)
-                raise ValueError(response_json["error"]["message"])
-
-            for response_item in response_json["items"]:
-                yield YouTubeMarshaller.parse_playlist_item(response_item)
-
-            if "nextPageToken" in response_json:
-                page_token = response_json["nextPageToken"]
+            page = self.get_playlist_items_page(playlist_id, page_token=page_token, timeout=timeout)
+            if page is None:
+                break
+
+            yield from page.items
+
+            if page.next_page_token is not None:
+                page_token = page.next_page_token
             else:
                 break
+
+    def _get(
+        self,
+        endpoint: str,
+        params: QueryParams,
+        timeout: Optional[int],
+        headers: Optional[dict[str, str]] = None,
+    ) -> Response:
+        if self.scheduler is not None:
+            self.scheduler.acquire(endpoint)
+
+        request_url = f"{self.base_url}/{endpoint}"
+        YOUTUBE_REQUESTS.labels(endpoint).inc()
+        start = time.perf_counter()
+        try:
+            with RequestProfiler.section(f"youtube.{endpoint}"):
+                response = self.http_client.get(request_url, params=params, timeout=timeout, headers=headers)
+        except HTTPError:
+            YOUTUBE_REQUEST_ERRORS.labels(endpoint).inc()
+            raise
+        finally:
+            YOUTUBE_REQUEST_LATENCY.labels(endpoint).observe(time.perf_counter() - start)
+
+        if response.is_error:
+            YOUTUBE_REQUEST_ERRORS.labels(endpoint).inc()
+        return response
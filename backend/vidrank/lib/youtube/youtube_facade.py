@@ -1,38 +1,64 @@
+import asyncio
 import logging
 from typing import Iterable, Iterator
 
-from vidrank.lib.caching.pickle_cache import PickleCache
+from vidrank.lib.caching.async_single_flight import AsyncSingleFlight
+from vidrank.lib.caching.batch_loader import BatchLoader
+from vidrank.lib.caching.single_flight import SingleFlight
+from vidrank.lib.youtube.async_youtube_client import AsyncYouTubeClient
 from vidrank.lib.youtube.channel import Channel
 from vidrank.lib.youtube.playlist import Playlist
+from vidrank.lib.youtube.quota_scheduler import QuotaScheduler
 from vidrank.lib.youtube.video import Video
+from vidrank.lib.youtube.video_summary import VideoSummary
+from vidrank.lib.youtube.youtube_caches import YouTubeCaches
 from vidrank.lib.youtube.youtube_client import YouTubeClient
 
 logger = logging.getLogger(__name__)
 
 
 class YouTubeFacade:
-    """Facade for the YouTube API."""
+    """Facade for the YouTube API.
+
+    Cache misses from concurrent callers are coalesced: a video, channel or playlist that is already being fetched is
+    not requested again, and videos missed within a short window are fetched together in one batched request. The
+    async methods share fetches that are in flight on the event loop in the same way.
+
+    Fetched videos are also stored as compact summaries, which listings and matching read instead of full videos. Full
+    videos are only loaded for summaries that are missing, like those of videos cached before summaries existed.
+    """
 
     def __init__(
         self,
         *,
         youtube_client: YouTubeClient,
-        video_cache: PickleCache[Video],
-        channel_cache: PickleCache[Channel],
-        playlist_cache: PickleCache[Playlist],
+        async_youtube_client: AsyncYouTubeClient,
+        caches: YouTubeCaches,
     ):
         """Initialize the YouTubeFacade.
 
         Args:
             youtube_client (YouTubeClient): The client for the YouTube API.
-            video_cache (PickleCache[Video]): The cache for videos.
-            channel_cache (PickleCache[Channel]): The cache for channels.
-            playlist_cache (PickleCache[Playlist]): The cache for playlists.
+            async_youtube_client (AsyncYouTubeClient): The asynchronous client for the YouTube API.
+            caches (YouTubeCaches): The caches for videos, video summaries, channels and playlists.
         """
         self.youtube_client = youtube_client
-        self.video_cache = video_cache
-        self.channel_cache = channel_cache
-        self.playlist_cache = playlist_cache
+        self.async_youtube_client = async_youtube_client
+        self.video_cache = caches.videos
+        self.video_summary_cache = caches.video_summaries
+        self.channel_cache = caches.channels
+        self.playlist_cache = caches.playlists
+
+        self._video_loader = BatchLoader(
+            self._load_videos,
+            max_batch_size=youtube_client.batch_size,
+            priority_fn=QuotaScheduler.get_priority_rank,
+        )
+        self._channel_flight: SingleFlight[Channel] = SingleFlight()
+        self._playlist_flight: SingleFlight[Playlist] = SingleFlight()
+        self._async_video_flight: AsyncSingleFlight[Video] = AsyncSingleFlight()
+        self._async_channel_flight: AsyncSingleFlight[Channel] = AsyncSingleFlight()
+        self._async_playlist_flight: AsyncSingleFlight[Playlist] = AsyncSingleFlight()
 
     def get_video(self, video_id: str, use_cache: bool = True) -> Video:
         """Get a video by its ID.
@@ -52,13 +78,32 @@ class YouTubeFacade:
             if video is not None:
                 return video
 
-        for video in self.youtube_client.iter_videos([video_id]):
-            self.video_cache.add(video.id, video)
-            return video
+        videos = self._fetch_videos([video_id], use_cache=use_cache)
+        if video_id in videos:
+            return videos[video_id]
 
         msg = f"Video with ID {video_id} not found"
         raise ValueError(msg)
 
+    def get_videos(self, video_ids: Iterable[str], use_cache: bool = True) -> dict[str, Video]:
+        """Get several videos by their IDs, fetching all cache misses with one batched request.
+
+        Args:
+            video_ids (Iterable[str]): The IDs of the videos to fetch.
+            use_cache (bool): Whether to use the cache to fetch the videos.
+
+        Returns:
+            dict[str, Video]: The videos that were found, keyed by ID. Deleted and private videos are left out.
+        """
+        video_ids = list(video_ids)
+        videos = self.video_cache.get_many(video_ids) if use_cache else {}
+
+        video_ids_to_fetch = [video_id for video_id in video_ids if video_id not in videos]
+        if len(video_ids_to_fetch) != 0:
+            videos.update(self._fetch_videos(video_ids_to_fetch, use_cache=use_cache))
+
+        return videos
+
     def iter_videos(self, video_ids: Iterable[str], use_cache: bool = True) -> Iterator[Video]:
         """Iterate over videos with the given IDs.
 
@@ -69,19 +114,41 @@ class YouTubeFacade:
         Returns:
             Iterator[Video]: An iterator over the videos with the given IDs.
         """
+        video_ids = list(video_ids)
+        cached_videos = self.video_cache.get_many(video_ids) if use_cache else {}
+
         video_ids_to_fetch = []
         for video_id in video_ids:
-            if use_cache:
-                video = self.video_cache.get(video_id)
-                if video is not None:
-                    yield video
-                    continue
+            video = cached_videos.get(video_id)
+            if video is not None:
+                yield video
+                continue
             video_ids_to_fetch.append(video_id)
 
         if len(video_ids_to_fetch) != 0:
-            for video in self.youtube_client.iter_videos(video_ids_to_fetch):
-                self.video_cache.add(video.id, video)
-                yield video
+            fetched_videos = self._fetch_videos(video_ids_to_fetch, use_cache=use_cache)
+            for video_id in video_ids_to_fetch:
+                if video_id in fetched_videos:
+                    yield fetched_videos[video_id]
+
+    def get_video_summaries(self, video_ids: Iterable[str]) -> dict[str, VideoSummary]:
+        """Get the summaries of several videos, loading full videos only for missing summaries.
+
+        Args:
+            video_ids (Iterable[str]): The IDs of the videos to summarize.
+
+        Returns:
+            dict[str, VideoSummary]: The summaries of the videos that were found, keyed by ID. Deleted and private
+                videos are left out.
+        """
+        video_ids = list(video_ids)
+        summaries = self.video_summary_cache.get_many(video_ids)
+
+        video_ids_to_load = [video_id for video_id in video_ids if video_id not in summaries]
+        if len(video_ids_to_load) != 0:
+            summaries.update(self._summarize_videos(self.get_videos(video_ids_to_load)))
+
+        return summaries
 
     def get_channel(self, channel_id: str, use_cache: bool = True) -> Channel:
         """Get a channel by its ID.
@@ -98,6 +165,8 @@ class YouTubeFacade:
             if channel is not None:
                 return channel
 
+            return self._channel_flight.do(channel_id, lambda: self._load_channel(channel_id))
+
         channel = self.youtube_client.get_channel(channel_id)
         self.channel_cache.add(channel.id, channel)
         return channel
@@ -117,6 +186,165 @@ class YouTubeFacade:
             if playlist is not None:
                 return playlist
 
+            return self._playlist_flight.do(playlist_id, lambda: self._load_playlist(playlist_id))
+
         playlist = self.youtube_client.get_playlist(playlist_id)
         self.playlist_cache.add(playlist.id, playlist)
         return playlist
+
+    async def get_videos_async(self, video_ids: Iterable[str], use_cache: bool = True) -> dict[str, Video]:
+        """Get several videos by their IDs without blocking the event loop.
+
+        Cache lookups run in a worker thread and all cache misses are fetched with concurrent chunked requests, except
+        for videos that are already being fetched by another caller.
+
+        Args:
+            video_ids (Iterable[str]): The IDs of the videos to fetch.
+            use_cache (bool): Whether to use the cache to fetch the videos.
+
+        Returns:
+            dict[str, Video]: The videos that were found, keyed by ID. Deleted and private videos are left out.
+        """
+        video_ids = list(video_ids)
+        videos = await asyncio.to_thread(self.video_cache.get_many, video_ids) if use_cache else {}
+
+        video_ids_to_fetch = [video_id for video_id in video_ids if video_id not in videos]
+        if len(video_ids_to_fetch) != 0:
+            if use_cache:
+                videos.update(await self._async_video_flight.do_many(video_ids_to_fetch, self._load_videos_async))
+            else:
+                videos.update(await self._request_videos_async(video_ids_to_fetch))
+
+        return videos
+
+    async def get_video_summaries_async(self, video_ids: Iterable[str]) -> dict[str, VideoSummary]:
+        """Get the summaries of several videos without blocking the event loop.
+
+        Args:
+            video_ids (Iterable[str]): The IDs of the videos to summarize.
+
+        Returns:
+            dict[str, VideoSummary]: The summaries of the videos that were found, keyed by ID. Deleted and private
+                videos are left out.
+        """
+        video_ids = list(video_ids)
+        summaries = await asyncio.to_thread(self.video_summary_cache.get_many, video_ids)
+
+        video_ids_to_load = [video_id for video_id in video_ids if video_id not in summaries]
+        if len(video_ids_to_load) != 0:
+            videos = await self.get_videos_async(video_ids_to_load)
+            summaries.update(await asyncio.to_thread(self._summarize_videos, videos))
+
+        return summaries
+
+    async def get_channel_async(self, channel_id: str, use_cache: bool = True) -> Channel:
+        """Get a channel by its ID without blocking the event loop.
+
+        Args:
+            channel_id (str): The ID of the channel to fetch.
+            use_cache (bool): Whether to use the cache to fetch the channel.
+
+        Returns:
+            Channel: The channel with the given ID.
+        """
+        if use_cache:
+            channel = await asyncio.to_thread(self.channel_cache.get, channel_id)
+            if channel is not None:
+                return channel
+
+            return await self._async_channel_flight.do(channel_id, lambda: self._load_channel_async(channel_id))
+
+        channel = await self.async_youtube_client.get_channel(channel_id)
+        await asyncio.to_thread(self.channel_cache.add, channel.id, channel)
+        return channel
+
+    async def get_playlist_async(self, playlist_id: str, use_cache: bool = True) -> Playlist:
+        """Get a playlist by its ID without blocking the event loop.
+
+        Args:
+            playlist_id (str): The ID of the playlist to fetch.
+            use_cache (bool): Whether to use the cache to fetch the playlist.
+
+        Returns:
+            Playlist: The playlist with the given ID.
+        """
+        if use_cache:
+            playlist = await asyncio.to_thread(self.playlist_cache.get, playlist_id)
+            if playlist is not None:
+                return playlist
+
+            return await self._async_playlist_flight.do(playlist_id, lambda: self._load_playlist_async(playlist_id))
+
+        playlist = await self.async_youtube_client.get_playlist(playlist_id)
+        await asyncio.to_thread(self.playlist_cache.add, playlist.id, playlist)
+        return playlist
+
+    def _fetch_videos(self, video_ids: list[str], use_cache: bool) -> dict[str, Video]:
+        if not use_cache:
+            return self._request_videos(video_ids)
+        return self._video_loader.load_many(video_ids)
+
+    def _load_videos(self, video_ids: list[str]) -> dict[str, Video]:
+        # NOTE: Another batch may have cached some of these videos since the caller missed the cache
+        videos = self.video_cache.get_many(video_ids)
+        video_ids_to_fetch = [video_id for video_id in video_ids if video_id not in videos]
+        if len(video_ids_to_fetch) != 0:
+            videos.update(self._request_videos(video_ids_to_fetch))
+        return videos
+
+    def _request_videos(self, video_ids: list[str]) -> dict[str, Video]:
+        fetched_videos = {video.id: video for video in self.youtube_client.iter_videos(video_ids)}
+        self._add_videos(fetched_videos)
+        return fetched_videos
+
+    def _add_videos(self, videos: dict[str, Video]) -> None:
+        self.video_cache.add_many(videos)
+        self.video_summary_cache.add_many(
+            {video_id: VideoSummary.from_video(video) for video_id, video in videos.items()}
+        )
+
+    def _summarize_videos(self, videos: dict[str, Video]) -> dict[str, VideoSummary]:
+        summaries = {video_id: VideoSummary.from_video(video) for video_id, video in videos.items()}
+        self.video_summary_cache.add_many(summaries)
+        return summaries
+
+    def _load_channel(self, channel_id: str) -> Channel:
+        channel = self.channel_cache.get(channel_id)
+        if channel is None:
+            channel = self.youtube_client.get_channel(channel_id)
+            self.channel_cache.add(channel.id, channel)
+        return channel
+
+    def _load_playlist(self, playlist_id: str) -> Playlist:
+        playlist = self.playlist_cache.get(playlist_id)
+        if playlist is None:
+            playlist = self.youtube_client.get_playlist(playlist_id)
+            self.playlist_cache.add(playlist.id, playlist)
+        return playlist
+
+    async def _load_videos_async(self, video_ids: list[str]) -> dict[str, Video]:
+        # NOTE: Another fetch may have cached some of these videos since the caller missed the cache
+        videos = await asyncio.to_thread(self.video_cache.get_many, video_ids)
+        video_ids_to_fetch = [video_id for video_id in video_ids if video_id not in videos]
+        if len(video_ids_to_fetch) != 0:
+            videos.update(await self._request_videos_async(video_ids_to_fetch))
+        return videos
+
+    async def _request_videos_async(self, video_ids: list[str]) -> dict[str, Video]:
+        fetched_videos = {video.id: video for video in await self.async_youtube_client.get_videos(video_ids)}
+        await asyncio.to_thread(self._add_videos, fetched_videos)
+        return fetched_videos
+
+    async def _load_channel_async(self, channel_id: str) -> Channel:
+        channel = await asyncio.to_thread(self.channel_cache.get, channel_id)
+        if channel is None:
+            channel = await self.async_youtube_client.get_channel(channel_id)
+            await asyncio.to_thread(self.channel_cache.add, channel.id, channel)
+        return channel
+
+    async def _load_playlist_async(self, playlist_id: str) -> Playlist:
+        playlist = await asyncio.to_thread(self.playlist_cache.get, playlist_id)
+        if playlist is None:
+            playlist = await self.async_youtube_client.get_playlist(playlist_id)
+            await asyncio.to_thread(self.playlist_cache.add, playlist.id, playlist)
+        return playlist
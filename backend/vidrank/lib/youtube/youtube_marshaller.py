@@ -167,4 +167,6 @@ class YouTubeMarshaller:
             title=playlist_item_dict["snippet"]["title"],
             description=playlist_item_dict["snippet"]["description"],
             thumbnails=cls.parse_thumbnail_set(playlist_item_dict["snippet"]["thumbnails"]),
+            # NOTE: The channel of the video is missing for deleted and private videos
+            channel=playlist_item_dict["snippet"].get("videoOwnerChannelTitle", ""),
         )